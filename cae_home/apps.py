@@ -1,4 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+
+from workspace import logging as init_logging
+
+
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+
+# Cache backends which only exist within a single process.
+PER_PROCESS_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
 
 
 class CaeHomeConfig(AppConfig):
@@ -8,3 +22,24 @@ class CaeHomeConfig(AppConfig):
     def ready(self):
         # Connect signals.
         from . import signals
+
+        # Find user login hooks for installed apps, once, rather than on every login.
+        from workspace.ldap_backends import login_hooks
+        login_hooks.discover()
+
+        check_shared_cache()
+
+
+def check_shared_cache():
+    """
+    Warns if default cache isn't shared between worker processes.
+    LDAP search results, LDAP rate limits and reference data changes all rely on the cache to reach other workers.
+    With a per-process cache, each worker instead has its own copy, and its own full LDAP rate limit.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend in PER_PROCESS_CACHE_BACKENDS:
+        logger.warning(
+            'Default cache "{0}" is not shared between worker processes. LDAP results, LDAP rate limits and '
+            'reference data changes will only apply per process. Set CACHES to a shared backend, such as Redis, '
+            'in env.py.'.format(backend)
+        )
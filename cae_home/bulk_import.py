@@ -0,0 +1,263 @@
+"""
+Bulk import logic for CAE Home app.
+
+Most models in this project call full_clean() on every save(). That validates each row individually, including one
+uniqueness query per unique field and one existence query per foreign key. Meanwhile, bulk_create() skips validation
+entirely.
+
+The bulk_import() function instead validates a full batch of unsaved model instances at once:
+    * Field validation and model clean() logic run per row, same as full_clean() would.
+    * Foreign keys are checked for existence with a single query per foreign key field.
+    * Unique fields are checked against both other rows in the batch, and against the database with a single query
+      per unique check.
+
+Valid rows are then inserted (or optionally updated, for rows matching an existing model) in bulk.
+Invalid rows are skipped, with errors reported per row.
+
+Note that model save() logic and signals are bypassed.
+"""
+
+# System Imports.
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connection, transaction
+from django.db.models import Field, FileField, Q
+from django.utils import timezone
+
+# User Imports.
+from cae_home import reference_data
+
+
+class BulkImportResult:
+    """
+    Results of a bulk import.
+    """
+    def __init__(self):
+        # Lists of saved model instances.
+        # Note that, depending on database, created instances may not have their pk set.
+        self.created = []
+        self.updated = []
+
+        # Dictionary of {row index: ValidationError}, for rows that failed validation.
+        self.errors = {}
+
+    def __str__(self):
+        return 'Created: {0}, Updated: {1}, Errors: {2}'.format(len(self.created), len(self.updated), len(self.errors))
+
+    @property
+    def is_valid(self):
+        return len(self.errors) == 0
+
+    def get_error_messages(self):
+        """
+        Returns all row errors as readable strings.
+        :return: List of error strings, one per invalid row.
+        """
+        return ['Row {0}: {1}'.format(index, '; '.join(error.messages)) for index, error in sorted(self.errors.items())]
+
+
+def bulk_import(model, instances, match_field=None, update_fields=None, batch_size=1000):
+    """
+    Validates and saves many unsaved model instances at once.
+    :param model: Model class of instances.
+    :param instances: Iterable of unsaved model instances.
+    :param match_field: Optional name of unique field to match existing models on. If provided, rows matching an
+        existing model update that model, instead of failing uniqueness validation.
+    :param update_fields: Optional names of fields to write for updated models. Defaults to all editable fields.
+    :param batch_size: Number of rows to validate and save at once.
+    :return: BulkImportResult instance.
+    """
+    instances = list(instances)
+    result = BulkImportResult()
+
+    if match_field is not None and not model._meta.get_field(match_field).unique:
+        raise ValueError('Match field "{0}" must be a unique field.'.format(match_field))
+    if update_fields is None:
+        update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and not getattr(field, 'auto_now_add', False)
+        ]
+
+    for index in range(0, len(instances), batch_size):
+        batch = list(enumerate(instances[index:index + batch_size], start=index))
+        errors = _validate_batch(model, batch, match_field)
+
+        new_instances = []
+        existing_instances = []
+        for row_index, instance in batch:
+            if row_index in errors:
+                result.errors[row_index] = ValidationError(errors[row_index])
+            elif instance._state.adding:
+                new_instances.append(instance)
+            else:
+                existing_instances.append(instance)
+
+        # Save all valid rows.
+        with transaction.atomic():
+            model.objects.bulk_create(new_instances, batch_size=batch_size)
+            if existing_instances:
+                # Bulk updates do not set auto_now fields, such as "date_modified". Set these manually.
+                now = timezone.now()
+                for field in model._meta.concrete_fields:
+                    if getattr(field, 'auto_now', False) and field.name in update_fields:
+                        for instance in existing_instances:
+                            setattr(instance, field.attname, now)
+                model.objects.bulk_update(existing_instances, update_fields, batch_size=batch_size)
+
+        result.created += new_instances
+        result.updated += existing_instances
+
+    # Reference data is normally invalidated on model save. Do so manually, in case model is reference data.
+    if result.created or result.updated:
+        reference_data.invalidate(model)
+
+    return result
+
+
+def _validate_batch(model, batch, match_field):
+    """
+    Validates a single batch of rows.
+    :param model: Model class of instances.
+    :param batch: List of (row index, model instance) tuples.
+    :param match_field: Optional name of unique field to match existing models on.
+    :return: Dictionary of {row index: {field name: list of errors}}, for invalid rows.
+    """
+    errors = {}
+    foreign_keys = [field for field in model._meta.concrete_fields if field.many_to_one or field.one_to_one]
+
+    # Run field validation and model clean() logic per row.
+    # Foreign keys are excluded, as Django would query for each related model individually.
+    for row_index, instance in batch:
+        try:
+            instance.full_clean(exclude=[field.name for field in foreign_keys], validate_unique=False)
+        except ValidationError as err:
+            _add_errors(errors, row_index, err)
+
+        for field in foreign_keys:
+            try:
+                value = field.to_python(getattr(instance, field.attname))
+                Field.validate(field, value, instance)
+                field.run_validators(value)
+                setattr(instance, field.attname, value)
+            except ValidationError as err:
+                _add_errors(errors, row_index, ValidationError({field.name: err.error_list}))
+
+        # Apply any field value formatting that normally happens on save, so uniqueness is checked on final values.
+        # Date fields set themselves on write, and file fields would save their files, so these are skipped.
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField):
+                continue
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                continue
+            setattr(instance, field.attname, field.pre_save(instance, True))
+
+    # Check that all foreign keys exist, one query per field.
+    for field in foreign_keys:
+        values = {
+            getattr(instance, field.attname) for row_index, instance in batch
+            if getattr(instance, field.attname) is not None
+        }
+        if not values:
+            continue
+
+        related_model = field.remote_field.model
+        related_field_name = field.remote_field.field_name
+        existing_values = set(
+            related_model._base_manager.filter(**{'{0}__in'.format(related_field_name): values}).complex_filter(
+                field.get_limit_choices_to(),
+            ).values_list(related_field_name, flat=True)
+        )
+        for row_index, instance in batch:
+            value = getattr(instance, field.attname)
+            if value is not None and value not in existing_values:
+                _add_errors(errors, row_index, ValidationError({field.name: ValidationError(
+                    field.error_messages['invalid'],
+                    code='invalid',
+                    params={
+                        'model': related_model._meta.verbose_name,
+                        'pk': value,
+                        'field': related_field_name,
+                        'value': value,
+                    },
+                )}))
+
+    # Match rows to existing models, if requested.
+    if match_field is not None:
+        existing_pks = dict(model._default_manager.filter(**{'{0}__in'.format(match_field): [
+            getattr(instance, match_field) for row_index, instance in batch
+        ]}).values_list(match_field, 'pk'))
+        for row_index, instance in batch:
+            pk = existing_pks.get(getattr(instance, match_field), None)
+            if pk is not None:
+                instance.pk = pk
+                instance._state.adding = False
+
+    # Check uniqueness, one query per unique check.
+    unique_checks, date_checks = batch[0][1]._get_unique_checks()
+    for model_class, unique_check in unique_checks:
+        _validate_unique_check(model_class, unique_check, batch, errors)
+
+    # Date based uniqueness checks are rare enough that they're simply checked per row.
+    if date_checks:
+        for row_index, instance in batch:
+            date_errors = instance._perform_date_checks(date_checks)
+            if date_errors:
+                _add_errors(errors, row_index, ValidationError(date_errors))
+
+    return errors
+
+
+def _validate_unique_check(model_class, unique_check, batch, errors):
+    """
+    Validates a single set of unique fields, against both the batch itself and the database.
+    """
+    fields = [model_class._meta.get_field(field_name) for field_name in unique_check]
+
+    # Collect lookup values for each row. Same as Django, rows with empty values are not checked.
+    row_keys = {}
+    for row_index, instance in batch:
+        key = tuple(getattr(instance, field.attname) for field in fields)
+        if any(
+            value is None or (value == '' and connection.features.interprets_empty_strings_as_nulls)
+            for value in key
+        ):
+            continue
+        if len(fields) == 1 and fields[0].primary_key and instance._state.adding is False:
+            # Row is matched to an existing model, so pk is always "taken" by that model itself.
+            continue
+        row_keys[row_index] = key
+    if not row_keys:
+        return
+
+    # Get existing database values.
+    if len(fields) == 1:
+        lookup = Q(**{'{0}__in'.format(fields[0].name): [key[0] for key in row_keys.values()]})
+    else:
+        lookup = Q()
+        for key in set(row_keys.values()):
+            lookup |= Q(**{field.name: value for field, value in zip(fields, key)})
+    existing_keys = {}
+    for values in model_class._default_manager.filter(lookup).values_list(*unique_check, 'pk'):
+        existing_keys[tuple(values[:-1])] = values[-1]
+
+    # Check each row against database values and prior rows in batch.
+    batch_keys = set()
+    instances = dict(batch)
+    for row_index, key in row_keys.items():
+        instance = instances[row_index]
+        existing_pk = existing_keys.get(key, None)
+        if key in batch_keys or (existing_pk is not None and existing_pk != instance.pk):
+            # Same as Django, single field errors belong to that field. Otherwise they're general model errors.
+            error_key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+            _add_errors(errors, row_index, ValidationError({
+                error_key: instance.unique_error_message(model_class, unique_check),
+            }))
+        batch_keys.add(key)
+
+
+def _add_errors(errors, row_index, err):
+    """
+    Merges validation error into dictionary of row errors.
+    """
+    row_errors = errors.setdefault(row_index, {})
+    for field_name, field_errors in err.update_error_dict({}).items():
+        row_errors.setdefault(field_name, []).extend(field_errors)
@@ -12,6 +12,9 @@ from django.contrib.auth.models import Group
 from django.core.exceptions import PermissionDenied
 from functools import wraps
 
+# User Imports.
+from cae_home.user_context import get_group_names
+
 
 def group_required(*required_groups):
     """
@@ -19,8 +22,13 @@ def group_required(*required_groups):
     To access view, user must be part of one or more groups provided.
     Logic from https://codereview.stackexchange.com/questions/57073/django-custom-decorator-for-user-group-check
 
+    Group names are resolved once, when decorator is applied. User groups are checked against the user's cached group
+    names, so checks don't query the database once cache is warm.
+
     Note: If you update this, make sure to also update below GroupRequiredMixin class.
     """
+    required_group_set = _get_required_group_set(required_groups)
+
     def check_group(view_func):
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
@@ -32,19 +40,8 @@ def group_required(*required_groups):
                 messages.warning(request, 'Please log in to view the page.')
                 return redirect_to_login(request.path)
 
-            # Check that provided values are Group models. If not, convert to such.
-            required_group_set = []
-            for passed_group in required_groups:
-                if isinstance(passed_group, list) or isinstance(passed_group, tuple):
-                    # Is list of groups. Handle accordingly.
-                    for inner_passed_group in passed_group:
-                        required_group_set.append(_validate_group(inner_passed_group))
-                else:
-                    # Is single value. Handle accordingly.
-                    required_group_set.append(_validate_group(passed_group))
-
             # Check that user is either superuser, or part of provided groups.
-            if user.is_superuser or bool(user.groups.filter(name__in=required_group_set).exists()):
+            if user.is_superuser or required_group_set.has_any(user, request):
                 return view_func(request, *args, **kwargs)
             else:
                 raise PermissionDenied
@@ -52,23 +49,72 @@ def group_required(*required_groups):
     return check_group
 
 
-def _validate_group(group):
+# Sets of required Group names, keyed by frozenset of names. Shared by all views requiring the same groups.
+_required_group_sets = {}
+
+
+def _get_required_group_set(required_groups):
     """
-    Validates if provided value is auth Group model or not.
-    If not, then assumes is str representation of desired Group name.
+    Gets set of required Groups for provided values. Reuses any existing set for the same Group names, so Group names
+    are only validated once per distinct set.
+    :param required_groups: Group models or Group names, plus lists of either.
+    :return: _RequiredGroups instance.
     """
-    # Check if Group model instance.
-    if isinstance(group, Group):
-        # Is Group model. Add to directly list.
-        return group
-    else:
-        # Not Group model. Assume is str of desired Group's name.
-        try:
-            return Group.objects.get(name=str(group).strip())
-        except Group.DoesNotExist:
-            raise Group.DoesNotExist(
-                'Invalid Group name of "{0}" provided. Could not find corresponding group.'.format(group),
-            )
+    names = frozenset(_get_group_names(required_groups))
+    required_group_set = _required_group_sets.get(names, None)
+    if required_group_set is None:
+        required_group_set = _required_group_sets.setdefault(names, _RequiredGroups(names))
+    return required_group_set
+
+
+class _RequiredGroups:
+    """
+    Set of Group names required to access a view.
+    """
+    def __init__(self, names):
+        self.names = names
+        self._validated = False
+
+    def has_any(self, user, request):
+        """
+        Checks if user is part of one or more required groups.
+        :param user: User to check.
+        :param request: Associated web request object.
+        :return: True if user is in a required group | False otherwise.
+        """
+        if not self._validated:
+            self.validate()
+        return not self.names.isdisjoint(get_group_names(user, request))
+
+    def validate(self):
+        """
+        Checks that all required groups exist. Only runs until first success, as Groups are rarely removed.
+        Not run when decorator is applied, as database may not be ready on import.
+        """
+        existing_names = set(Group.objects.filter(name__in=self.names).values_list('name', flat=True))
+        for name in sorted(self.names):
+            if name not in existing_names:
+                raise Group.DoesNotExist(
+                    'Invalid Group name of "{0}" provided. Could not find corresponding group.'.format(name),
+                )
+        self._validated = True
+
+
+def _get_group_names(required_groups):
+    """
+    Gets Group names for provided values, flattening any lists.
+    If value is not an auth Group model, then assumes is str representation of desired Group name.
+    """
+    for passed_group in required_groups:
+        if isinstance(passed_group, list) or isinstance(passed_group, tuple):
+            # Is list of groups. Handle accordingly.
+            yield from _get_group_names(passed_group)
+        elif isinstance(passed_group, Group):
+            # Is Group model. Use name directly.
+            yield passed_group.name
+        else:
+            # Not Group model. Assume is str of desired Group's name.
+            yield str(passed_group).strip()
 
 
 class GroupRequiredMixin:
@@ -92,25 +138,17 @@ class GroupRequiredMixin:
             messages.warning(request, 'Please log in to view the page.')
             return redirect_to_login(request.path)
 
-        # Check that provided values are Group models. If not, convert to such.
-        required_group_set = []
-        if self.required_user_auth_groups:
-            for passed_group in self.required_user_auth_groups:
-                if isinstance(passed_group, list) or isinstance(passed_group, tuple):
-                    # Is list of groups. Handle accordingly.
-                    for inner_passed_group in passed_group:
-                        required_group_set.append(_validate_group(inner_passed_group))
-                else:
-                    # Is single value. Handle accordingly.
-                    required_group_set.append(_validate_group(passed_group))
-        else:
+        # Check that groups were provided.
+        if not self.required_user_auth_groups:
             raise ValueError(
                 'GroupRequiredMixin is called, but no groups provided. Please populate class the ' +
                 '"required_user_auth_groups" value with desired groups.'
             )
 
         # Check that user is either superuser, or part of provided groups.
-        if user.is_superuser or bool(user.groups.filter(name__in=required_group_set).exists()):
+        # Groups are resolved on each request, so values set on instance (such as through as_view()) apply.
+        required_group_set = _get_required_group_set(self.required_user_auth_groups)
+        if user.is_superuser or required_group_set.has_any(user, request):
             return super().dispatch(request, *args, **kwargs)
         else:
             raise PermissionDenied
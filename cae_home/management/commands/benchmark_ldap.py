@@ -0,0 +1,217 @@
+"""
+Command to benchmark the LDAP backends, against an in-memory fake directory. See "workspace/ldap_backends/fake_ldap.py".
+
+Runs the "createstudents" import, first and repeat user logins, and the "update_user_models" sync for a set of
+generated users.
+Reports wall time and directory calls per user, for each.
+
+All changes are made within a transaction that is rolled back at the end, so no data is actually modified.
+Likewise, LDAP results are cached in a separate, temporary cache. So the actual cache is never given fake results.
+"""
+
+# System Imports.
+import contextlib, os, tempfile, time
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from os import devnull
+
+# User Imports.
+from cae_home import models
+from cae_home.management.commands import createstudents, update_user_models
+from workspace.ldap_backends import connection_pool, fake_ldap, ldap_guard
+from workspace.ldap_backends.wmu_auth import cae_backend
+
+
+# Settings to connect backends to fake directory with.
+FAKE_LDAP_SETTINGS = {
+    **fake_ldap.SETTINGS,
+    'AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS': False,
+    'LDAP_RATE_LIMITS': {},     # Limits protect the actual directories. The fake directory doesn't need them.
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'benchmark_ldap',
+        },
+    },
+}
+
+# Fixtures needed to create users, with a model to check if each is already loaded.
+REQUIRED_FIXTURES = [
+    (Group, 'production_models/auth_groups'),
+    (models.SiteTheme, 'production_models/site_themes'),
+    (models.Department, 'production_models/departments'),
+    (models.Major, 'production_models/majors'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks LDAP backend logic against an in-memory fake directory, reporting time and directory calls.'
+
+    def add_arguments(self, parser):
+        """
+        Parser for command.
+        """
+        # Optional arguments.
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=100,
+            help='Number of users to generate, and import with "createstudents". Defaults to 100.',
+        )
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=25,
+            help='Number of generated users to log in as. Defaults to 25.',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=2,
+            help='Milliseconds each directory search takes. Binds and authentication take five times as long. '
+            'Defaults to 2.',
+        )
+        parser.add_argument(
+            '--failure_rate',
+            type=float,
+            default=0,
+            help='Chance (0 to 1) of each directory call failing. Defaults to 0.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed for generated users and failures, so runs are reproducible. Defaults to 0.',
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        The logic of the command.
+        """
+        latency = kwargs['latency'] / 1000
+
+        with override_settings(**FAKE_LDAP_SETTINGS):
+            directory = fake_ldap.FakeDirectory.generate(
+                user_count=kwargs['users'],
+                seed=kwargs['seed'],
+                latency={'bind': latency * 5, 'unbind': latency, 'search': latency, 'authenticate': latency * 5},
+                failure_rate={operation: kwargs['failure_rate'] for operation in fake_ldap.OPERATIONS},
+            )
+            fake_ldap.set_directory(directory)
+
+            try:
+                with transaction.atomic():
+                    # Make sure reference models exist, for new users.
+                    with open(devnull, 'a') as null:
+                        for model, fixture in REQUIRED_FIXTURES:
+                            if not model.objects.exists():
+                                call_command('loaddata', fixture, stdout=null)
+
+                    # Run benchmarks.
+                    login_count = min(kwargs['logins'], len(directory.users))
+                    results = [
+                        self.run_benchmark(directory, 'createstudents', len(directory.users), self.create_students),
+                        self.run_benchmark(directory, 'Logins', login_count, self.login),
+                        self.run_benchmark(directory, 'Repeat logins', login_count, self.login),
+                        self.run_benchmark(directory, 'update_user_models', None, self.update_user_models),
+                    ]
+
+                    # Undo all changes.
+                    transaction.set_rollback(True)
+            finally:
+                fake_ldap.set_directory(None)
+                connection_pool.close_all()
+
+        # Display results.
+        self.stdout.write('{0:<22}{1:>8}{2:>8}{3:>12}{4:>12}{5:>12}{6:>12}{7:>12}'.format(
+            'Benchmark', 'Users', 'Errors', 'Seconds', 'Calls', 'Calls/User', 'Searches', 'Refused',
+        ))
+        for name, user_count, error_count, seconds, calls, refused_count in results:
+            self.stdout.write('{0:<22}{1:>8}{2:>8}{3:>12.3f}{4:>12}{5:>12.2f}{6:>12}{7:>12}'.format(
+                name,
+                user_count,
+                error_count,
+                seconds,
+                sum(calls.values()),
+                sum(calls.values()) / max(user_count, 1),
+                calls['search'],
+                refused_count,
+            ))
+
+    def run_benchmark(self, directory, name, user_count, benchmark):
+        """
+        Times given benchmark, and counts directory calls made during it.
+        Each benchmark starts with a cold cache, no bound connections, and closed circuit breakers.
+        :param directory: FakeDirectory in use.
+        :param name: Name of benchmark.
+        :param user_count: Number of users benchmark handles. None if determined by benchmark.
+        :param benchmark: Function to run. Takes user_count, and returns tuple of (user count, error count).
+        :return: Tuple of (name, user count, error count, seconds, Counter of directory calls, refused call count).
+        """
+        cache.clear()
+        connection_pool.close_all()
+        ldap_guard.reset_breakers()
+        ldap_guard.reset_stats()
+        directory.reset_calls()
+
+        # Backends and commands print progress. Only the results are of interest here.
+        with open(devnull, 'a') as null, contextlib.redirect_stdout(null):
+            start = time.perf_counter()
+            user_count, error_count = benchmark(directory, user_count)
+            seconds = time.perf_counter() - start
+
+        # Calls refused by circuit breakers never reach the directory.
+        refused_count = sum(stats['short_circuited'] for stats in ldap_guard.get_stats().values())
+
+        return name, user_count, error_count, seconds, directory.get_calls(), refused_count
+
+    def create_students(self, directory, user_count):
+        """
+        Imports all generated users by winno, same as the "createstudents" command.
+        """
+        # Command reads values from a file.
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as student_file:
+            student_file.write('\n'.join(winno for uid, winno in directory.users[:user_count]))
+
+        try:
+            command = createstudents.Command()
+            command.create_students(file_name=student_file.name)
+        except Exception:
+            return user_count, user_count
+        finally:
+            os.remove(student_file.name)
+
+        return user_count, 0
+
+    def login(self, directory, user_count):
+        """
+        Logs in as the first few generated users, creating their (login) User models.
+        """
+        cae_auth = cae_backend.CaeAuthBackend()
+        error_count = 0
+
+        for uid, winno in directory.users[:user_count]:
+            try:
+                if cae_auth.authenticate(None, username=uid, password=fake_ldap.DEFAULT_PASSWORD) is None:
+                    error_count += 1
+            except Exception:
+                error_count += 1
+
+        return user_count, error_count
+
+    def update_user_models(self, directory, user_count):
+        """
+        Unconditionally updates all User/WmuUser models, same as "update_user_models --update_all".
+        """
+        user_count = models.WmuUser.objects.filter(is_active=True).count()
+
+        try:
+            call_command(update_user_models.Command(), update_all=True)
+        except Exception:
+            return user_count, user_count
+
+        return user_count, 0
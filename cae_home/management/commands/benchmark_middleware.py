@@ -0,0 +1,150 @@
+"""
+Command to benchmark page requests under ASGI, with CAE Home middleware running in sync-only and async-capable mode.
+
+Used to compare requests/sec and latency before and after changes to middleware.
+Requests are made in-process through Django's async test client, so no running server is required.
+Note that this uses the currently configured database, so results will include actual query time.
+"""
+
+# System Imports.
+import asyncio, time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+
+# User Imports.
+from cae_home import middleware
+
+
+# Middleware classes to toggle between sync-only and async-capable mode.
+MIDDLEWARE_CLASSES = [
+    middleware.GetUserProfileMiddleware,
+    middleware.GetProjectDetailMiddleware,
+    middleware.GetUserSiteOptionsMiddleware,
+    middleware.SetTimezoneMiddleware,
+    middleware.HandleExceptionsMiddleware,
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks ASGI requests/sec and latency, with CAE Home middleware in sync-only and async-capable mode.'
+
+    def add_arguments(self, parser):
+        """
+        Parser for command.
+        """
+        # Optional arguments.
+        parser.add_argument(
+            '--url',
+            type=str,
+            default='/',
+            help='Url to request. Defaults to site index.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Total number of requests to make, per mode.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=10,
+            help='Number of requests to run at once.',
+        )
+        parser.add_argument(
+            '--user',
+            type=str,
+            default='',
+            help='Username to make requests as. If not provided, then requests are anonymous.',
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        The logic of the command.
+        """
+        url = kwargs['url']
+        total_requests = kwargs['requests']
+        concurrency = kwargs['concurrency']
+        username = str(kwargs['user']).strip()
+
+        if total_requests < 1 or concurrency < 1:
+            raise CommandError('Request and concurrency values must be at least 1.')
+
+        # Get user, if provided.
+        user = None
+        if username:
+            try:
+                user = get_user_model().objects.get(username=username)
+            except get_user_model().DoesNotExist:
+                raise CommandError('User "{0}" does not exist.'.format(username))
+
+        results = []
+        for async_capable in (False, True):
+            results.append(self.run_benchmark(url, total_requests, concurrency, user, async_capable))
+
+        # Display results.
+        self.stdout.write('')
+        self.stdout.write('Url: {0}    Requests: {1}    Concurrency: {2}    User: {3}'.format(
+            url,
+            total_requests,
+            concurrency,
+            username or 'Anonymous',
+        ))
+        self.stdout.write('{0:<20}{1:>12}{2:>12}{3:>12}'.format('Middleware Mode', 'Req/Sec', 'p50 (ms)', 'p99 (ms)'))
+        for mode, requests_per_second, p50, p99 in results:
+            self.stdout.write('{0:<20}{1:>12.1f}{2:>12.2f}{3:>12.2f}'.format(mode, requests_per_second, p50, p99))
+
+    def run_benchmark(self, url, total_requests, concurrency, user, async_capable):
+        """
+        Runs benchmark for a single middleware mode.
+        :param url: Url to request.
+        :param total_requests: Total number of requests to make.
+        :param concurrency: Number of requests to run at once.
+        :param user: Optional user to make requests as.
+        :param async_capable: Boolean indicating if CAE Home middleware should be allowed to run in async mode.
+        :return: Tuple of (mode name, requests per second, p50 latency, p99 latency).
+        """
+        mode = 'Async-Capable' if async_capable else 'Sync-Only'
+        self.stdout.write('Running {0} benchmark...'.format(mode))
+
+        # Set middleware mode. Django reads these values when the client builds its middleware chain.
+        for middleware_class in MIDDLEWARE_CLASSES:
+            middleware_class.async_capable = async_capable
+
+        try:
+            client = AsyncClient()
+            if user is not None:
+                client.force_login(user)
+
+            latencies, elapsed = asyncio.run(self.make_requests(client, url, total_requests, concurrency))
+        finally:
+            # Reset middleware mode.
+            for middleware_class in MIDDLEWARE_CLASSES:
+                middleware_class.async_capable = True
+
+        latencies.sort()
+        return (
+            mode,
+            total_requests / elapsed,
+            latencies[int(len(latencies) * 0.50)] * 1000,
+            latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+        )
+
+    async def make_requests(self, client, url, total_requests, concurrency):
+        """
+        Makes all requests for a single benchmark run, with given concurrency.
+        :return: Tuple of (list of request latencies, total elapsed time).
+        """
+        latencies = []
+        remaining = iter(range(total_requests))
+
+        async def worker():
+            for _ in remaining:
+                start_time = time.perf_counter()
+                await client.get(url)
+                latencies.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return latencies, time.perf_counter() - start_time
@@ -0,0 +1,72 @@
+"""
+Command to benchmark how many queries a single user model save costs, including the resulting user model sync.
+
+All changes are made within a transaction that is rolled back at the end, so no data is actually modified.
+"""
+
+# System Imports.
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from os import devnull
+
+# User Imports.
+from cae_home import models, user_sync
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks query count of saving user models, including the resulting user model sync.'
+
+    def handle(self, *args, **kwargs):
+        """
+        The logic of the command.
+        """
+        with transaction.atomic():
+            # Make sure default site theme exists, for new user profile.
+            if not models.SiteTheme.objects.filter(slug='wmu').exists():
+                with open(devnull, 'a') as null:
+                    call_command('loaddata', 'production_models/site_themes', stdout=null)
+
+            # Create user to test with.
+            user = models.User.objects.create_user(username='benchmark_user_sync', password='benchmark')
+            wmu_user = models.WmuUser.objects.create(
+                bronco_net='benchmark_user_sync',
+                winno='benchmark_user_sync',
+                first_name='Benchmark',
+                last_name='User',
+            )
+            user_sync.flush()
+
+            # Run benchmarks.
+            results = [
+                ('User.save()',) + self.count_queries(user, 'first_name', 'Changed'),
+                ('WmuUser.save()',) + self.count_queries(wmu_user, 'last_name', 'Changed'),
+                ('UserIntermediary.save()',) + self.count_queries(user.userintermediary, 'cae_is_active', False),
+            ]
+
+            # Undo all changes.
+            transaction.set_rollback(True)
+
+        # Display results.
+        self.stdout.write('{0:<28}{1:>10}{2:>10}{3:>10}'.format('Save', 'Save', 'Sync', 'Total'))
+        for name, save_count, sync_count in results:
+            self.stdout.write('{0:<28}{1:>10}{2:>10}{3:>10}'.format(
+                name,
+                save_count,
+                sync_count,
+                save_count + sync_count,
+            ))
+
+    def count_queries(self, instance, field, value):
+        """
+        Counts queries for saving model instance, and then for the resulting sync.
+        Sync normally runs on transaction commit, so it's explicitly flushed here instead.
+        :return: Tuple of (save query count, sync query count).
+        """
+        setattr(instance, field, value)
+        with CaptureQueriesContext(connection) as save_queries:
+            instance.save()
+        with CaptureQueriesContext(connection) as sync_queries:
+            user_sync.flush()
+        return len(save_queries), len(sync_queries)
@@ -9,6 +9,7 @@ from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand
 
 # User Imports.
+from cae_home.bulk_import import bulk_import
 from cae_home.models import Major
 from workspace.ldap_backends.wmu_auth import adv_backend
 
@@ -65,11 +66,12 @@ class Command(BaseCommand):
         self.stdout.write(self.style.HTTP_INFO('Attempting to read file "{0}"...'.format(file_name)))
         file = open(file_name)
 
-        # Process each user (should be one bronco_net/winno per line).
+        # Process each major (should be one major code per line).
+        major_codes = []
         for line in file:
             orig_id = line
 
-            # Validate that line is uid. Must be a string comprised of only letters or numbers.
+            # Validate that line is major code. Must be a string comprised of only letters or numbers.
             if not isinstance(orig_id, str):
                 raise ValidationError('Each line should be a string of major code.')
             elif orig_id.strip() == '':
@@ -78,15 +80,30 @@ class Command(BaseCommand):
                 raise ValidationError('Bronconet/winno must be comprised of only standard numbers or letters.')
             else:
                 major_code = orig_id.strip().upper()
-
-                # Attempt to get major model from Django. Only proceed if does not already exist.
-                try:
-                    Major.objects.get(student_code=major_code)
-
-                    self.stdout.write('Major {0} already exists. Skipping Ldap import.\n\n'.format(major_code))
-                except Major.DoesNotExist:
-                    self.stdout.write('Major {0} does not exist. Importing from Ldap.'.format(major_code))
-
-                    # Import by code, aka "StudentCode" according to most of our internal logic.
-                    # Aka wmuStudentMajor according to main campus.
-                    adv_ldap.import_major_model(major_code)
+                if major_code not in major_codes:
+                    major_codes.append(major_code)
+        file.close()
+
+        # Only import majors that do not already exist.
+        existing_codes = set(Major.objects.filter(student_code__in=major_codes).values_list('student_code', flat=True))
+        majors = []
+        for major_code in major_codes:
+            if major_code in existing_codes:
+                self.stdout.write('Major {0} already exists. Skipping Ldap import.\n\n'.format(major_code))
+            else:
+                self.stdout.write('Major {0} does not exist. Importing from Ldap.'.format(major_code))
+
+                # Import by code, aka "StudentCode" according to most of our internal logic.
+                # Aka wmuStudentMajor according to main campus.
+                major = adv_ldap.build_major_model(major_code)
+                if major is not None:
+                    majors.append(major)
+
+        # Validate and save all imported majors at once.
+        result = bulk_import(Major, majors)
+        for index, error in sorted(result.errors.items()):
+            self.stdout.write(self.style.ERROR('Failed to import major {0}: {1}'.format(
+                majors[index].student_code,
+                '; '.join(error.messages),
+            )))
+        self.stdout.write(self.style.HTTP_INFO('Created {0} majors.'.format(len(result.created))))
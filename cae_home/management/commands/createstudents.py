@@ -11,6 +11,7 @@ from django.core.management.base import BaseCommand
 
 # User Imports.
 from cae_home.models import WmuUser
+from workspace.ldap_backends import ldap_guard
 from workspace.ldap_backends.wmu_auth import wmu_backend
 
 
@@ -58,6 +59,16 @@ class Command(BaseCommand):
         """
         self.stdout.write(self.style.HTTP_INFO('\nCreate Student command has been called.'))
 
+        # Limit calls to the "batch" LDAP budget, so user logins aren't starved during the import.
+        with ldap_guard.batch_traffic():
+            self._create_students(*args, **kwargs)
+
+        self.stdout.write(self.style.HTTP_INFO('\nUser creation complete.'))
+
+    def _create_students(self, *args, **kwargs):
+        """
+        Creates student models from file. See create_students().
+        """
         # Initialize LDAP backend connector.
         wmu_ldap = wmu_backend.WmuAuthBackend()
 
@@ -113,4 +124,3 @@ class Command(BaseCommand):
 
         # Close file.
         file.close()
-        self.stdout.write(self.style.HTTP_INFO('\nUser creation complete.'))
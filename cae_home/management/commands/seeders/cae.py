@@ -3,8 +3,6 @@ Seeder for "CAE Center" related Core Models.
 """
 
 # System Imports
-from django.core.exceptions import ValidationError
-from django.db import IntegrityError
 from django.utils.text import slugify
 from faker import Faker
 from random import randint
@@ -12,6 +10,7 @@ from sys import stdout
 
 # User Imports.
 from cae_home import models
+from cae_home.bulk_import import bulk_import
 from cae_home.management.commands.fixtures import cae as cae_fixtures
 
 
@@ -42,14 +41,14 @@ def create_assets(style, model_count):
     rooms = models.Room.objects.all()
 
     # Generate models equal to model count.
-    total_fail_count = 0
-    for i in range(model_count - pre_initialized_count):
-        fail_count = 0
-        try_create_model = True
-
-        # Loop attempt until 3 fails or model is created.
-        # Model creation may fail due to field unique requirement.
-        while try_create_model:
+    # Model creation may fail due to field unique requirement. Failed models are regenerated, up to 3 attempts.
+    remaining_count = model_count - pre_initialized_count
+    for attempt in range(3):
+        if remaining_count <= 0:
+            break
+
+        assets = []
+        for i in range(remaining_count):
             # Get Room.
             index = randint(0, len(rooms) - 1)
             # room = rooms[index]
@@ -60,29 +59,20 @@ def create_assets(style, model_count):
             else:
                 ip_address = faker_factory.ipv6()
 
-            # Attempt to create model seed.
-            try:
-                models.Asset.objects.create(
-                    # room=room,
-                    serial_number=faker_factory.isbn13(),
-                    asset_tag=faker_factory.ean8(),
-                    brand_name=faker_factory.domain_word(),
-                    mac_address=faker_factory.mac_address(),
-                    ip_address=ip_address,
-                    device_name=faker_factory.last_name(),
-                    description=faker_factory.sentence(),
-                )
-
-                try_create_model = False
-            except (ValidationError, IntegrityError):
-                # Seed generation failed. Nothing can be done about this without removing the random generation aspect.
-                # If we want that, we should use fixtures instead.
-                fail_count += 1
-
-                # If failed 3 times, give up model creation and move on to next model, to prevent infinite loops.
-                if fail_count > 2:
-                    try_create_model = False
-                    total_fail_count += 1
+            assets.append(models.Asset(
+                # room=room,
+                serial_number=faker_factory.isbn13(),
+                asset_tag=faker_factory.ean8(),
+                brand_name=faker_factory.domain_word(),
+                mac_address=faker_factory.mac_address(),
+                ip_address=ip_address,
+                device_name=faker_factory.last_name(),
+                description=faker_factory.sentence(),
+            ))
+
+        # Attempt to create model seeds. Rows that fail validation are skipped.
+        remaining_count = len(bulk_import(models.Asset, assets).errors)
+    total_fail_count = max(remaining_count, 0)
 
     # Output if model instances failed to generate.
     if total_fail_count > 0:
@@ -107,34 +97,24 @@ def create_software(style, model_count):
     pre_initialized_count = len(models.Software.objects.all())
 
     # Generate models equal to model count.
-    total_fail_count = 0
-    for i in range(model_count - pre_initialized_count):
-        fail_count = 0
-        try_create_model = True
-
-        # Loop attempt until 3 fails or model is created.
-        # Model creation may fail due to randomness of name value and overlapping slugs being invalid.
-        while try_create_model:
-
+    # Model creation may fail due to randomness of name value and overlapping slugs being invalid.
+    # Failed models are regenerated, up to 3 attempts.
+    remaining_count = model_count - pre_initialized_count
+    for attempt in range(3):
+        if remaining_count <= 0:
+            break
+
+        software_models = []
+        for i in range(remaining_count):
             name = faker_factory.job()
-            slug = slugify(name)
-
-            # Attempt to create model seed.
-            try:
-                models.Software.objects.create(
-                    name=name,
-                    slug=slug
-                )
-                try_create_model = False
-            except (ValidationError, IntegrityError):
-                # Seed generation failed. Nothing can be done about this without removing the random generation
-                # aspect. If we want that, we should use fixtures instead.
-                fail_count += 1
-
-                # If failed 3 times, give up model creation and move on to next model, to prevent infinite loops.
-                if fail_count > 2:
-                    try_create_model = False
-                    total_fail_count += 1
+            software_models.append(models.Software(
+                name=name,
+                slug=slugify(name),
+            ))
+
+        # Attempt to create model seeds. Rows that fail validation are skipped.
+        remaining_count = len(bulk_import(models.Software, software_models).errors)
+    total_fail_count = max(remaining_count, 0)
 
     # Output if model instances failed to generate.
     if total_fail_count > 0:
@@ -155,21 +135,21 @@ def create_software_detail(style, model_count):
     # Generate random data.
     faker_factory = Faker()
 
-    softwares = models.Software.objects.all()
+    softwares = list(models.Software.objects.all())
 
     # Count number of models already created.
     pre_initialized_count = len(models.SoftwareDetail.objects.all())
 
     # Generate models equal to model count.
-    total_fail_count = 0
-    for i in range(model_count - pre_initialized_count):
-        fail_count = 0
-        try_create_model = True
-
-        # Loop attempt until 3 fails or model is created.
-        # Model creation may fail due to randomness of name value and overlapping slugs being invalid.
-        while try_create_model:
-
+    # Model creation may fail due to randomness of name value and overlapping slugs being invalid.
+    # Failed models are regenerated, up to 3 attempts.
+    remaining_count = model_count - pre_initialized_count
+    for attempt in range(3):
+        if remaining_count <= 0:
+            break
+
+        software_details = []
+        for i in range(remaining_count):
             # Get software.
             index = randint(0, len(softwares) - 1)
             software = softwares[index]
@@ -179,26 +159,18 @@ def create_software_detail(style, model_count):
             is_active = faker_factory.boolean()
             slug = slugify('{0} - {1}'.format(software.name, version))
 
-            # Attempt to create model seed.
-            try:
-                models.SoftwareDetail.objects.create(
-                    software=software,
-                    software_type=software_type,
-                    version=faker_factory.random_int(min=1, max=500),
-                    expiration=faker_factory.date_between(start_date="-1y", end_date="+2y"),
-                    is_active=is_active,
-                    slug=slug,
-                )
-                try_create_model = False
-            except (ValidationError, IntegrityError):
-                # Seed generation failed. Nothing can be done about this without removing the random generation
-                # aspect. If we want that, we should use fixtures instead.
-                fail_count += 1
-
-                # If failed 3 times, give up model creation and move on to next model, to prevent infinite loops.
-                if fail_count > 2:
-                    try_create_model = False
-                    total_fail_count += 1
+            software_details.append(models.SoftwareDetail(
+                software=software,
+                software_type=software_type,
+                version=faker_factory.random_int(min=1, max=500),
+                expiration=faker_factory.date_between(start_date="-1y", end_date="+2y"),
+                is_active=is_active,
+                slug=slug,
+            ))
+
+        # Attempt to create model seeds. Rows that fail validation are skipped.
+        remaining_count = len(bulk_import(models.SoftwareDetail, software_details).errors)
+    total_fail_count = max(remaining_count, 0)
 
     # Output if model instances failed to generate.
     if total_fail_count > 0:
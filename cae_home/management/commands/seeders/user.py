@@ -19,6 +19,7 @@ from sys import stdout
 # User Imports.
 from cae_home import models
 from cae_home.models.user import check_all_group_memberships
+from cae_home.user_factory import UserFactory
 from cae_home.management.commands.fixtures import user as user_fixtures
 
 default_password = settings.USER_SEED_PASSWORD
@@ -402,9 +403,11 @@ def create_wmu_users(style, model_count):
     faker_factory.add_provider(E164Provider)
 
     # Create a WmuUser model for each test user we created.
+    # Models are created through the UserFactory, to avoid running the full user model save signal cascade.
     # Note we intentionally use an "invalid" winno here,
     # so we can easily tell which are our seeded/testing users and which might be "real" users.
     winno = 100
+    user_factory = UserFactory()
     user_list = models.User.objects.all()
     for user in user_list:
 
@@ -448,15 +451,16 @@ def create_wmu_users(style, model_count):
 
         # Attempt to generate models.
         try:
-            with transaction.atomic():
-                models.WmuUser.objects.create(
-                    bronco_net=user.username,
-                    winno=winno,
-                    first_name=first_name,
-                    last_name=last_name,
-                    user_type=user_type,
-                    is_active=user.is_active,
-                )
+            user_factory.create(
+                user.username,
+                wmu_user={
+                    'winno': winno,
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'user_type': user_type,
+                    'is_active': user.is_active,
+                },
+            )
         except (ValidationError, IntegrityError):
             print('ERROR generating WmuUser model seed for {0}'.format(user))
 
@@ -506,14 +510,18 @@ def create_wmu_users(style, model_count):
             # Attempt to create model seed.
             try:
                 with transaction.atomic():
-                    wmu_user = models.WmuUser.objects.create(
-                        bronco_net=bronco_net,
-                        winno=winno,
-                        first_name=faker_factory.first_name(),
-                        last_name=faker_factory.last_name(),
-                        user_type=user_type,
-                        is_active=is_active,
+                    user_intermediary = user_factory.create(
+                        bronco_net,
+                        wmu_user={
+                            'winno': winno,
+                            'first_name': faker_factory.first_name(),
+                            'last_name': faker_factory.last_name(),
+                            'user_type': user_type,
+                            'is_active': is_active,
+                        },
+                        user_intermediary={'cae_is_active': is_active, 'wmu_is_active': is_active},
                     )
+                    wmu_user = user_intermediary.wmu_user
 
                     # Add between one and three majors to student.
                     major_count = randint(1, 3)
@@ -535,7 +543,7 @@ def create_wmu_users(style, model_count):
                                 is_active=is_active,
                                 date_stopped=timezone.now(),
                             )
-                    user_profile = models.Profile.get_profile(bronco_net)
+                    user_profile = user_intermediary.profile
                     user_profile.address = address
                     user_profile.phone_number = phone_number
                     user_profile.save()
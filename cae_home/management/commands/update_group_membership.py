@@ -19,4 +19,5 @@ class Command(BaseCommand):
         The logic of the command.
         """
         # Run function from models.py file.
-        check_all_group_memberships()
+        ended_count, created_count = check_all_group_memberships()
+        self.stdout.write('Ended {0} and created {1} GroupMembership models.'.format(ended_count, created_count))
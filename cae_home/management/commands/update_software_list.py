@@ -16,6 +16,7 @@ from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand
 
 # User Imports.
+from cae_home.bulk_import import bulk_import
 from cae_home.models import User
 from django.db.models import ObjectDoesNotExist
 from django.utils.text import slugify
@@ -77,46 +78,48 @@ class Command(BaseCommand):
 
         # print('    Software names list: {0}'.format(softwarenames))
         # print('       Software details list: {0}'.format(softwarelist))
-        softwarelist = zip(softwarenames, softwaredetails)
-        print(list(softwarelist))
-        for names, details in softwarelist:  # Loop to add the software names and details to the database
-
-            # Next section is taken almost verbatim from the create_dummy_model from cae_home.models.cae.py
-            name = names
-            slug = slugify(name)
-            version = details['version']
-            expiration = details['expiration']
-            rooms = details['rooms']
-
-            try:
-                currentModel = Software.objects.get(
-                    name=name,
-                    slug=slug,
-                )
-                Software.save(currentModel)
-            except ObjectDoesNotExist:
-                currentModel = Software.objects.create(
-                    name=name,
-                    slug=slug,
-                )
-                Software.save(currentModel)
-            # print
-            try:
-                currentModel = SoftwareDetail.objects.get(
-                    software=name,
-                    version=version,
-                    expiration=expiration,
-                    # room detail ?
-                )
-                SoftwareDetail.save(currentModel)
-            except ObjectDoesNotExist:
-                return SoftwareDetail.objects.create(
-                    software=name,
-                    version=version,
-                    expiration=expiration,
-                    rooms=rooms
-                )
-                SoftwareDetail.save(self)
+        softwarelist = list(zip(softwarenames, softwaredetails))
+        print(softwarelist)
+
+        # Validate and save all Software models at once. Software that already exists (by slug) is updated.
+        software_models = [Software(name=name, slug=slugify(name)) for name, details in softwarelist]
+        software_result = bulk_import(Software, software_models, match_field='slug', update_fields=['name'])
+        self.print_errors('Software', software_models, software_result)
+
+        # Now do the same for SoftwareDetail models, one per readme.
+        software_pks = dict(Software.objects.filter(
+            slug__in=[software.slug for software in software_models],
+        ).values_list('slug', 'pk'))
+        detail_models = [
+            SoftwareDetail(
+                software_id=software_pks.get(slugify(name), None),
+                version=details['version'],
+                expiration=details['expiration'],
+                slug=slugify('{0} - {1}'.format(name, details['version'])),
+            )
+            for name, details in softwarelist
+        ]
+        detail_result = bulk_import(
+            SoftwareDetail,
+            detail_models,
+            match_field='slug',
+            update_fields=['version', 'expiration'],
+        )
+        self.print_errors('SoftwareDetail', detail_models, detail_result)
+
+        print('Software: {0}'.format(software_result))
+        print('SoftwareDetail: {0}'.format(detail_result))
+
+    def print_errors(self, model_name, instances, result):
+        """
+        Prints any models which failed to import.
+        """
+        for index, error in sorted(result.errors.items()):
+            print('Failed to import {0} "{1}": {2}'.format(
+                model_name,
+                instances[index].slug,
+                '; '.join(error.messages),
+            ))
 
     def checkLastModified(self, readmefile):  # Function to check if the file was modified in the past two weeks
         # twoweeks = 1209600.00  # Value of two weeks in seconds
@@ -13,7 +13,8 @@ from django.utils import timezone
 
 # User Imports.
 from cae_home import models
-from cae_home.models.user import compare_user_and_wmuuser_models
+from cae_home.models.user import bulk_compare_user_and_wmuuser_models, compare_user_and_wmuuser_models
+from workspace.ldap_backends import ldap_cache, ldap_guard
 from workspace.ldap_backends.wmu_auth import cae_backend, wmu_backend
 
 
@@ -46,6 +47,38 @@ class Command(BaseCommand):
         user_value = str(kwargs['user']).strip()
         update_all_bool = kwargs['update_all']
 
+        # Memoize LDAP results for the full run, so each user is only searched for once.
+        # Calls are also limited to the "batch" LDAP budget, so user logins aren't starved during the run.
+        ldap_cache.reset_stats()
+        ldap_guard.reset_stats()
+        with ldap_cache.unit_of_work(), ldap_guard.batch_traffic():
+            self.update_users(user_value, update_all_bool)
+
+        # Display how many LDAP searches were avoided.
+        for result_class, stats in ldap_cache.get_stats().items():
+            print('LDAP "{0}" lookups: {1} memoized, {2} cached, {3} searched.'.format(
+                result_class,
+                stats['memo_hits'],
+                stats['cache_hits'],
+                stats['misses'],
+            ))
+
+        # Display any LDAP calls which were delayed or refused.
+        for name, stats in ldap_guard.get_stats().items():
+            print('LDAP "{0}" calls: {1} delayed, {2} throttled, {3} short-circuited. Circuit opened {4} times.'.format(
+                name,
+                stats['delayed'],
+                stats['throttled'],
+                stats['short_circuited'],
+                stats['opened'],
+            ))
+
+    def update_users(self, user_value, update_all_bool):
+        """
+        Updates either all users, or a single user if one was provided.
+        :param user_value: BroncoNet or Winno of single user to update. Empty to update all users.
+        :param update_all_bool: Boolean to override RNG logic, and force updating of all models.
+        """
         # Check if single user value was provided. In most cases, it will not be.
         if user_value is None or user_value == '':
             # No user explicitly provided. Update all.
@@ -71,8 +104,11 @@ class Command(BaseCommand):
         cae_auth = cae_backend.CaeAuthBackend()
         wmu_auth = wmu_backend.WmuAuthBackend()
 
+        # Fetch current CAE group members once, up front. All user checks in this run then share the snapshot.
+        cae_auth.group_snapshot.refresh()
+
         # Get list of all active user models.
-        active_user_list = get_user_model().objects.filter(is_active=True)
+        active_user_list = get_user_model().objects.filter(is_active=True).select_related('userintermediary')
         handled_list = []
         non_ldap_usernames = ['step_admin']
 
@@ -91,7 +127,8 @@ class Command(BaseCommand):
                     user_model.userintermediary.last_ldap_check = two_months_ago
                     user_model.userintermediary.save()
 
-        # Loop through all known active users.
+        # Loop through all known active users, to determine which to update.
+        update_list = []
         for user_model in active_user_list:
             last_user_ldap_check = user_model.userintermediary.last_ldap_check
 
@@ -103,37 +140,57 @@ class Command(BaseCommand):
                 # Assumes one call per night.
                 if random.randint(1, 30) == 1:
                     # RNG has dictated we check this user's ldap info.
-                    handled_list = self.login_user_update(cae_auth, wmu_auth, user_model, handled_list)
+                    update_list.append(user_model)
                 else:
                     # RNG didn't dictate we check user.
                     # However, run anyways if it's been more than a full month since last LDAP check.
                     month_ago = timezone.now().date() - timezone.timedelta(days=30)
                     if last_user_ldap_check < month_ago:
                         # Check user's Ldap info.
-                        handled_list = self.login_user_update(cae_auth, wmu_auth, user_model, handled_list)
+                        update_list.append(user_model)
+
+        # First, sync existing Django database model data for all users to update at once.
+        # Usually not needed, but occasionally required such as when adding new database fields.
+        bulk_compare_user_and_wmuuser_models([user_model.username for user_model in update_list])
+
+        # Fetch main campus info for all users to update at once, then update each.
+        user_ldap_info = self.get_all_user_info(wmu_auth, [user_model.username for user_model in update_list])
+        for user_model in update_list:
+            try:
+                handled_list = self.login_user_update(
+                    cae_auth, wmu_auth, user_model, handled_list, sync_models=False,
+                    user_ldap_info=user_ldap_info.get(user_model.username, None),
+                )
+            except ldap_guard.LdapUnavailableError as err:
+                # LDAP is throttled or down. Leave user as is, to be checked on a later run.
+                print('Skipped User "{0}". LDAP unavailable. {1}'.format(user_model, err))
 
         return handled_list
 
-    def login_user_update(self, cae_auth, wmu_auth, user_model, handled_list):
+    def login_user_update(self, cae_auth, wmu_auth, user_model, handled_list, sync_models=True, user_ldap_info=None):
         """
         Logic to actually update a given (login) User model.
         :param cae_auth: Initialized CAE Auth backend.
         :param wmu_auth: Initialized WMU Auth backend.
         :param user_model: (Login) User model to update.
         :param handled_list: List to hold all (login) User models that have been updated so far.
+        :param sync_models: Boolean indicating if database model data should be synced first.
+            Skipped if already synced in bulk.
+        :param user_ldap_info: Optional, already fetched main campus LDAP info for user.
         :return: Updated handled_list variable.
         """
         print('Updating User "{0}"'.format(user_model))
 
         # First, sync existing Django database model data for user.
         # Usually not needed, but occasionally required such as when adding new database fields.
-        compare_user_and_wmuuser_models(user_model.username)
+        if sync_models:
+            compare_user_and_wmuuser_models(user_model.username)
 
         # Update user data using CAE LDAP.
-        cae_auth.create_or_update_user_model(user_model.username)
+        cae_auth.create_or_update_user_model(user_model.username, wmu_user_ldap_info=user_ldap_info)
 
         # Update user data using WMU LDAP.
-        wmu_auth.create_or_update_user_model(user_model.username)
+        wmu_auth.create_or_update_user_model(user_model.username, user_ldap_info=user_ldap_info)
 
         # Add user to handled list, to avoid potentially re-running update logic in WmuUser update function.
         handled_list.append(str(user_model.username).strip())
@@ -158,7 +215,7 @@ class Command(BaseCommand):
         wmu_auth = wmu_backend.WmuAuthBackend()
 
         # Get list of all active user models.
-        active_user_list = models.WmuUser.objects.filter(is_active=True)
+        active_user_list = models.WmuUser.objects.filter(is_active=True).select_related('userintermediary')
         non_ldap_usernames = ['ceas_cae', 'ceas_prog']
 
         # Check for "update_all_bool".
@@ -179,6 +236,8 @@ class Command(BaseCommand):
                     user_model.userintermediary.last_ldap_check = two_months_ago
                     user_model.userintermediary.save()
 
+        # Loop through all known active users, to determine which to update.
+        update_list = []
         for wmu_user_model in active_user_list:
             last_user_ldap_check = wmu_user_model.userintermediary.last_ldap_check
 
@@ -193,29 +252,62 @@ class Command(BaseCommand):
                     # Assumes one call per night.
                     if update_all_bool or random.randint(1, 60) == 1:
                         # RNG has dictated we check this user's ldap info.
-                        self.wmu_user_update(wmu_auth, wmu_user_model)
+                        update_list.append(wmu_user_model)
                     else:
                         # RNG didn't dictate we check user.
                         # However, run anyways if it's been more than a full month since last LDAP check.
                         two_months_ago = timezone.now().date() - timezone.timedelta(days=60)
                         if last_user_ldap_check < two_months_ago:
                             # Check user's Ldap info.
-                            self.wmu_user_update(wmu_auth, wmu_user_model)
+                            update_list.append(wmu_user_model)
+
+        # First, sync existing Django database model data for all users to update at once.
+        # Usually not needed, but occasionally required such as when adding new database fields.
+        bulk_compare_user_and_wmuuser_models([wmu_user_model.bronco_net for wmu_user_model in update_list])
+
+        # Fetch main campus info for all users to update at once, then update each.
+        user_ldap_info = self.get_all_user_info(wmu_auth, [wmu_user_model.bronco_net for wmu_user_model in update_list])
+        for wmu_user_model in update_list:
+            try:
+                self.wmu_user_update(
+                    wmu_auth, wmu_user_model, sync_models=False,
+                    user_ldap_info=user_ldap_info.get(wmu_user_model.bronco_net, None),
+                )
+            except ldap_guard.LdapUnavailableError as err:
+                # LDAP is throttled or down. Leave user as is, to be checked on a later run.
+                print('Skipped WmuUser "{0}". LDAP unavailable. {1}'.format(wmu_user_model, err))
+
+    def get_all_user_info(self, wmu_auth, uids):
+        """
+        Fetches main campus info for all given users at once.
+        :param wmu_auth: Initialized Wmu Auth backend.
+        :param uids: List of BroncoNets to fetch.
+        :return: Dict of {BroncoNet: LDAP info}. Empty if LDAP is unavailable, so users are instead fetched one by one.
+        """
+        try:
+            return wmu_auth.get_all_user_info(uids)
+        except ldap_guard.LdapUnavailableError as err:
+            print('Failed to fetch main campus info for all users. LDAP unavailable. {0}'.format(err))
+            return {}
 
-    def wmu_user_update(self, wmu_auth, wmu_user_model):
+    def wmu_user_update(self, wmu_auth, wmu_user_model, sync_models=True, user_ldap_info=None):
         """
         Logic to actually update a given WmuUser model.
         :param wmu_auth: Initialized Wmu Auth backend.
         :param wmu_user_model: WmuUser model to update.
+        :param sync_models: Boolean indicating if database model data should be synced first.
+            Skipped if already synced in bulk.
+        :param user_ldap_info: Optional, already fetched main campus LDAP info for user.
         """
         print('Updating WmuUser "{0}"'.format(wmu_user_model))
 
         # First, sync existing Django database model data for user.
         # Usually not needed, but occasionally required such as when adding new database fields.
-        compare_user_and_wmuuser_models(wmu_user_model.bronco_net)
+        if sync_models:
+            compare_user_and_wmuuser_models(wmu_user_model.bronco_net)
 
         # Update user data using LDAP.
-        wmu_auth.create_or_update_wmu_user_model(wmu_user_model.bronco_net)
+        wmu_auth.create_or_update_wmu_user_model(wmu_user_model.bronco_net, user_ldap_info=user_ldap_info)
 
     def handle_single_user(self, user_value):
         """
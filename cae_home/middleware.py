@@ -3,58 +3,197 @@ Middleware for CAE Home app.
 """
 
 # System Imports.
-import pytz, re
+import asyncio, pytz, sys
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.exceptions import PermissionDenied
 from django.core.handlers.exception import response_for_exception
-from django.db.models import ObjectDoesNotExist
 from django.http import Http404
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
 
 # User Imports.
-from cae_home import models
+from cae_home import query_budget, site_context
+from cae_home.user_context import get_user_context
 from workspace import logging as init_logging
 
 
+# Attempt to import coroutine marker. Only provided by asgiref 3.6 and later.
+try:
+    from asgiref.sync import markcoroutinefunction
+except ImportError:
+    if sys.version_info >= (3, 12):
+        from inspect import markcoroutinefunction
+    else:
+        def markcoroutinefunction(func):
+            """
+            Marks callable as coroutine function, same as Django's MiddlewareMixin does for older Python versions.
+            """
+            func._is_coroutine = asyncio.coroutines._is_coroutine
+            return func
+
 # Import logger.
 logger = init_logging.get_logger(__name__)
 
 
-class GetUserProfileMiddleware(object):
+# Session key and default value for app main nav template.
+MAIN_NAV_SESSION_KEY = 'cae_workspace_main_nav_template_path'
+DEFAULT_MAIN_NAV_TEMPLATE_PATH = 'cae_home/nav/default_app_nav.html'
+
+
+def is_user_loaded(request):
     """
-    Load profile associated with authenticated user and append to user request object for other middleware/view access.
+    Determines if request user (and associated session) can be accessed without a database query.
+
+    Database access is sync-only, so async middleware uses this to determine if it needs to switch to a sync thread.
+    :param request: Django request object.
+    :return: True if user can be accessed without database query | False otherwise.
+    """
+    # Check for session. If no session key, then user is anonymous and nothing is loaded from database.
+    session = getattr(request, 'session', None)
+    if session is None or session.session_key is None:
+        return True
+
+    # Check if user has already been lazily loaded (by earlier middleware or view logic).
+    user = getattr(request, 'user', None)
+    return not isinstance(user, SimpleLazyObject) or user._wrapped is not empty
+
+
+def is_user_context_loaded(request):
+    """
+    Determines if request user's context (see "cae_home/user_context.py") can be accessed without a database query.
+
+    A loaded user is not enough, as the user context may still need to be loaded from database on a cold cache.
+    :param request: Django request object.
+    :return: True if user context can be accessed without database query | False otherwise.
+    """
+    # Check for session. If no session key, then user is anonymous and has no user context.
+    session = getattr(request, 'session', None)
+    if session is None or session.session_key is None:
+        return True
+
+    # Check if user context has already been loaded for this request.
+    return getattr(request, '_cae_user_context', None) is not None
+
+
+class AsyncCapableMiddleware(object):
     """
+    Base class for middleware that can run natively in both sync (WSGI) and async (ASGI) mode.
+
+    Django picks the mode on server start, based on the rest of the middleware chain.
+    Child classes provide sync logic in "__call__()"/"process_template_response()", and optionally async equivalents
+    in "async_call()"/"async_process_template_response()". Otherwise, the request is passed through as-is.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+
+        if self.is_async:
+            # Mark instance as coroutine, so that Django awaits it directly.
+            markcoroutinefunction(self)
+
+            # Use async version of template hook, so that Django doesn't wrap it in a sync thread.
+            # Sync version is kept under a separate name, for async logic that can safely call it directly.
+            if hasattr(self, 'async_process_template_response'):
+                self.sync_process_template_response = self.process_template_response
+                self.process_template_response = self.async_process_template_response
+
+    def __call__(self, request, *args, **kwargs):
+        # Check if running in async mode.
+        if self.is_async:
+            return self.async_call(request)
+
+        # Resume view call as normal.
+        response = self.get_response(request)
+        return response
+
+    async def async_call(self, request):
+        # Resume view call as normal.
+        response = await self.get_response(request)
+        return response
 
+
+class GetUserProfileMiddleware(AsyncCapableMiddleware):
+    """
+    Load profile associated with authenticated user and append to user request object for other middleware/view access.
+
+    Values are pulled from the cached "user context", so that a warm cache requires no database queries.
+    (See "cae_home/user_context.py" for more info.)
+    """
     def __call__(self, request, *args, **kwargs):
+        # Check if running in async mode.
+        if self.is_async:
+            return self.async_call(request)
+
+        self.set_user_profile(request)
+
+        # Resume view call as normal.
+        response = self.get_response(request)
+        return response
+
+    async def async_call(self, request):
+        # Loading user and user context may require database access, which is sync-only.
+        # Skip the sync thread switch when request has no session (user is anonymous) or context was already loaded.
+        # Note that a loaded user alone is not enough, as a cold user context cache still queries the database.
+        if is_user_context_loaded(request):
+            self.set_user_profile(request)
+        else:
+            await sync_to_async(self.set_user_profile, thread_sensitive=True)(request)
+
+        # Resume view call as normal.
+        response = await self.get_response(request)
+        return response
+
+    def set_user_profile(self, request):
+        """
+        Sets extra profile values on request user.
+        """
         # Add extra values if user is logged in.
         if request.user.is_authenticated:
+            user_context = get_user_context(request)
+
             # Get user profile info.
-            request.user.profile = request.user.userintermediary.profile
+            request.user.profile = user_context.profile
 
             # Determine if user is CAE Center user.
-            user_groups = request.user.groups.all().values_list('name', flat=True)
-            is_cae_user = False
-            for group in user_groups:
-                if group in settings.CAE_CENTER_GROUPS:
-                    is_cae_user = True
-            request.user.is_cae_user = is_cae_user
+            request.user.is_cae_user = user_context.is_cae_user
+
+
+class SetTimezoneMiddleware(AsyncCapableMiddleware):
+    """
+    Allows views to auto-convert from UTC to user's timezone.
+    """
+    def __call__(self, request, *args, **kwargs):
+        # Check if running in async mode.
+        if self.is_async:
+            return self.async_call(request)
+
+        self.set_timezone(request)
 
         # Resume view call as normal.
         response = self.get_response(request)
         return response
 
+    async def async_call(self, request):
+        # User is generally already loaded by GetUserProfileMiddleware. Only switch to sync thread if not.
+        # Note that the activated timezone carries over to the async context either way.
+        if is_user_loaded(request):
+            self.set_timezone(request)
+        else:
+            await sync_to_async(self.set_timezone, thread_sensitive=True)(request)
 
-class SetTimezoneMiddleware(object):
-    """
-    Allows views to auto-convert from UTC to user's timezone.
-    """
-    def __init__(self, get_response):
-        self.get_response = get_response
+        # Resume view call as normal.
+        response = await self.get_response(request)
+        return response
 
-    def __call__(self, request, *args, **kwargs):
+    def set_timezone(self, request):
+        """
+        Activates timezone for request user.
+        """
         # Attempt to set timezone for user in all views.
         tzname = None
         if request.user.is_authenticated:
@@ -64,25 +203,17 @@ class SetTimezoneMiddleware(object):
         else:
             timezone.deactivate()
 
-        # Resume view call as normal.
-        response = self.get_response(request)
-        return response
-
 
-class GetProjectDetailMiddleware(object):
+class GetProjectDetailMiddleware(AsyncCapableMiddleware):
     """
     Passes project detail information to all views.
 
     Note: To function properly, all views must use "TemplateResponse" instead of "Render"
           Views should also provide an object dictionary even in the event that they pass no data (such as an index).
-    """
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request, *args, **kwargs):
-        response = self.get_response(request)
-        return response
 
+    Site-wide values are pulled from the "site context" as lazy objects, and only computed when a template uses them.
+    (See "cae_home/site_context.py" for more info.)
+    """
     def process_template_response(self, request, response):
         # Check to ensure DjangoRest views don't error.
         if response.context_data is not None:
@@ -101,32 +232,30 @@ class GetProjectDetailMiddleware(object):
             response.context_data['domain'] = get_current_site(request)
 
             # Get installed project/app details.
-            response.context_data['imported_projects'] = settings.INSTALLED_APP_DETAILS
+            response.context_data['imported_projects'] = site_context.get_lazy_value('imported_projects')
 
             # Check if CAE Web is installed. Needed for setting the "default" header nav.
-            response.context_data['caeweb_installed'] = 'apps.CAE_Web.cae_web_core.apps.CaeWebCoreConfig' in settings.INSTALLED_APPS
+            response.context_data['caeweb_installed'] = site_context.get_lazy_value('caeweb_installed')
 
             # Get CAE Programmer email (For footer).
-            try:
-                prog_email = models.WmuUser.objects.get(bronco_net='ceas_prog').official_email
-                response.context_data['cae_prog_email'] = prog_email
-            except ObjectDoesNotExist:
-                pass
+            response.context_data['cae_prog_email'] = site_context.get_lazy_value('cae_prog_email')
 
         return response
 
+    async def async_process_template_response(self, request, response):
+        # No database access occurs here, so sync logic is safe to run as-is.
+        return self.sync_process_template_response(request, response)
+
 
-class GetUserSiteOptionsMiddleware(object):
+class GetUserSiteOptionsMiddleware(AsyncCapableMiddleware):
     """
     Gets site theme for all views.
     """
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
 
-    def __call__(self, request, *args, **kwargs):
-        # Resume view call as normal.
-        response = self.get_response(request)
-        return response
+        # Url prefix to main nav template lookup. Built once on server start, as installed apps can't change after.
+        self.main_nav_template_paths = dict(settings.INSTALLED_APP_URL_DICT)
 
     def process_template_response(self, request, response):
         # Check to ensure DjangoRest views don't error.
@@ -139,45 +268,45 @@ class GetUserSiteOptionsMiddleware(object):
                 response.context_data['mobile_font_size'] = request.user.profile.get_mobile_font_size()
             else:
                 # Default to "wmu" site theme.
-                response.context_data['site_theme'] = models.SiteTheme.objects.get(slug='wmu')
+                response.context_data['site_theme'] = site_context.get_lazy_value('default_site_theme')
                 response.context_data['desktop_font_size'] = 'base'
                 response.context_data['mobile_font_size'] = 'base'
 
         # Parse url. All we care about is the argument before the first "/" character.
-        url_split = re.split('^/([^/]*)/*', request.path)
-
-        # Check that at least one argument was found.
-        if len(url_split) > 1:
-            app_url = url_split[1]
-            try:
-                request.session['cae_workspace_main_nav_template_path'] = settings.INSTALLED_APP_URL_DICT[app_url]
-            except KeyError:
-                # Arg was not for subproject. Likely a page in cae_home, such as user profile edit page.
-                # Skip saving to session.
-                pass
-
-        # Get main nav template path from session.
-        try:
-            response.context_data['main_nav_template_path'] = request.session['cae_workspace_main_nav_template_path']
-        except KeyError:
-            # Session was not populated. Default to cae_home main nav path.
-            response.context_data['main_nav_template_path'] = 'cae_home/nav/default_app_nav.html'
+        app_url = request.path.lstrip('/').split('/', 1)[0]
+
+        # Get main nav template path for url.
+        main_nav_template_path = self.main_nav_template_paths.get(app_url, None)
+        if main_nav_template_path is not None:
+            # Url is for subproject. Only save to session if value actually changed.
+            # Otherwise the session is marked as modified and re-saved to the database on every single page load.
+            if request.session.get(MAIN_NAV_SESSION_KEY, None) != main_nav_template_path:
+                request.session[MAIN_NAV_SESSION_KEY] = main_nav_template_path
+        else:
+            # Url was not for subproject. Likely a page in cae_home, such as user profile edit page.
+            # Get last used main nav template path from session.
+            # If session was not populated, default to cae_home main nav path.
+            main_nav_template_path = request.session.get(MAIN_NAV_SESSION_KEY, DEFAULT_MAIN_NAV_TEMPLATE_PATH)
+
+        if response.context_data is not None:
+            response.context_data['main_nav_template_path'] = main_nav_template_path
 
         return response
 
+    async def async_process_template_response(self, request, response):
+        # User and session are generally already loaded by this point. Only switch to sync thread if not.
+        if is_user_loaded(request):
+            return self.sync_process_template_response(request, response)
+        else:
+            return await sync_to_async(self.sync_process_template_response, thread_sensitive=True)(request, response)
+
 
-class HandleExceptionsMiddleware(object):
+class HandleExceptionsMiddleware(AsyncCapableMiddleware):
     """
     Handles all exceptions.
-    """
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request, *args, **kwargs):
-        # Resume view call as normal.
-        response = self.get_response(request)
-        return response
 
+    Note: Django always calls "process_exception()" in sync mode, even under ASGI. So there is no async equivalent.
+    """
     def process_exception(self, request, exception):
         """
         Handles when any view raises an uncaught exception.
@@ -201,6 +330,7 @@ class HandleExceptionsMiddleware(object):
             ))
         else:
             # Unhandled error type. Log and send error email.
+            # Email is queued and sent in the background as a digest. See "workspace/logging.py".
             logger.error('{0}'.format(exception), exc_info=True)
 
         # Call standard Django response handling for given exception.
@@ -208,3 +338,49 @@ class HandleExceptionsMiddleware(object):
 
         # Note that this function SHOULD NOT return any value.
         # Otherwise, all exception pages that raise will look like a 500.
+
+
+class QueryBudgetMiddleware(object):
+    """
+    Optional middleware to record queries for each request, and log views that exceed their query budget.
+    Violations are logged to "sql/queries.log". Enabled with the QUERY_BUDGET_ENABLED setting.
+
+    Views use the project default budget (as defined in settings), unless they declare their own.
+    If the QUERY_BUDGET_RAISE setting is True, views that exceed a declared budget raise an error instead of logging.
+    This allows UnitTests to fail on query regressions.
+    (See "cae_home/query_budget.py" for more info.)
+
+    Note: Sync-only, as database connections (and their execute wrappers) are per thread.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.default_budget = query_budget.QueryBudget.from_settings()
+
+    def __call__(self, request, *args, **kwargs):
+        # Record all queries for request, including other middleware.
+        with query_budget.record_queries() as recorder:
+            response = self.get_response(request)
+
+        # Check recorded queries against budget.
+        declared_budget = getattr(request, '_cae_query_budget', None)
+        budget = declared_budget if declared_budget is not None else self.default_budget
+        violations = budget.get_violations(recorder)
+
+        if violations:
+            message = 'Query budget exceeded for url "{0}" ({1}): {2}'.format(
+                request.get_full_path_info(),
+                recorder.get_summary(),
+                '; '.join(violations),
+            )
+            if declared_budget is not None and settings.QUERY_BUDGET_RAISE:
+                raise query_budget.QueryBudgetExceeded(message)
+            query_budget.logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Save declared view budget, if any.
+        request._cae_query_budget = query_budget.get_view_query_budget(view_func)
@@ -0,0 +1,116 @@
+"""
+Custom model mixin definitions.
+"""
+
+# System Imports.
+from django.db.models import DEFERRED
+
+
+class ChangeTrackingMixin:
+    """
+    Change Tracking Model Mixin
+
+    Snapshots field values as the model is loaded from the database, and again after each save.
+    On save of an existing model, only fields which have changed since the snapshot are written to the database.
+    If no fields have changed, then the save is skipped entirely (including pre_save/post_save signals).
+
+    Only tracks concrete, non-relational-M2M fields with immutable values (strings, numbers, dates, etc).
+    Must be placed before the Django model class, in the model's inheritance list.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Snapshot field values on model load.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._set_tracked_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        """
+        Snapshot field values on model refresh, so refreshed values aren't considered changes.
+        """
+        super().refresh_from_db(using=using, fields=fields)
+        self._set_tracked_values(fields)
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        """
+        Modify model save behavior, to only write changed fields.
+        """
+        if update_fields is None and not force_insert and self.is_tracked():
+            # Existing model, loaded from database. Only save changed fields.
+            update_fields = self.get_changed_fields()
+            if update_fields:
+                # Also include any fields which set themselves on every save, such as "date_modified".
+                update_fields.update(
+                    field.name for field in self._meta.concrete_fields
+                    if getattr(field, 'auto_now', False)
+                )
+
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+
+        # Update snapshot to match saved values.
+        self._set_tracked_values(update_fields)
+
+    def is_tracked(self):
+        """
+        Determines if model currently has a snapshot of database values to compare against.
+        :return: True if model is tracked | False otherwise (such as unsaved models).
+        """
+        return not self._state.adding and getattr(self, '_tracked_values', None) is not None
+
+    def get_changed_fields(self):
+        """
+        Returns names of all fields that have changed since model was loaded or last saved.
+        Fields that have not been loaded (such as deferred fields) are never considered changed.
+        :return: Set of changed field names.
+        """
+        tracked_values = getattr(self, '_tracked_values', None) or {}
+
+        changed_fields = set()
+        for field in self._tracked_fields():
+            if field.attname in tracked_values and field.attname in self.__dict__:
+                if self.__dict__[field.attname] != tracked_values[field.attname]:
+                    changed_fields.add(field.name)
+        return changed_fields
+
+    def has_changed(self, *field_names):
+        """
+        Determines if model has changed since it was loaded or last saved.
+        Unsaved/untracked models are always considered changed.
+        :param field_names: Optional names of fields to check. If not provided, checks all fields.
+        :return: True if model (or one of provided fields) has changed | False otherwise.
+        """
+        if not self.is_tracked():
+            return True
+
+        changed_fields = self.get_changed_fields()
+        if field_names:
+            return not changed_fields.isdisjoint(field_names)
+        return len(changed_fields) > 0
+
+    def _tracked_fields(self):
+        """
+        Returns all fields that are tracked for changes.
+        """
+        return [field for field in self._meta.concrete_fields if not field.primary_key]
+
+    def _set_tracked_values(self, field_names=None):
+        """
+        Snapshots current field values.
+        :param field_names: Optional names of fields to snapshot. If not provided, snapshots all loaded fields.
+        """
+        if field_names is None or getattr(self, '_tracked_values', None) is None:
+            self._tracked_values = {}
+            field_names = None
+
+        for field in self._tracked_fields():
+            if field_names is not None and field.name not in field_names and field.attname not in field_names:
+                continue
+
+            value = self.__dict__.get(field.attname, DEFERRED)
+            if value is DEFERRED:
+                # Field was not loaded. Nothing to compare against.
+                self._tracked_values.pop(field.attname, None)
+            else:
+                self._tracked_values[field.attname] = value
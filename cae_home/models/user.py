@@ -4,17 +4,19 @@ Definitions of "User" related Core Models.
 
 # System Imports.
 import pytz
+from functools import partial
 from django.contrib.auth.models import AbstractUser, Group
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.conf import settings
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone
 from django.utils.text import slugify
 from phonenumber_field.modelfields import PhoneNumberField
 
 # User Imports.
 from ..models import Major
+from .mixins import ChangeTrackingMixin
 
 
 MAX_LENGTH = 255
@@ -22,6 +24,18 @@ MAX_LENGTH = 255
 
 # region Model Functions
 
+def save_related_user_intermediary(user_model):
+    """
+    Saves UserIntermediary related to given (login) User or WmuUser model, if it was loaded through the model and has
+    since changed. So setting values such as "user.userintermediary.cae_is_active", then saving the user model, saves
+    both.
+    :param user_model: (Login) User or WmuUser model instance.
+    """
+    user_intermediary = user_model._state.fields_cache.get('userintermediary', None)
+    if user_intermediary is not None and user_intermediary.has_changed():
+        user_intermediary.save()
+
+
 def compare_user_and_wmuuser_models(uid):
     """
     Validates user info between login_user model and wmu_user model.
@@ -29,7 +43,6 @@ def compare_user_and_wmuuser_models(uid):
     """
     user_model = None
     wmu_user_model = None
-    model_updated = False
 
     # Get UserIntermediary value for user.
     user_intermediary = UserIntermediary.objects.get(bronco_net=uid)
@@ -57,6 +70,185 @@ def compare_user_and_wmuuser_models(uid):
         # BroncoNet somehow does not have an associated (login) User model or WmuUser model.
         raise ValidationError('Could not find associated user models for BroncoNet {0}.'.format(id))
 
+    # Get (login) User group names, if any.
+    user_group_names = []
+    if user_model:
+        user_group_names = list(user_model.groups.values_list('name', flat=True))
+
+    # Update corresponding (login) User, WmuUser, and UserIntermediary model values.
+    model_updated = sync_user_model_values(user_intermediary, user_model, wmu_user_model, user_group_names)
+
+    # Handle group membership based on is_active status.
+    # Note that above, we already iterated over groups and set is_active accordingly.
+    # So this is effectively a "safe fallback" for any edge-case scenarios/new logic that we might not have handled for.
+    if user_model:
+        # (Login) User model exists.
+        if user_model.is_active is False:
+            # (Login) User is not active.
+            if len(user_group_names) > 0:
+                # However, model has one or more Auth Group relations. Remove all.
+                user_model.groups.clear()
+                model_updated = True
+
+    # If any model values were updated, then save all three corresponding models.
+    # Note that each model only writes its own changed fields. Models with no changes skip saving entirely.
+    if model_updated:
+        if user_model:
+            user_model.save()
+        if wmu_user_model:
+            wmu_user_model.save()
+        user_intermediary.save()
+
+    # Handle for potential GradApps membership.
+    handle_grad_apps_membership(user_intermediary)
+
+    # Handle if SuccessCtr is installed.
+    if 'success_center' in settings.INSTALLED_CAE_PROJECTS:
+        # SuccessCtr project is present.
+        from apps.Success_Center.success_center_core import models as success_ctr_models
+
+        # Verify that active (Login)User has an associated "SuccessCtr Profile" model.
+        if user_model and user_model.is_active:
+            user_profile = user_intermediary.profile
+            try:
+                success_ctr_models.SuccessCtrProfile.objects.get(profile=user_profile)
+            except success_ctr_models.SuccessCtrProfile.DoesNotExist:
+                # Failed to find profile. Create new one.
+                success_ctr_models.SuccessCtrProfile.objects.create(profile=user_profile)
+
+
+def bulk_compare_user_and_wmuuser_models(uids, batch_size=1000):
+    """
+    Validates user info between login_user model and wmu_user model, for many users at once.
+
+    Produces the same results as calling compare_user_and_wmuuser_models() for each user, but loads and updates
+    models in batches, rather than one user at a time.
+    Note that model save() logic and signals are bypassed. Users that cannot be found are skipped, rather than raising.
+    :param uids: List or QuerySet of user Ids (BroncoNets) to validate.
+    :param batch_size: Number of users to load and update at once.
+    :return: Set of BroncoNets with one or more updated models.
+    """
+    # Special imports that can't be up top, to avoid circular logic.
+    from cae_home import site_context
+    from cae_home.user_context import invalidate_user_context
+
+    uids = list(uids)
+    updated_uids = set()
+    for index in range(0, len(uids), batch_size):
+        batch_uids = uids[index:index + batch_size]
+
+        # Load all three user model types, plus (login) User group names, keyed by BroncoNet.
+        user_intermediaries = UserIntermediary.objects.filter(bronco_net__in=batch_uids).order_by('bronco_net')
+        user_models = {user.username: user for user in User.objects.filter(username__in=batch_uids)}
+        wmu_user_models = {
+            wmu_user.bronco_net: wmu_user for wmu_user in WmuUser.objects.filter(bronco_net__in=batch_uids)
+        }
+        user_group_names = {}
+        for username, group_name in User.groups.through.objects.filter(
+            user__username__in=batch_uids,
+        ).values_list('user__username', 'group__name'):
+            user_group_names.setdefault(username, []).append(group_name)
+
+        # Update model values in memory.
+        changed_models = []
+        clear_group_users = []
+        for user_intermediary in user_intermediaries:
+            uid = user_intermediary.bronco_net
+            user_model = user_models.get(uid, None)
+            wmu_user_model = wmu_user_models.get(uid, None)
+
+            # Skip users without (login) User or WmuUser models.
+            if not user_model and not wmu_user_model:
+                continue
+
+            # Make sure UserIntermediary has Winno field populated.
+            if user_intermediary.winno == '':
+                user_intermediary.winno = user_intermediary.bronco_net
+
+            sync_user_model_values(user_intermediary, user_model, wmu_user_model, user_group_names.get(uid, []))
+
+            # Run WmuUser model validation, same as save() would.
+            # Syncing never changes unique fields, so uniqueness checks (a query per model) are skipped.
+            # Cleaning can set official_email, which then needs to sync again.
+            if wmu_user_model and wmu_user_model.has_changed():
+                official_email = wmu_user_model.official_email
+                wmu_user_model.full_clean(validate_unique=False)
+                if wmu_user_model.official_email != official_email:
+                    sync_user_model_values(
+                        user_intermediary, user_model, wmu_user_model, user_group_names.get(uid, []),
+                    )
+
+            # Inactive (login) Users should not have any Auth Group relations.
+            if user_model and user_model.is_active is False and uid in user_group_names:
+                clear_group_users.append(user_model)
+
+            # Record models with changes.
+            for model in (user_model, wmu_user_model, user_intermediary):
+                if model and model.has_changed():
+                    changed_models.append(model)
+                    updated_uids.add(uid)
+
+        # Write all changes. Models are grouped by changed fields, so that only changed fields are written.
+        now = timezone.now()
+        update_groups = {}
+        for model in changed_models:
+            changed_fields = model.get_changed_fields()
+            if hasattr(model, 'date_modified'):
+                model.date_modified = now
+                changed_fields.add('date_modified')
+            update_groups.setdefault((type(model), frozenset(changed_fields)), []).append(model)
+        for (model_class, changed_fields), models_to_update in update_groups.items():
+            model_class.objects.bulk_update(models_to_update, changed_fields, batch_size=batch_size)
+
+        # Clear groups of inactive users. Run individually, so group change signals still trigger.
+        for user_model in clear_group_users:
+            user_model.groups.clear()
+
+        # Run remaining per-user logic.
+        updated_user_ids = []
+        for user_intermediary in user_intermediaries:
+            uid = user_intermediary.bronco_net
+            user_model = user_models.get(uid, None)
+
+            # Handle logic that would normally run from model save signals.
+            if uid in updated_uids and user_intermediary.user_id is not None:
+                invalidate_user_context(user_intermediary.user_id)
+                updated_user_ids.append(user_intermediary.user_id)
+
+            # Handle for potential GradApps membership.
+            if 'grad_applications' in settings.INSTALLED_CAE_PROJECTS:
+                handle_grad_apps_membership(user_intermediary)
+
+            # Handle if SuccessCtr is installed.
+            if 'success_center' in settings.INSTALLED_CAE_PROJECTS:
+                # SuccessCtr project is present.
+                from apps.Success_Center.success_center_core import models as success_ctr_models
+
+                # Verify that active (Login)User has an associated "SuccessCtr Profile" model.
+                if user_model and user_model.is_active:
+                    success_ctr_models.SuccessCtrProfile.objects.get_or_create(profile_id=user_intermediary.profile_id)
+
+        # Update GroupMembership models for all updated users once transaction completes, same as on model save.
+        if updated_user_ids:
+            transaction.on_commit(partial(reconcile_group_memberships, User.objects.filter(pk__in=updated_user_ids)))
+
+        if any(isinstance(model, WmuUser) and model.bronco_net == 'ceas_prog' for model in changed_models):
+            site_context.invalidate('cae_prog_email')
+
+    return updated_uids
+
+
+def sync_user_model_values(user_intermediary, user_model, wmu_user_model, user_group_names):
+    """
+    Updates values between the three user model types, to match each other. Models are updated but not saved.
+    :param user_intermediary: UserIntermediary model of user.
+    :param user_model: (Login) User model of user, or None if user has none.
+    :param wmu_user_model: WmuUser model of user, or None if user has none.
+    :param user_group_names: List of names of Auth Groups that (login) User belongs to.
+    :return: True if any model values were updated | False otherwise.
+    """
+    model_updated = False
+
     # Below logic attempts to update corresponding (login) User, WmuUser, and UserIntermediary models.
 
     # Sync winno values.
@@ -146,19 +338,18 @@ def compare_user_and_wmuuser_models(uid):
         #
         # Meanwhile, the WmuUser model is_active is set based on either of the LDAP values (CAE or main campus)
         # returning that the user is active.
-        user_groups = user_model.groups.all()
         orig_active = user_model.is_active
         orig_staff = user_model.is_staff
         user_model.is_active = False
         user_model.is_staff = False
-        for group in user_groups:
-            if group.name in (settings.CAE_ADMIN_GROUPS + ['CAE Programmer']):
+        for group_name in user_group_names:
+            if group_name in (settings.CAE_ADMIN_GROUPS + ['CAE Programmer']):
                 user_model.is_staff = True
-            if group.name in settings.CAE_CENTER_GROUPS:
+            if group_name in settings.CAE_CENTER_GROUPS:
                 user_model.is_active = True
-            if group.name in settings.SUCCESS_CENTER_GROUPS:
+            if group_name in settings.SUCCESS_CENTER_GROUPS:
                 user_model.is_active = True
-            if group.name in settings.GRAD_APPS_GROUPS:
+            if group_name in settings.GRAD_APPS_GROUPS:
                 user_model.is_active = True
         # Extra handling for development. Seed users are always set to active + staff.
         if user_model.username in settings.SEED_USERS:
@@ -180,42 +371,7 @@ def compare_user_and_wmuuser_models(uid):
                 wmu_user_model.is_active = False
                 model_updated = True
 
-    # Handle group membership based on is_active status.
-    # Note that above, we already iterated over groups and set is_active accordingly.
-    # So this is effectively a "safe fallback" for any edge-case scenarios/new logic that we might not have handled for.
-    if user_model:
-        # (Login) User model exists.
-        if user_model.is_active is False:
-            # (Login) User is not active.
-            if user_model.groups.all().exists():
-                # However, model has one or more Auth Group relations. Remove all.
-                user_model.groups.clear()
-                model_updated = True
-
-    # If any model values were updated, then save all three corresponding models.
-    if model_updated:
-        if user_model:
-            user_model.save()
-        if wmu_user_model:
-            wmu_user_model.save()
-        user_intermediary.save()
-
-    # Handle for potential GradApps membership.
-    handle_grad_apps_membership(user_intermediary)
-
-    # Handle if SuccessCtr is installed.
-    if 'success_center' in settings.INSTALLED_CAE_PROJECTS:
-        # SuccessCtr project is present.
-        from apps.Success_Center.success_center_core import models as success_ctr_models
-
-        # Verify that active (Login)User has an associated "SuccessCtr Profile" model.
-        if user_model and user_model.is_active:
-            user_profile = user_intermediary.profile
-            try:
-                success_ctr_models.SuccessCtrProfile.objects.get(profile=user_profile)
-            except success_ctr_models.SuccessCtrProfile.DoesNotExist:
-                # Failed to find profile. Create new one.
-                success_ctr_models.SuccessCtrProfile.objects.create(profile=user_profile)
+    return model_updated
 
 
 def check_user_group_membership(uid):
@@ -225,32 +381,9 @@ def check_user_group_membership(uid):
     Group one is provided by Django, and tracks general site-access permissions. But does NOT record history of "who
     used to be part of what group, years ago". GroupMembership is custom and specifically tracks history).
 
-    Intended to run on model save.
+    Intended to run on model save. For updating many users at once, see check_all_group_memberships().
     """
-    user = User.objects.get(username=uid)
-    user_auth_groups = user.groups.all()
-
-    # Get list of all current values in user GroupMemberships.
-    group_membership_list = GroupMembership.objects.filter(user=user, date_left=None)
-
-    # Loop through current GroupMemberships and update models.
-    found_groups = []
-    for group_membership in group_membership_list:
-        # Save group as having known membership in GroupMemberships.
-        found_groups.append(group_membership.group)
-
-        # Find groups user is no longer member of.
-        if group_membership.group not in user_auth_groups:
-            # User is no longer member. Update GroupMembership.
-            group_membership.date_left = timezone.datetime.today()
-            group_membership.save()
-
-    # Loop through current group membership and update group dates accordingly.
-    for auth_group in user_auth_groups:
-
-        # Find groups user has joined membership of.
-        if auth_group not in found_groups:
-            GroupMembership.objects.create(user=user, group=auth_group, date_joined=timezone.datetime.today())
+    reconcile_group_memberships(User.objects.filter(username=uid))
 
 
 def check_all_group_memberships():
@@ -259,24 +392,55 @@ def check_all_group_memberships():
     Aka, specifically the GroupMember ship model, not the auth Group model (these are separate, but related. The auth
     Group one is provided by Django, and tracks general site-access permissions. But does NOT record history of "who
     used to be part of what group, years ago". GroupMembership is custom and specifically tracks history).
+    :return: Tuple of (number of GroupMemberships ended, number of GroupMemberships created).
     """
     # First, update for active users.
-    active_users = User.objects.filter(is_active=True)
+    ended_count, created_count = reconcile_group_memberships(User.objects.filter(is_active=True))
 
-    # Loop through all active users.
-    for user in active_users:
-        check_user_group_membership(user.username)
+    # Now, end all existing GroupMemberships for inactive users.
+    ended_count += GroupMembership.objects.filter(user__is_active=False, date_left=None).update(
+        date_left=timezone.datetime.today().date(),
+        date_modified=timezone.now(),
+    )
 
-    # Now, update for inactive users.
-    inactive_users = User.objects.filter(is_active=False)
+    return ended_count, created_count
 
-    # Attempt to find any open GroupMembership that reference inactive users.
-    group_membership_list = GroupMembership.objects.filter(user__in=inactive_users, date_left=None)
 
-    # End all existing GroupMemberships for inactive users.
-    for inactive_group_membership in group_membership_list:
-        inactive_group_membership.date_left = timezone.datetime.today()
-        inactive_group_membership.save()
+def reconcile_group_memberships(users):
+    """
+    Updates GroupMembership models to match current auth Group membership, for all provided users at once.
+
+    Open GroupMemberships with no matching auth Group membership are ended, and auth Group memberships with no
+    matching open GroupMembership get a new GroupMembership.
+    Note that model save() logic and signals are bypassed.
+    :param users: QuerySet of (login) Users to update.
+    :return: Tuple of (number of GroupMemberships ended, number of GroupMemberships created).
+    """
+    today = timezone.datetime.today().date()
+    auth_group_memberships = User.groups.through.objects.filter(user__in=users)
+
+    # End open GroupMemberships for groups that users are no longer a member of.
+    ended_count = GroupMembership.objects.filter(user__in=users, date_left=None).filter(
+        ~Exists(User.groups.through.objects.filter(user_id=OuterRef('user_id'), group_id=OuterRef('group_id'))),
+    ).update(
+        date_left=today,
+        date_modified=timezone.now(),
+    )
+
+    # Create GroupMemberships for groups that users have joined.
+    new_memberships = [
+        GroupMembership(user_id=user_id, group_id=group_id, date_joined=today)
+        for user_id, group_id in auth_group_memberships.filter(
+            ~Exists(GroupMembership.objects.filter(
+                user_id=OuterRef('user_id'),
+                group_id=OuterRef('group_id'),
+                date_left=None,
+            )),
+        ).values_list('user_id', 'group_id').iterator()
+    ]
+    GroupMembership.objects.bulk_create(new_memberships, batch_size=1000)
+
+    return ended_count, len(new_memberships)
 
 
 def handle_grad_apps_membership(user_intermediary):
@@ -306,9 +470,10 @@ def handle_grad_apps_membership(user_intermediary):
 
     # Special imports that can't be up top, to avoid circular logic.
     from apps.Grad_Applications.grad_applications_core import models as grad_apps_models
+    from cae_home import reference_data
     from cae_home.models import Department
-    na_department = Department.objects.get(code='NA')
-    default_department = Department.objects.get(code='EDO')
+    na_department = reference_data.get(Department, code='NA')
+    default_department = reference_data.get(Department, code='EDO')
 
     # Ensure default committees exist.
     try:
@@ -414,20 +579,42 @@ class WmuUserMajorRelationship(models.Model):
 
 # region Models
 
-class User(AbstractUser):
+class User(ChangeTrackingMixin, AbstractUser):
     """
     An extension of Django's default user, allowing for additional functionality.
     One of three User model types. Contains all information directly related to Django authentication.
     """
+    # Fields which trigger user model sync on change.
+    SYNC_FIELDS = ('first_name', 'last_name', 'email', 'is_active', 'is_staff')
+
+    def save(self, *args, **kwargs):
+        """
+        Modify model save behavior.
+        """
+        # Special imports that can't be up top, to avoid circular logic.
+        from cae_home import user_sync
+
+        # Save model, along with any changes to related UserIntermediary. Both are synced together.
+        with user_sync.deferred():
+            super().save(*args, **kwargs)
+            save_related_user_intermediary(self)
+
     @staticmethod
     def get_or_create_superuser(username, email, password):
         """
         Attempts to either get or create user with the given information.
         """
+        # Special imports that can't be up top, to avoid circular logic.
+        from cae_home.user_factory import UserFactory
+
         try:
             new_user = User.objects.get(username=username, email=email)
         except User.DoesNotExist:
-            new_user = User.objects.create_superuser(username, email, password)
+            new_user = UserFactory().create(
+                username,
+                user={'email': email, 'is_staff': True, 'is_superuser': True},
+                password=password,
+            ).user
         return new_user
 
     @staticmethod
@@ -435,21 +622,24 @@ class User(AbstractUser):
         """
         Attempts to either get or create user with given information.
         """
-        new_user, created = User.objects.get_or_create(username=username, email=email)
-        if isinstance(new_user, tuple):
-            new_user = new_user[0]
+        # Special imports that can't be up top, to avoid circular logic.
+        from cae_home.user_factory import UserFactory
 
-        # If user was newly created, set new password.
-        if created:
-            new_user.set_password(password)
-            if inactive:
-                new_user.is_active = False
-                new_user.userintermediary.cae_is_active = False
-                new_user.userintermediary.wmu_is_active = False
-            new_user.save()
-        else:
+        try:
+            new_user = User.objects.get(username=username, email=email)
             new_user.set_password(password)
             new_user.save()
+        except User.DoesNotExist:
+            # User does not exist. Create new user, along with all associated user models.
+            user_intermediary_values = None
+            if inactive:
+                user_intermediary_values = {'cae_is_active': False, 'wmu_is_active': False}
+            new_user = UserFactory().create(
+                username,
+                user={'email': email, 'is_active': not inactive},
+                user_intermediary=user_intermediary_values,
+                password=password,
+            ).user
 
         return new_user
 
@@ -545,10 +735,13 @@ class GroupMembership(models.Model):
         super().save(*args, **kwargs)
 
 
-class UserIntermediary(models.Model):
+class UserIntermediary(ChangeTrackingMixin, models.Model):
     """
     Intermediary to connect the three User model types: (login) User models, user Profile models, and WmuUser models.
     """
+    # Fields which trigger user model sync on change.
+    SYNC_FIELDS = ('user', 'wmu_user', 'winno', 'first_name', 'last_name', 'cae_is_active', 'wmu_is_active')
+
     # Relationship Keys.
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, blank=True, null=True)
     wmu_user = models.OneToOneField('cae_home.WMUUser', on_delete=models.CASCADE, blank=True, null=True)
@@ -613,11 +806,15 @@ class UserIntermediary(models.Model):
         """
         # Save model.
         self.clean()    # Seems to error on validation without this line.
-        self.full_clean()
+
+        # Only validate if something has actually changed. Otherwise save is skipped anyway.
+        if self.has_changed():
+            self.full_clean()
+
         super().save(*args, **kwargs)
 
 
-class WmuUser(models.Model):
+class WmuUser(ChangeTrackingMixin, models.Model):
     """
     An entity with WMU ldap credentials.
     One of three User model types. Contains all information directly related Wmu LDAP information.
@@ -635,6 +832,9 @@ class WmuUser(models.Model):
         (OTHER, 'Other'),
     )
 
+    # Fields which trigger user model sync on change.
+    SYNC_FIELDS = ('winno', 'first_name', 'last_name', 'official_email', 'is_active')
+
     # Relationship keys.
     major = models.ManyToManyField('Major', through=WmuUserMajorRelationship, blank=True)
 
@@ -671,9 +871,17 @@ class WmuUser(models.Model):
         """
         Modify model save behavior.
         """
-        # Save model.
-        self.full_clean()
-        super().save(*args, **kwargs)
+        # Special imports that can't be up top, to avoid circular logic.
+        from cae_home import user_sync
+
+        # Only validate if something has actually changed. Otherwise save is skipped anyway.
+        if self.has_changed():
+            self.full_clean()
+
+        # Save model, along with any changes to related UserIntermediary. Both are synced together.
+        with user_sync.deferred():
+            super().save(*args, **kwargs)
+            save_related_user_intermediary(self)
 
     def shorthand_email(self):
         """
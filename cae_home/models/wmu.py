@@ -6,7 +6,6 @@ Definitions of "WMU" related Core Models.
 import datetime, decimal
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Q
 from django.utils.text import slugify
 
 # User Imports.
@@ -231,15 +230,16 @@ class Room(models.Model):
         Returns only computer labs/computer classrooms associated with the "CAE Center" department.
         :return: The list of CAE Center labs.
         """
-        cae_lab_query = (
-            (
-                Q(room_type__name__iexact='classroom')
-                | Q(room_type__name__iexact='computer classroom')
-                | Q(room_type__name__iexact='department office')
-            )
-            & Q(department__name__iexact='cae center')
-        )
-        return Room.objects.filter(cae_lab_query)
+        # Special imports that can't be up top, to avoid circular logic.
+        from cae_home import reference_data
+
+        # Determine matching rooms from reference data, rather than querying with case-insensitive joins.
+        room_ids = [
+            room.pk for room in reference_data.get_all(Room)
+            if room.room_type.name.lower() in ('classroom', 'computer classroom', 'department office')
+            and any(department.name.lower() == 'cae center' for department in room.department.all())
+        ]
+        return Room.objects.filter(pk__in=room_ids)
 
 
 class Major(models.Model):
@@ -0,0 +1,173 @@
+"""
+Permission cache logic for CAE Home app.
+
+Caches the permission strings (such as "cae_home.change_room") used by the authentication backends, across requests.
+Values are cached in three parts:
+    * Per user: the user's Group pks and individual permissions.
+    * Per Group: the Group's permissions.
+    * Superusers: all permissions.
+So a permission check only needs the database once per user (and once per Group, shared by all members).
+
+Per user values are invalidated on User group or permission change. All values are invalidated on Permission or
+Group change. (See "cae_home/signals.py" for the associated signal handlers.) Changes made within a transaction are
+invalidated again once committed, so that values read before commit are never held under the new version.
+"""
+
+# System Imports.
+import uuid
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import transaction
+
+
+# Cache key values.
+CACHE_KEY_PREFIX = 'cae_home.permission_cache'
+GLOBAL_VERSION_KEY = '{0}.version'.format(CACHE_KEY_PREFIX)
+ALL_PERMISSIONS_KEY = '{0}.all'.format(CACHE_KEY_PREFIX)
+
+
+def get_permissions(user):
+    """
+    Gets permission strings for given user, from cache if possible.
+    Superusers have all permissions, from both sources.
+    :param user: (Login) User model instance.
+    :return: Tuple of (frozenset of individual permissions, frozenset of group permissions).
+    """
+    user_key = _get_user_key(user.pk)
+    user_version_key = _get_user_version_key(user.pk)
+
+    # Pull all user cache values in one round trip.
+    cached_values = cache.get_many([user_key, user_version_key, GLOBAL_VERSION_KEY, ALL_PERMISSIONS_KEY])
+    global_version = _get_or_create_version(GLOBAL_VERSION_KEY, cached_values)
+    version = (global_version, _get_or_create_version(user_version_key, cached_values))
+
+    if user.is_superuser:
+        all_permissions = cached_values.get(ALL_PERMISSIONS_KEY, None)
+        if all_permissions is None or all_permissions[0] != global_version:
+            all_permissions = (global_version, _load_permissions(Permission.objects.all()))
+            cache.set(ALL_PERMISSIONS_KEY, all_permissions, settings.PERMISSION_CACHE_TIMEOUT)
+        return all_permissions[1], all_permissions[1]
+
+    # Check that cached user value exists and is still valid.
+    user_value = cached_values.get(user_key, None)
+    if user_value is None or user_value[0] != version:
+        user_value = (
+            version,
+            frozenset(user.groups.values_list('pk', flat=True)),
+            _load_permissions(user.user_permissions.all()),
+        )
+        cache.set(user_key, user_value, settings.PERMISSION_CACHE_TIMEOUT)
+    version, group_ids, user_permissions = user_value
+
+    return user_permissions, get_group_permissions(group_ids, global_version)
+
+
+def get_group_permissions(group_ids, global_version):
+    """
+    Gets combined permission strings for given Groups, from cache if possible. Groups not cached are loaded together.
+    :param group_ids: Iterable of Group pks.
+    :param global_version: Current global cache version.
+    :return: Frozenset of permission strings.
+    """
+    if not group_ids:
+        return frozenset()
+
+    group_keys = {_get_group_key(group_id): group_id for group_id in group_ids}
+    cached_values = cache.get_many(group_keys)
+
+    # Split Groups into valid cached values, and ones to load.
+    permissions = set()
+    missing_group_ids = []
+    for group_key, group_id in group_keys.items():
+        group_value = cached_values.get(group_key, None)
+        if group_value is None or group_value[0] != global_version:
+            missing_group_ids.append(group_id)
+        else:
+            permissions.update(group_value[1])
+
+    if missing_group_ids:
+        # Load all missing Groups in one query.
+        group_permissions = {group_id: set() for group_id in missing_group_ids}
+        for group_id, app_label, codename in Permission.objects.filter(group__in=missing_group_ids).values_list(
+            'group', 'content_type__app_label', 'codename',
+        ).order_by():
+            group_permissions[group_id].add('{0}.{1}'.format(app_label, codename))
+
+        cache.set_many(
+            {
+                _get_group_key(group_id): (global_version, frozenset(group_perms))
+                for group_id, group_perms in group_permissions.items()
+            },
+            settings.PERMISSION_CACHE_TIMEOUT,
+        )
+        for group_perms in group_permissions.values():
+            permissions.update(group_perms)
+
+    return frozenset(permissions)
+
+
+def invalidate_user_permissions(user_id):
+    """
+    Invalidates cached permissions for a single user.
+    :param user_id: Pk of (login) User model to invalidate.
+    """
+    _invalidate_version(_get_user_version_key(user_id))
+
+
+def invalidate_all_permissions():
+    """
+    Invalidates cached permissions for all users and Groups.
+    Used for Permission and Group changes, which potentially affect many users at once.
+    """
+    _invalidate_version(GLOBAL_VERSION_KEY)
+
+
+def _invalidate_version(key):
+    """
+    Sets new version value for key, invalidating all values cached under the old one.
+    """
+    cache.set(key, uuid.uuid4().hex, None)
+
+    # Within a transaction, other requests may load old values before commit, and cache them under the new version.
+    # Invalidate again once committed.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, None))
+
+
+def _load_permissions(permission_query):
+    """
+    Loads permission strings for given Permission queryset.
+    """
+    permissions = permission_query.values_list('content_type__app_label', 'codename').order_by()
+    return frozenset('{0}.{1}'.format(app_label, codename) for app_label, codename in permissions)
+
+
+def _get_user_key(user_id):
+    return '{0}.user.{1}'.format(CACHE_KEY_PREFIX, user_id)
+
+
+def _get_user_version_key(user_id):
+    return '{0}.version.{1}'.format(CACHE_KEY_PREFIX, user_id)
+
+
+def _get_group_key(group_id):
+    return '{0}.group.{1}'.format(CACHE_KEY_PREFIX, group_id)
+
+
+def _get_or_create_version(key, cached_values):
+    """
+    Gets version value for key. If missing (never set or evicted), then a new version is generated.
+    Generating on eviction guarantees any previously cached values for key are treated as invalid.
+    """
+    version = cached_values.get(key, None)
+    if version is None:
+        new_version = uuid.uuid4().hex
+        cache.add(key, new_version, None)
+
+        # Use value of whichever process set version first.
+        # If key was evicted again in the meantime, the local version is still guaranteed to be unused.
+        version = cache.get(key)
+        if version is None:
+            version = new_version
+    return version
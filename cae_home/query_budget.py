@@ -0,0 +1,205 @@
+"""
+SQL query budget logic for CAE Home app.
+
+Records query count, total database time, and repeated queries (a common sign of N+1 query patterns) for a block of
+code, using Django's database "execute wrappers".
+
+Used by QueryBudgetMiddleware to log views that exceed budgets (see "sql/queries.log"), and by tests to assert that
+a view or block of code stays within a given budget.
+"""
+
+# System Imports.
+import re, time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.db import connections
+
+# User Imports.
+from workspace import logging as init_logging
+
+
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+
+# Used to collapse variable length "IN (%s, %s, ...)" clauses, so they fingerprint as the same query.
+IN_CLAUSE_REGEX = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+WHITESPACE_REGEX = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block of code exceeds its declared query budget.
+    Subclass of AssertionError, so that UnitTests report it as a failure.
+    """
+    pass
+
+
+class QueryBudget:
+    """
+    Limits for queries ran within a single request or block of code. Limits of None are not checked.
+    """
+    def __init__(self, max_queries=None, max_duplicates=None, max_db_time=None):
+        """
+        :param max_queries: Maximum number of queries.
+        :param max_duplicates: Maximum number of times any single query may be repeated.
+        :param max_db_time: Maximum total database time, in seconds.
+        """
+        self.max_queries = max_queries
+        self.max_duplicates = max_duplicates
+        self.max_db_time = max_db_time
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Returns project default budget, as defined in settings.
+        """
+        return cls(
+            max_queries=settings.QUERY_BUDGET_MAX_QUERIES,
+            max_duplicates=settings.QUERY_BUDGET_MAX_DUPLICATES,
+            max_db_time=settings.QUERY_BUDGET_MAX_DB_TIME,
+        )
+
+    def get_violations(self, recorder):
+        """
+        Checks recorded queries against budget.
+        :param recorder: QueryRecorder instance to check.
+        :return: List of budget violation messages. Empty if within budget.
+        """
+        violations = []
+
+        if self.max_queries is not None and recorder.count > self.max_queries:
+            violations.append('{0} queries (max {1})'.format(recorder.count, self.max_queries))
+
+        if self.max_duplicates is not None:
+            for fingerprint, count in recorder.get_duplicates():
+                if count - 1 > self.max_duplicates:
+                    violations.append('query repeated {0} times (max {1}): {2}'.format(
+                        count - 1,
+                        self.max_duplicates,
+                        fingerprint,
+                    ))
+
+        if self.max_db_time is not None and recorder.db_time > self.max_db_time:
+            violations.append('{0:.3f}s database time (max {1:.3f}s)'.format(recorder.db_time, self.max_db_time))
+
+        return violations
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that records all queries passing through it.
+    """
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start_time
+            self.count += 1
+            self.fingerprints[get_fingerprint(sql)] += 1
+
+    def get_duplicates(self):
+        """
+        :return: List of (fingerprint, count) tuples for all queries that ran more than once, most repeated first.
+        """
+        return [(fingerprint, count) for fingerprint, count in self.fingerprints.most_common() if count > 1]
+
+    def get_summary(self):
+        """
+        :return: Single line summary of recorded queries.
+        """
+        return '{0} queries, {1:.3f}s database time, {2} repeated queries'.format(
+            self.count,
+            self.db_time,
+            len(self.get_duplicates()),
+        )
+
+
+def get_fingerprint(sql):
+    """
+    Normalizes sql, so that the same query with different parameters produces the same value.
+    Query parameters are already separate from the sql string at this point. So we only need to handle whitespace
+    and variable length "IN" clauses.
+    :param sql: Sql string, as passed to database cursor.
+    :return: Normalized sql string.
+    """
+    sql = IN_CLAUSE_REGEX.sub('(...)', sql)
+    return WHITESPACE_REGEX.sub(' ', sql).strip()
+
+
+@contextmanager
+def record_queries():
+    """
+    Records all queries ran on all database connections (for the current thread) within block.
+    :return: QueryRecorder instance.
+    """
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+@contextmanager
+def assert_query_budget(max_queries=None, max_duplicates=None, max_db_time=None):
+    """
+    Test assertion that all code within block stays within given query budget.
+
+    Example:
+        with assert_query_budget(max_queries=10, max_duplicates=0):
+            self.client.get(url)
+
+    :param max_queries: Maximum number of queries.
+    :param max_duplicates: Maximum number of times any single query may be repeated.
+    :param max_db_time: Maximum total database time, in seconds.
+    :return: QueryRecorder instance.
+    """
+    budget = QueryBudget(max_queries=max_queries, max_duplicates=max_duplicates, max_db_time=max_db_time)
+    with record_queries() as recorder:
+        yield recorder
+
+    violations = budget.get_violations(recorder)
+    if violations:
+        raise QueryBudgetExceeded('Query budget exceeded: {0}'.format('; '.join(violations)))
+
+
+def query_budget(max_queries=None, max_duplicates=None, max_db_time=None):
+    """
+    View decorator to declare a query budget for a view. Overrides the project default budget for the view.
+    Only checked when QueryBudgetMiddleware is enabled.
+
+    Should be the innermost decorator, so that other view decorators carry the declared budget over.
+    For class-based views, instead set a "query_budget = QueryBudget(...)" class attribute.
+
+    :param max_queries: Maximum number of queries.
+    :param max_duplicates: Maximum number of times any single query may be repeated.
+    :param max_db_time: Maximum total database time, in seconds.
+    """
+    def decorator(view_func):
+        view_func.query_budget = QueryBudget(
+            max_queries=max_queries,
+            max_duplicates=max_duplicates,
+            max_db_time=max_db_time,
+        )
+        return view_func
+    return decorator
+
+
+def get_view_query_budget(view_func):
+    """
+    Gets declared query budget for view, if any.
+    :param view_func: View function, as resolved by Django.
+    :return: QueryBudget instance | None if view did not declare one.
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None and hasattr(view_func, 'view_class'):
+        # Class-based view.
+        budget = getattr(view_func.view_class, 'query_budget', None)
+    return budget
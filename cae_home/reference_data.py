@@ -0,0 +1,252 @@
+"""
+Reference data logic for CAE Home app.
+
+Holds small, rarely changing "reference" tables (Departments, Majors, RoomTypes, Rooms, and SiteThemes) in memory,
+indexed by their unique lookup fields. Hot paths, such as LDAP sync loops and signal handlers, can then resolve these
+models without a database query.
+
+Each table is loaded in full on first lookup, then held until invalidated. Tables are invalidated on model change
+(See "cae_home/signals.py" for the associated signal handlers). Invalidations are also broadcast to other worker
+processes, through a version value in the shared cache.
+
+Lookups made within a database transaction always go directly to the database instead, so that uncommitted (and
+possibly rolled back) values are never held.
+
+Returned model instances are shared, and should be treated as read-only.
+"""
+
+# System Imports.
+import threading, time, uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# User Imports.
+from cae_home import models
+
+
+# Cache key values.
+CACHE_KEY_PREFIX = 'cae_home.reference_data'
+
+
+class ReferenceTable:
+    """
+    In-memory copy of a single reference table, indexed by lookup fields.
+    """
+    def __init__(self, model, lookup_fields, select_related=(), prefetch_related=(), dependencies=()):
+        self.model = model
+        self.lookup_fields = lookup_fields
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+        self.dependencies = dependencies
+        self.version_key = '{0}.version.{1}'.format(CACHE_KEY_PREFIX, model._meta.label_lower)
+
+        # Loaded values, as a tuple of (list of model instances, dictionary of lookup field indexes).
+        self.data = None
+        self.version = None
+        self.last_version_check = 0
+
+        # Incremented on every invalidation. Prevents a load that raced an invalidation from holding stale values.
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get_queryset(self):
+        return self.model.objects.select_related(*self.select_related).prefetch_related(*self.prefetch_related)
+
+    def get_instances(self):
+        """
+        Returns all loaded model instances, loading them first if needed.
+        """
+        self.check_version()
+        data = self.data
+        if data is None:
+            data = self.load()
+        return data[0]
+
+    def get(self, field, value):
+        """
+        Returns model instance with given lookup field value.
+        :param field: Name of lookup field.
+        :param value: Value of lookup field.
+        :return: Model instance.
+        """
+        self.check_version()
+        data = self.data
+        if data is None:
+            data = self.load()
+
+        try:
+            return data[1][field][value]
+        except KeyError:
+            raise self.model.DoesNotExist('{0} matching {1}={2!r} does not exist.'.format(
+                self.model._meta.object_name,
+                field,
+                value,
+            ))
+
+    def load(self):
+        """
+        Loads all model instances from database.
+        :return: Tuple of (list of model instances, dictionary of lookup field indexes).
+        """
+        generation = self.generation
+        version = _get_shared_version(self.version_key)
+        instances = list(self.get_queryset())
+        indexes = {
+            field: {getattr(instance, field): instance for instance in instances}
+            for field in self.lookup_fields
+        }
+
+        # Only hold values if nothing was invalidated while loading.
+        with self.lock:
+            if generation == self.generation:
+                self.data = (instances, indexes)
+                self.version = version
+                self.last_version_check = time.monotonic()
+
+        return instances, indexes
+
+    def check_version(self):
+        """
+        Periodically checks shared cache, to see if table was invalidated by another worker process.
+        """
+        if self.data is None:
+            return
+
+        now = time.monotonic()
+        if now - self.last_version_check < settings.REFERENCE_DATA_VERSION_CHECK_INTERVAL:
+            return
+        self.last_version_check = now
+
+        if _get_shared_version(self.version_key) != self.version:
+            self.clear()
+
+    def clear(self):
+        """
+        Clears loaded values for this process only.
+        """
+        with self.lock:
+            self.generation += 1
+            self.data = None
+            self.version = None
+
+
+# Registered reference tables, keyed by model class.
+_tables = {}
+
+
+def register(model, lookup_fields, select_related=(), prefetch_related=(), dependencies=()):
+    """
+    Registers model as reference data.
+    :param model: Model class to register.
+    :param lookup_fields: Names of unique fields that model can be looked up by.
+    :param select_related: Relations to load along with model.
+    :param prefetch_related: Many-to-many relations to load along with model.
+    :param dependencies: Other model classes that loaded relations come from.
+        Table is also invalidated when these change.
+    """
+    _tables[model] = ReferenceTable(
+        model,
+        lookup_fields,
+        select_related=select_related,
+        prefetch_related=prefetch_related,
+        dependencies=dependencies,
+    )
+
+
+def get(model, **lookup):
+    """
+    Returns reference model instance matching lookup, same as "model.objects.get(**lookup)" would.
+    :param model: Registered model class.
+    :param lookup: Single lookup field and value. Such as "slug='unk'".
+    :return: Model instance.
+    """
+    if len(lookup) != 1:
+        raise ValueError('Reference data lookups take exactly one field. Got {0}.'.format(list(lookup)))
+    field, value = next(iter(lookup.items()))
+
+    table = _tables[model]
+    if field not in table.lookup_fields:
+        raise ValueError('"{0}" is not a lookup field for {1}.'.format(field, model._meta.object_name))
+
+    # Within a transaction, values may not be committed yet. Go directly to database.
+    if transaction.get_connection().in_atomic_block:
+        return table.get_queryset().get(**lookup)
+
+    return table.get(field, value)
+
+
+def get_all(model):
+    """
+    Returns all reference model instances, same as "model.objects.all()" would.
+    :param model: Registered model class.
+    :return: List of model instances.
+    """
+    table = _tables[model]
+
+    # Within a transaction, values may not be committed yet. Go directly to database.
+    if transaction.get_connection().in_atomic_block:
+        return list(table.get_queryset())
+
+    return table.get_instances()
+
+
+def invalidate(model):
+    """
+    Invalidates reference table for given model (and tables that depend on it), in all worker processes.
+    :param model: Model class to invalidate.
+    """
+    tables = [
+        table for table in _tables.values()
+        if table.model is model or model in table.dependencies
+    ]
+    _invalidate_tables(tables)
+
+    # Within a transaction, other processes may reload old values before commit. Invalidate again once committed.
+    if tables and transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _invalidate_tables(tables))
+
+
+def _invalidate_tables(tables):
+    for table in tables:
+        table.clear()
+        cache.set(table.version_key, uuid.uuid4().hex, None)
+
+
+def _get_shared_version(key):
+    """
+    Gets shared version value for key. If missing (never set or evicted), then a new version is generated.
+    """
+    version = cache.get(key)
+    if version is None:
+        new_version = uuid.uuid4().hex
+        cache.add(key, new_version, None)
+
+        # Use value of whichever process set version first.
+        # If key was evicted again in the meantime, the local version is still guaranteed to be unused.
+        version = cache.get(key)
+        if version is None:
+            version = new_version
+    return version
+
+
+# region Reference Tables
+
+register(models.Department, ('code', 'slug'))
+register(
+    models.Major,
+    ('slug', 'student_code', 'program_code'),
+    select_related=('department',),
+    dependencies=(models.Department,),
+)
+register(models.RoomType, ('slug', 'name'))
+register(
+    models.Room,
+    ('slug', 'name'),
+    select_related=('room_type',),
+    prefetch_related=('department',),
+    dependencies=(models.RoomType, models.Department),
+)
+register(models.SiteTheme, ('slug',))
+
+# endregion Reference Tables
@@ -3,17 +3,18 @@ Signals for CAE Home app.
 """
 
 # System Imports.
+from django.contrib.auth.models import Group, Permission
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.core.management import call_command
-from django.db import models, transaction
-from django.db.models.signals import post_save
+from django.core.signals import setting_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
-from os import devnull
 
 # User Imports.
-from . import models
-from .models.user import compare_user_and_wmuuser_models, check_user_group_membership
+from . import models, reference_data, site_context, user_sync
+from .permission_cache import invalidate_all_permissions, invalidate_user_permissions
+from .user_context import invalidate_all_user_contexts, invalidate_user_context
+from .user_factory import get_default_site_theme
 
 
 @receiver(post_save, sender=models.User)
@@ -21,46 +22,29 @@ def user_model_post_save(sender, instance, created, **kwargs):
     """
     Post-save handling for User model.
     """
-    # Handling for associated User model.
-    if created:
-        # Handle for new (login) User being created. Attempt to find existing Intermediary with bronco_net.
-        # On failure, create new UserIntermediary instance.
-        try:
-            user_intermediary = models.UserIntermediary.objects.get(bronco_net=instance.username)
-
-            # Check that User has not been provided to UserIntermediary.
-            if user_intermediary.user is not None:
-                raise ValidationError('User Intermediary model already has associated User model.')
-            else:
-                user_intermediary.user = instance
-                user_intermediary.save()
-        except ObjectDoesNotExist:
-            models.UserIntermediary.objects.create(user=instance)
-    else:
-        # Just updating an existing UserIntermediary. Save.
-        instance.userintermediary.save()
-
-    # Check that values are consistent between user models.
-    # First disconnect related post_save signals to prevent recursion errors.
-    post_save.disconnect(user_model_post_save, sender=models.User)
-    post_save.disconnect(userintermediary_model_post_save, sender=models.UserIntermediary)
-    post_save.disconnect(wmuuser_model_post_save, sender=models.WmuUser)
+    # Ignore saves made by user sync logic itself, or saves that didn't change any synced values.
+    if user_sync.is_syncing() or not user_sync.has_sync_changes(instance, created, kwargs['update_fields']):
+        return
 
-    # Run comparison method to sync all corresponding user models.
-    compare_user_and_wmuuser_models(instance.username)
+    with user_sync.deferred():
+        # Handling for associated User model.
+        if created:
+            # Handle for new (login) User being created. Attempt to find existing Intermediary with bronco_net.
+            # On failure, create new UserIntermediary instance.
+            try:
+                user_intermediary = models.UserIntermediary.objects.get(bronco_net=instance.username)
 
-    # Run logic to update group membership dates.
-    # Note that we have to wait for the full transaction to complete, as per:
-    # https://stackoverflow.com/questions/1925383/issue-with-manytomany-relationships-not-updating-immediately-after-save
-    # https://stackoverflow.com/questions/950214/run-code-after-transaction-commit-in-django
-    transaction.on_commit(
-        lambda: check_user_group_membership(instance.username)
-    )
+                # Check that User has not been provided to UserIntermediary.
+                if user_intermediary.user is not None:
+                    raise ValidationError('User Intermediary model already has associated User model.')
+                else:
+                    user_intermediary.user = instance
+                    user_intermediary.save()
+            except ObjectDoesNotExist:
+                models.UserIntermediary.objects.create(user=instance)
 
-    # Reconnect related post_save signals.
-    post_save.connect(user_model_post_save, sender=models.User)
-    post_save.connect(userintermediary_model_post_save, sender=models.UserIntermediary)
-    post_save.connect(wmuuser_model_post_save, sender=models.WmuUser)
+        # Mark user models to be synced, along with group membership dates.
+        user_sync.mark_dirty(instance.username, check_group_membership=True)
 
 
 @receiver(post_save, sender=models.UserIntermediary)
@@ -68,56 +52,28 @@ def userintermediary_model_post_save(sender, instance, created, **kwargs):
     """
     Post-save handling for UserIntermediary model.
     """
-    # Handling for associated Profile model.
-    if created:
-        # Handle for new UserIntermediary being created. Create new profile as well.
-        try:
-            # Attempt to get default theme.
-            site_theme = models.SiteTheme.objects.get(slug='wmu')
-        except ObjectDoesNotExist:
-            # Failed to get theme. Likely a unit test. Run site_theme fixtures and attempt again.
-            with open(devnull, 'a') as null:
-                call_command('loaddata', 'production_models/site_themes', stdout=null)
-            site_theme = models.SiteTheme.objects.get(slug='wmu')
-
-        # Create new profile object for new user.
-        profile = models.Profile.objects.create(site_theme=site_theme)
+    # Ignore saves made by user sync logic itself, or saves that didn't change any synced values.
+    if user_sync.is_syncing() or not user_sync.has_sync_changes(instance, created, kwargs['update_fields']):
+        return
 
-        # Associate profile with UserIntermediary.
-        instance.profile = profile
+    with user_sync.deferred():
+        # Handling for associated Profile model.
+        if created:
+            # Handle for new UserIntermediary being created. Create new profile as well.
+            # Create new profile object for new user.
+            profile = models.Profile.objects.create(site_theme=get_default_site_theme())
 
-        # Set "last ldap check" value such that user will be ran on next script execution.
-        instance.last_ldap_check = timezone.now() - timezone.timedelta(days=365)
+            # Associate profile with UserIntermediary.
+            instance.profile = profile
 
-        # Save all changes to UserIntermediary model.
-        instance.save()
+            # Set "last ldap check" value such that user will be ran on next script execution.
+            instance.last_ldap_check = timezone.now() - timezone.timedelta(days=365)
 
-    else:
-        # Just updating an existing profile. Save.
-        instance.profile.save()
-
-    # Check that values are consistent between user models.
-    # First disconnect related post_save signals to prevent recursion errors.
-    post_save.disconnect(user_model_post_save, sender=models.User)
-    post_save.disconnect(userintermediary_model_post_save, sender=models.UserIntermediary)
-    post_save.disconnect(wmuuser_model_post_save, sender=models.WmuUser)
-
-    # Run comparison method to sync all corresponding user models.
-    compare_user_and_wmuuser_models(instance.bronco_net)
-
-    # Run logic to update group membership dates.
-    # Note that we have to wait for the full transaction to complete, as per:
-    # https://stackoverflow.com/questions/1925383/issue-with-manytomany-relationships-not-updating-immediately-after-save
-    # https://stackoverflow.com/questions/950214/run-code-after-transaction-commit-in-django
-    if instance.user:
-        transaction.on_commit(
-            lambda: check_user_group_membership(instance.bronco_net)
-        )
+            # Save all changes to UserIntermediary model.
+            instance.save()
 
-    # Reconnect related post_save signals.
-    post_save.connect(user_model_post_save, sender=models.User)
-    post_save.connect(userintermediary_model_post_save, sender=models.UserIntermediary)
-    post_save.connect(wmuuser_model_post_save, sender=models.WmuUser)
+        # Mark user models to be synced. Group membership dates only apply if there's an associated (login) User.
+        user_sync.mark_dirty(instance.bronco_net, check_group_membership=instance.user_id is not None)
 
 
 @receiver(post_save, sender=models.WmuUser)
@@ -125,44 +81,245 @@ def wmuuser_model_post_save(sender, instance, created, **kwargs):
     """
     Post-save handling for Wmu User model.
     """
-    # Handling for associated User Intermediary model.
-    if created:
-        # Handle for new WmuUser being created. Attempt to find existing Intermediary with bronco_net.
-        # On failure, create new UserIntermediary instance.
-        try:
-            user_intermediary = models.UserIntermediary.objects.get(bronco_net=instance.bronco_net)
-
-            # Check that WmuUser has not been provided to UserIntermediary.
-            if user_intermediary.wmu_user is not None:
-                raise ValidationError('User Intermediary model already has associated WmuUser model.')
-            else:
-                user_intermediary.wmu_user = instance
-                user_intermediary.save()
-        except ObjectDoesNotExist:
-            models.UserIntermediary.objects.create(wmu_user=instance)
-    else:
-        # Just updating an existing UserIntermediary. Save.
-        instance.userintermediary.save()
-
-    # Check that values are consistent between user models.
-    # First disconnect related post_save signals to prevent recursion errors.
-    post_save.disconnect(user_model_post_save, sender=models.User)
-    post_save.disconnect(userintermediary_model_post_save, sender=models.UserIntermediary)
-    post_save.disconnect(wmuuser_model_post_save, sender=models.WmuUser)
-
-    # Run comparison method to sync all corresponding user models.
-    compare_user_and_wmuuser_models(instance.bronco_net)
-
-    # Run logic to update group membership dates.
-    # Note that we have to wait for the full transaction to complete, as per:
-    # https://stackoverflow.com/questions/1925383/issue-with-manytomany-relationships-not-updating-immediately-after-save
-    # https://stackoverflow.com/questions/950214/run-code-after-transaction-commit-in-django
-    if instance.userintermediary and instance.userintermediary.user:
-        transaction.on_commit(
-            lambda: check_user_group_membership(instance.userintermediary.user.username)
+    # Ignore saves made by user sync logic itself, or saves that didn't change any synced values.
+    if user_sync.is_syncing() or not user_sync.has_sync_changes(instance, created, kwargs['update_fields']):
+        return
+
+    with user_sync.deferred():
+        # Handling for associated User Intermediary model.
+        if created:
+            # Handle for new WmuUser being created. Attempt to find existing Intermediary with bronco_net.
+            # On failure, create new UserIntermediary instance.
+            try:
+                user_intermediary = models.UserIntermediary.objects.get(bronco_net=instance.bronco_net)
+
+                # Check that WmuUser has not been provided to UserIntermediary.
+                if user_intermediary.wmu_user is not None:
+                    raise ValidationError('User Intermediary model already has associated WmuUser model.')
+                else:
+                    user_intermediary.wmu_user = instance
+                    user_intermediary.save()
+            except ObjectDoesNotExist:
+                models.UserIntermediary.objects.create(wmu_user=instance)
+
+        # Mark user models to be synced. Group membership dates only apply if there's an associated (login) User.
+        user_sync.mark_dirty(
+            instance.bronco_net,
+            check_group_membership=models.UserIntermediary.objects.filter(
+                wmu_user=instance,
+                user__isnull=False,
+            ).exists(),
         )
 
-    # Reconnect related post_save signals.
-    post_save.connect(user_model_post_save, sender=models.User)
-    post_save.connect(userintermediary_model_post_save, sender=models.UserIntermediary)
-    post_save.connect(wmuuser_model_post_save, sender=models.WmuUser)
+
+@receiver(m2m_changed, sender=models.User.groups.through)
+def user_groups_sync(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Marks user models to be synced on User group membership change, as (login) User is_active is based on groups.
+    """
+    # Ignore group changes made by user sync logic itself.
+    if user_sync.is_syncing():
+        return
+
+    if action == 'pre_clear' and reverse:
+        # Group is about to be cleared. Affected users are only known at this point, so hold onto them.
+        instance._user_sync_cleared_usernames = list(instance.user_set.values_list('username', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        # Called from User side. Instance is the User.
+        usernames = [instance.username]
+    elif pk_set:
+        # Called from Group side. Pk set is the affected Users.
+        usernames = models.User.objects.filter(pk__in=pk_set).values_list('username', flat=True)
+    else:
+        # Group was cleared. Use users found before clear.
+        usernames = getattr(instance, '_user_sync_cleared_usernames', [])
+        instance._user_sync_cleared_usernames = []
+
+    with user_sync.deferred():
+        for username in usernames:
+            user_sync.mark_dirty(username, check_group_membership=True)
+
+
+# region User Context Cache Invalidation
+
+@receiver(post_save, sender=models.UserIntermediary)
+@receiver(post_delete, sender=models.UserIntermediary)
+def userintermediary_user_context_invalidation(sender, instance, **kwargs):
+    """
+    Invalidates cached user context on UserIntermediary change.
+    """
+    if instance.user_id is not None:
+        invalidate_user_context(instance.user_id)
+
+
+@receiver(post_save, sender=models.Profile)
+@receiver(post_delete, sender=models.Profile)
+def profile_user_context_invalidation(sender, instance, **kwargs):
+    """
+    Invalidates cached user context on Profile change.
+    """
+    user_ids = models.UserIntermediary.objects.filter(
+        profile=instance,
+        user__isnull=False,
+    ).values_list('user_id', flat=True)
+    for user_id in user_ids:
+        invalidate_user_context(user_id)
+
+
+@receiver(post_save, sender=models.SiteTheme)
+@receiver(post_delete, sender=models.SiteTheme)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def global_user_context_invalidation(sender, instance, **kwargs):
+    """
+    Invalidates all cached user contexts on SiteTheme or Group change.
+    These are shared between many users, so it's simpler to invalidate everything.
+    """
+    invalidate_all_user_contexts()
+
+
+@receiver(m2m_changed, sender=models.User.groups.through)
+def user_groups_user_context_invalidation(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidates cached user context on User group membership change.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        # Called from User side. Instance is the User.
+        invalidate_user_context(instance.pk)
+    elif pk_set:
+        # Called from Group side. Pk set is the affected Users.
+        for user_id in pk_set:
+            invalidate_user_context(user_id)
+    else:
+        # Group was cleared. Affected users are unknown at this point.
+        invalidate_all_user_contexts()
+
+# endregion User Context Cache Invalidation
+
+
+# region Permission Cache Invalidation
+
+@receiver(post_save, sender=models.User)
+@receiver(post_delete, sender=models.User)
+def user_permission_cache_invalidation(sender, instance, created=False, **kwargs):
+    """
+    Invalidates cached permissions on User creation or deletion.
+    Prevents stale values if a user pk is ever reused (such as between UnitTests).
+    """
+    if created or kwargs['signal'] is post_delete:
+        invalidate_user_permissions(instance.pk)
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def global_permission_cache_invalidation(sender, instance, **kwargs):
+    """
+    Invalidates all cached permissions on Permission or Group change.
+    These are shared between many users, so it's simpler to invalidate everything.
+    """
+    invalidate_all_permissions()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_permission_cache_invalidation(sender, action, **kwargs):
+    """
+    Invalidates all cached permissions on Group permission change.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_all_permissions()
+
+
+@receiver(m2m_changed, sender=models.User.groups.through)
+@receiver(m2m_changed, sender=models.User.user_permissions.through)
+def user_permission_cache_m2m_invalidation(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidates cached permissions on User group membership or individual permission change.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        # Called from User side. Instance is the User.
+        invalidate_user_permissions(instance.pk)
+    elif pk_set:
+        # Called from Group/Permission side. Pk set is the affected Users.
+        for user_id in pk_set:
+            invalidate_user_permissions(user_id)
+    else:
+        # Group/Permission was cleared. Affected users are unknown at this point.
+        invalidate_all_permissions()
+
+# endregion Permission Cache Invalidation
+
+
+# region Site Context Invalidation
+
+@receiver(post_save, sender=models.WmuUser)
+@receiver(post_delete, sender=models.WmuUser)
+def wmuuser_site_context_invalidation(sender, instance, **kwargs):
+    """
+    Invalidates site context CAE Programmer email on CAE Programmer WmuUser change.
+    """
+    if instance.bronco_net == 'ceas_prog':
+        site_context.invalidate('cae_prog_email')
+
+
+@receiver(post_save, sender=models.SiteTheme)
+@receiver(post_delete, sender=models.SiteTheme)
+def sitetheme_site_context_invalidation(sender, instance, **kwargs):
+    """
+    Invalidates site context default theme on default SiteTheme change.
+    """
+    if instance.slug == 'wmu':
+        site_context.invalidate('default_site_theme')
+
+
+@receiver(setting_changed)
+def settings_site_context_invalidation(sender, setting, **kwargs):
+    """
+    Invalidates settings-based site context values on settings change (such as UnitTest settings overrides).
+    """
+    if setting in ('INSTALLED_APPS', 'INSTALLED_APP_DETAILS'):
+        site_context.invalidate('imported_projects', 'caeweb_installed')
+
+# endregion Site Context Invalidation
+
+
+# region Reference Data Invalidation
+
+@receiver(post_save, sender=models.Department)
+@receiver(post_delete, sender=models.Department)
+@receiver(post_save, sender=models.Major)
+@receiver(post_delete, sender=models.Major)
+@receiver(post_save, sender=models.RoomType)
+@receiver(post_delete, sender=models.RoomType)
+@receiver(post_save, sender=models.Room)
+@receiver(post_delete, sender=models.Room)
+@receiver(post_save, sender=models.SiteTheme)
+@receiver(post_delete, sender=models.SiteTheme)
+def reference_data_invalidation(sender, **kwargs):
+    """
+    Invalidates reference data on Department, Major, RoomType, Room, or SiteTheme change.
+    """
+    reference_data.invalidate(sender)
+
+
+@receiver(m2m_changed, sender=models.Room.department.through)
+def room_department_reference_data_invalidation(sender, action, **kwargs):
+    """
+    Invalidates Room reference data on Room Department change.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        reference_data.invalidate(models.Room)
+
+# endregion Reference Data Invalidation
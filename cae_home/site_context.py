@@ -0,0 +1,196 @@
+"""
+Site-wide "site context" logic for CAE Home app.
+
+Holds values that are the same for every page and every user, such as the CAE Programmer email and default site theme.
+Values are computed at most once per worker process, then held until invalidated.
+(See "cae_home/signals.py" for the associated signal handlers.) Invalidations are also broadcast to other worker
+processes, through a version value in the shared cache.
+
+Middleware provides these to templates as lazy objects, so pages that never display a value never compute it.
+"""
+
+# System Imports.
+import threading, time, uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+# User Imports.
+from cae_home import models
+
+
+# Cache key values.
+CACHE_KEY_PREFIX = 'cae_home.site_context'
+
+# Registered loader functions, keyed by value name.
+_loaders = {}
+
+# Names of values that only depend on settings. These are the same in every worker process, so they skip the shared
+# version check, and are only ever invalidated locally (such as by UnitTest settings overrides).
+_local_names = set()
+
+# Currently computed values, keyed by value name.
+# Each is a tuple of (value, shared version value was computed at, time of last shared version check).
+_values = {}
+
+# Incremented on every invalidation. Prevents a load that raced an invalidation from caching a stale value.
+_generation = 0
+_lock = threading.Lock()
+
+
+def register(name, is_shared=True):
+    """
+    Decorator to register a loader function for the given site context value name.
+    :param name: Name of site context value.
+    :param is_shared: Bool indicating if value can change in another worker process. False for settings-based values.
+    """
+    def wrapper(loader):
+        _loaders[name] = loader
+        if not is_shared:
+            _local_names.add(name)
+        return loader
+    return wrapper
+
+
+def get_value(name):
+    """
+    Returns site context value for given name. Computed on first access, then held until invalidated.
+    :param name: Name of site context value.
+    :return: Site context value.
+    """
+    entry = _values.get(name, None)
+    if entry is not None:
+        value, version, last_version_check = entry
+        if name in _local_names:
+            return value
+
+        # Periodically check shared cache, to see if value was invalidated by another worker process.
+        now = time.monotonic()
+        if now - last_version_check < settings.SITE_CONTEXT_VERSION_CHECK_INTERVAL:
+            return value
+
+        if _get_shared_version(_get_version_key(name)) == version:
+            with _lock:
+                if _values.get(name, None) is entry:
+                    _values[name] = (value, version, now)
+            return value
+
+        _clear((name,))
+
+    # Not yet computed (or invalidated). Load value.
+    generation = _generation
+    version = None if name in _local_names else _get_shared_version(_get_version_key(name))
+    value = _loaders[name]()
+
+    # Only hold value if nothing was invalidated while loading.
+    with _lock:
+        if generation == _generation:
+            _values[name] = (value, version, time.monotonic())
+
+    return value
+
+
+def get_lazy_value(name):
+    """
+    Returns site context value for given name, wrapped in a lazy object.
+    Value is only computed once the object is actually used (such as a template rendering it).
+    :param name: Name of site context value.
+    :return: Lazy site context value.
+    """
+    return SimpleLazyObject(lambda: get_value(name))
+
+
+def invalidate(*names):
+    """
+    Invalidates site context values in all worker processes, so that they're recomputed on next access.
+    :param names: Names of site context values to invalidate. If none are provided, then all values are invalidated.
+    """
+    names = names or tuple(_loaders.keys())
+    _clear([name for name in names if name in _local_names])
+
+    shared_names = [name for name in names if name not in _local_names]
+    if shared_names:
+        _invalidate_values(shared_names)
+
+        # Within a transaction, other processes may reload old values before commit. Invalidate again once committed.
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: _invalidate_values(shared_names))
+
+
+def _invalidate_values(names):
+    _clear(names)
+    cache.set_many({_get_version_key(name): uuid.uuid4().hex for name in names}, None)
+
+
+def _clear(names):
+    """
+    Clears computed values for this process only.
+    """
+    global _generation
+
+    with _lock:
+        _generation += 1
+        for name in names:
+            _values.pop(name, None)
+
+
+def _get_version_key(name):
+    return '{0}.version.{1}'.format(CACHE_KEY_PREFIX, name)
+
+
+def _get_shared_version(key):
+    """
+    Gets shared version value for key. If missing (never set or evicted), then a new version is generated.
+    """
+    version = cache.get(key)
+    if version is None:
+        new_version = uuid.uuid4().hex
+        cache.add(key, new_version, None)
+
+        # Use value of whichever process set version first.
+        # If key was evicted again in the meantime, the local version is still guaranteed to be unused.
+        version = cache.get(key)
+        if version is None:
+            version = new_version
+    return version
+
+
+# region Site Context Values
+
+@register('cae_prog_email')
+def _load_cae_prog_email():
+    """
+    CAE Programmer email (For footer).
+    """
+    try:
+        return models.WmuUser.objects.get(bronco_net='ceas_prog').official_email
+    except ObjectDoesNotExist:
+        return ''
+
+
+@register('default_site_theme')
+def _load_default_site_theme():
+    """
+    Default site theme, for users that are not logged in.
+    """
+    return models.SiteTheme.objects.get(slug='wmu')
+
+
+@register('imported_projects', is_shared=False)
+def _load_imported_projects():
+    """
+    Installed project/app details.
+    """
+    return settings.INSTALLED_APP_DETAILS
+
+
+@register('caeweb_installed', is_shared=False)
+def _load_caeweb_installed():
+    """
+    If CAE Web is installed. Needed for setting the "default" header nav.
+    """
+    return 'apps.CAE_Web.cae_web_core.apps.CaeWebCoreConfig' in settings.INSTALLED_APPS
+
+# endregion Site Context Values
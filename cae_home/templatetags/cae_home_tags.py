@@ -8,6 +8,9 @@ from django.conf import settings
 from django.utils import timezone
 from django.utils.html import mark_safe
 
+# User Imports.
+from cae_home.user_context import get_group_names
+
 
 register = template.Library()
 
@@ -44,10 +47,11 @@ def render_model_docstring(obj):
 def has_group(user, group_name):
     """
     Template tag to determine if user belongs to provided group.
+    Uses user's cached group names, so repeated checks (such as in nav templates) don't query the database.
     :param user: Current user.
     :param group_name: Group to check membership of.
     """
-    return user.groups.filter(name=group_name).exists()
+    return group_name in get_group_names(user)
 
 
 @register.simple_tag
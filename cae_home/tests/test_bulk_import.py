@@ -0,0 +1,120 @@
+"""
+Tests for CAE Home app bulk import logic.
+
+Files located at:
+* cae_home/bulk_import.py
+"""
+
+# System Imports.
+from django.core.exceptions import NON_FIELD_ERRORS
+
+# User Imports.
+from cae_home import models
+from cae_home.bulk_import import bulk_import
+from cae_home.tests.utils import IntegrationTestCase
+
+
+class BulkImportTests(IntegrationTestCase):
+    """
+    Tests to ensure bulk import logic functions as expected.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        self.department = models.Department.objects.create(code='TD', name='Test Department', slug='test-department')
+
+    def test_create(self):
+        """
+        Tests creating many models at once.
+        """
+        majors = [
+            models.Major(
+                department=self.department,
+                student_code='TM{0}'.format(index),
+                program_code='TP{0}'.format(index),
+                name='Test Major {0}'.format(index),
+                slug='test-major-{0}'.format(index),
+            )
+            for index in range(50)
+        ]
+
+        # One query per unique check, one per foreign key, plus the insert and savepoint queries.
+        with self.assertNumQueries(7):
+            result = bulk_import(models.Major, majors)
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual(len(result.created), 50)
+        self.assertEqual(models.Major.objects.filter(department=self.department).count(), 50)
+
+    def test_field_formatting(self):
+        """
+        Tests that values are formatted same as on model save.
+        """
+        result = bulk_import(models.Department, [
+            models.Department(code=' ab c ', name='Formatted Department', slug='formatted-department'),
+        ])
+
+        self.assertTrue(result.is_valid)
+        self.assertTrue(models.Department.objects.filter(code='ABC').exists())
+
+    def test_validation_errors(self):
+        """
+        Tests that invalid rows are skipped and reported, while valid rows are still saved.
+        """
+        result = bulk_import(models.Department, [
+            models.Department(code='V1', name='Valid Department', slug='valid-department'),
+            models.Department(code='TD', name='Existing Code', slug='existing-code'),
+            models.Department(code='V2', name='Duplicate Slug', slug='valid-department'),
+            models.Department(code='V3', name='', slug='missing-name'),
+        ])
+
+        self.assertEqual(len(result.created), 1)
+        self.assertEqual(sorted(result.errors), [1, 2, 3])
+        self.assertIn('code', result.errors[1].message_dict)
+        self.assertIn('slug', result.errors[2].message_dict)
+        self.assertIn('name', result.errors[3].message_dict)
+        self.assertEqual(len(result.get_error_messages()), 3)
+        self.assertTrue(models.Department.objects.filter(code='V1').exists())
+        self.assertFalse(models.Department.objects.filter(code__in=['V2', 'V3']).exists())
+
+        with self.subTest('Invalid foreign key'):
+            result = bulk_import(models.Major, [
+                models.Major(
+                    department_id=-1,
+                    student_code='TM',
+                    program_code='TP',
+                    name='Test Major',
+                    slug='test-major',
+                ),
+            ])
+            self.assertIn('department', result.errors[0].message_dict)
+
+        with self.subTest('Unique together'):
+            semester = models.Semester.create_dummy_model()
+            result = bulk_import(models.Semester, [
+                models.Semester(start_date=semester.start_date, end_date=semester.start_date.replace(month=5)),
+            ])
+            self.assertIn('start_date', result.errors[0].message_dict)
+            self.assertIn(NON_FIELD_ERRORS, result.errors[0].message_dict)
+
+    def test_update(self):
+        """
+        Tests updating existing models, matched by unique field.
+        """
+        result = bulk_import(
+            models.Department,
+            [
+                models.Department(code='TD', name='Updated Department', slug='test-department'),
+                models.Department(code='ND', name='New Department', slug='new-department'),
+            ],
+            match_field='code',
+            update_fields=['name'],
+        )
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual(len(result.created), 1)
+        self.assertEqual(len(result.updated), 1)
+        self.department.refresh_from_db()
+        self.assertEqual(self.department.name, 'Updated Department')
+        self.assertTrue(models.Department.objects.filter(code='ND').exists())
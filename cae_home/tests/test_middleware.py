@@ -0,0 +1,482 @@
+"""
+Tests for CAE Home app middleware.
+
+Files located at:
+* cae_home/decorators.py
+* cae_home/middleware.py
+* cae_home/user_context.py
+"""
+
+# System Imports.
+import asyncio
+from asgiref.sync import sync_to_async
+from importlib import import_module
+from unittest.mock import patch
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.models import AnonymousUser, Group
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, override_settings
+from django.utils.functional import SimpleLazyObject
+from django.views import View
+
+# User Imports.
+from cae_home import models, site_context, user_context
+from cae_home.decorators import GroupRequiredMixin, group_required
+from cae_home.middleware import (
+    GetProjectDetailMiddleware,
+    GetUserProfileMiddleware,
+    GetUserSiteOptionsMiddleware,
+    HandleExceptionsMiddleware,
+    SetTimezoneMiddleware,
+)
+from cae_home.templatetags.cae_home_tags import has_group
+from cae_home.tests.utils import IntegrationTestCase
+
+
+class GetUserProfileMiddlewareTests(IntegrationTestCase):
+    """
+    Tests to ensure GetUserProfileMiddleware functions as expected.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = GetUserProfileMiddleware(lambda request: HttpResponse())
+        self.test_user = self.create_user('test_middleware_user')
+
+        # Create session, so that cache keys are consistent between requests.
+        self.session = SessionStore()
+        self.session.create()
+
+    def get_request(self):
+        """
+        Creates a new request, as if it were made by test user.
+        """
+        request = self.factory.get('/')
+        request.session = self.session
+        request.user = models.User.objects.get(pk=self.test_user.pk)
+        return request
+
+    def test_profile_values(self):
+        """
+        Tests that expected profile values are set on request user.
+        """
+        request = self.get_request()
+        self.middleware(request)
+
+        self.assertEqual(request.user.profile, self.test_user.userintermediary.profile)
+        self.assertEqual(request.user.profile.site_theme.slug, 'wmu')
+        self.assertFalse(request.user.is_cae_user)
+
+    def test_query_count(self):
+        """
+        Tests that user context is cached between requests.
+        """
+        with self.subTest('Cold cache'):
+            request = self.get_request()
+            with self.assertNumQueries(2):
+                self.middleware(request)
+
+                # Related values should already be loaded.
+                self.assertEqual(request.user.profile.site_theme.slug, 'wmu')
+
+        with self.subTest('Warm cache'):
+            request = self.get_request()
+            with self.assertNumQueries(0):
+                self.middleware(request)
+
+                # Related values should already be loaded.
+                self.assertEqual(request.user.profile.site_theme.slug, 'wmu')
+
+    def test_invalidation(self):
+        """
+        Tests that cached user context is invalidated on relevant model changes.
+        """
+        request = self.get_request()
+        self.middleware(request)
+        self.assertFalse(request.user.is_cae_user)
+
+        with self.subTest('Group added from User side'):
+            self.test_user.groups.add(Group.objects.get(name='CAE Admin GA'))
+
+            request = self.get_request()
+            self.middleware(request)
+            self.assertTrue(request.user.is_cae_user)
+
+        with self.subTest('Group removed from Group side'):
+            Group.objects.get(name='CAE Admin GA').user_set.remove(self.test_user)
+
+            request = self.get_request()
+            self.middleware(request)
+            self.assertFalse(request.user.is_cae_user)
+
+        with self.subTest('Profile updated'):
+            profile = self.test_user.userintermediary.profile
+            profile.site_theme = models.SiteTheme.objects.get(slug='cae')
+            profile.save()
+
+            request = self.get_request()
+            self.middleware(request)
+            self.assertEqual(request.user.profile.site_theme.slug, 'cae')
+
+        with self.subTest('Group removed, with old context read before commit'):
+            group = Group.objects.get(name='CAE Admin GA')
+            self.test_user.groups.add(group)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.test_user.groups.remove(group)
+
+                # Simulate concurrent request, which still sees committed (old) groups but the new version.
+                request = self.get_request()
+                profile = self.test_user.userintermediary.profile
+                new_version = (
+                    cache.get(user_context.GLOBAL_VERSION_KEY),
+                    cache.get(user_context._get_user_version_key(self.test_user.pk)),
+                )
+                cache.set(
+                    user_context._get_context_key(request),
+                    user_context.UserContext(self.test_user.pk, profile, [group.name], new_version),
+                )
+
+            request = self.get_request()
+            self.middleware(request)
+            self.assertFalse(request.user.is_cae_user)
+
+        with self.subTest('Version evicted while being created'):
+            with patch.object(cache, 'get', return_value=None):
+                version = user_context._get_or_create_version(user_context.GLOBAL_VERSION_KEY, {})
+            self.assertIsNotNone(version)
+
+
+class GroupCheckTests(IntegrationTestCase):
+    """
+    Tests to ensure group checks share the user's cached group names.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = GetUserProfileMiddleware(lambda request: HttpResponse())
+        self.test_user = self.create_user('test_group_user', groups='CAE Admin')
+
+        # Create session, so that cache keys are consistent between requests.
+        self.session = SessionStore()
+        self.session.create()
+
+    def get_request(self):
+        """
+        Creates a new request, as if it were made by test user.
+        """
+        request = self.factory.get('/')
+        request.session = self.session
+        request.user = models.User.objects.get(pk=self.test_user.pk)
+        return request
+
+    def test_group_checks(self):
+        """
+        Tests that decorator and template tag checks don't query database once cache is warm.
+        """
+        admin_view = group_required('CAE Admin', ['CAE Programmer'])(lambda request: HttpResponse())
+        attendant_view = group_required('CAE Attendant')(lambda request: HttpResponse())
+
+        # Warm cache.
+        self.middleware(self.get_request())
+
+        request = self.get_request()
+        with self.assertNumQueries(0):
+            self.middleware(request)
+            self.assertTrue(has_group(request.user, 'CAE Admin'))
+            self.assertFalse(has_group(request.user, 'CAE Attendant'))
+
+        with self.subTest('Group required'):
+            self.assertEqual(admin_view(request).status_code, 200)
+
+            # Group names are only validated once.
+            with self.assertNumQueries(0):
+                self.assertEqual(admin_view(request).status_code, 200)
+
+            with self.assertRaises(PermissionDenied):
+                attendant_view(request)
+
+        with self.subTest('Invalid group name'):
+            with self.assertRaises(Group.DoesNotExist):
+                group_required('Invalid Group')(lambda request: HttpResponse())(request)
+
+        with self.subTest('Group required mixin'):
+            class GroupView(GroupRequiredMixin, View):
+                required_user_auth_groups = ['CAE Admin', 'CAE Programmer']
+
+                def get(self, request, *args, **kwargs):
+                    return HttpResponse()
+
+            self.assertEqual(GroupView.as_view()(request).status_code, 200)
+
+            # Groups provided through as_view() replace class groups.
+            with self.assertRaises(PermissionDenied):
+                GroupView.as_view(required_user_auth_groups=['CAE Attendant'])(request)
+
+            with self.assertNumQueries(0):
+                self.assertEqual(GroupView.as_view()(request).status_code, 200)
+
+        with self.subTest('Group changed'):
+            self.test_user.groups.add(Group.objects.get(name='CAE Attendant'))
+
+            request = self.get_request()
+            self.middleware(request)
+            self.assertEqual(attendant_view(request).status_code, 200)
+
+
+class SiteContextMiddlewareTests(IntegrationTestCase):
+    """
+    Tests to ensure GetProjectDetailMiddleware and GetUserSiteOptionsMiddleware site context values function as
+    expected.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        site_context.invalidate()
+        self.factory = RequestFactory()
+        self.project_middleware = GetProjectDetailMiddleware(lambda request: HttpResponse())
+        self.site_options_middleware = GetUserSiteOptionsMiddleware(lambda request: HttpResponse())
+
+    def get_response(self):
+        """
+        Runs site context middleware on a new anonymous request.
+        """
+        request = self.factory.get('/')
+        request.session = SessionStore()
+        request.user = AnonymousUser()
+        response = TemplateResponse(request, 'cae_home/index.html', {})
+        response = self.project_middleware.process_template_response(request, response)
+        response = self.site_options_middleware.process_template_response(request, response)
+        return response
+
+    def test_query_count(self):
+        """
+        Tests that site context values are lazy, and only computed once.
+        """
+        with self.subTest('Unused values'):
+            with self.assertNumQueries(0):
+                self.get_response()
+
+        with self.subTest('First use'):
+            response = self.get_response()
+            with self.assertNumQueries(2):
+                self.assertEqual(str(response.context_data['cae_prog_email']), '')
+                self.assertEqual(response.context_data['site_theme'].slug, 'wmu')
+
+        with self.subTest('Later use'):
+            response = self.get_response()
+            with self.assertNumQueries(0):
+                self.assertEqual(str(response.context_data['cae_prog_email']), '')
+                self.assertEqual(response.context_data['site_theme'].slug, 'wmu')
+
+    def test_invalidation(self):
+        """
+        Tests that site context values are invalidated on relevant model changes.
+        """
+        response = self.get_response()
+        self.assertEqual(str(response.context_data['cae_prog_email']), '')
+
+        with self.subTest('WmuUser updated'):
+            models.WmuUser.objects.create(
+                bronco_net='ceas_prog',
+                winno='123456789',
+                first_name='Test',
+                last_name='Programmer',
+                official_email='ceas_prog@wmich.edu',
+            )
+
+            response = self.get_response()
+            self.assertEqual(str(response.context_data['cae_prog_email']), 'ceas_prog@wmich.edu')
+
+        with self.subTest('Unrelated WmuUser updated'):
+            with patch('cae_home.site_context.invalidate') as mock_invalidate:
+                models.WmuUser.objects.create(
+                    bronco_net='other_user',
+                    winno='987654321',
+                    first_name='Other',
+                    last_name='User',
+                    official_email='other_user@wmich.edu',
+                )
+                mock_invalidate.assert_not_called()
+
+        with self.subTest('Unrelated SiteTheme updated'):
+            with patch('cae_home.site_context.invalidate') as mock_invalidate:
+                models.SiteTheme.objects.get(slug='cae').save()
+                mock_invalidate.assert_not_called()
+
+        with self.subTest('SiteTheme updated'):
+            site_theme = models.SiteTheme.objects.get(slug='wmu')
+            self.assertEqual(response.context_data['site_theme'].display_name, site_theme.display_name)
+            site_theme.display_name = 'Updated Theme Name'
+            site_theme.save()
+
+            response = self.get_response()
+            self.assertEqual(response.context_data['site_theme'].display_name, 'Updated Theme Name')
+
+        with self.subTest('Change from other process'):
+            # Simulate another worker process updating value. Only the shared version is changed.
+            models.WmuUser.objects.filter(bronco_net='ceas_prog').update(official_email='other_process@wmich.edu')
+            cache.set('{0}.version.cae_prog_email'.format(site_context.CACHE_KEY_PREFIX), 'other_process', None)
+
+            response = self.get_response()
+            self.assertEqual(str(response.context_data['cae_prog_email']), 'ceas_prog@wmich.edu')
+
+            with override_settings(SITE_CONTEXT_VERSION_CHECK_INTERVAL=0):
+                response = self.get_response()
+                self.assertEqual(str(response.context_data['cae_prog_email']), 'other_process@wmich.edu')
+
+        with self.subTest('Settings-based values skip shared version check'):
+            site_context.get_value('caeweb_installed')
+            with override_settings(SITE_CONTEXT_VERSION_CHECK_INTERVAL=0):
+                with patch('cae_home.site_context.cache.get') as mock_get:
+                    site_context.get_value('caeweb_installed')
+                    mock_get.assert_not_called()
+
+
+@override_settings(INSTALLED_APP_URL_DICT={'test_app': 'test_app_core/app_nav.html'})
+class MainNavMiddlewareTests(IntegrationTestCase):
+    """
+    Tests to ensure GetUserSiteOptionsMiddleware main nav logic functions as expected.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        self.factory = RequestFactory()
+        self.middleware = GetUserSiteOptionsMiddleware(lambda request: HttpResponse())
+        self.session = SessionStore()
+
+    def get_response(self, path):
+        """
+        Runs middleware on a new anonymous request to given path.
+        """
+        request = self.factory.get(path)
+        request.session = self.session
+        request.user = AnonymousUser()
+        response = TemplateResponse(request, 'cae_home/index.html', {})
+        return self.middleware.process_template_response(request, response)
+
+    def test_main_nav_template_path(self):
+        """
+        Tests that expected main nav template is provided, and session is only modified on change.
+        """
+        with self.subTest('Default nav'):
+            response = self.get_response('/info/')
+            self.assertEqual(response.context_data['main_nav_template_path'], 'cae_home/nav/default_app_nav.html')
+            self.assertFalse(self.session.modified)
+
+        with self.subTest('App nav, first visit'):
+            response = self.get_response('/test_app/some/page/')
+            self.assertEqual(response.context_data['main_nav_template_path'], 'test_app_core/app_nav.html')
+            self.assertTrue(self.session.modified)
+
+        # Reset, as if session was saved at end of request.
+        self.session.modified = False
+
+        with self.subTest('App nav, later visit'):
+            response = self.get_response('/test_app/')
+            self.assertEqual(response.context_data['main_nav_template_path'], 'test_app_core/app_nav.html')
+            self.assertFalse(self.session.modified)
+
+        with self.subTest('Non-app page keeps last app nav'):
+            response = self.get_response('/user/profile/')
+            self.assertEqual(response.context_data['main_nav_template_path'], 'test_app_core/app_nav.html')
+            self.assertFalse(self.session.modified)
+
+
+class AsyncMiddlewareTests(IntegrationTestCase):
+    """
+    Tests to ensure middleware functions as expected when running in async (ASGI) mode.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        self.factory = RequestFactory()
+        self.test_user = self.create_user('test_async_user', groups='CAE Admin GA')
+
+        # Create database session for user.
+        self.client.force_login(self.test_user)
+        self.session_key = self.client.session.session_key
+
+    def test_middleware_mode(self):
+        """
+        Tests that middleware runs in same mode as the rest of the middleware chain.
+        """
+        async def async_get_response(request):
+            return HttpResponse()
+
+        def sync_get_response(request):
+            return HttpResponse()
+
+        for middleware_class in (
+            GetUserProfileMiddleware,
+            GetProjectDetailMiddleware,
+            GetUserSiteOptionsMiddleware,
+            SetTimezoneMiddleware,
+            HandleExceptionsMiddleware,
+        ):
+            with self.subTest(middleware_class.__name__):
+                self.assertTrue(asyncio.iscoroutinefunction(middleware_class(async_get_response)))
+                self.assertFalse(asyncio.iscoroutinefunction(middleware_class(sync_get_response)))
+
+    async def test_async_request(self):
+        """
+        Tests that middleware provides expected values under async request handling.
+        Any database access outside of a sync thread will raise an error.
+        """
+        # Create request with lazily loaded session and user, same as Django's own middleware would.
+        request = self.factory.get('/')
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore(self.session_key)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+        async def get_response(request):
+            return TemplateResponse(request, 'cae_home/index.html', {})
+
+        # Build middleware chain.
+        site_options_middleware = GetUserSiteOptionsMiddleware(get_response)
+        project_detail_middleware = GetProjectDetailMiddleware(site_options_middleware)
+        timezone_middleware = SetTimezoneMiddleware(project_detail_middleware)
+        profile_middleware = GetUserProfileMiddleware(timezone_middleware)
+
+        response = await profile_middleware(request)
+        response = await site_options_middleware.process_template_response(request, response)
+        response = await project_detail_middleware.process_template_response(request, response)
+
+        self.assertTrue(request.user.is_cae_user)
+        self.assertEqual(response.context_data['site_theme'].slug, 'wmu')
+        self.assertEqual(response.context_data['main_nav_template_path'], 'cae_home/nav/default_app_nav.html')
+        self.assertIn('cae_prog_email', response.context_data)
+
+    async def test_async_preloaded_user(self):
+        """
+        Tests that middleware loads user context in a sync thread, when user is already loaded but cache is cold.
+        Any database access outside of a sync thread will raise an error.
+        """
+        request = self.factory.get('/')
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore(self.session_key)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+        # Load user ahead of time, as earlier middleware or view logic might. But leave user context uncached.
+        await sync_to_async(lambda: request.user.pk)()
+        await sync_to_async(cache.clear)()
+
+        async def get_response(request):
+            return HttpResponse()
+
+        await GetUserProfileMiddleware(get_response)(request)
+
+        self.assertTrue(request.user.is_cae_user)
+        self.assertEqual(request.user.profile.site_theme.slug, 'wmu')
@@ -0,0 +1,119 @@
+"""
+Tests for CAE Home app permission cache logic.
+
+Files located at:
+* cae_home/permission_cache.py
+"""
+
+# System Imports.
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test import override_settings
+
+# User Imports.
+from cae_home import models, permission_cache
+from cae_home.tests.utils import IntegrationTestCase
+from workspace.ldap_backends import fake_ldap
+from workspace.ldap_backends.wmu_auth.cae_backend import CaeAuthBackend
+
+
+# Permission checks never reach LDAP. Fake library only allows creating a backend without the actual library installed.
+@override_settings(**fake_ldap.SETTINGS)
+class PermissionCacheTests(IntegrationTestCase):
+    """
+    Tests to ensure permissions are cached across requests, and invalidated on change.
+    """
+    def setUp(self):
+        cache.clear()
+
+        self.backend = CaeAuthBackend()
+        # User needs a CAE Center group to remain active.
+        self.group = Group.objects.create(name='Permission Cache Group')
+        self.group.permissions.add(Permission.objects.get(codename='change_room'))
+        self.user_permission = Permission.objects.get(codename='change_major')
+        self.user = self.create_user(
+            'perm_user',
+            permissions=self.user_permission,
+            groups=[self.group, Group.objects.get(name='CAE Attendant')],
+        )
+
+    def get_fresh_user(self):
+        """
+        Gets new instance of user, as for a new request.
+        """
+        return models.User.objects.get(pk=self.user.pk)
+
+    def test_get_permissions(self):
+        """
+        Tests that permissions are loaded once, then shared across requests.
+        """
+        user = self.get_fresh_user()
+
+        with self.subTest('Initial lookup loads permissions'):
+            with self.assertNumQueries(3):
+                user_permissions, group_permissions = permission_cache.get_permissions(user)
+            self.assertEqual(user_permissions, {'cae_home.change_major'})
+            self.assertIn('cae_home.change_room', group_permissions)
+
+        with self.subTest('Further requests are cached'):
+            user = self.get_fresh_user()
+            with self.assertNumQueries(0):
+                self.assertTrue(self.backend.has_perm(user, 'cae_home.change_room'))
+                self.assertTrue(self.backend.has_perm(user, 'cae_home.change_major'))
+                self.assertFalse(self.backend.has_perm(user, 'auth.delete_group'))
+                self.assertTrue(self.backend.has_module_perms(user, 'cae_home'))
+                self.assertFalse(self.backend.has_module_perms(user, 'sessions'))
+
+        with self.subTest('Superuser'):
+            user.is_superuser = True
+            user.save()
+            user = self.get_fresh_user()
+            self.assertTrue(self.backend.has_perm(user, 'sessions.delete_session'))
+
+            user = self.get_fresh_user()
+            with self.assertNumQueries(0):
+                self.assertTrue(self.backend.has_perm(user, 'auth.delete_group'))
+
+    def test_invalidation(self):
+        """
+        Tests that cached permissions are invalidated on change.
+        """
+        permission_cache.get_permissions(self.get_fresh_user())
+
+        with self.subTest('User group change'):
+            self.user.groups.remove(self.group)
+            self.assertFalse(self.backend.has_perm(self.get_fresh_user(), 'cae_home.change_room'))
+            self.group.user_set.add(self.user)
+            self.assertTrue(self.backend.has_perm(self.get_fresh_user(), 'cae_home.change_room'))
+
+        with self.subTest('User permission change'):
+            self.user.user_permissions.remove(self.user_permission)
+            self.assertFalse(self.backend.has_perm(self.get_fresh_user(), 'cae_home.change_major'))
+
+        with self.subTest('Group permission change'):
+            self.group.permissions.add(Permission.objects.get(codename='delete_session'))
+            self.assertTrue(self.backend.has_perm(self.get_fresh_user(), 'sessions.delete_session'))
+
+        with self.subTest('Group deletion'):
+            self.group.delete()
+            self.assertFalse(self.backend.has_perm(self.get_fresh_user(), 'sessions.delete_session'))
+
+    def test_commit_invalidation(self):
+        """
+        Tests that permissions are invalidated again on commit.
+        Otherwise, a concurrent request could cache old permissions under the new version, before change is committed.
+        """
+        permission_cache.get_permissions(self.get_fresh_user())
+        user_key = permission_cache._get_user_key(self.user.pk)
+        user_version_key = permission_cache._get_user_version_key(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.group)
+
+            # Simulate concurrent request, which still sees committed (old) groups but the new version.
+            old_version, group_ids, user_permissions = cache.get(user_key)
+            new_version = (cache.get(permission_cache.GLOBAL_VERSION_KEY), cache.get(user_version_key))
+            cache.set(user_key, (new_version, group_ids, user_permissions))
+            self.assertTrue(self.backend.has_perm(self.get_fresh_user(), 'cae_home.change_room'))
+
+        self.assertFalse(self.backend.has_perm(self.get_fresh_user(), 'cae_home.change_room'))
@@ -0,0 +1,108 @@
+"""
+Tests for CAE Home app query budget logic.
+
+Files located at:
+* cae_home/query_budget.py
+* cae_home/middleware.py - QueryBudgetMiddleware
+"""
+
+# System Imports.
+from django.contrib.auth.models import Group
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+# User Imports.
+from cae_home.middleware import QueryBudgetMiddleware
+from cae_home.query_budget import (
+    QueryBudgetExceeded,
+    assert_query_budget,
+    get_fingerprint,
+    query_budget,
+)
+from cae_home.tests.utils import IntegrationTestCase
+
+
+@query_budget(max_queries=1, max_duplicates=0)
+def budget_view(request):
+    """
+    View that declares a budget of one query.
+    """
+    for name in ('CAE Admin', 'CAE Programmer'):
+        Group.objects.filter(name=name).exists()
+    return HttpResponse()
+
+
+def default_budget_view(request):
+    """
+    View that uses default budget.
+    """
+    for name in ('CAE Admin', 'CAE Programmer'):
+        Group.objects.filter(name=name).exists()
+    return HttpResponse()
+
+
+class QueryBudgetTests(IntegrationTestCase):
+    """
+    Tests to ensure query budget logic functions as expected.
+    """
+    def test_fingerprint(self):
+        """
+        Tests that the same query with different parameters has the same fingerprint.
+        """
+        self.assertEqual(
+            get_fingerprint('SELECT "id" FROM "t" WHERE "id" IN (%s, %s)'),
+            get_fingerprint('SELECT "id"\n  FROM "t" WHERE "id" IN (%s,%s,%s)'),
+        )
+        self.assertNotEqual(
+            get_fingerprint('SELECT "id" FROM "t" WHERE "id" = %s'),
+            get_fingerprint('SELECT "name" FROM "t" WHERE "id" = %s'),
+        )
+
+    def test_assert_query_budget(self):
+        """
+        Tests assert_query_budget() test assertion.
+        """
+        with self.subTest('Within budget'):
+            with assert_query_budget(max_queries=2, max_duplicates=1) as recorder:
+                Group.objects.filter(name='CAE Admin').exists()
+                Group.objects.filter(name='CAE Programmer').exists()
+            self.assertEqual(recorder.count, 2)
+            self.assertEqual(len(recorder.get_duplicates()), 1)
+
+        with self.subTest('Too many queries'):
+            with self.assertRaises(QueryBudgetExceeded):
+                with assert_query_budget(max_queries=1):
+                    Group.objects.filter(name='CAE Admin').exists()
+                    Group.objects.filter(name='CAE Programmer').exists()
+
+        with self.subTest('Repeated query'):
+            with self.assertRaises(QueryBudgetExceeded):
+                with assert_query_budget(max_duplicates=0):
+                    Group.objects.filter(name='CAE Admin').exists()
+                    Group.objects.filter(name='CAE Programmer').exists()
+
+    def test_middleware(self):
+        """
+        Tests QueryBudgetMiddleware.
+        """
+        factory = RequestFactory()
+
+        def get_response(view):
+            request = factory.get('/')
+            middleware = QueryBudgetMiddleware(view)
+            middleware.process_view(request, view, (), {})
+            return middleware(request)
+
+        with self.subTest('Within default budget'):
+            with self.assertNoLogs('cae_home.query_budget', level='WARNING'):
+                get_response(default_budget_view)
+
+        with self.subTest('Declared budget, logged'):
+            with self.assertLogs('cae_home.query_budget', level='WARNING') as logs:
+                get_response(budget_view)
+            self.assertIn('2 queries (max 1)', logs.output[0])
+
+        with self.subTest('Declared budget, raised'):
+            with override_settings(QUERY_BUDGET_RAISE=True):
+                with self.assertRaises(QueryBudgetExceeded):
+                    get_response(budget_view)
@@ -0,0 +1,95 @@
+"""
+Tests for CAE Home app reference data logic.
+
+Files located at:
+* cae_home/reference_data.py
+"""
+
+# System Imports.
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+# User Imports.
+from cae_home import models, reference_data
+
+
+class ReferenceDataTests(TransactionTestCase):
+    """
+    Tests to ensure reference data logic functions as expected.
+    Uses TransactionTestCase, as reference data is only held outside of transactions.
+    """
+    def setUp(self):
+        self.major = models.Major.create_dummy_model()
+        self.department = self.major.department
+
+    def tearDown(self):
+        # Database is reset after each test without sending signals, so clear held reference data manually.
+        for model in (models.Department, models.Major, models.RoomType, models.Room, models.SiteTheme):
+            reference_data.invalidate(model)
+
+    def test_get(self):
+        """
+        Tests reference data lookups.
+        """
+        with self.subTest('Initial lookup loads table'):
+            with self.assertNumQueries(1):
+                self.assertEqual(reference_data.get(models.Major, slug='dummy'), self.major)
+
+        with self.subTest('Further lookups are held'):
+            with self.assertNumQueries(0):
+                self.assertEqual(reference_data.get(models.Major, student_code='dummy'), self.major)
+                self.assertEqual(reference_data.get(models.Major, slug='dummy').department, self.department)
+
+        with self.subTest('Missing value'):
+            with self.assertNumQueries(0):
+                with self.assertRaises(models.Major.DoesNotExist):
+                    reference_data.get(models.Major, slug='missing')
+
+        with self.subTest('Invalid lookup'):
+            with self.assertRaises(ValueError):
+                reference_data.get(models.Major, name='Dummy Major')
+
+    def test_invalidation(self):
+        """
+        Tests that reference data is invalidated on model change.
+        """
+        reference_data.get(models.Major, slug='dummy')
+
+        with self.subTest('Model change'):
+            self.major.name = 'Updated Major'
+            self.major.save()
+            self.assertEqual(reference_data.get(models.Major, slug='dummy').name, 'Updated Major')
+
+        with self.subTest('Dependency change'):
+            self.department.name = 'Updated Department'
+            self.department.save()
+            self.assertEqual(reference_data.get(models.Major, slug='dummy').department.name, 'Updated Department')
+
+        with self.subTest('Change from other process'):
+            reference_data.get(models.Major, slug='dummy')
+            models.Major.objects.filter(pk=self.major.pk).update(name='Other Process Major')
+            cache.set('{0}.version.cae_home.major'.format(reference_data.CACHE_KEY_PREFIX), 'other_process', None)
+
+            with override_settings(REFERENCE_DATA_VERSION_CHECK_INTERVAL=0):
+                self.assertEqual(reference_data.get(models.Major, slug='dummy').name, 'Other Process Major')
+
+    def test_transaction(self):
+        """
+        Tests that lookups within a transaction go directly to database.
+        """
+        reference_data.get(models.Major, slug='dummy')
+
+        with transaction.atomic():
+            major = models.Major.objects.create(
+                student_code='uncommitted',
+                program_code='uncommitted',
+                slug='uncommitted',
+                name='Uncommitted Major',
+                department=self.department,
+            )
+            self.assertEqual(reference_data.get(models.Major, slug='uncommitted'), major)
+            transaction.set_rollback(True)
+
+        with self.assertRaises(models.Major.DoesNotExist):
+            reference_data.get(models.Major, slug='uncommitted')
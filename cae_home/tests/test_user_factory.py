@@ -0,0 +1,138 @@
+"""
+Tests for CAE Home app user factory logic.
+
+Files located at:
+* cae_home/user_factory.py
+"""
+
+# System Imports.
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# User Imports.
+from cae_home import models
+from cae_home.models.user import bulk_compare_user_and_wmuuser_models
+from cae_home.tests.utils import IntegrationTestCase
+from cae_home.user_factory import UserFactory
+
+
+class UserFactoryTests(IntegrationTestCase):
+    """
+    Tests to ensure user factory logic functions as expected.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        self.user_factory = UserFactory()
+
+    def test_create(self):
+        """
+        Tests creating a full set of user models.
+        """
+        user_intermediary = self.user_factory.create(
+            'test_factory_user',
+            user={'first_name': 'Login First', 'email': 'login@example.com'},
+            wmu_user={'winno': '123456789', 'first_name': 'Wmu First', 'last_name': 'Wmu Last'},
+            password='test_password',
+            groups=['CAE Director'],
+        )
+
+        with self.subTest('Models are created and linked'):
+            user_intermediary = models.UserIntermediary.objects.get(bronco_net='test_factory_user')
+            self.assertEqual(user_intermediary.user.username, 'test_factory_user')
+            self.assertEqual(user_intermediary.wmu_user.bronco_net, 'test_factory_user')
+            self.assertEqual(user_intermediary.profile.site_theme.slug, 'wmu')
+            self.assertEqual(user_intermediary.slug, 'test_factory_user')
+            self.assertTrue(user_intermediary.user.check_password('test_password'))
+            self.assertEqual(list(user_intermediary.user.groups.values_list('name', flat=True)), ['CAE Director'])
+
+        with self.subTest('Model values are synced'):
+            self.assertEqual(user_intermediary.winno, '123456789')
+            self.assertEqual(user_intermediary.first_name, 'Wmu First')
+            self.assertEqual(user_intermediary.user.first_name, 'Wmu First')
+            self.assertEqual(user_intermediary.user.last_name, 'Wmu Last')
+            self.assertEqual(user_intermediary.user.email, 'test_factory_user@wmich.edu')
+            self.assertTrue(user_intermediary.user.is_active)
+            self.assertTrue(user_intermediary.user.is_staff)
+
+            # Sync logic should find nothing left to update.
+            self.assertEqual(bulk_compare_user_and_wmuuser_models(['test_factory_user']), set())
+
+        with self.subTest('Inactive user'):
+            user_intermediary = self.user_factory.create(
+                'test_inactive_user',
+                wmu_user={'winno': '987654321', 'first_name': 'Inactive', 'last_name': 'User'},
+                user_intermediary={'cae_is_active': False, 'wmu_is_active': False},
+            )
+            self.assertIsNone(user_intermediary.user)
+            self.assertFalse(models.WmuUser.objects.get(bronco_net='test_inactive_user').is_active)
+
+    def test_query_count(self):
+        """
+        Tests that number of queries does not depend on number of users created.
+        """
+        # Load site theme ahead of time, in case fixtures aren't loaded yet.
+        self.user_factory.create('test_initial_user', user={})
+
+        with CaptureQueriesContext(connection) as single_queries:
+            self.user_factory.create('test_single_user', user={}, groups=['CAE Admin'])
+
+        with CaptureQueriesContext(connection) as bulk_queries:
+            self.user_factory.bulk_create([
+                {
+                    'bronco_net': 'test_bulk_user_{0}'.format(index),
+                    'user': {},
+                    'wmu_user': {'winno': 'test_bulk_winno_{0}'.format(index), 'first_name': 'A', 'last_name': 'B'},
+                    'groups': ['CAE Admin'],
+                }
+                for index in range(10)
+            ])
+
+        self.assertEqual(len(bulk_queries), len(single_queries) + 1)
+        self.assertEqual(models.UserIntermediary.objects.filter(bronco_net__startswith='test_bulk_user_').count(), 10)
+
+    def test_attach_to_existing_user(self):
+        """
+        Tests creating models for a BroncoNet that already has some user models.
+        """
+        self.create_user('test_existing_user', groups=['CAE Admin'])
+
+        user_intermediary = self.user_factory.create(
+            'test_existing_user',
+            wmu_user={'winno': '123456789', 'first_name': 'Wmu First', 'last_name': 'Wmu Last'},
+        )
+
+        with self.subTest('Models are linked and synced'):
+            self.assertEqual(user_intermediary.wmu_user.bronco_net, 'test_existing_user')
+            self.assertEqual(user_intermediary.user.first_name, 'Wmu First')
+            self.assertEqual(models.User.objects.get(username='test_existing_user').first_name, 'Wmu First')
+            self.assertEqual(models.UserIntermediary.objects.get(bronco_net='test_existing_user').winno, '123456789')
+
+        with self.subTest('Models already exist'):
+            with self.assertRaises(ValidationError):
+                self.user_factory.create('test_existing_user', user={})
+            with self.assertRaises(ValidationError):
+                self.user_factory.create(
+                    'test_existing_user',
+                    wmu_user={'winno': '111111111', 'first_name': 'A', 'last_name': 'B'},
+                )
+
+    def test_invalid_values(self):
+        """
+        Tests that invalid values are rejected, without creating any models.
+        """
+        with self.subTest('Missing user values'):
+            with self.assertRaises(ValidationError):
+                self.user_factory.create('test_invalid_user')
+
+        with self.subTest('Invalid group'):
+            with self.assertRaises(ValidationError):
+                self.user_factory.create('test_invalid_user', user={}, groups=['Invalid Group'])
+
+        with self.subTest('Invalid field value'):
+            with self.assertRaises(ValidationError):
+                self.user_factory.create('test_invalid_user', wmu_user={'winno': '123456789'})
+
+        self.assertFalse(models.UserIntermediary.objects.filter(bronco_net='test_invalid_user').exists())
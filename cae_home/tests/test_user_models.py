@@ -13,13 +13,16 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 from django_expanded_test_cases import BaseTestCase
 from phonenumber_field.phonenumber import PhoneNumber
 
 # User Imports.
 from .. import models
+from cae_home.models.user import check_all_group_memberships, check_user_group_membership
 from cae_home.management.commands.fixtures.wmu import create_departments
 from cae_home.management.commands.seeders.user import create_groups as seed_groups, create_users as seed_users
+from cae_home.tests.utils import IntegrationTestCase
 
 
 class UserModelTests(BaseTestCase):
@@ -31,9 +34,10 @@ class UserModelTests(BaseTestCase):
         # Run parent logic.
         super().setUpTestData()
 
-        # Generate user data.
-        seed_groups()
-        seed_users()
+        # Generate user data. TestCase never commits, so run user sync commit callbacks manually.
+        with cls.captureOnCommitCallbacks(execute=True):
+            seed_groups()
+            seed_users()
 
     def test__user_active(self):
         """
@@ -45,8 +49,10 @@ class UserModelTests(BaseTestCase):
         # update the User model seeding/test-generation logic, then these initial test-user states might not necessarily
         # reflect the save logic that applies to production. For this test, we *specifially* want to mimic exactly how
         # the models handle in production, when adding and removing groups.
-        for user in get_user_model().objects.all():
-            user.save()
+        # TestCase never commits, so run user sync commit callbacks manually, for each change.
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in get_user_model().objects.all():
+                user.save()
 
         with self.subTest('Local env seed users'):
             # Loop through all users defined in env settings seed (if any) and verify expected values.
@@ -151,8 +157,9 @@ class UserModelTests(BaseTestCase):
             self.assertFalse(step_admin.is_staff)
 
             # Remove all groups.
-            step_admin.groups.clear()
-            step_admin.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                step_admin.groups.clear()
+                step_admin.save()
 
             # Refresh model to clear cached data.
             step_admin = self.get_user('step_admin')
@@ -162,8 +169,9 @@ class UserModelTests(BaseTestCase):
             self.assertFalse(step_admin.is_staff)
 
             # Readd groups.
-            step_admin.groups.add(Group.objects.get(name='CAE Attendant'))
-            step_admin.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                step_admin.groups.add(Group.objects.get(name='CAE Attendant'))
+                step_admin.save()
 
             # Refresh model to clear cached data.
             step_admin = self.get_user('step_admin')
@@ -178,8 +186,9 @@ class UserModelTests(BaseTestCase):
             self.assertFalse(grad_apps_admin_inactive.is_staff)
 
             # Add groups.
-            grad_apps_admin_inactive.groups.add(Group.objects.get(name='Grad Apps Admin'))
-            grad_apps_admin_inactive.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                grad_apps_admin_inactive.groups.add(Group.objects.get(name='Grad Apps Admin'))
+                grad_apps_admin_inactive.save()
 
             # Refresh model to clear cached data.
             grad_apps_admin_inactive = self.get_user('grad_apps_admin_inactive')
@@ -189,8 +198,9 @@ class UserModelTests(BaseTestCase):
             self.assertFalse(grad_apps_admin_inactive.is_staff)
 
             # Remove all groups.
-            grad_apps_admin_inactive.groups.clear()
-            grad_apps_admin_inactive.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                grad_apps_admin_inactive.groups.clear()
+                grad_apps_admin_inactive.save()
 
             # Refresh model to clear cached data.
             grad_apps_admin_inactive = self.get_user('grad_apps_admin_inactive')
@@ -232,14 +242,15 @@ class UserModelTests(BaseTestCase):
 
             with self.subTest('When starting as active'):
                 # Remove all groups.
-                cae_director.groups.clear()
-                cae_director.save()
-                cae_admin_ga.groups.clear()
-                cae_admin_ga.save()
-                cae_programmer_ga.groups.clear()
-                cae_programmer_ga.save()
-                cae_programmer.groups.clear()
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_director.groups.clear()
+                    cae_director.save()
+                    cae_admin_ga.groups.clear()
+                    cae_admin_ga.save()
+                    cae_programmer_ga.groups.clear()
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.clear()
+                    cae_programmer.save()
 
                 # Refresh models to clear cached data.
                 cae_director = self.get_user('cae_director')
@@ -258,14 +269,15 @@ class UserModelTests(BaseTestCase):
                 self.assertFalse(cae_programmer.is_staff)
 
                 # Readd groups.
-                cae_director.groups.add(Group.objects.get(name='CAE Director'))
-                cae_director.save()
-                cae_admin_ga.groups.add(Group.objects.get(name='CAE Admin GA'))
-                cae_admin_ga.save()
-                cae_programmer_ga.groups.add(Group.objects.get(name='CAE Programmer GA'))
-                cae_programmer_ga.save()
-                cae_programmer.groups.add(Group.objects.get(name='CAE Programmer'))
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_director.groups.add(Group.objects.get(name='CAE Director'))
+                    cae_director.save()
+                    cae_admin_ga.groups.add(Group.objects.get(name='CAE Admin GA'))
+                    cae_admin_ga.save()
+                    cae_programmer_ga.groups.add(Group.objects.get(name='CAE Programmer GA'))
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.add(Group.objects.get(name='CAE Programmer'))
+                    cae_programmer.save()
 
                 # Refresh models to clear cached data.
                 cae_director = self.get_user('cae_director')
@@ -285,14 +297,15 @@ class UserModelTests(BaseTestCase):
 
             with self.subTest('When starting as inactive'):
                 # Add groups.
-                cae_director_inactive.groups.add(Group.objects.get(name='CAE Director'))
-                cae_director_inactive.save()
-                cae_admin_ga_inactive.groups.add(Group.objects.get(name='CAE Admin GA'))
-                cae_admin_ga_inactive.save()
-                cae_programmer_ga_inactive.groups.add(Group.objects.get(name='CAE Programmer GA'))
-                cae_programmer_ga_inactive.save()
-                cae_programmer_inactive.groups.add(Group.objects.get(name='CAE Programmer'))
-                cae_programmer_inactive.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_director_inactive.groups.add(Group.objects.get(name='CAE Director'))
+                    cae_director_inactive.save()
+                    cae_admin_ga_inactive.groups.add(Group.objects.get(name='CAE Admin GA'))
+                    cae_admin_ga_inactive.save()
+                    cae_programmer_ga_inactive.groups.add(Group.objects.get(name='CAE Programmer GA'))
+                    cae_programmer_ga_inactive.save()
+                    cae_programmer_inactive.groups.add(Group.objects.get(name='CAE Programmer'))
+                    cae_programmer_inactive.save()
 
                 # Refresh models to clear cached data.
                 cae_director_inactive = self.get_user('cae_director_inactive')
@@ -311,14 +324,15 @@ class UserModelTests(BaseTestCase):
                 self.assertTrue(cae_programmer_inactive.is_staff)
 
                 # Remove all groups.
-                cae_director_inactive.groups.clear()
-                cae_director_inactive.save()
-                cae_admin_ga_inactive.groups.clear()
-                cae_admin_ga_inactive.save()
-                cae_programmer_ga_inactive.groups.clear()
-                cae_programmer_ga_inactive.save()
-                cae_programmer_inactive.groups.clear()
-                cae_programmer_inactive.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_director_inactive.groups.clear()
+                    cae_director_inactive.save()
+                    cae_admin_ga_inactive.groups.clear()
+                    cae_admin_ga_inactive.save()
+                    cae_programmer_ga_inactive.groups.clear()
+                    cae_programmer_ga_inactive.save()
+                    cae_programmer_inactive.groups.clear()
+                    cae_programmer_inactive.save()
 
                 # Refresh models to clear cached data.
                 cae_director_inactive = self.get_user('cae_director_inactive')
@@ -354,10 +368,11 @@ class UserModelTests(BaseTestCase):
 
             with self.subTest('When adding SuccessCtrAdmin'):
                 # Add SuccessCtrAdmin group.
-                cae_programmer_ga.groups.add(successctr_admin_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.add(successctr_admin_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.add(successctr_admin_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.add(successctr_admin_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -370,10 +385,11 @@ class UserModelTests(BaseTestCase):
                 self.assertTrue(cae_programmer.is_staff)
 
                 # Remove SuccessCtrAdmin group.
-                cae_programmer_ga.groups.remove(successctr_admin_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.remove(successctr_admin_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.remove(successctr_admin_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.remove(successctr_admin_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -388,10 +404,11 @@ class UserModelTests(BaseTestCase):
             with self.subTest('When adding SuccessCtrEmployee'):
 
                 # Add SuccessCtrEmployee group.
-                cae_programmer_ga.groups.add(successctr_employee_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.add(successctr_employee_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.add(successctr_employee_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.add(successctr_employee_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -404,10 +421,11 @@ class UserModelTests(BaseTestCase):
                 self.assertTrue(cae_programmer.is_staff)
 
                 # Remove SuccessCtrEmployee group.
-                cae_programmer_ga.groups.remove(successctr_employee_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.remove(successctr_employee_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.remove(successctr_employee_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.remove(successctr_employee_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -437,10 +455,11 @@ class UserModelTests(BaseTestCase):
 
             with self.subTest('When adding GradAppsAdmin'):
                 # Add GradAppsAdmin group.
-                cae_programmer_ga.groups.add(grad_apps_admin_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.add(grad_apps_admin_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.add(grad_apps_admin_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.add(grad_apps_admin_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -453,10 +472,11 @@ class UserModelTests(BaseTestCase):
                 self.assertTrue(cae_programmer.is_staff)
 
                 # Remove GradAppsAdmin group.
-                cae_programmer_ga.groups.remove(grad_apps_admin_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.remove(grad_apps_admin_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.remove(grad_apps_admin_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.remove(grad_apps_admin_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -470,10 +490,11 @@ class UserModelTests(BaseTestCase):
 
             with self.subTest('When adding GradAppsCommitteeMember'):
                 # Add GradAppsCommitteeMember group.
-                cae_programmer_ga.groups.add(grad_apps_committee_member_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.add(grad_apps_committee_member_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.add(grad_apps_committee_member_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.add(grad_apps_committee_member_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -486,10 +507,11 @@ class UserModelTests(BaseTestCase):
                 self.assertTrue(cae_programmer.is_staff)
 
                 # Remove GradAppsCommitteeMember group.
-                cae_programmer_ga.groups.remove(grad_apps_committee_member_group)
-                cae_programmer_ga.save()
-                cae_programmer.groups.remove(grad_apps_committee_member_group)
-                cae_programmer.save()
+                with self.captureOnCommitCallbacks(execute=True):
+                    cae_programmer_ga.groups.remove(grad_apps_committee_member_group)
+                    cae_programmer_ga.save()
+                    cae_programmer.groups.remove(grad_apps_committee_member_group)
+                    cae_programmer.save()
 
                 # Pull fresh group models, to ensure we have the most up-to-date data after running save logic.
                 cae_programmer_ga = self.get_user('cae_programmer_ga')
@@ -567,6 +589,96 @@ class UserModelTests(BaseTestCase):
 #         self.assertEqual(membership_models[0].date_left, self.now)
 
 
+class GroupMembershipReconciliationTests(IntegrationTestCase):
+    """
+    Tests to ensure GroupMembership models update to match auth Group membership.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        self.today = timezone.datetime.today().date()
+        self.two_years_ago = self.today - timezone.timedelta(days=730)
+        self.cae_admin_group = Group.objects.get(name='CAE Admin')
+        self.cae_attendant_group = Group.objects.get(name='CAE Attendant')
+        self.cae_director_group = Group.objects.get(name='CAE Director')
+
+        # Active user, with one existing membership still valid and one no longer valid.
+        self.active_user = self.create_user('test_active_member', groups=['CAE Admin', 'CAE Attendant'])
+        models.GroupMembership.objects.create(
+            user=self.active_user,
+            group=self.cae_admin_group,
+            date_joined=self.two_years_ago,
+        )
+        models.GroupMembership.objects.create(
+            user=self.active_user,
+            group=self.cae_director_group,
+            date_joined=self.two_years_ago,
+        )
+
+        # Inactive user, with one existing membership.
+        self.inactive_user = self.create_user('test_inactive_member')
+        models.GroupMembership.objects.create(
+            user=self.inactive_user,
+            group=self.cae_attendant_group,
+            date_joined=self.two_years_ago,
+        )
+
+    def get_memberships(self, user):
+        """
+        Returns (group name, date joined, date left) for all GroupMemberships of user.
+        """
+        return set(models.GroupMembership.objects.filter(user=user).values_list(
+            'group__name', 'date_joined', 'date_left',
+        ))
+
+    def test_check_user_group_membership(self):
+        """
+        Tests updating GroupMemberships for a single user.
+        """
+        check_user_group_membership(self.active_user.username)
+
+        self.assertEqual(self.get_memberships(self.active_user), {
+            ('CAE Admin', self.two_years_ago, None),
+            ('CAE Attendant', self.today, None),
+            ('CAE Director', self.two_years_ago, self.today),
+        })
+
+        # Other users are unaffected.
+        self.assertEqual(self.get_memberships(self.inactive_user), {
+            ('CAE Attendant', self.two_years_ago, None),
+        })
+
+    def test_check_all_group_memberships(self):
+        """
+        Tests updating GroupMemberships for all users.
+        """
+        with self.subTest('Initial update'):
+            self.assertEqual(check_all_group_memberships(), (2, 1))
+
+            self.assertEqual(self.get_memberships(self.active_user), {
+                ('CAE Admin', self.two_years_ago, None),
+                ('CAE Attendant', self.today, None),
+                ('CAE Director', self.two_years_ago, self.today),
+            })
+            self.assertEqual(self.get_memberships(self.inactive_user), {
+                ('CAE Attendant', self.two_years_ago, self.today),
+            })
+
+        with self.subTest('Nothing to update'):
+            self.assertEqual(check_all_group_memberships(), (0, 0))
+
+    def test_query_count(self):
+        """
+        Tests that updating GroupMemberships does not query per user.
+        """
+        for index in range(10):
+            self.create_user('test_member_{0}'.format(index), groups=['CAE Admin', 'CAE Attendant'])
+
+        with self.assertNumQueries(4):
+            check_all_group_memberships()
+
+
 class UserIntermediaryModelTests(BaseTestCase):
     """
     Tests to ensure valid UserIntermediary model creation/logic.
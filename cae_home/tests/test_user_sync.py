@@ -0,0 +1,404 @@
+"""
+Tests for CAE Home app user model sync logic.
+
+Files located at:
+* cae_home/user_sync.py
+* cae_home/signals.py
+* cae_home/models/mixins.py - ChangeTrackingMixin
+"""
+
+# System Imports.
+import random
+from django.contrib.auth.models import Group
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from unittest.mock import call, patch
+
+# User Imports.
+from cae_home import models, user_sync
+from cae_home.models.user import bulk_compare_user_and_wmuuser_models, reconcile_group_memberships
+from cae_home.tests.utils import IntegrationTestCase
+
+
+class UserSyncTests(IntegrationTestCase):
+    """
+    Tests to ensure user model sync logic functions as expected.
+    """
+    def setUp(self):
+        # Run parent setup logic.
+        super().setUp()
+
+        self.test_user = self.create_user('test_sync_user')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_wmu_user = models.WmuUser.objects.create(
+                bronco_net='test_sync_user',
+                winno='test_sync_user',
+                first_name='Wmu First',
+                last_name='Wmu Last',
+            )
+
+    def test_single_sync_per_save(self):
+        """
+        Tests that saving a user model results in exactly one sync, regardless of related model saves.
+        """
+        for instance, field, value in (
+            (models.User.objects.get(pk=self.test_user.pk), 'email', 'changed@wmich.edu'),
+            (models.WmuUser.objects.get(pk=self.test_wmu_user.pk), 'last_name', 'Changed'),
+            (models.UserIntermediary.objects.get(bronco_net='test_sync_user'), 'cae_is_active', False),
+        ):
+            with self.subTest(type(instance).__name__):
+                with patch(
+                    'cae_home.user_sync.compare_user_and_wmuuser_models',
+                    wraps=user_sync.compare_user_and_wmuuser_models,
+                ) as compare_mock:
+                    with self.captureOnCommitCallbacks(execute=True):
+                        setattr(instance, field, value)
+                        instance.save()
+
+                compare_mock.assert_called_once_with('test_sync_user')
+
+    def test_sync_values(self):
+        """
+        Tests that user model values are synced on save.
+        """
+        with self.subTest('Synced on WmuUser creation'):
+            self.test_user.refresh_from_db()
+            self.assertEqual(self.test_user.first_name, 'Wmu First')
+            self.assertEqual(self.test_user.userintermediary.winno, 'test_sync_user')
+
+        with self.subTest('Synced on WmuUser update'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.test_wmu_user.last_name = 'Updated Last'
+                self.test_wmu_user.save()
+
+            self.test_user.refresh_from_db()
+            self.assertEqual(self.test_user.last_name, 'Updated Last')
+            self.assertEqual(self.test_user.userintermediary.last_name, 'Updated Last')
+
+    def test_deferred(self):
+        """
+        Tests that deferred() block coalesces multiple saves into one sync.
+        """
+        with patch(
+            'cae_home.user_sync.compare_user_and_wmuuser_models',
+            wraps=user_sync.compare_user_and_wmuuser_models,
+        ) as compare_mock:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with user_sync.deferred():
+                    self.test_wmu_user.first_name = 'Deferred First'
+                    self.test_wmu_user.save()
+                    self.test_wmu_user.last_name = 'Deferred Last'
+                    self.test_wmu_user.save()
+
+                    # Nothing synced or registered yet.
+                    self.assertEqual(len(callbacks), 0)
+
+                compare_mock.assert_not_called()
+
+        compare_mock.assert_called_once_with('test_sync_user')
+        self.test_user.refresh_from_db()
+        self.assertEqual(self.test_user.first_name, 'Deferred First')
+        self.assertEqual(self.test_user.last_name, 'Deferred Last')
+
+    def test_transaction(self):
+        """
+        Tests that saves within a transaction are synced once, on commit, and never applied on rollback.
+        """
+        with patch(
+            'cae_home.user_sync.compare_user_and_wmuuser_models',
+            wraps=user_sync.compare_user_and_wmuuser_models,
+        ) as compare_mock:
+            with self.subTest('Commit'):
+                with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                    with transaction.atomic(), user_sync.deferred():
+                        user = models.User.objects.get(pk=self.test_user.pk)
+                        user.email = 'committed@wmich.edu'
+                        user.save()
+                        wmu_user = models.WmuUser.objects.get(pk=self.test_wmu_user.pk)
+                        wmu_user.last_name = 'Committed'
+                        wmu_user.save()
+                        compare_mock.assert_not_called()
+
+                compare_mock.assert_called_once_with('test_sync_user')
+                flush_callbacks = [
+                    callback for callback in callbacks
+                    if getattr(callback, '__func__', None) is user_sync.UserSyncBatch.flush
+                ]
+                self.assertEqual(len(flush_callbacks), 1)
+                self.assertEqual(models.User.objects.get(pk=self.test_user.pk).last_name, 'Committed')
+
+            compare_mock.reset_mock()
+            with self.subTest('Rollback, then new transaction'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    with transaction.atomic():
+                        user = models.User.objects.get(pk=self.test_user.pk)
+                        user.email = 'rolled_back@wmich.edu'
+                        user.save()
+                        transaction.set_rollback(True)
+
+                    # Users marked in a later transaction still sync, even though the earlier callback was dropped.
+                    with transaction.atomic():
+                        models.WmuUser.objects.create(
+                            bronco_net='test_other_user',
+                            winno='test_other_user',
+                            first_name='Other First',
+                            last_name='Other Last',
+                        )
+                    compare_mock.assert_not_called()
+
+                self.assertIn(call('test_other_user'), compare_mock.call_args_list)
+                self.assertNotEqual(models.User.objects.get(pk=self.test_user.pk).email, 'rolled_back@wmich.edu')
+                self.assertEqual(
+                    models.UserIntermediary.objects.get(bronco_net='test_other_user').first_name,
+                    'Other First',
+                )
+
+    def test_change_tracking(self):
+        """
+        Tests that saving user models only writes changed fields.
+        """
+        wmu_user = models.WmuUser.objects.get(pk=self.test_wmu_user.pk)
+
+        with self.subTest('No changes'):
+            self.assertFalse(wmu_user.has_changed())
+            with CaptureQueriesContext(connection) as queries:
+                wmu_user.save()
+            self.assertEqual(len(queries), 0)
+
+        with self.subTest('Single change'):
+            wmu_user.middle_name = 'Middle'
+            self.assertTrue(wmu_user.has_changed())
+            self.assertTrue(wmu_user.has_changed('middle_name'))
+            self.assertFalse(wmu_user.has_changed('first_name'))
+            self.assertEqual(wmu_user.get_changed_fields(), {'middle_name'})
+
+            with CaptureQueriesContext(connection) as queries:
+                wmu_user.save()
+            update_queries = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+            self.assertEqual(len(update_queries), 1)
+            self.assertIn('"middle_name"', update_queries[0])
+            self.assertIn('"date_modified"', update_queries[0])
+            self.assertNotIn('"first_name"', update_queries[0])
+
+            # Snapshot is updated on save.
+            self.assertFalse(wmu_user.has_changed())
+
+        with self.subTest('Unsaved model'):
+            self.assertTrue(models.WmuUser(bronco_net='test_unsaved_user').has_changed())
+
+    def test_sync_skipped_without_sync_field_changes(self):
+        """
+        Tests that user models are only synced when a synced field changes.
+        """
+        user_intermediary = models.UserIntermediary.objects.get(bronco_net='test_sync_user')
+
+        with patch(
+            'cae_home.user_sync.compare_user_and_wmuuser_models',
+            wraps=user_sync.compare_user_and_wmuuser_models,
+        ) as compare_mock:
+            with self.subTest('Non-synced field'):
+                user_intermediary.last_ldap_check = timezone.localdate() - timezone.timedelta(days=1)
+                user_intermediary.save()
+                compare_mock.assert_not_called()
+
+            with self.subTest('Synced field'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    user_intermediary.wmu_is_active = False
+                    user_intermediary.save()
+                compare_mock.assert_called_once_with('test_sync_user')
+
+    def test_related_intermediary_save(self):
+        """
+        Tests that changing related UserIntermediary, then saving only the user model, saves both.
+        """
+        for model, lookup in (
+            (models.User, {'pk': self.test_user.pk}),
+            (models.WmuUser, {'pk': self.test_wmu_user.pk}),
+        ):
+            with self.subTest(model.__name__):
+                models.UserIntermediary.objects.filter(bronco_net='test_sync_user').update(cae_is_active=True)
+                user_model = model.objects.get(**lookup)
+
+                with patch(
+                    'cae_home.user_sync.compare_user_and_wmuuser_models',
+                    wraps=user_sync.compare_user_and_wmuuser_models,
+                ) as compare_mock:
+                    with self.captureOnCommitCallbacks(execute=True):
+                        user_model.userintermediary.cae_is_active = False
+                        user_model.save()
+
+                self.assertFalse(models.UserIntermediary.objects.get(bronco_net='test_sync_user').cae_is_active)
+                compare_mock.assert_called_once_with('test_sync_user')
+
+    def test_group_change_sync(self):
+        """
+        Tests that (login) User group changes sync user models.
+        """
+        self.assertFalse(models.User.objects.get(pk=self.test_user.pk).is_active)
+
+        with self.subTest('Group added'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.test_user.groups.add(Group.objects.get(name='CAE Attendant'))
+            self.assertTrue(models.User.objects.get(pk=self.test_user.pk).is_active)
+
+        with self.subTest('Group removed'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.test_user.groups.remove(Group.objects.get(name='CAE Attendant'))
+            self.assertFalse(models.User.objects.get(pk=self.test_user.pk).is_active)
+
+        with self.subTest('Group cleared from Group side'):
+            group = Group.objects.create(name='Test Sync Group')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.test_user.groups.add(Group.objects.get(name='CAE Attendant'))
+            self.assertTrue(models.User.objects.get(pk=self.test_user.pk).is_active)
+
+            # Give user a non-CAE group, then clear user's only CAE Center group from its own side.
+            with self.captureOnCommitCallbacks(execute=True):
+                group.user_set.add(self.test_user)
+            with self.captureOnCommitCallbacks(execute=True):
+                Group.objects.get(name='CAE Attendant').user_set.clear()
+            self.assertFalse(models.User.objects.get(pk=self.test_user.pk).is_active)
+
+
+class BulkUserSyncTests(IntegrationTestCase):
+    """
+    Tests to ensure bulk user model sync logic functions as expected.
+    """
+    # Number of users to generate. Syncing each user individually for comparison makes up most of the test runtime.
+    user_count = 10000
+
+    @classmethod
+    def setUpTestData(cls):
+        # Run parent logic.
+        super().setUpTestData()
+
+        # Generate a large number of users, with a mix of out-of-sync values.
+        # Models are created in bulk, so that save logic doesn't sync them ahead of time.
+        generator = random.Random(0)
+        site_theme = models.SiteTheme.objects.get(slug='wmu')
+        groups = list(Group.objects.filter(name__in=['CAE Admin', 'CAE Attendant', 'CAE Programmer', 'STEP Admin']))
+        names = ['Alex', 'Sam', ' Sam ', '', ' ']
+        wmu_names = ['Alex', 'Sam', ' Sam ']
+        emails = ['', None, 'alt@wmich.edu']
+        offset = 100000
+
+        users = []
+        wmu_users = []
+        profiles = []
+        user_intermediaries = []
+        user_groups = []
+        for index in range(cls.user_count):
+            pk = offset + index
+            bronco_net = 'bulk_user_{0}'.format(index)
+            has_user = index % 3 != 0
+            has_wmu_user = index % 3 != 1
+
+            if has_user:
+                users.append(models.User(
+                    pk=pk,
+                    username=bronco_net,
+                    first_name=generator.choice(names),
+                    last_name=generator.choice(names),
+                    email=generator.choice(['', '{0}@wmich.edu'.format(bronco_net), 'alt@wmich.edu']),
+                    is_active=generator.choice([True, False]),
+                    is_staff=generator.choice([True, False]),
+                ))
+                for group in generator.sample(groups, generator.randint(0, 2)):
+                    user_groups.append(models.User.groups.through(user_id=pk, group=group))
+            if has_wmu_user:
+                wmu_users.append(models.WmuUser(
+                    pk=pk,
+                    bronco_net=bronco_net,
+                    winno='bulk_winno_{0}'.format(index),
+                    first_name=generator.choice(wmu_names),
+                    last_name=generator.choice(wmu_names),
+                    official_email=generator.choice(emails),
+                    is_active=generator.choice([True, False]),
+                ))
+            profiles.append(models.Profile(pk=pk, site_theme=site_theme))
+            user_intermediaries.append(models.UserIntermediary(
+                user_id=pk if has_user else None,
+                wmu_user_id=pk if has_wmu_user else None,
+                profile_id=pk,
+                bronco_net=bronco_net,
+                slug=bronco_net,
+                winno=generator.choice(['', 'stale_winno_{0}'.format(index)]),
+                first_name=generator.choice(names),
+                last_name=generator.choice(names),
+                cae_is_active=generator.choice([True, False]),
+                wmu_is_active=generator.choice([True, False]),
+            ))
+
+        models.User.objects.bulk_create(users)
+        models.WmuUser.objects.bulk_create(wmu_users)
+        models.Profile.objects.bulk_create(profiles)
+        models.UserIntermediary.objects.bulk_create(user_intermediaries)
+        models.User.groups.through.objects.bulk_create(user_groups)
+
+        cls.bronco_nets = ['bulk_user_{0}'.format(index) for index in range(cls.user_count)]
+
+    def get_user_state(self):
+        """
+        Returns current synced values for all generated users.
+        """
+        return (
+            list(models.User.objects.filter(username__in=self.bronco_nets).order_by('username').values_list(
+                'username', 'first_name', 'last_name', 'email', 'is_active', 'is_staff',
+            )),
+            list(models.WmuUser.objects.filter(bronco_net__in=self.bronco_nets).order_by('bronco_net').values_list(
+                'bronco_net', 'winno', 'first_name', 'last_name', 'official_email', 'is_active',
+            )),
+            list(models.UserIntermediary.objects.filter(
+                bronco_net__in=self.bronco_nets,
+            ).order_by('bronco_net').values_list(
+                'bronco_net', 'winno', 'first_name', 'last_name',
+            )),
+            list(models.User.groups.through.objects.filter(
+                user__username__in=self.bronco_nets,
+            ).order_by('user__username', 'group__name').values_list(
+                'user__username', 'group__name',
+            )),
+            list(models.GroupMembership.objects.filter(
+                user__username__in=self.bronco_nets,
+            ).order_by('user__username', 'group__name', 'date_left').values_list(
+                'user__username', 'group__name', 'date_joined', 'date_left',
+            )),
+        )
+
+    def test_bulk_parity(self):
+        """
+        Tests that bulk sync results match syncing each user individually.
+        """
+        original_state = self.get_user_state()
+
+        # Sync each user individually, then undo changes.
+        # Commit callbacks are run, so that saves sync same as when committed.
+        savepoint = transaction.savepoint()
+        with self.captureOnCommitCallbacks(execute=True):
+            for bronco_net in self.bronco_nets:
+                user_sync.compare_user_and_wmuuser_models(bronco_net)
+        expected_state = self.get_user_state()
+        transaction.savepoint_rollback(savepoint)
+
+        # Verify generated users actually needed syncing.
+        self.assertEqual(self.get_user_state(), original_state)
+        self.assertNotEqual(expected_state, original_state)
+
+        # Sync all users in bulk.
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                updated_bronco_nets = bulk_compare_user_and_wmuuser_models(self.bronco_nets)
+
+        # GroupMemberships are updated for all users in a batch at once, rather than per user.
+        reconcile_callbacks = [
+            callback for callback in callbacks if getattr(callback, 'func', None) is reconcile_group_memberships
+        ]
+        self.assertEqual(len(reconcile_callbacks), self.user_count // 1000)
+
+        self.assertGreater(len(updated_bronco_nets), 0)
+        for expected, actual in zip(expected_state, self.get_user_state()):
+            self.assertEqual(expected, actual)
+
+        # Verify bulk sync doesn't query per user.
+        self.assertLess(len(queries), self.user_count)
@@ -4,6 +4,7 @@ CAE Home app testing Utility Functions and Classes.
 
 # System Imports.
 import re, sys, time
+from contextlib import contextmanager
 from channels.testing import ChannelsLiveServerTestCase
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -23,6 +24,7 @@ from urllib.parse import ParseResult, urlparse
 # User Imports.
 from cae_home.management.commands.fixtures.user import create_site_themes
 from cae_home.management.commands.seeders.user import create_groups, create_permission_group_users
+from cae_home.user_factory import UserFactory
 from workspace import logging as init_logging
 
 
@@ -265,12 +267,26 @@ class AbstractTestHelper():
 
     # endregion Debug Util Functions
 
+    @classmethod
+    @contextmanager
+    def run_commit_callbacks(cls):
+        """
+        Runs transaction commit callbacks (such as user model sync) registered within block, as if committed.
+        TestCase never commits, so these otherwise never run. Other test classes commit as normal.
+        """
+        if hasattr(cls, 'captureOnCommitCallbacks'):
+            with cls.captureOnCommitCallbacks(execute=True):
+                yield
+        else:
+            yield
+
     def create_default_users_and_groups(self, password=default_password):
         """
         Create expected/default groups and dummy users to associate with them.
         """
-        create_groups()
-        create_permission_group_users(password=password, with_names=False)
+        with self.run_commit_callbacks():
+            create_groups()
+            create_permission_group_users(password=password, with_names=False)
 
     def create_user(self, username, password=default_password, permissions=None, groups=None):
         """
@@ -281,8 +297,13 @@ class AbstractTestHelper():
         :param groups: Optional permission groups to add.
         :return: Instance of created user.
         """
-        # Create user.
-        user = get_user_model().objects.create_user(username=username, password=password)
+        # Check for optional groups.
+        if groups and not isinstance(groups, list) and not isinstance(groups, tuple):
+            groups = [groups]
+
+        # Create user, along with all associated user models.
+        with self.run_commit_callbacks():
+            user = UserFactory().create(username, user={}, password=password, groups=groups or ()).user
         user.password_string = password
 
         # Check for optional permissions.
@@ -293,14 +314,6 @@ class AbstractTestHelper():
             else:
                 self.add_user_permission(permissions, user)
 
-        # Check for optional groups.
-        if groups:
-            if isinstance(groups, list) or isinstance(groups, tuple):
-                for group in groups:
-                    self.add_user_group(group, user)
-            else:
-                self.add_user_group(groups, user)
-
         return user
 
     def get_user(self, user, password=default_password):
@@ -394,7 +407,8 @@ class AbstractTestHelper():
                 raise Group.DoesNotExist('Group matching "{0}" was not found.'.format(user_group))
 
         # If we made it this far, then valid Group acquired. Add to User.
-        self.get_user(user).groups.add(group)
+        with self.run_commit_callbacks():
+            self.get_user(user).groups.add(group)
 
     def _handle_test_error(self, err):
         """
@@ -0,0 +1,183 @@
+"""
+Request "user context" logic for CAE Home app.
+
+Gathers all the user-related values that the CAE Home middleware needs on every authenticated page
+(UserIntermediary > Profile > SiteTheme, plus user Group names) into a single object.
+
+The object is loaded with one select_related query (plus one for Group names), then cached across requests.
+Cached values are invalidated by signals whenever the profile, site theme, or group membership changes. Changes made
+within a transaction are invalidated again once committed, so that values read before commit are never held under the
+new version.
+
+Group names are also shared with all group checks, through get_group_names().
+(See "cae_home/signals.py" for the associated signal handlers.)
+"""
+
+# System Imports.
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.models import Group
+from django.db import transaction
+
+# User Imports.
+from cae_home import models
+
+
+# Cache key values.
+CACHE_KEY_PREFIX = 'cae_home.user_context'
+GLOBAL_VERSION_KEY = '{0}.version'.format(CACHE_KEY_PREFIX)
+
+
+class UserContext:
+    """
+    Holds all cached, user-specific values needed to render a page for an authenticated user.
+    """
+    def __init__(self, user_id, profile, group_names, version):
+        self.user_id = user_id
+        self.profile = profile
+        self.group_names = frozenset(group_names)
+        self.version = version
+
+    @property
+    def site_theme(self):
+        return self.profile.site_theme
+
+    @property
+    def is_cae_user(self):
+        """
+        Determines if user is CAE Center user.
+        """
+        return not self.group_names.isdisjoint(settings.CAE_CENTER_GROUPS)
+
+
+def get_user_context(request):
+    """
+    Returns the UserContext for the authenticated user of the given request.
+    First attempts to pull from cache. On failure, loads from database and caches the result.
+    :param request: Django request object, with an authenticated user.
+    :return: UserContext instance for request user.
+    """
+    # Check if already loaded for this request.
+    user_context = getattr(request, '_cae_user_context', None)
+    if user_context is not None:
+        return user_context
+
+    user = request.user
+    context_key = _get_context_key(request)
+    user_version_key = _get_user_version_key(user.pk)
+
+    # Pull all related cache values in one round trip.
+    cached_values = cache.get_many([context_key, user_version_key, GLOBAL_VERSION_KEY])
+    version = (
+        _get_or_create_version(GLOBAL_VERSION_KEY, cached_values),
+        _get_or_create_version(user_version_key, cached_values),
+    )
+
+    # Check that cached value exists and is still valid.
+    user_context = cached_values.get(context_key, None)
+    if user_context is None or user_context.version != version or user_context.user_id != user.pk:
+        # Not cached or invalidated. Load fresh from database.
+        user_context = load_user_context(user, version)
+        cache.set(context_key, user_context, settings.USER_CONTEXT_CACHE_TIMEOUT)
+
+    request._cae_user_context = user_context
+
+    # Share Group names with all other group checks for request user. See get_group_names().
+    request.user._cae_group_names = user_context.group_names
+
+    return user_context
+
+
+def get_group_names(user, request=None):
+    """
+    Returns Group names for the given user. Shared by all group checks (decorators, template tags, views).
+    For the request user, names come from the cached UserContext. Other users are loaded once per model instance.
+    :param user: (Login) User model instance, or AnonymousUser.
+    :param request: Optional Django request object. Allows loading the request user's names from cache, if not already.
+    :return: Frozenset of Group names.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    group_names = getattr(user, '_cae_group_names', None)
+    if group_names is None:
+        if request is not None and request.user.pk == user.pk:
+            group_names = get_user_context(request).group_names
+        else:
+            group_names = frozenset(Group.objects.filter(user=user).values_list('name', flat=True))
+            user._cae_group_names = group_names
+    return group_names
+
+
+def load_user_context(user, version=None):
+    """
+    Loads user context values from database.
+    Pulls UserIntermediary > Profile > SiteTheme in one query, and User Group names in a second query.
+    :param user: (Login) User model instance.
+    :param version: Cache version tuple to associate with context.
+    :return: UserContext instance for user.
+    """
+    user_intermediary = models.UserIntermediary.objects.select_related('profile__site_theme').get(user=user)
+    group_names = Group.objects.filter(user=user).values_list('name', flat=True)
+
+    return UserContext(user.pk, user_intermediary.profile, group_names, version)
+
+
+def invalidate_user_context(user_id):
+    """
+    Invalidates cached user context for a single user.
+    :param user_id: Pk of (login) User model to invalidate.
+    """
+    _invalidate_version(_get_user_version_key(user_id))
+
+
+def invalidate_all_user_contexts():
+    """
+    Invalidates cached user context for all users.
+    Used for changes that potentially affect many users at once, such as a SiteTheme or Group update.
+    """
+    _invalidate_version(GLOBAL_VERSION_KEY)
+
+
+def _invalidate_version(key):
+    """
+    Sets new version value for key, invalidating all contexts cached under the old one.
+    """
+    cache.set(key, uuid.uuid4().hex, None)
+
+    # Within a transaction, other requests may load old values before commit, and cache them under the new version.
+    # Invalidate again once committed.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, None))
+
+
+def _get_context_key(request):
+    """
+    Context is cached per user session.
+    Prevents stale values if a user pk is ever reused (such as between UnitTests).
+    """
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    return '{0}.{1}.{2}'.format(CACHE_KEY_PREFIX, request.user.pk, session_key)
+
+
+def _get_user_version_key(user_id):
+    return '{0}.version.{1}'.format(CACHE_KEY_PREFIX, user_id)
+
+
+def _get_or_create_version(key, cached_values):
+    """
+    Gets version value for key. If missing (never set or evicted), then a new version is generated.
+    Generating on eviction guarantees any previously cached contexts for key are treated as invalid.
+    """
+    version = cached_values.get(key, None)
+    if version is None:
+        new_version = uuid.uuid4().hex
+        cache.add(key, new_version, None)
+
+        # Use value of whichever process set version first.
+        # If key was evicted again in the meantime, the local version is still guaranteed to be unused.
+        version = cache.get(key)
+        if version is None:
+            version = new_version
+    return version
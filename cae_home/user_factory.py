@@ -0,0 +1,311 @@
+"""
+User model creation logic for CAE Home app.
+
+Creating a (login) User or WmuUser model normally triggers a chain of model save signals, which create the associated
+UserIntermediary and Profile models, then sync all user models together. Each step is saved (and validated)
+individually, so creating a single user takes dozens of queries.
+
+The UserFactory instead builds all associated user models in memory, syncs their values, then inserts them in bulk,
+within a single transaction. Model save signals are not triggered.
+"""
+
+# System Imports.
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from os import devnull
+
+# User Imports.
+from cae_home import models, reference_data, site_context
+from cae_home.models.user import (
+    bulk_compare_user_and_wmuuser_models,
+    handle_grad_apps_membership,
+    reconcile_group_memberships,
+    sync_user_model_values,
+)
+
+
+def get_default_site_theme():
+    """
+    Returns default site theme, for new user profiles.
+    If site themes have not been loaded yet (such as in UnitTests), then loads them first.
+    """
+    try:
+        return reference_data.get(models.SiteTheme, slug='wmu')
+    except ObjectDoesNotExist:
+        # Failed to get theme. Likely a unit test. Run site_theme fixtures and attempt again.
+        with open(devnull, 'a') as null:
+            call_command('loaddata', 'production_models/site_themes', stdout=null)
+        return reference_data.get(models.SiteTheme, slug='wmu')
+
+
+class UserFactory:
+    """
+    Creates full sets of user models for BroncoNets. Each set is a (login) User and/or WmuUser model, plus the
+    associated UserIntermediary and Profile models. Optionally also creates GroupMembership models.
+
+    Users are provided as dictionaries of:
+        * bronco_net - BroncoNet of user.
+        * user - Optional dictionary of (login) User field values. If provided, then a (login) User is created.
+        * wmu_user - Optional dictionary of WmuUser field values. If provided, then a WmuUser is created.
+        * user_intermediary - Optional dictionary of UserIntermediary field values.
+        * password - Optional password for (login) User. If not provided, then User has no usable password.
+        * groups - Optional list of Group models or names to add (login) User to.
+
+    If a BroncoNet already has a UserIntermediary, then new models are attached to it instead.
+    """
+    def __init__(self, site_theme=None, create_group_memberships=False):
+        """
+        :param site_theme: Optional SiteTheme for new user profiles. Defaults to "wmu" theme.
+        :param create_group_memberships: Boolean indicating if GroupMembership models should also be created.
+        """
+        self.site_theme = site_theme
+        self.create_group_memberships = create_group_memberships
+
+    def create(self, bronco_net, user=None, wmu_user=None, user_intermediary=None, password=None, groups=()):
+        """
+        Creates user models for a single BroncoNet. See class docstring for parameters.
+        :return: UserIntermediary model, with associated models accessible through it.
+        """
+        return self.bulk_create([{
+            'bronco_net': bronco_net,
+            'user': user,
+            'wmu_user': wmu_user,
+            'user_intermediary': user_intermediary,
+            'password': password,
+            'groups': groups,
+        }])[0]
+
+    def bulk_create(self, user_list, batch_size=1000):
+        """
+        Creates user models for many BroncoNets at once. See class docstring for values.
+        :param user_list: List of user dictionaries.
+        :param batch_size: Number of models to insert per query.
+        :return: List of UserIntermediary models, in same order as provided users.
+        """
+        user_list = list(user_list)
+        bronco_nets = [user_values['bronco_net'] for user_values in user_list]
+        if len(set(bronco_nets)) != len(bronco_nets):
+            raise ValidationError('Provided users contain duplicate BroncoNets.')
+
+        # Resolve shared values up front, outside of transaction.
+        site_theme = self.site_theme or get_default_site_theme()
+        groups = self._get_groups(user_list)
+        last_ldap_check = timezone.now() - timezone.timedelta(days=365)
+
+        with transaction.atomic():
+            existing_intermediaries = {
+                user_intermediary.bronco_net: user_intermediary
+                for user_intermediary in models.UserIntermediary.objects.filter(bronco_net__in=bronco_nets)
+            }
+
+            # Build all models in memory.
+            user_intermediaries = []
+            new_intermediaries = []
+            attached_intermediaries = []
+            new_users = []
+            new_wmu_users = []
+            new_profiles = []
+            user_groups = []
+            for user_values in user_list:
+                bronco_net = user_values['bronco_net']
+                user_intermediary = existing_intermediaries.get(bronco_net, None)
+                user_model = self._build_user(user_values)
+                wmu_user_model = self._build_wmu_user(user_values)
+
+                # Check that at least one of either "User" or "WmuUser" is provided.
+                if user_model is None and wmu_user_model is None:
+                    raise ValidationError('Must provide either "User" or "WmuUser" values for {0}.'.format(
+                        bronco_net,
+                    ))
+
+                if user_intermediary is None:
+                    # New user. Build full set of models, then sync their values same as model save signals would.
+                    profile = models.Profile(site_theme=site_theme)
+                    user_intermediary = models.UserIntermediary(
+                        user=user_model,
+                        wmu_user=wmu_user_model,
+                        profile=profile,
+                        bronco_net=bronco_net,
+                        slug=slugify(bronco_net),
+                        winno=bronco_net,
+                        last_ldap_check=last_ldap_check,
+                        **(user_values.get('user_intermediary', None) or {}),
+                    )
+                    user_intermediary.full_clean(validate_unique=False)
+                    group_names = [group.name for group in self._get_user_groups(user_values, groups)]
+                    sync_user_model_values(user_intermediary, user_model, wmu_user_model, group_names)
+
+                    new_profiles.append(profile)
+                    new_intermediaries.append(user_intermediary)
+                else:
+                    # Existing user. Attach new models to existing UserIntermediary.
+                    if user_model is not None:
+                        if user_intermediary.user_id is not None:
+                            raise ValidationError('User Intermediary model already has associated User model.')
+                        user_intermediary.user = user_model
+                    if wmu_user_model is not None:
+                        if user_intermediary.wmu_user_id is not None:
+                            raise ValidationError('User Intermediary model already has associated WmuUser model.')
+                        user_intermediary.wmu_user = wmu_user_model
+                    attached_intermediaries.append(user_intermediary)
+
+                if user_model is not None:
+                    new_users.append(user_model)
+
+                    # Inactive (login) Users should not have any Auth Group relations.
+                    if user_model.is_active:
+                        user_groups += [(user_model, group) for group in self._get_user_groups(user_values, groups)]
+                if wmu_user_model is not None:
+                    new_wmu_users.append(wmu_user_model)
+                user_intermediaries.append(user_intermediary)
+
+            # Insert all models. Related models are inserted first, so that their pks can be referenced.
+            self._insert(models.User, new_users, 'username', batch_size)
+            self._insert(models.WmuUser, new_wmu_users, 'bronco_net', batch_size)
+            if connection.features.can_return_rows_from_bulk_insert:
+                models.Profile.objects.bulk_create(new_profiles, batch_size=batch_size)
+            else:
+                # Database does not provide new pks on bulk insert, and Profiles have no unique value to look up by.
+                for profile in new_profiles:
+                    profile.save()
+            self._insert(models.UserIntermediary, new_intermediaries, 'bronco_net', batch_size)
+            models.User.groups.through.objects.bulk_create([
+                models.User.groups.through(user_id=user_model.pk, group_id=group.pk)
+                for user_model, group in user_groups
+            ], batch_size=batch_size)
+
+            # Snapshot saved values, so that later saves only write actual changes.
+            for model in new_users + new_wmu_users + new_intermediaries:
+                model._set_tracked_values()
+
+            # Link newly attached models, then sync existing users with them.
+            if attached_intermediaries:
+                for user_intermediary in attached_intermediaries:
+                    user_intermediary.user_id = getattr(user_intermediary.user, 'pk', None)
+                    user_intermediary.wmu_user_id = getattr(user_intermediary.wmu_user, 'pk', None)
+                models.UserIntermediary.objects.bulk_update(
+                    attached_intermediaries,
+                    ['user', 'wmu_user'],
+                    batch_size=batch_size,
+                )
+                bulk_compare_user_and_wmuuser_models(
+                    [user_intermediary.bronco_net for user_intermediary in attached_intermediaries],
+                    batch_size=batch_size,
+                )
+
+                # Sync bypasses above instances. Reload them with their synced values.
+                attached_intermediaries = {
+                    user_intermediary.bronco_net: user_intermediary
+                    for user_intermediary in models.UserIntermediary.objects.filter(
+                        bronco_net__in=[user_intermediary.bronco_net for user_intermediary in attached_intermediaries],
+                    ).select_related('user', 'wmu_user')
+                }
+                user_intermediaries = [
+                    attached_intermediaries.get(user_intermediary.bronco_net, user_intermediary)
+                    for user_intermediary in user_intermediaries
+                ]
+
+            # Handle logic that would normally run from model save signals.
+            self._handle_projects(new_intermediaries)
+            if self.create_group_memberships and user_groups:
+                reconcile_group_memberships(models.User.objects.filter(pk__in=[user.pk for user in new_users]))
+
+        if new_wmu_users:
+            site_context.invalidate('cae_prog_email')
+
+        return user_intermediaries
+
+    def _handle_projects(self, user_intermediaries):
+        """
+        Runs project-specific user logic for newly created users, same as user model sync would.
+        """
+        for user_intermediary in user_intermediaries:
+            # Handle for potential GradApps membership.
+            if 'grad_applications' in settings.INSTALLED_CAE_PROJECTS:
+                handle_grad_apps_membership(user_intermediary)
+
+            # Handle if SuccessCtr is installed.
+            if 'success_center' in settings.INSTALLED_CAE_PROJECTS:
+                # SuccessCtr project is present.
+                from apps.Success_Center.success_center_core import models as success_ctr_models
+
+                # Verify that active (Login)User has an associated "SuccessCtr Profile" model.
+                if user_intermediary.user is not None and user_intermediary.user.is_active:
+                    success_ctr_models.SuccessCtrProfile.objects.get_or_create(profile_id=user_intermediary.profile_id)
+
+    def _build_user(self, user_values):
+        """
+        Builds (login) User model from user values, or None if no User values were provided.
+        """
+        field_values = user_values.get('user', None)
+        if field_values is None:
+            return None
+
+        user_model = models.User(username=user_values['bronco_net'], **field_values)
+        user_model.email = models.User.objects.normalize_email(user_model.email)
+        if user_values.get('password', None) is not None:
+            user_model.set_password(user_values['password'])
+        else:
+            user_model.set_unusable_password()
+
+        # Uniqueness is validated by the database on insert.
+        user_model.full_clean(validate_unique=False)
+        return user_model
+
+    def _build_wmu_user(self, user_values):
+        """
+        Builds WmuUser model from user values, or None if no WmuUser values were provided.
+        """
+        field_values = user_values.get('wmu_user', None)
+        if field_values is None:
+            return None
+
+        wmu_user_model = models.WmuUser(bronco_net=user_values['bronco_net'], **field_values)
+
+        # Uniqueness is validated by the database on insert.
+        wmu_user_model.full_clean(validate_unique=False)
+        return wmu_user_model
+
+    def _get_groups(self, user_list):
+        """
+        Loads all Group models referenced by name, in a single query.
+        :return: Dictionary of {group name: Group model}.
+        """
+        group_names = set()
+        for user_values in user_list:
+            for group in user_values.get('groups', None) or ():
+                if not isinstance(group, Group):
+                    group_names.add(group)
+
+        groups = {group.name: group for group in Group.objects.filter(name__in=group_names)}
+        missing_names = group_names - set(groups)
+        if missing_names:
+            raise ValidationError('Could not find groups: {0}'.format(', '.join(sorted(missing_names))))
+        return groups
+
+    def _get_user_groups(self, user_values, groups):
+        """
+        Returns list of Group models for user values.
+        """
+        return [
+            group if isinstance(group, Group) else groups[group]
+            for group in user_values.get('groups', None) or ()
+        ]
+
+    def _insert(self, model, instances, unique_field, batch_size):
+        """
+        Inserts models in bulk, making sure each has its new pk set afterwards.
+        """
+        model.objects.bulk_create(instances, batch_size=batch_size)
+        if instances and not connection.features.can_return_rows_from_bulk_insert:
+            # Database does not provide new pks on bulk insert. Look them up by unique field instead.
+            pks = dict(model.objects.filter(
+                **{'{0}__in'.format(unique_field): [getattr(instance, unique_field) for instance in instances]}
+            ).values_list(unique_field, 'pk'))
+            for instance in instances:
+                instance.pk = pks[getattr(instance, unique_field)]
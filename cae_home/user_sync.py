@@ -0,0 +1,198 @@
+"""
+User model sync logic for CAE Home app.
+
+Keeps the three user model types ((login) User, UserIntermediary, and WmuUser) in sync, as they're saved.
+
+Rather than syncing on every single save, saved users are marked as "dirty". Each dirty user is then synced exactly
+once, either on transaction commit or (when not in a transaction) once the outermost save finishes.
+Within a transaction, the batch is flushed by a transaction.on_commit() callback, which resets batch state once run.
+On rollback, Django never runs the callback. Django also gives no way to check if a transaction was rolled back, so a
+callback is registered once per outermost save (or deferred() block) that marks users, rather than once per batch.
+Duplicate callbacks do nothing, as a batch only flushes once. Wrap bulk changes in deferred() for a single callback.
+Within UnitTests, use captureOnCommitCallbacks(execute=True) to sync changes made in a TestCase.
+Saves made by the sync logic itself are ignored, so syncing never recurses.
+Saves which don't change any of the model's SYNC_FIELDS are also ignored, as there's nothing new to sync.
+(See "cae_home/signals.py" for the associated signal handlers.)
+"""
+
+# System Imports.
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from django.db import transaction
+
+# User Imports.
+from cae_home import models
+from cae_home.models.user import compare_user_and_wmuuser_models, check_user_group_membership
+
+
+# Sync state for current context (thread or async task).
+_state = ContextVar('cae_home_user_sync_state', default=None)
+
+
+class UserSyncBatch:
+    """
+    Set of users to sync together, in order they were marked.
+    """
+    def __init__(self):
+        # Dictionary of {bronco_net: check_group_membership}.
+        self.users = {}
+        self.is_flushed = False
+        self.is_waiting_on_commit = False
+
+        # If users were marked since the last commit callback was registered.
+        self.has_new_marks = False
+
+    def add(self, bronco_net, check_group_membership=False):
+        self.users[bronco_net] = self.users.get(bronco_net, False) or check_group_membership
+        self.has_new_marks = True
+
+    def flush_on_commit(self):
+        """
+        Registers batch to flush on commit of current transaction. Only registers if users were marked since last call.
+        If an earlier transaction registered the batch but was rolled back, its users are then synced with this one.
+        """
+        if self.has_new_marks:
+            self.has_new_marks = False
+            self.is_waiting_on_commit = True
+            transaction.on_commit(self.flush)
+
+    def is_discarded(self):
+        """
+        Determines if batch was waiting on a transaction commit, but the transaction was rolled back instead.
+        Commit callbacks run as soon as the outermost transaction commits. So a batch that is still waiting once no
+        longer in a transaction will never flush.
+        :return: True if batch was rolled back | False otherwise.
+        """
+        return (
+            self.is_waiting_on_commit
+            and not self.is_flushed
+            and not transaction.get_connection().in_atomic_block
+        )
+
+    def flush(self):
+        """
+        Syncs all users in batch. Only runs once per batch, regardless of how many times it's called.
+        """
+        if self.is_flushed:
+            return
+        self.is_flushed = True
+
+        state = _get_state()
+        if state.batch is self:
+            state.batch = None
+
+        state.is_syncing = True
+        try:
+            for bronco_net, check_group_membership in self.users.items():
+                try:
+                    compare_user_and_wmuuser_models(bronco_net)
+                except models.UserIntermediary.DoesNotExist:
+                    # User was deleted (or creation was rolled back) since being marked. Nothing to sync.
+                    continue
+
+                # Run logic to update group membership dates.
+                # Note that we have to wait for the full transaction to complete, as per:
+                # https://stackoverflow.com/questions/1925383/issue-with-manytomany-relationships-not-updating-immediately-after-save
+                # https://stackoverflow.com/questions/950214/run-code-after-transaction-commit-in-django
+                if check_group_membership:
+                    transaction.on_commit(partial(check_user_group_membership, bronco_net))
+        finally:
+            state.is_syncing = False
+
+
+class _UserSyncState:
+    """
+    Per-context sync state.
+    """
+    def __init__(self):
+        self.batch = None
+        self.depth = 0
+        self.is_syncing = False
+
+
+def _get_state():
+    state = _state.get()
+    if state is None:
+        state = _UserSyncState()
+        _state.set(state)
+
+    # Drop batches whose transaction was rolled back, so they aren't flushed by some later, unrelated save.
+    if state.batch is not None and state.batch.is_discarded():
+        state.batch = None
+
+    return state
+
+
+def is_syncing():
+    """
+    Determines if sync logic is currently running. Used to ignore saves made by sync logic itself.
+    :return: True if currently syncing | False otherwise.
+    """
+    return _get_state().is_syncing
+
+
+def has_sync_changes(instance, created, update_fields):
+    """
+    Determines if a user model save changed any values which need syncing to the other user models.
+    :param instance: Saved user model instance. Model's SYNC_FIELDS define which fields are synced.
+    :param created: Boolean indicating if model was created by save.
+    :param update_fields: Set of field names written by save, as provided by post_save signal. None for full saves.
+    :return: True if save needs syncing | False otherwise.
+    """
+    if created or update_fields is None:
+        return True
+    return not update_fields.isdisjoint(instance.SYNC_FIELDS)
+
+
+def mark_dirty(bronco_net, check_group_membership=False):
+    """
+    Marks user as needing sync.
+    :param bronco_net: BroncoNet of user to sync.
+    :param check_group_membership: Boolean indicating if GroupMembership models should also be updated after sync.
+    """
+    state = _get_state()
+    if state.batch is None:
+        state.batch = UserSyncBatch()
+    state.batch.add(bronco_net, check_group_membership=check_group_membership)
+
+    if state.depth == 0:
+        if transaction.get_connection().in_atomic_block:
+            # Sync once transaction is committed.
+            state.batch.flush_on_commit()
+        else:
+            # Not within a transaction or deferred() block. Sync immediately.
+            state.batch.flush()
+
+
+@contextmanager
+def deferred():
+    """
+    Defers syncing of any users marked within block, until the outermost deferred() block exits.
+    Used by signal handlers, so that saving one user model (and its related models) results in a single sync.
+    Can also be used to group bulk user model changes.
+    """
+    state = _get_state()
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+
+    if state.depth == 0 and state.batch is not None:
+        if transaction.get_connection().in_atomic_block:
+            # Sync once transaction is committed.
+            state.batch.flush_on_commit()
+        elif not state.batch.is_waiting_on_commit:
+            # Batches waiting on a transaction commit are left for the commit callback.
+            state.batch.flush()
+
+
+def flush():
+    """
+    Immediately syncs all currently marked users, regardless of transaction state.
+    """
+    state = _get_state()
+    if state.batch is not None:
+        state.batch.flush()
+
@@ -10,6 +10,7 @@ from django.template.response import TemplateResponse
 
 # User Imports.
 from cae_home import forms
+from cae_home.user_context import get_group_names
 from workspace import logging as init_logging
 
 
@@ -48,7 +49,7 @@ def login_redirect(request):
     if not request.user.is_authenticated:
         return redirect('cae_home:login')
     else:
-        user_groups = request.user.groups.values_list('name', flat=True)
+        user_groups = get_group_names(request.user, request)
 
         # Check if programmer and development mode.
         if settings.DEV_URLS:
@@ -100,7 +101,7 @@ def logout(request):
     if not request.user.is_authenticated:
         return redirect('cae_home:login')
     else:
-        user_groups = request.user.groups.values_list('name', flat=True)
+        user_groups = get_group_names(request.user, request)
 
         # Fallback url.
         logout_redirect_url = redirect('cae_home:login')
@@ -16,8 +16,9 @@ from django.urls import reverse, reverse_lazy
 from django.views.generic.base import TemplateView
 
 # User Imports.
-from cae_home import forms, models
+from cae_home import forms, models, user_sync
 from cae_home.decorators import group_required
+from cae_home.user_context import get_group_names
 from cae_home.utils import get_or_create_login_user_model
 from workspace import logging as init_logging
 
@@ -35,7 +36,7 @@ class UserDetails(TemplateView, LoginRequiredMixin):
         # Grab variables.
         current_user = self.request.user
         user_profile = current_user.profile
-        user_groups = current_user.groups.all().values_list('name', flat=True)
+        user_groups = sorted(get_group_names(current_user, self.request))
         # Check if user has one or more of "CAE admin groups". If so, display additional links.
         is_cae_admin = False
         for group in settings.CAE_ADMIN_GROUPS:
@@ -118,25 +119,27 @@ def manage_user_access_groups(request):
         if valid_forms:
             # All forms came back as valid. Save.
 
-            # First clear out any existing groups for user.
-            user.groups.clear()
-
-            # Get groups provided by forms.
-            for form in form_list:
-                if form.name == 'CaeManagementForm':
-                    cae_groups = form.cleaned_data['cae_groups']
-                elif form.name == 'GradAppsManagementForm':
-                    grad_apps_groups = form.cleaned_data['grad_apps_groups']
-                elif form.name == 'SuccessCtrManagementForm':
-                    success_ctr_groups = form.cleaned_data['success_ctr_groups']
-
-            # Add groups for each set.
-            for cae_group in cae_groups:
-                user.groups.add(Group.objects.get(name=cae_group))
-            for grad_apps_group in grad_apps_groups:
-                user.groups.add(Group.objects.get(name=grad_apps_group))
-            for success_ctr_group in success_ctr_groups:
-                user.groups.add(Group.objects.get(name=success_ctr_group))
+            # Group changes trigger user model sync. Defer until all changes are made, so user only syncs once.
+            with user_sync.deferred():
+                # First clear out any existing groups for user.
+                user.groups.clear()
+
+                # Get groups provided by forms.
+                for form in form_list:
+                    if form.name == 'CaeManagementForm':
+                        cae_groups = form.cleaned_data['cae_groups']
+                    elif form.name == 'GradAppsManagementForm':
+                        grad_apps_groups = form.cleaned_data['grad_apps_groups']
+                    elif form.name == 'SuccessCtrManagementForm':
+                        success_ctr_groups = form.cleaned_data['success_ctr_groups']
+
+                # Add groups for each set.
+                for cae_group in cae_groups:
+                    user.groups.add(Group.objects.get(name=cae_group))
+                for grad_apps_group in grad_apps_groups:
+                    user.groups.add(Group.objects.get(name=grad_apps_group))
+                for success_ctr_group in success_ctr_groups:
+                    user.groups.add(Group.objects.get(name=success_ctr_group))
 
             # Save updated state.
             user.save()
@@ -173,7 +176,7 @@ def user_edit(request):
     user = user_intermediary.user
     user_profile = user_intermediary.profile
     address = user_profile.address
-    user_groups = request.user.groups.values_list('name', flat=True)
+    user_groups = get_group_names(request.user, request)
 
     form_list = []
     form = forms.UserModelForm(instance=user)
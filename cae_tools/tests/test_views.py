@@ -3,12 +3,14 @@ Tests for CAE Tools app.
 """
 
 # System Imports.
-import unittest
+import threading, time, unittest
 from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 # User Imports.
 from cae_home.tests.utils import IntegrationTestCase
+from cae_tools.views.ldap import get_directory_executor, search_directories
 from workspace.tests.utils import run_ldap_tests
 
 
@@ -21,6 +23,71 @@ CAE_CENTER_PADL_USERS = [
 ]
 
 
+class StubLdapBackend:
+    """
+    Stand-in for an LDAP Auth backend, with controllable response.
+    """
+    def __init__(self, user_info=None, error=None, release_event=None):
+        self.user_info = user_info
+        self.error = error
+        self.release_event = release_event
+
+    def get_ldap_user_info(self, search_value, search_by=None):
+        # Simulate an unresponsive server, until test releases it.
+        if self.release_event is not None:
+            self.release_event.wait(timeout=10)
+        if self.error is not None:
+            raise self.error
+        return self.user_info
+
+
+@override_settings(LDAP_UTILITY_TIMEOUT=0.5, LDAP_UTILITY_THREADS_PER_DIRECTORY=1)
+class SearchDirectoriesTests(TestCase):
+    """
+    Tests to ensure PADL utility directory searches handle slow and failing directories.
+    """
+    def test_search_directories(self):
+        release_event = threading.Event()
+        self.addCleanup(release_event.set)
+        backends = {
+            'Stub Fast': StubLdapBackend(user_info={'uid': ['test_user']}),
+            'Stub Slow': StubLdapBackend(user_info={'uid': ['test_user']}, release_event=release_event),
+            'Stub Error': StubLdapBackend(error=ValueError('Test error.')),
+        }
+
+        with self.subTest('Partial results'):
+            results, timed_out_directories, errored_directories = search_directories(backends, 'test_user')
+            self.assertEqual(results, {'Stub Fast': {'uid': ['test_user']}, 'Stub Slow': None, 'Stub Error': None})
+            self.assertEqual(timed_out_directories, ['Stub Slow'])
+            self.assertEqual(errored_directories, ['Stub Error'])
+
+        with self.subTest('Directory with hung searches'):
+            # Only thread for directory is still stuck. Search should be reported immediately, rather than queued.
+            start_time = time.monotonic()
+            results, timed_out_directories, errored_directories = search_directories(
+                {'Stub Slow': backends['Stub Slow']},
+                'test_user',
+            )
+            self.assertLess(time.monotonic() - start_time, 0.5)
+            self.assertEqual(results, {'Stub Slow': None})
+            self.assertEqual(timed_out_directories, ['Stub Slow'])
+            self.assertEqual(errored_directories, [])
+
+        with self.subTest('Directory recovered'):
+            # Wait for hung search to finish and free its thread.
+            release_event.set()
+            executor, slots = get_directory_executor('Stub Slow')
+            executor.submit(lambda: None).result()
+
+            results, timed_out_directories, errored_directories = search_directories(
+                {'Stub Slow': backends['Stub Slow']},
+                'test_user',
+            )
+            self.assertEqual(results, {'Stub Slow': {'uid': ['test_user']}})
+            self.assertEqual(timed_out_directories, [])
+            self.assertEqual(errored_directories, [])
+
+
 @unittest.skipUnless(run_ldap_tests(), 'Missing criteria for LDAP. Skipping Ldap tests.')
 class LdapUtilityTests(IntegrationTestCase):
     """
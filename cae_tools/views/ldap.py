@@ -1,7 +1,7 @@
 """"""
 
 # System Imports.
-import random
+import concurrent.futures, random, threading, time
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.template.response import TemplateResponse
@@ -18,9 +18,48 @@ from workspace.ldap_backends.wmu_auth.cae_backend import CaeAuthBackend
 from workspace.ldap_backends.wmu_auth.adv_backend import AdvisingAuthBackend
 from workspace.ldap_backends.wmu_auth.wmu_backend import WmuAuthBackend
 from workspace.ldap_backends import simple_ldap_lib
+from workspace import logging as init_logging
 from workspace.settings.reusable_settings import CAE_CENTER_GROUPS
 
 
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+
+# Dedicated threads for each LDAP directory, so that searches stuck on one directory never hold up the others.
+# Threads cannot be stopped once a search starts, so each directory is also limited to its number of threads. Further
+# searches of a directory with no free threads are reported as unresponsive immediately, rather than queuing up behind.
+_directory_executors = {}
+_directory_slots = {}
+_directory_lock = threading.Lock()
+
+
+def get_directory_executor(name):
+    """
+    Gets thread pool for searching the given LDAP directory, creating it on first use.
+    :param name: Name of LDAP directory.
+    :return: Tuple of (ThreadPoolExecutor, BoundedSemaphore of free threads).
+    """
+    with _directory_lock:
+        if name not in _directory_executors:
+            _directory_executors[name] = concurrent.futures.ThreadPoolExecutor(
+                max_workers=settings.LDAP_UTILITY_THREADS_PER_DIRECTORY,
+                thread_name_prefix='ldap_utility_{0}'.format(name.lower()),
+            )
+            _directory_slots[name] = threading.BoundedSemaphore(settings.LDAP_UTILITY_THREADS_PER_DIRECTORY)
+        return _directory_executors[name], _directory_slots[name]
+
+
+def _search_directory(slots, backend, search_value, search_by):
+    """
+    Searches a single LDAP directory. Frees directory thread once done, even if search was already given up on.
+    """
+    try:
+        return backend.get_ldap_user_info(search_value, search_by=search_by)
+    finally:
+        slots.release()
+
+
 def sync_ldap():
     """
     handle syncing with ldap using settings in env.py
@@ -39,6 +78,68 @@ def sync_ldap():
     ldap_lib.set_uid_attribute(settings.CAE_LDAP['default_uid'])
 
 
+def search_directories(backends, search_value, search_by=None):
+    """
+    Searches multiple LDAP directories at once, each on its own thread.
+    Each directory is given up to LDAP_UTILITY_TIMEOUT seconds. Directories that error or time out return None, without
+    holding up the others. Directories whose threads are all still stuck on earlier searches count as timed out.
+    :param backends: Dict of {directory name: initialized Auth backend}.
+    :param search_value: Value to search for.
+    :param search_by: Attribute to search value by. Defaults to uid.
+    :return: Tuple of (Dict of {directory name: user's LDAP info | None}, List of directory names that timed out,
+             List of directory names that errored).
+    """
+    start_time = time.monotonic()
+    results = {}
+    timed_out_directories = []
+    errored_directories = []
+
+    futures = {}
+    for name, backend in backends.items():
+        executor, slots = get_directory_executor(name)
+        if slots.acquire(blocking=False):
+            futures[name] = executor.submit(_search_directory, slots, backend, search_value, search_by)
+        else:
+            logger.warning('{0} LDAP search for "{1}" skipped. Earlier searches are still running.'.format(
+                name,
+                search_value,
+            ))
+            results[name] = None
+            timed_out_directories.append(name)
+
+    for name, future in futures.items():
+        # All searches started at the same time, so each only waits out what remains of its own timeout.
+        remaining_time = max(settings.LDAP_UTILITY_TIMEOUT - (time.monotonic() - start_time), 0)
+        try:
+            results[name] = future.result(timeout=remaining_time)
+        except concurrent.futures.TimeoutError:
+            # Search keeps running in its directory thread, until the LDAP server responds or drops the connection.
+            logger.warning('{0} LDAP search for "{1}" timed out.'.format(name, search_value))
+            results[name] = None
+            timed_out_directories.append(name)
+        except Exception as err:
+            logger.warning('{0} LDAP search for "{1}" failed. {2}'.format(name, search_value, err))
+            results[name] = None
+            errored_directories.append(name)
+
+    # Return in same order as provided backends.
+    results = {name: results[name] for name in backends.keys()}
+    return results, timed_out_directories, errored_directories
+
+
+def add_search_messages(request, timed_out_directories, errored_directories):
+    """
+    Warns user about directories that could not be searched.
+    :param request: Request to add messages to.
+    :param timed_out_directories: List of directory names that timed out.
+    :param errored_directories: List of directory names that errored.
+    """
+    for name in timed_out_directories:
+        messages.warning(request, "{0} LDAP did not respond in time. Results may be incomplete.".format(name))
+    for name in errored_directories:
+        messages.warning(request, "{0} LDAP search failed. Results may be incomplete.".format(name))
+
+
 @login_required()
 @group_required('CAE Director', 'CAE Admin GA', 'CAE Programmer GA', 'CAE Admin', 'CAE Programmer')
 def ldap_utility(request):
@@ -46,6 +147,7 @@ def ldap_utility(request):
     ldap utility function that searches user based on Bronco net, Email, Fullname, Win Number
     or Phone number and return results from CAE, Advising, and main Campus WMU Ldap
 
+    All three directories are searched concurrently, so the page only waits on the slowest single directory.
     """
     # check if ldap is setup
     if settings.CAE_LDAP['login_dn'] == "":
@@ -53,16 +155,17 @@ def ldap_utility(request):
     else:
         sync_ldap()
     # initialize ldap backend for all 3 ldap s - main campus, advising and CAE
-    cae_auth_backend = CaeAuthBackend()
-    advising_auth_backend = AdvisingAuthBackend()
-    wmu_auth_backend = WmuAuthBackend()
+    # Order matters. Earlier directories take priority when resolving uid and cn values.
+    backends = {
+        'CAE': CaeAuthBackend(),
+        'WMU': WmuAuthBackend(),
+        'Advising': AdvisingAuthBackend(),
+    }
 
     # initialize variables
     form = forms.LdapUtilityForm()
     uid = None
-    cae_ldap_user_info = None
-    advising_ldap_user_info = None
-    wmu_ldap_user_info = None
+    ldap_user_info = {name: None for name in backends.keys()}
     # cn holds username and will be used as page header
     cn = None
 
@@ -73,57 +176,66 @@ def ldap_utility(request):
             search_by = form.cleaned_data['search_choice_field']
             search_for_value = form.cleaned_data['search_input']
 
-            # Connect to LDAP server and pull user's full info.
-            cae_ldap_user_info = cae_auth_backend.get_ldap_user_info(search_for_value, search_by=search_by,
-                                                                     attributes=['uid'])
-            if cae_ldap_user_info:
-                uid = cae_ldap_user_info["uid"][0]
-
-            wmu_ldap_user_info = wmu_auth_backend.get_ldap_user_info(search_for_value, search_by=search_by,
-                                                                     attributes=['uid'])
-            if uid is None and wmu_ldap_user_info:
-                uid = wmu_ldap_user_info["uid"][0]
+            # Connect to all LDAP servers at once and pull user's full info.
+            ldap_user_info, timed_out_directories, errored_directories = search_directories(
+                backends,
+                search_for_value,
+                search_by=search_by,
+            )
+            add_search_messages(request, timed_out_directories, errored_directories)
+            failed_directories = timed_out_directories + errored_directories
 
-            advising_ldap_user_info = advising_auth_backend.get_ldap_user_info(search_for_value, search_by=search_by,
-                                                                               attributes=['uid'])
-            if uid is None and advising_ldap_user_info:
-                uid = advising_ldap_user_info["uid"][0]
+            # Get uid from first directory that found user.
+            for user_info in ldap_user_info.values():
+                if uid is None and user_info and user_info.get('uid', None):
+                    uid = user_info['uid'][0]
 
             if uid is None:
                 messages.error(request, "Error Unknown Value!")
-
-            # By this point we know we have UID for sure. Now fetch information using UID from all 3 ldap s
-            cae_ldap_user_info = cae_auth_backend.get_ldap_user_info(f'{uid}')
-            wmu_ldap_user_info = wmu_auth_backend.get_ldap_user_info(f'{uid}')
-            advising_ldap_user_info = advising_auth_backend.get_ldap_user_info(f'{uid}')
+            else:
+                # By this point we know we have UID for sure. Now fetch information using UID, but only from
+                # directories that did not already return this exact user.
+                missing_backends = {
+                    name: backend for name, backend in backends.items()
+                    if name not in failed_directories and (
+                        ldap_user_info[name] is None or uid not in ldap_user_info[name].get('uid', [])
+                    )
+                }
+                if missing_backends:
+                    missing_user_info, timed_out_directories, errored_directories = search_directories(
+                        missing_backends,
+                        uid,
+                    )
+                    ldap_user_info.update(missing_user_info)
+                    add_search_messages(request, timed_out_directories, errored_directories)
 
             # Check if we got LDAP response. If not, user does not exist in CAE LDAP.
-            if cae_ldap_user_info is not None:
-                cn = cae_ldap_user_info['cn'][0]
+            if ldap_user_info['CAE'] is not None:
+                cn = ldap_user_info['CAE']['cn'][0]
             else:
                 messages.warning(request, "Failed to connect to CAE LDAP!")
 
             # Check if we got LDAP response. If not, user does not exist in Advising LDAP.
-            if advising_ldap_user_info is not None:
+            if ldap_user_info['Advising'] is not None:
                 # If user doesn't exist, their cn (name) doesn't exist in Advising ldap.
                 # this error only exists for Advising ldap.
-                if advising_ldap_user_info['wmuKerberosUserStatus'][0] == "removed":
+                if ldap_user_info['Advising']['wmuKerberosUserStatus'][0] == "removed":
                     messages.warning(request, "User doesn't exist anymore!")
                 else:
-                    cn = advising_ldap_user_info['cn'][0]
+                    cn = ldap_user_info['Advising']['cn'][0]
             else:
                 messages.warning(request, "Failed to connect to Advising LDAP!")
 
             # Check if we got LDAP response. If not, user does not exist in WMU LDAP.
-            if wmu_ldap_user_info is not None:
-                cn = wmu_ldap_user_info['cn'][0]
+            if ldap_user_info['WMU'] is not None:
+                cn = ldap_user_info['WMU']['cn'][0]
 
             else:
                 messages.warning(request, "Failed to connect to WMU LDAP!")
     return TemplateResponse(request, 'cae_tools/ldap_utility.html', {
-        'cae_ldap_user_info': cae_ldap_user_info,
-        'advising_ldap_user_info': advising_ldap_user_info,
-        'wmu_ldap_user_info': wmu_ldap_user_info,
+        'cae_ldap_user_info': ldap_user_info['CAE'],
+        'advising_ldap_user_info': ldap_user_info['Advising'],
+        'wmu_ldap_user_info': ldap_user_info['WMU'],
         'form': form,
         'cn': cn
     })
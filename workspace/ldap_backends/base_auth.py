@@ -7,6 +7,7 @@ Values in the env.py list are then automatically called, in order (stopping on f
 a user attempts to log in.
 
 Note: To work, this needs the simple_ldap_lib git submodule imported, and the correct env settings set.
+Alternatively, the LDAP_LIBRARY setting can point to the in-memory fake library. See "fake_ldap.py".
 """
 
 # System Imports.
@@ -17,18 +18,31 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
-from importlib import import_module
+from django.utils import timezone
+from django.utils.module_loading import import_string
 
 # User Imports.
-from cae_home import models
+from cae_home import models, permission_cache
 from workspace import logging as init_logging
-from workspace.ldap_backends import simple_ldap_lib
+from workspace.ldap_backends import connection_pool, ldap_cache, ldap_guard, login_hooks
 
 
 # Import logger.
 logger = init_logging.get_logger(__name__)
 
 
+def escape_filter_value(value):
+    """
+    Escapes special characters in value, for use in an LDAP filter. See RFC 4515.
+    :param value: Value to escape.
+    :return: Escaped value string.
+    """
+    value = str(value)
+    for character in ('\\', '*', '(', ')', '\0'):
+        value = value.replace(character, '\\{0:02x}'.format(ord(character)))
+    return value
+
+
 class AbstractLDAPBackend(ABC):
     """
     Custom, abstract LDAP authentication class.
@@ -44,11 +58,26 @@ class AbstractLDAPBackend(ABC):
         """
         self.regex_username_match = r'([a-zA-Z0-9]+)(($)|(@{0}$))'    # Regex to compare username to.
         self.get_info = 'SCHEMA'    # "get_info" value used in LDAP connection binds.
+        self.ldap_pool_name = self.__class__.__name__     # Backends with the same pool name share connections.
 
-        self.ldap_lib = simple_ldap_lib.SimpleLdap()
+        self.ldap_lib = import_string(settings.LDAP_LIBRARY)()
 
         self.setup_abstract_class()
 
+        # Bound connections for "master" account searches. Shared by all backend instances in process.
+        self.ldap_pool = connection_pool.get_pool(
+            self.ldap_pool_name,
+            self._create_pooled_ldap_lib,
+            get_info=self.get_info,
+        )
+
+    @classmethod
+    def _create_pooled_ldap_lib(cls):
+        """
+        Creates new LDAP library instance for connection pool, configured same as the backend's own.
+        """
+        return cls().ldap_lib
+
     # region Abstract Methods
 
     @abstractmethod
@@ -58,6 +87,7 @@ class AbstractLDAPBackend(ABC):
 
         In this case, it should contain values to connect to LDAP for the SimpleLdapLibrary.
         If the "get_info" attribute should be anything other than "SCHEMA", also change that here.
+        Likewise, the "ldap_pool_name" attribute should be set to the name of the directory connected to.
         """
         pass
 
@@ -81,10 +111,18 @@ class AbstractLDAPBackend(ABC):
     def authenticate(self, request, username=None, password=None):
         """
         Takes user input and attempts authentication.
+        LDAP results are memoized for the duration of the login. See "ldap_cache.py".
         :param username: Value from username field.
         :param password: Value from password field.
         :return: Valid user object on success. | None on failure.
         """
+        with ldap_cache.unit_of_work():
+            return self._authenticate(request, username=username, password=password)
+
+    def _authenticate(self, request, username=None, password=None):
+        """
+        Authentication logic for authenticate() method.
+        """
         try:
             logger.auth_info('{0}: Attempting user login...'.format(username))
 
@@ -144,6 +182,10 @@ class AbstractLDAPBackend(ABC):
                 self.run_user_login_hooks(request, user)
 
                 return user
+        except ldap_guard.LdapUnavailableError as err:
+            # LDAP is throttled or down. Fail login now, rather than waiting on the server.
+            logger.auth_warning('{0}: User login failed. LDAP is unavailable. {1}'.format(username, err))
+            return None
         except Exception as err:
             logger.auth_error('Error during auth: {0}'.format(err), exc_info=True)
             raise (err)
@@ -226,17 +268,18 @@ class AbstractLDAPBackend(ABC):
             return None
 
         # Not a test user, at least as far as we can tell. Proceed with LDAP auth attempt.
-        auth_search_return = self.ldap_lib.authenticate_with_unknown_uid(
-            uid,
-            password,
-            search_filter='(uid={0})'.format(uid),
-            get_info='NONE',
-        )
+        with ldap_guard.guard(self.ldap_pool_name):
+            auth_search_return = self.ldap_lib.authenticate_with_unknown_uid(
+                uid,
+                password,
+                search_filter='(uid={0})'.format(escape_filter_value(uid)),
+                get_info='NONE',
+            )
 
         if auth_search_return[0]:
-            # User validated successfully through ldap. Create (or update) corresponding django user.
+            # User validated successfully through ldap. Get (or create) corresponding django user.
             logger.auth_info('{0}: {1}'.format(user_id, auth_search_return[1]))
-            user = self.create_or_update_user_model(uid, password)
+            user = self._get_or_sync_user_model(uid, password)
         else:
             # Invalid ldap credentials.
             logger.auth_info('{0}: {1}'.format(user_id, auth_search_return[1]))
@@ -244,6 +287,35 @@ class AbstractLDAPBackend(ABC):
 
         return user
 
+    def _get_or_sync_user_model(self, uid, password):
+        """
+        Gets User model for a user just validated through ldap, so that login only waits on the credential bind.
+
+        If the user's LDAP info was synced within LDAP_LOGIN_SYNC_MAX_AGE days (by default, since the nightly
+        "update_user_models" run), the existing model is used as is. Otherwise, the user is fully synced before login
+        completes, so that is_active and groups reflect any removals in LDAP. New or inactive users are always synced.
+
+        Note that this leaves a window: a user removed from LDAP groups after their last sync still logs in with their
+        old groups until their info is next synced (at most LDAP_LOGIN_SYNC_MAX_AGE days).
+        :param uid: Confirmed valid ldap uid.
+        :param password: Confirmed valid ldap pass.
+        :return: User model.
+        """
+        try:
+            user = models.User.objects.select_related('userintermediary').get(username=uid)
+        except models.User.DoesNotExist:
+            user = None
+
+        if user is None or not self.user_can_authenticate(user):
+            return self.create_or_update_user_model(uid, password)
+
+        oldest_allowed_check = timezone.localdate() - timezone.timedelta(days=settings.LDAP_LOGIN_SYNC_MAX_AGE)
+        if user.userintermediary.last_ldap_check <= oldest_allowed_check:
+            logger.auth_info('{0}: LDAP info is out of date. Syncing before login.'.format(uid))
+            return self.create_or_update_user_model(uid, password)
+
+        return user
+
     def user_can_authenticate(self, user):
         """
         Default django method, imported from "contrib.auth.backends.ModelBackend".
@@ -285,16 +357,8 @@ class AbstractLDAPBackend(ABC):
         # If we made it this far, login was successful. Run login hooks.
         logger.auth_info('{0}: Login successful. Running user login hooks.'.format(user))
 
-        # Call all login user logic hooks for included apps.
-        for project, project_settings in settings.INSTALLED_CAE_PROJECTS.items():
-            for app, app_name in project_settings['related_apps'].items():
-                try:
-                    # Attempt to call app hook.
-                    app_hook = import_module('{0}.management.user_hooks'.format(app_name))
-                    app_hook.LoginHooks(request, user)
-                except ModuleNotFoundError:
-                    # User login hooks do not exist for app. Skip.
-                    pass
+        # Call all login user logic hooks for included apps. Hooks are found on startup. See login_hooks.py.
+        login_hooks.run(request, user)
 
     # endregion User Auth
 
@@ -330,12 +394,8 @@ class AbstractLDAPBackend(ABC):
 
         perm_cache_name = '_%s_perm_cache' % from_name
         if not hasattr(user_obj, perm_cache_name):
-            if user_obj.is_superuser:
-                perms = Permission.objects.all()
-            else:
-                perms = getattr(self, '_get_%s_permissions' % from_name)(user_obj)
-            perms = perms.values_list('content_type__app_label', 'codename').order_by()
-            setattr(user_obj, perm_cache_name, {'%s.%s' % (ct, name) for ct, name in perms})
+            # Pull both permission types from shared cache at once. Then keep on user for rest of request.
+            user_obj._user_perm_cache, user_obj._group_perm_cache = permission_cache.get_permissions(user_obj)
         return getattr(user_obj, perm_cache_name)
 
     def get_user_permissions(self, user_obj, obj=None):
@@ -363,10 +423,10 @@ class AbstractLDAPBackend(ABC):
         if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
             return set()
         if not hasattr(user_obj, '_perm_cache'):
-            user_obj._perm_cache = {
+            user_obj._perm_cache = frozenset((
                 *self.get_user_permissions(user_obj),
                 *self.get_group_permissions(user_obj),
-            }
+            ))
         return user_obj._perm_cache
 
     def has_perm(self, user_obj, perm, obj=None):
@@ -383,10 +443,15 @@ class AbstractLDAPBackend(ABC):
 
         Return True if user_obj has any permissions in the given app_label.
         """
-        return user_obj.is_active and any(
-            perm[:perm.index('.')] == app_label
-            for perm in self.get_all_permissions(user_obj)
-        )
+        if not user_obj.is_active:
+            return False
+
+        # App labels are found once per request, so repeated checks (such as for the admin index) are set lookups.
+        if not hasattr(user_obj, '_perm_app_label_cache'):
+            user_obj._perm_app_label_cache = frozenset(
+                perm[:perm.index('.')] for perm in self.get_all_permissions(user_obj)
+            )
+        return app_label in user_obj._perm_app_label_cache
 
     # endregion User Permissions
 
@@ -413,9 +478,10 @@ class AbstractLDAPBackend(ABC):
             search_by = "uid"
 
         # Get value from server.
-        self.ldap_lib.bind_server(get_info=self.get_info)
-        user_attributes = self.ldap_lib.search(search_filter='({0}={1})'.format(search_by, search_value), attributes=attributes)
-        self.ldap_lib.unbind_server()
+        user_attributes = self.ldap_pool.search(
+            search_filter='({0}={1})'.format(search_by, escape_filter_value(search_value)),
+            attributes=attributes,
+        )
 
         # Check server response.
         if user_attributes is None:
@@ -440,9 +506,15 @@ class AbstractLDAPBackend(ABC):
             raise ValidationError('Attribute cannot be an empty string.')
 
         # Get value from server.
-        self.ldap_lib.bind_server(get_info=self.get_info)
-        user_attribute = self.ldap_lib.search(search_filter='(uid={0})'.format(uid), attributes=[attribute])
-        self.ldap_lib.unbind_server()
+        user_attribute = ldap_cache.get_or_search(
+            self.ldap_pool_name,
+            'attribute',
+            (uid, attribute),
+            lambda: self.ldap_pool.search(
+                search_filter='(uid={0})'.format(escape_filter_value(uid)),
+                attributes=[attribute],
+            ),
+        )
 
         # Check server response.
         if user_attribute is None:
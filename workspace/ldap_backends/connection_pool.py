@@ -0,0 +1,305 @@
+"""
+Per-process pools of bound LDAP connections.
+
+Binding to an LDAP server means a TLS handshake plus a bind request, which frequently takes longer than the actual
+search. So rather than binding and unbinding around every search, backends borrow an already bound connection from a
+pool, then return it once done.
+
+There is one pool per configured directory (CAE, WMU, Advising). Each pool is shared by all backend instances within
+the process, and holds at most LDAP_CONNECTION_POOL_MAX_SIZE connections. When all are borrowed, callers wait up to
+LDAP_CONNECTION_POOL_BORROW_TIMEOUT seconds for one to free up, then get an LdapPoolExhaustedError.
+
+Connections which sat unused for longer than LDAP_CONNECTION_POOL_IDLE_TIMEOUT are assumed to be dropped by the server,
+and are rebound on next borrow. Connections which fail during a search with a communication error (such as the server
+dropping the socket) are rebound, and the search is retried once. Other errors are raised as-is.
+
+All binds and searches are rate limited and circuit broken, per directory. See "ldap_guard.py".
+
+Note: To work, this needs the simple_ldap_lib git submodule imported, and the correct env settings set.
+"""
+
+# System Imports.
+import os
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+
+# User Imports.
+from workspace import logging as init_logging
+from workspace.ldap_backends import ldap_guard
+
+# Attempt to import ldap3 communication errors.
+try:
+    from ldap3.core.exceptions import LDAPCommunicationError
+except ImportError:
+    # Assume that ldap3 isn't installed. Only socket errors can occur then.
+    LDAPCommunicationError = None
+
+
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+# Errors which indicate the connection itself failed, and which are thus worth a rebind and retry.
+CONNECTION_ERRORS = (OSError, LDAPCommunicationError) if LDAPCommunicationError is not None else (OSError,)
+
+
+# Pools for current process, keyed by directory name.
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(name, connection_factory, get_info='NONE'):
+    """
+    Gets connection pool for given directory. Creates the pool on first call.
+    :param name: Name of directory, such as "cae".
+    :param connection_factory: Function returning a new, configured (but unbound) SimpleLdap instance.
+    :param get_info: "get_info" value used in LDAP connection binds.
+    :return: LdapConnectionPool instance.
+    """
+    global _pools_pid
+
+    with _pools_lock:
+        # Bound sockets cannot be shared with forked worker processes. Child processes start with empty pools.
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+
+        pool = _pools.get(name, None)
+        if pool is None:
+            pool = LdapConnectionPool(name, connection_factory, get_info=get_info)
+            _pools[name] = pool
+        return pool
+
+
+def close_all():
+    """
+    Unbinds all idle connections, for all pools in current process.
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+
+
+class PooledLdapConnection:
+    """
+    Single LDAP connection, owned by a pool. Binds on first search.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self.ldap_lib = pool.connection_factory()
+        self.is_bound = False
+        self.last_used = time.monotonic()
+
+    def bind(self):
+        """
+        Binds connection to server, using pool's master account.
+        """
+        with ldap_guard.guard(self.pool.name):
+            self.ldap_lib.bind_server(get_info=self.pool.get_info)
+        self.is_bound = True
+
+    def close(self):
+        """
+        Unbinds connection from server. Errors are ignored, as the connection is likely already dead.
+        """
+        if self.is_bound:
+            self.is_bound = False
+            try:
+                self.ldap_lib.unbind_server()
+            except Exception as err:
+                logger.debug('{0}: Failed to unbind LDAP connection. {1}'.format(self.pool.name, err))
+
+    def search(self, *args, **kwargs):
+        """
+        Runs search on bound connection. Accepts same arguments as SimpleLdap.search().
+        On failure, rebinds and tries once more, in case server dropped connection.
+        """
+        return self._run(self.ldap_lib.search, *args, **kwargs)
+
+    def search_all(self, search_base, search_filter, attributes=None):
+        """
+        Runs search on bound connection, returning all matching entries rather than just the first.
+        Results are requested in pages of LDAP_SEARCH_PAGE_SIZE entries.
+        On failure, rebinds and tries once more, in case server dropped connection.
+        :param search_base: Base dn to search under.
+        :param search_filter: LDAP filter string, such as "(|(uid=a)(uid=b))".
+        :param attributes: List of attributes to return. None to return all.
+        :return: List of {attribute name: list of values} dictionaries, one per matching entry.
+        """
+        return self._run(self._search_all, search_base, search_filter, attributes)
+
+    def _search_all(self, search_base, search_filter, attributes):
+        """
+        Runs paged search for all matching entries. See search_all().
+        """
+        page_size = settings.LDAP_SEARCH_PAGE_SIZE
+
+        # Use library's own implementation, if it has one (such as the fake library).
+        if hasattr(self.ldap_lib, 'search_all'):
+            return self.ldap_lib.search_all(
+                search_base=search_base,
+                search_filter=search_filter,
+                attributes=attributes,
+                page_size=page_size,
+            )
+
+        # Otherwise, run paged search directly on library's underlying ldap3 connection.
+        entries = []
+        for response in _get_ldap3_connection(self.ldap_lib).extend.standard.paged_search(
+            search_base=search_base,
+            search_filter=search_filter,
+            attributes=attributes if attributes is not None else '*',
+            paged_size=page_size,
+            generator=True,
+        ):
+            if response.get('type', None) == 'searchResEntry':
+                entries.append({
+                    name: list(values) if isinstance(values, (list, tuple)) else [values]
+                    for name, values in response['attributes'].items()
+                })
+        return entries
+
+    def _run(self, search, *args, **kwargs):
+        """
+        Runs given search function on bound connection. On connection failure, rebinds and tries once more.
+        """
+        if not self.is_bound:
+            self.bind()
+
+        try:
+            with ldap_guard.guard(self.pool.name):
+                return search(*args, **kwargs)
+        except CONNECTION_ERRORS as err:
+            logger.auth_warning('{0}: LDAP search failed. Rebinding connection. {1}'.format(self.pool.name, err))
+            self.close()
+
+        self.bind()
+        try:
+            with ldap_guard.guard(self.pool.name):
+                return search(*args, **kwargs)
+        except CONNECTION_ERRORS:
+            # Still failing. Likely server is unreachable. Drop connection so it isn't reused.
+            self.close()
+            raise
+
+
+class LdapConnectionPool:
+    """
+    Bounded pool of bound connections to a single directory.
+    """
+    def __init__(self, name, connection_factory, get_info='NONE', max_size=None, idle_timeout=None,
+                 borrow_timeout=None):
+        """
+        :param name: Name of directory, used for logging.
+        :param connection_factory: Function returning a new, configured (but unbound) SimpleLdap instance.
+        :param get_info: "get_info" value used in LDAP connection binds.
+        :param max_size: Max number of connections. Defaults to LDAP_CONNECTION_POOL_MAX_SIZE setting.
+        :param idle_timeout: Seconds an idle connection is kept. Defaults to LDAP_CONNECTION_POOL_IDLE_TIMEOUT setting.
+        :param borrow_timeout: Seconds to wait for a free connection. Defaults to LDAP_CONNECTION_POOL_BORROW_TIMEOUT
+            setting.
+        """
+        self.name = name
+        self.connection_factory = connection_factory
+        self.get_info = get_info
+        self.max_size = max_size or settings.LDAP_CONNECTION_POOL_MAX_SIZE
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings.LDAP_CONNECTION_POOL_IDLE_TIMEOUT
+        self.borrow_timeout = borrow_timeout if borrow_timeout is not None else \
+            settings.LDAP_CONNECTION_POOL_BORROW_TIMEOUT
+
+        # Idle connections, most recently used last. Reusing the newest first lets rarely needed extras time out.
+        self._idle_connections = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows connection from pool, for the duration of the "with" block.
+        Use when running multiple searches at once. For a single search, see search().
+        Waits up to borrow timeout for a free connection, then raises LdapPoolExhaustedError.
+        """
+        if not self._slots.acquire(timeout=self.borrow_timeout):
+            # Pool is exhausted. Opening extra connections would defeat the max size, so refuse instead.
+            logger.auth_warning('{0}: LDAP connection pool exhausted.'.format(self.name))
+            raise ldap_guard.LdapPoolExhaustedError(
+                'No "{0}" LDAP connection became free within {1} seconds.'.format(self.name, self.borrow_timeout),
+            )
+
+        try:
+            connection = self._checkout()
+            try:
+                yield connection
+            finally:
+                self._checkin(connection)
+        finally:
+            self._slots.release()
+
+    def search(self, *args, **kwargs):
+        """
+        Runs a single search on a borrowed connection. Accepts same arguments as SimpleLdap.search().
+        """
+        with self.connection() as connection:
+            return connection.search(*args, **kwargs)
+
+    def close(self):
+        """
+        Unbinds all idle connections. Borrowed connections are unaffected.
+        """
+        with self._lock:
+            idle_connections = self._idle_connections
+            self._idle_connections = []
+        for connection in idle_connections:
+            connection.close()
+
+    def _checkout(self):
+        """
+        Gets idle connection, or creates a new one if none are available.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            # Idle connections are ordered oldest first. Remove any that have sat unused for too long.
+            expired_count = 0
+            for idle_connection in self._idle_connections:
+                if now - idle_connection.last_used <= self.idle_timeout:
+                    break
+                expired_count += 1
+            expired_connections = self._idle_connections[:expired_count]
+            self._idle_connections = self._idle_connections[expired_count:]
+
+            connection = self._idle_connections.pop() if self._idle_connections else None
+
+        # Server has likely already dropped expired connections. Unbind outside of lock, as it may be slow.
+        for expired_connection in expired_connections:
+            expired_connection.close()
+
+        if connection is None:
+            connection = PooledLdapConnection(self)
+        return connection
+
+    def _checkin(self, connection):
+        """
+        Returns connection to pool. Connections that failed (and are thus unbound) are dropped.
+        """
+        if connection.is_bound:
+            connection.last_used = time.monotonic()
+            with self._lock:
+                self._idle_connections.append(connection)
+
+
+def _get_ldap3_connection(ldap_lib):
+    """
+    Gets bound ldap3 Connection used by given SimpleLdap instance.
+    SimpleLdap only exposes single entry searches, so paged searches run on the ldap3 Connection it holds internally,
+    as its "_connection" attribute.
+    :param ldap_lib: Bound SimpleLdap instance.
+    :return: ldap3 Connection instance.
+    """
+    ldap3_connection = getattr(ldap_lib, '_connection', None)
+    if ldap3_connection is None or not getattr(ldap3_connection, 'bound', False):
+        raise TypeError('LDAP library "{0}" has no bound ldap3 connection to run paged searches with.'.format(
+            type(ldap_lib).__name__,
+        ))
+    return ldap3_connection
@@ -0,0 +1,498 @@
+"""
+In-memory stand-in for the simple_ldap_lib "SimpleLdap" class.
+
+Allows the LDAP backends to be run, benchmarked and load-tested without network access to the CAE/WMU directories.
+Entries are generated from seed data, and roughly mimic what the actual directories return for users, majors and
+CAE Center groups.
+
+To use, set the LDAP_LIBRARY setting to "workspace.ldap_backends.fake_ldap.FakeSimpleLdap". All fake connections then
+share a single FakeDirectory, which is generated from the current LDAP settings on first use. Alternatively, call
+set_directory() with a custom directory, such as one with simulated latency or failures.
+
+For tests and benchmarks, override settings with SETTINGS, which also provides values for the LDAP settings.
+
+Generated users all have the password "password", unless otherwise specified.
+"""
+
+# System Imports.
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.utils import timezone
+from fnmatch import fnmatchcase
+
+
+# Settings to connect backends to fake directory with, such as with override_settings().
+SETTINGS = {
+    'LDAP_LIBRARY': 'workspace.ldap_backends.fake_ldap.FakeSimpleLdap',
+    'CAE_LDAP': {
+        'host': 'cae.fake',
+        'login_dn': 'cn=fake,dc=cae,dc=fake',
+        'login_password': 'fake',
+        'admin_dn': 'cn=fake_admin,dc=cae,dc=fake',
+        'admin_password': 'fake',
+        'default_uid': 'uid',
+        'user_search_base': 'ou=people,dc=cae,dc=fake',
+        'group_dn': 'ou=groups,dc=cae,dc=fake',
+        'director_cn': 'director',
+        'attendant_cn': 'attendant',
+        'admin_cn': 'admin',
+        'programmer_cn': 'programmer',
+    },
+    'WMU_LDAP': {
+        'host': 'wmu.fake',
+        'login_dn': 'cn=fake,dc=wmu,dc=fake',
+        'login_password': 'fake',
+        'default_uid': 'uid',
+        'user_search_base': 'ou=people,dc=wmu,dc=fake',
+    },
+    'ADV_LDAP': {
+        'login_dn': 'cn=fake_advising,dc=wmu,dc=fake',
+        'login_password': 'fake',
+    },
+}
+
+# Search base for main campus major entries. Matches value used in the Advising backend.
+MAJOR_SEARCH_BASE = 'ou=Majors,ou=WMUCourses,o=wmich.edu,dc=wmich,dc=edu'
+
+# Seed values for generated entries.
+# Majors are tuples of (student code, department name, display name, program code).
+SEED_MAJORS = [
+    ('CSJ', 'Computer Science', 'Computer Science', 'CSJ-BS-CS'),
+    ('CEJ', 'Electrical and Computer Engineering', 'Computer Engineering', 'CEJ-BSE-CE'),
+    ('EEJ', 'Electrical and Computer Engineering', 'Electrical Engineering', 'EEJ-BSE-EE'),
+    ('MEJ', 'Mechanical and Aerospace Engineering', 'Mechanical Engineering', 'MEJ-BSE-ME'),
+    ('AEJ', 'Mechanical and Aerospace Engineering', 'Aerospace Engineering', 'AEJ-BSE-AE'),
+    ('IEJ', 'Industrial and Entrepreneurial Engineering', 'Industrial Engineering', 'IEJ-BSE-IE'),
+    ('CSM', 'Computer Science', 'Computer Science', 'CSM-MS-CS'),
+    ('ECED', 'Electrical and Computer Engineering', 'Electrical and Computer Engineering', 'ECED-PHD-ECE'),
+]
+SEED_FIRST_NAMES = [
+    'Alex', 'Brianna', 'Carlos', 'Dana', 'Elijah', 'Fatima', 'Grace', 'Hiro', 'Isabel', 'Jamal', 'Kayla', 'Liam',
+    'Maya', 'Noah', 'Olivia', 'Priya', 'Quinn', 'Ravi', 'Sofia', 'Tyler',
+]
+SEED_LAST_NAMES = [
+    'Anderson', 'Brown', 'Chen', 'Davis', 'Evans', 'Garcia', 'Hernandez', 'Johnson', 'Kim', 'Lee', 'Martinez',
+    'Nguyen', 'Patel', 'Robinson', 'Smith', 'Taylor', 'Walker', 'Williams', 'Young', 'Zimmerman',
+]
+
+# Default password for generated users.
+DEFAULT_PASSWORD = 'password'
+
+# Operations that can be given latency, failure rates, and are counted.
+OPERATIONS = ('bind', 'unbind', 'search', 'authenticate')
+
+
+class FakeLdapError(Exception):
+    """
+    Raised on injected failures, and on misuse of a fake connection (such as searching while unbound).
+    """
+    pass
+
+
+class FakeDirectory:
+    """
+    In-memory LDAP directory, shared by all fake connections.
+    """
+    def __init__(self, latency=None, failure_rate=None, seed=None):
+        """
+        :param latency: Dictionary of {operation: seconds} to delay each call by.
+        :param failure_rate: Dictionary of {operation: 0 to 1 chance} that each call raises FakeLdapError.
+        :param seed: Seed for failure injection, so runs are reproducible.
+        """
+        self.latency = dict(latency or {})
+        self.failure_rate = dict(failure_rate or {})
+        self.users = []     # Tuples of (uid, winno), for generated users.
+
+        self._entries = []
+        self._index = defaultdict(list)
+        self._passwords = {}
+        self._calls = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def generate(cls, user_count=100, password=DEFAULT_PASSWORD, seed=0, **kwargs):
+        """
+        Creates directory populated with generated users, majors and CAE Center groups.
+
+        Search bases and group names are read from the CAE_LDAP/WMU_LDAP settings, so the backends find entries where
+        they expect. Users are added under both the CAE and WMU user search bases.
+        :param user_count: Number of users to generate.
+        :param password: Password of all generated users.
+        :param seed: Seed for generated values, so runs are reproducible.
+        :param kwargs: Additional args for directory, such as latency.
+        :return: New FakeDirectory instance.
+        """
+        directory = cls(seed=seed, **kwargs)
+        generator = random.Random(seed)
+        today = timezone.localdate()
+
+        # Add majors.
+        for student_code, department_name, display_name, program_code in SEED_MAJORS:
+            directory.add('wmuStudentMajor={0},{1}'.format(student_code, MAJOR_SEARCH_BASE), {
+                'wmuStudentMajor': [student_code],
+                'wmuDepartmentName': [department_name],
+                'displayName': [display_name],
+                'title': [display_name],
+                'wmuProgramCode': [program_code],
+            })
+
+        # Add users.
+        user_search_bases = {settings.CAE_LDAP['user_search_base'], settings.WMU_LDAP['user_search_base']}
+        for index in range(user_count):
+            first_name = generator.choice(SEED_FIRST_NAMES)
+            last_name = generator.choice(SEED_LAST_NAMES)
+            uid = '{0}{1}{2:04d}'.format(first_name[0], last_name[:2], index).lower()
+            winno = str(700000000 + index)
+            directory.users.append((uid, winno))
+
+            # Roughly 80% of users are enrolled. Of the rest, some are still employed, and some have left.
+            is_enrolled = generator.random() < 0.8
+            has_left = not is_enrolled and generator.random() < 0.5
+            student_expiration = today + timezone.timedelta(days=generator.randint(-900, 900))
+            employee_expiration = today + timezone.timedelta(days=generator.randint(-900, 365))
+
+            # Most students have a single major.
+            major_count = 2 if generator.random() < 0.1 else 1
+
+            attributes = {
+                'uid': [uid],
+                'wmuUID': [uid],
+                'wmuBannerID': [winno],
+                'givenName': [first_name],
+                'sn': [last_name],
+                'cn': ['{0} {1}'.format(first_name, last_name)],
+                'displayName': ['{0} {1}'.format(first_name, last_name)],
+                'gecos': ['{0} {1}'.format(first_name, last_name)],
+                'wmuFirstName': [first_name],
+                'wmuLastName': [last_name],
+                'mail': ['{0}.{1}.{2}@wmich.edu'.format(first_name, last_name, index).lower()],
+                'homePhone': ['269-555-{0:04d}'.format(index % 10000)],
+                'wmuEnrolled': ['TRUE' if is_enrolled else 'FALSE'],
+                'inetUserStatus': ['inactive' if has_left else 'active'],
+                'wmuKerberosUserStatus': ['inactive' if has_left else 'active'],
+                'wmuStudentExpiration': [student_expiration.strftime('%Y%m%d')],
+                'wmuEmployeeExpiration': [employee_expiration.strftime('%Y%m%d')],
+                'wmuStudentMajor': [major[0] for major in generator.sample(SEED_MAJORS, major_count)],
+            }
+            if generator.random() < 0.3:
+                attributes['wmuMiddleName'] = [generator.choice(SEED_FIRST_NAMES)]
+
+            for search_base in user_search_bases:
+                directory.add(_join_dn('uid={0}'.format(uid), search_base), attributes, password=password)
+
+        # Add CAE Center groups. First few users are spread between groups, as actual groups are fairly small.
+        for group_index, group_key in enumerate(['director', 'attendant', 'admin', 'programmer']):
+            group_cn = settings.CAE_LDAP['{0}_cn'.format(group_key)]
+            if group_cn:
+                directory.add(_join_dn('cn={0}'.format(group_cn), settings.CAE_LDAP['group_dn']), {
+                    'cn': [group_cn],
+                    'memberUid': [uid for uid, winno in directory.users[group_index:20:4]],
+                })
+
+        return directory
+
+    def add(self, dn, attributes, password=None):
+        """
+        Adds entry to directory.
+        :param dn: Distinguished name of entry.
+        :param attributes: Dictionary of {attribute name: list of values}.
+        :param password: Password to authenticate entry with. Entries without passwords can't authenticate.
+        """
+        with self._lock:
+            position = len(self._entries)
+            self._entries.append((dn.lower(), attributes))
+            for name, values in attributes.items():
+                for value in values:
+                    self._index[(name.lower(), str(value).lower())].append(position)
+            if password is not None and 'uid' in attributes:
+                self._passwords[dn.lower()] = password
+
+    def search(self, search_base, search_filter, attributes=None):
+        """
+        Finds first entry matching filter.
+        :param search_base: Only entries with a dn under this base are matched. Empty to match all.
+        :param search_filter: LDAP filter string. Supports equality, presence, wildcards, "&", "|" and "!".
+        :param attributes: List of attributes to return. None or "ALL_ATTRIBUTES" to return all.
+        :return: Dictionary of {attribute name: list of values} | None if not found.
+        """
+        entry = self._find(search_base, search_filter)
+        if entry is None:
+            return None
+        return _get_attributes(entry[1], attributes)
+
+    def search_all(self, search_base, search_filter, attributes=None):
+        """
+        Finds all entries matching filter. Same as search(), but for multiple entries.
+        :return: List of {attribute name: list of values} dictionaries, in order entries were added.
+        """
+        return [
+            _get_attributes(entry_attributes, attributes)
+            for dn, entry_attributes in self._find_all(search_base, search_filter)
+        ]
+
+    def check_password(self, search_base, search_filter, password):
+        """
+        :return: True if entry matching filter has given password | False otherwise.
+        """
+        entry = self._find(search_base, search_filter)
+        return entry is not None and self._passwords.get(entry[0], None) == password
+
+    def record(self, host, operation):
+        """
+        Counts call to directory. Then simulates latency and failures for operation.
+        :param host: Host connection was made to.
+        :param operation: Name of operation, from OPERATIONS.
+        """
+        with self._lock:
+            self._calls[(host, operation)] += 1
+            failed = self._random.random() < self.failure_rate.get(operation, 0)
+
+        delay = self.latency.get(operation, 0)
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            raise FakeLdapError('Simulated "{0}" failure for host "{1}".'.format(operation, host))
+
+    def get_calls(self, host=None):
+        """
+        :param host: Only count calls to this host. None to count calls to all hosts.
+        :return: Counter of {operation: number of calls}.
+        """
+        with self._lock:
+            calls = Counter()
+            for (call_host, operation), count in self._calls.items():
+                if host is None or call_host == host:
+                    calls[operation] += count
+            return calls
+
+    def reset_calls(self):
+        """
+        Resets call counts.
+        """
+        with self._lock:
+            self._calls.clear()
+
+    def _find(self, search_base, search_filter):
+        """
+        :return: Tuple of (dn, attributes) for first entry matching filter | None if not found.
+        """
+        return next(self._find_all(search_base, search_filter), None)
+
+    def _find_all(self, search_base, search_filter):
+        """
+        :return: Generator of (dn, attributes) tuples, for all entries matching filter.
+        """
+        search_base = str(search_base or '').lower()
+        match = _parse_filter(str(search_filter).strip())
+
+        # Simple equality filters (and "|" filters of them) can use the index, rather than checking every entry.
+        if _is_indexed(match):
+            positions = self._index.get((match[1], match[2]), [])
+        elif match[0] == '|' and all(_is_indexed(child) for child in match[1]):
+            positions = sorted(set().union(*(self._index.get((child[1], child[2]), []) for child in match[1])))
+        else:
+            positions = range(len(self._entries))
+
+        for position in positions:
+            dn, attributes = self._entries[position]
+            if (not search_base or dn.endswith(search_base)) and _matches(match, attributes):
+                yield dn, attributes
+
+
+class FakeSimpleLdap:
+    """
+    Fake equivalent of "simple_ldap_lib.SimpleLdap". Each instance is a single connection to the shared directory.
+    """
+    def __init__(self):
+        self.directory = get_directory()
+        self.host = None
+        self.master_dn = None
+        self.search_base = None
+        self.uid_attribute = None
+        self.is_bound = False
+
+    def set_host(self, host):
+        self.host = host
+
+    def set_master_account(self, dn, password, check_credentials=True, get_info='SCHEMA'):
+        self.master_dn = dn
+        if check_credentials:
+            self.bind_server(get_info=get_info)
+            self.unbind_server()
+
+    def set_search_base(self, search_base):
+        self.search_base = search_base
+
+    def set_uid_attribute(self, uid_attribute):
+        self.uid_attribute = uid_attribute
+
+    def bind_server(self, get_info='SCHEMA'):
+        """
+        Binds connection using master account.
+        """
+        self.directory.record(self.host, 'bind')
+        self.is_bound = True
+
+    def unbind_server(self):
+        """
+        Unbinds connection, if bound.
+        """
+        if self.is_bound:
+            self.is_bound = False
+            self.directory.record(self.host, 'unbind')
+
+    def search(self, search_base=None, search_filter=None, attributes=None):
+        """
+        Searches directory with bound connection.
+        :return: Dictionary of first matching entry's attributes | None if not found.
+        """
+        if not self.is_bound:
+            raise FakeLdapError('Attempted search on unbound connection for host "{0}".'.format(self.host))
+
+        self.directory.record(self.host, 'search')
+        return self.directory.search(
+            search_base if search_base is not None else self.search_base,
+            search_filter if search_filter is not None else '(objectClass=*)',
+            attributes=attributes,
+        )
+
+    def search_all(self, search_base=None, search_filter=None, attributes=None, page_size=None):
+        """
+        Searches directory with bound connection, returning all matching entries. Each page of results counts as a
+        separate search, same as a paged search against actual LDAP.
+        :return: List of dictionaries of matching entries' attributes.
+        """
+        if not self.is_bound:
+            raise FakeLdapError('Attempted search on unbound connection for host "{0}".'.format(self.host))
+
+        self.directory.record(self.host, 'search')
+        entries = self.directory.search_all(
+            search_base if search_base is not None else self.search_base,
+            search_filter if search_filter is not None else '(objectClass=*)',
+            attributes=attributes,
+        )
+        if page_size:
+            for index in range(page_size, len(entries), page_size):
+                self.directory.record(self.host, 'search')
+        return entries
+
+    def authenticate_with_unknown_uid(self, uid, password, search_filter=None, get_info='SCHEMA'):
+        """
+        Checks user credentials, using a separate connection.
+        :return: Tuple of (bool of success, message).
+        """
+        self.directory.record(self.host, 'authenticate')
+        if search_filter is None:
+            search_filter = '({0}={1})'.format(self.uid_attribute or 'uid', uid)
+
+        if self.directory.check_password(self.search_base, search_filter, password):
+            return (True, 'Successfully authenticated {0}.'.format(uid))
+        return (False, 'Invalid credentials for {0}.'.format(uid))
+
+
+# Directory for current process. Generated on first use, if not set.
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def get_directory():
+    """
+    Gets directory shared by all fake connections. Generates default directory on first call.
+    """
+    global _directory
+
+    with _directory_lock:
+        if _directory is None:
+            _directory = FakeDirectory.generate()
+        return _directory
+
+
+def set_directory(directory):
+    """
+    Sets directory shared by all fake connections. Only affects connections created after the call.
+    :param directory: FakeDirectory instance | None to generate a new default directory on next use.
+    """
+    global _directory
+
+    with _directory_lock:
+        _directory = directory
+
+
+def _join_dn(rdn, search_base):
+    """
+    :return: Full dn for given relative dn, under search base.
+    """
+    return '{0},{1}'.format(rdn, search_base) if search_base else rdn
+
+
+def _parse_filter(search_filter):
+    """
+    Parses LDAP filter string into a nested tuple, of either:
+        * ("=", attribute name, value), with both lowercased.
+        * ("&" | "|" | "!", list of child filters).
+    """
+    if not (search_filter.startswith('(') and search_filter.endswith(')')):
+        raise FakeLdapError('Invalid search filter "{0}".'.format(search_filter))
+
+    inner = search_filter[1:-1].strip()
+    if inner[:1] in ('&', '|', '!'):
+        # Split children by matching parentheses.
+        children = []
+        depth = 0
+        start = None
+        for index, character in enumerate(inner[1:], start=1):
+            if character == '(':
+                if depth == 0:
+                    start = index
+                depth += 1
+            elif character == ')':
+                depth -= 1
+                if depth == 0:
+                    children.append(_parse_filter(inner[start:index + 1]))
+        return inner[0], children
+
+    name, separator, value = inner.partition('=')
+    if not separator:
+        raise FakeLdapError('Invalid search filter "{0}".'.format(search_filter))
+    return '=', name.strip().lower(), value.strip().lower()
+
+
+def _is_indexed(match):
+    """
+    :return: True if parsed filter is a simple equality, which can be looked up in directory index | False otherwise.
+    """
+    return match[0] == '=' and '*' not in match[2]
+
+
+def _get_attributes(entry_attributes, attributes):
+    """
+    :return: Copy of entry attributes, limited to requested attributes. None or "ALL_ATTRIBUTES" to return all.
+    """
+    if attributes is None or attributes == 'ALL_ATTRIBUTES':
+        return {name: list(values) for name, values in entry_attributes.items()}
+
+    requested = {str(name).lower() for name in attributes}
+    return {name: list(values) for name, values in entry_attributes.items() if name.lower() in requested}
+
+
+def _matches(match, attributes):
+    """
+    :return: True if entry attributes match parsed filter | False otherwise.
+    """
+    if match[0] == '&':
+        return all(_matches(child, attributes) for child in match[1])
+    elif match[0] == '|':
+        return any(_matches(child, attributes) for child in match[1])
+    elif match[0] == '!':
+        return not any(_matches(child, attributes) for child in match[1])
+
+    operator, name, value = match
+    for attribute_name, values in attributes.items():
+        if attribute_name.lower() == name:
+            return any(fnmatchcase(str(entry_value).lower(), value) for entry_value in values)
+    return False
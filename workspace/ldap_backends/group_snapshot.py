@@ -0,0 +1,126 @@
+"""
+Per-process snapshot of LDAP group membership.
+
+Checking if a single user belongs to a group means fetching the full "memberUid" list of that group anyways. So rather
+than searching every group once per user checked, each group's members are fetched once and held as a set, for
+LDAP_GROUP_SNAPSHOT_TTL seconds. Syncing N users then takes one search per group, rather than one per group per user.
+
+Note: To work, this needs the simple_ldap_lib git submodule imported, and the correct env settings set.
+"""
+
+# System Imports.
+import threading
+import time
+from django.conf import settings
+
+# User Imports.
+from workspace import logging as init_logging
+from workspace.ldap_backends import ldap_guard
+
+
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+
+# Snapshots for current process, keyed by directory name.
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(name, ldap_pool, search_base, group_cns):
+    """
+    Gets group snapshot for given directory. Creates the snapshot on first call.
+    :param name: Name of directory, such as "cae".
+    :param ldap_pool: LdapConnectionPool to search with.
+    :param search_base: Search base of groups.
+    :param group_cns: Dictionary of {group key: group cn}.
+    :return: LdapGroupSnapshot instance.
+    """
+    with _snapshots_lock:
+        snapshot = _snapshots.get(name, None)
+        if snapshot is None:
+            snapshot = LdapGroupSnapshot(ldap_pool, search_base, group_cns)
+            _snapshots[name] = snapshot
+        return snapshot
+
+
+class LdapGroupSnapshot:
+    """
+    Members of a fixed set of LDAP groups, refreshed once expired.
+    """
+    def __init__(self, ldap_pool, search_base, group_cns, ttl=None):
+        """
+        :param ldap_pool: LdapConnectionPool to search with.
+        :param search_base: Search base of groups.
+        :param group_cns: Dictionary of {group key: group cn}.
+        :param ttl: Seconds until snapshot is refreshed. Defaults to LDAP_GROUP_SNAPSHOT_TTL setting.
+        """
+        self.ldap_pool = ldap_pool
+        self.search_base = search_base
+        self.group_cns = dict(group_cns)
+        self.ttl = ttl if ttl is not None else settings.LDAP_GROUP_SNAPSHOT_TTL
+
+        self._members = None
+        self._expires = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Fetches current members of all groups, regardless of expiration.
+        """
+        members = {}
+
+        # Fetch each group once. All searches share a single pooled connection.
+        with self.ldap_pool.connection() as ldap_connection:
+            for group_key, group_cn in self.group_cns.items():
+                ldap_group = ldap_connection.search(
+                    search_base=self.search_base,
+                    search_filter='(cn={0})'.format(group_cn),
+                    attributes=['memberUid'],
+                )
+                if ldap_group is not None:
+                    members[group_key] = frozenset(ldap_group['memberUid'])
+                else:
+                    logger.auth_warning('Failed to find LDAP group "{0}". Assuming no members.'.format(group_cn))
+                    members[group_key] = frozenset()
+
+        with self._lock:
+            self._members = members
+            self._expires = time.monotonic() + self.ttl
+
+        return members
+
+    def invalidate(self):
+        """
+        Marks snapshot as expired, so that next check fetches current members.
+        """
+        with self._lock:
+            self._expires = 0
+
+    def get_members(self):
+        """
+        :return: Dictionary of {group key: frozenset of member uids}.
+        """
+        with self._lock:
+            members = self._members
+            if members is not None and time.monotonic() < self._expires:
+                return members
+
+        # Snapshot expired. Searching happens outside of lock, so other threads can keep using the prior snapshot.
+        try:
+            return self.refresh()
+        except ldap_guard.LdapUnavailableError as err:
+            if members is None:
+                raise
+
+            # Directory is throttled or down. Prior snapshot is better than failing.
+            logger.auth_warning('Failed to refresh LDAP group snapshot. Using prior snapshot. {0}'.format(err))
+            return members
+
+    def get_user_groups(self, uid):
+        """
+        Checks which groups given user belongs to.
+        :param uid: User id to check.
+        :return: Dict of booleans for each group key.
+        """
+        return {group_key: uid in group_members for group_key, group_members in self.get_members().items()}
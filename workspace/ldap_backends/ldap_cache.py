@@ -0,0 +1,197 @@
+"""
+Two-tier cache of LDAP search results.
+
+A single login or user sync tends to look up the same user several times over. Main campus has also asked that we keep
+queries to a minimum. So search results are held in two tiers:
+    * A "unit of work" memo, which holds results for the duration of a single login or sync run.
+      Only active within a unit_of_work() block.
+    * The shared Django cache, which holds results across requests and worker processes, for a TTL based on the
+      result's class. See the LDAP_CACHE_TIMEOUTS setting.
+
+Searches that find nothing are also cached (for LDAP_CACHE_NOT_FOUND_TIMEOUT seconds), so repeated lookups of invalid
+values don't repeatedly reach the server.
+"""
+
+# System Imports.
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+# User Imports.
+from workspace import logging as init_logging
+
+
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+
+# Cache key values.
+CACHE_KEY_PREFIX = 'workspace.ldap_cache'
+
+# Stored in place of results for searches that found nothing. The Django cache returns None for missing keys.
+NOT_FOUND = '{0}.not_found'.format(CACHE_KEY_PREFIX)
+
+# Memo for current unit of work (thread or async task). None when outside of a unit of work.
+_memo = ContextVar('workspace_ldap_cache_memo', default=None)
+
+# Hit/miss counts for current process, keyed by "{result class}.{count type}".
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Context manager which memoizes LDAP results within the block, such as for a single login or sync run.
+    Nested blocks share the outermost memo.
+    """
+    if _memo.get() is not None:
+        # Already within a unit of work.
+        yield
+        return
+
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def get_or_search(directory, result_class, key, search):
+    """
+    Gets LDAP result from cache. On miss, runs search and caches the result.
+    :param directory: Name of directory searched, such as "wmu".
+    :param result_class: Class of result, such as "user_info". Determines TTL.
+    :param key: Value(s) identifying the search, such as the BroncoNet searched for.
+    :param search: Function which runs the actual search. Should return None if nothing was found.
+    :return: Search result | None if nothing was found.
+    """
+    cache_key = get_cache_key(directory, result_class, key)
+    memo = _memo.get()
+
+    # Check unit of work memo.
+    if memo is not None and cache_key in memo:
+        _count(result_class, 'memo_hits')
+        return _from_cached(memo[cache_key])
+
+    # Check shared cache.
+    cached_value = cache.get(cache_key, None)
+    if cached_value is not None:
+        _count(result_class, 'cache_hits')
+        if memo is not None:
+            memo[cache_key] = cached_value
+        return _from_cached(cached_value)
+
+    # Not cached. Run search.
+    _count(result_class, 'misses')
+    result = search()
+    _store(cache_key, result_class, result, memo)
+    return result
+
+
+def get_many(directory, result_class, keys):
+    """
+    Gets many LDAP results from cache at once, such as before a bulk search.
+    :param directory: Name of directory searched, such as "wmu".
+    :param result_class: Class of result, such as "user_info".
+    :param keys: List of values identifying each search.
+    :return: Tuple of (Dict of {key: result | None}, for cached keys. List of keys not cached).
+    """
+    cache_keys = {key: get_cache_key(directory, result_class, key) for key in keys}
+    memo = _memo.get()
+
+    results = {}
+    cached_values = cache.get_many([
+        cache_key for cache_key in cache_keys.values() if memo is None or cache_key not in memo
+    ])
+    for key, cache_key in cache_keys.items():
+        if memo is not None and cache_key in memo:
+            _count(result_class, 'memo_hits')
+            results[key] = _from_cached(memo[cache_key])
+        elif cache_key in cached_values:
+            _count(result_class, 'cache_hits')
+            if memo is not None:
+                memo[cache_key] = cached_values[cache_key]
+            results[key] = _from_cached(cached_values[cache_key])
+
+    return results, [key for key in keys if key not in results]
+
+
+def set_result(directory, result_class, key, result):
+    """
+    Caches an already known LDAP result, such as from a bulk search. Counted as a miss, as result was searched for.
+    :param directory: Name of directory searched, such as "wmu".
+    :param result_class: Class of result, such as "user_info". Determines TTL.
+    :param key: Value(s) identifying the search, such as the BroncoNet searched for.
+    :param result: Search result | None if nothing was found.
+    """
+    _count(result_class, 'misses')
+    _store(get_cache_key(directory, result_class, key), result_class, result, _memo.get())
+
+
+def invalidate(directory, result_class, key):
+    """
+    Removes LDAP result from both cache tiers, so that next lookup searches again.
+    """
+    cache_key = get_cache_key(directory, result_class, key)
+    memo = _memo.get()
+    if memo is not None:
+        memo.pop(cache_key, None)
+    cache.delete(cache_key)
+
+
+def get_cache_key(directory, result_class, key):
+    """
+    :return: Cache key for given LDAP search.
+    """
+    if isinstance(key, (list, tuple)):
+        key = '.'.join(str(value) for value in key)
+    return '{0}.{1}.{2}.{3}'.format(CACHE_KEY_PREFIX, directory, result_class, str(key).strip().lower())
+
+
+def get_stats():
+    """
+    :return: Dictionary of {result class: {"memo_hits": int, "cache_hits": int, "misses": int}}, for current process.
+    """
+    with _stats_lock:
+        stats = {}
+        for stat_key, count in _stats.items():
+            result_class, count_type = stat_key.rsplit('.', 1)
+            stats.setdefault(result_class, {'memo_hits': 0, 'cache_hits': 0, 'misses': 0})[count_type] = count
+        return stats
+
+
+def reset_stats():
+    """
+    Resets hit/miss counts for current process.
+    """
+    with _stats_lock:
+        _stats.clear()
+
+
+def _store(cache_key, result_class, result, memo):
+    """
+    Stores search result in both cache tiers.
+    """
+    cached_value = NOT_FOUND if result is None else result
+    if memo is not None:
+        memo[cache_key] = cached_value
+
+    timeout = settings.LDAP_CACHE_NOT_FOUND_TIMEOUT if result is None else settings.LDAP_CACHE_TIMEOUTS[result_class]
+    try:
+        cache.set(cache_key, cached_value, timeout)
+    except Exception as err:
+        # Cache is only an optimization. Search result is still valid.
+        logger.warning('Failed to cache LDAP result for "{0}". {1}'.format(cache_key, err))
+
+
+def _count(result_class, count_type):
+    with _stats_lock:
+        _stats['{0}.{1}'.format(result_class, count_type)] += 1
+
+
+def _from_cached(cached_value):
+    return None if cached_value == NOT_FOUND else cached_value
@@ -0,0 +1,323 @@
+"""
+Rate limiting and circuit breaking for LDAP traffic.
+
+Main campus has asked that we keep LDAP queries to a minimum. So every bind and search to a limited directory first
+takes from a per-second budget, shared by all workers through the Django cache. Each budget is split by traffic class:
+    * "interactive" traffic, such as user logins and page views. The default.
+    * "batch" traffic, such as the nightly user sync. Only applies within a batch_traffic() block.
+Calls over budget wait for the next second, up to LDAP_RATE_LIMIT_MAX_WAIT. Then fail with LdapRateLimitError.
+
+Separately, each process tracks the error rate of each directory. Once too many calls fail, the directory's circuit
+"opens", and further calls fail immediately with LdapCircuitOpenError, rather than each waiting on network timeouts.
+After LDAP_CIRCUIT_BREAKER_RESET_TIMEOUT seconds, a single trial call is let through. The circuit closes again if it
+succeeds.
+
+Callers should catch LdapUnavailableError and fall back to local data, where possible.
+"""
+
+# System Imports.
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+# User Imports.
+from workspace import logging as init_logging
+
+
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+
+# Cache key values.
+CACHE_KEY_PREFIX = 'workspace.ldap_guard'
+
+# Traffic class for current thread or async task.
+_traffic_class = ContextVar('workspace_ldap_guard_traffic_class', default='interactive')
+
+# Circuit breakers for current process, keyed by directory name.
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+# Call counts for current process, keyed by "{directory}.{count type}".
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+class LdapUnavailableError(Exception):
+    """
+    Raised when an LDAP call is refused before reaching the server.
+    """
+    pass
+
+
+class LdapRateLimitError(LdapUnavailableError):
+    """
+    Raised when an LDAP call is over budget, and waiting would take too long.
+    """
+    pass
+
+
+class LdapCircuitOpenError(LdapUnavailableError):
+    """
+    Raised when an LDAP call is refused, due to recent errors with the directory.
+    """
+    pass
+
+
+class LdapPoolExhaustedError(LdapUnavailableError):
+    """
+    Raised when no pooled LDAP connection became free in time.
+    """
+    pass
+
+
+@contextmanager
+def batch_traffic():
+    """
+    Context manager which marks LDAP calls within the block as batch traffic, such as for a sync command.
+    """
+    token = _traffic_class.set('batch')
+    try:
+        yield
+    finally:
+        _traffic_class.reset(token)
+
+
+def get_traffic_class():
+    """
+    :return: Traffic class of current thread or async task. Either "interactive" or "batch".
+    """
+    return _traffic_class.get()
+
+
+@contextmanager
+def guard(name):
+    """
+    Context manager to wrap a single LDAP call (bind or search) with. Rate limits and circuit breaks the call.
+    :param name: Name of directory called, such as "wmu".
+    """
+    breaker = get_breaker(name)
+    breaker.before_call()
+    try:
+        acquire(name)
+    except LdapUnavailableError:
+        breaker.cancel_call()
+        raise
+
+    try:
+        yield
+    except LdapUnavailableError:
+        # Refused by a nested guard. Says nothing about the directory itself.
+        breaker.cancel_call()
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    else:
+        breaker.record_success()
+
+
+def acquire(name):
+    """
+    Takes one call from the directory's budget for the current traffic class. Waits if over budget.
+    If the shared cache is unavailable, calls are allowed unlimited. Limiting is only a courtesy to the server.
+    :param name: Name of directory called, such as "wmu".
+    """
+    traffic_class = get_traffic_class()
+    limit = settings.LDAP_RATE_LIMITS.get(name, {}).get(traffic_class, None)
+    if not limit:
+        # Directory is not limited.
+        return
+
+    deadline = time.monotonic() + settings.LDAP_RATE_LIMIT_MAX_WAIT[traffic_class]
+    while True:
+        # Budgets are per wall clock second, so all workers agree on the current window.
+        now = time.time()
+        window = int(now)
+        cache_key = '{0}.{1}.{2}.{3}'.format(CACHE_KEY_PREFIX, name, traffic_class, window)
+        try:
+            cache.add(cache_key, 0, 2)
+            call_count = cache.incr(cache_key)
+        except Exception as err:
+            logger.warning('Failed to check LDAP rate limit for "{0}". {1}'.format(name, err))
+            return
+
+        if call_count <= limit:
+            return
+
+        # Over budget. Wait for next window, if possible.
+        wait = window + 1 - now
+        if time.monotonic() + wait > deadline:
+            _count(name, 'throttled')
+            raise LdapRateLimitError('Exceeded {0} LDAP rate limit of {1} calls per second for "{2}".'.format(
+                traffic_class,
+                limit,
+                name,
+            ))
+        _count(name, 'delayed')
+        time.sleep(wait)
+
+
+def get_breaker(name):
+    """
+    Gets circuit breaker for given directory. Creates the breaker on first call.
+    :param name: Name of directory, such as "wmu".
+    :return: CircuitBreaker instance.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name, None)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+
+def reset_breakers():
+    """
+    Discards all circuit breakers for current process, closing any open circuits.
+    """
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def get_stats():
+    """
+    :return: Dictionary of {directory: {"delayed": int, "throttled": int, "short_circuited": int, "opened": int}},
+        for current process.
+    """
+    with _stats_lock:
+        stats = {}
+        for stat_key, count in _stats.items():
+            name, count_type = stat_key.rsplit('.', 1)
+            stats.setdefault(name, dict.fromkeys(['delayed', 'throttled', 'short_circuited', 'opened'], 0))
+            stats[name][count_type] = count
+        return stats
+
+
+def reset_stats():
+    """
+    Resets call counts for current process.
+    """
+    with _stats_lock:
+        _stats.clear()
+
+
+class CircuitBreaker:
+    """
+    Tracks recent call failures for a single directory, and refuses calls while error rate is high.
+    """
+    def __init__(self, name, failure_rate=None, min_calls=None, window=None, reset_timeout=None):
+        """
+        :param name: Name of directory, used for logging.
+        :param failure_rate: Rate of failed calls (0 to 1) which opens circuit. Defaults to
+            LDAP_CIRCUIT_BREAKER_FAILURE_RATE setting.
+        :param min_calls: Number of calls needed within window, before circuit can open. Defaults to
+            LDAP_CIRCUIT_BREAKER_MIN_CALLS setting.
+        :param window: Seconds of recent calls to check error rate of. Defaults to LDAP_CIRCUIT_BREAKER_WINDOW setting.
+        :param reset_timeout: Seconds until trial call is let through an open circuit. Defaults to
+            LDAP_CIRCUIT_BREAKER_RESET_TIMEOUT setting.
+        """
+        self.name = name
+        self.failure_rate = failure_rate or settings.LDAP_CIRCUIT_BREAKER_FAILURE_RATE
+        self.min_calls = min_calls or settings.LDAP_CIRCUIT_BREAKER_MIN_CALLS
+        self.window = window or settings.LDAP_CIRCUIT_BREAKER_WINDOW
+        self.reset_timeout = reset_timeout if reset_timeout is not None else \
+            settings.LDAP_CIRCUIT_BREAKER_RESET_TIMEOUT
+
+        # Recent call outcomes, as tuples of (time, failed), oldest first.
+        self._calls = deque()
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """
+        :return: True if calls are currently being refused | False otherwise.
+        """
+        with self._lock:
+            return self._opened_at is not None
+
+    def before_call(self):
+        """
+        Checks if call is allowed. If circuit is open and due for a trial, this call becomes the trial.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+
+            if self._trial_in_progress or time.monotonic() - self._opened_at < self.reset_timeout:
+                refuse = True
+            else:
+                refuse = False
+                self._trial_in_progress = True
+
+        if refuse:
+            _count(self.name, 'short_circuited')
+            raise LdapCircuitOpenError('LDAP circuit for "{0}" is open, due to recent errors.'.format(self.name))
+
+    def cancel_call(self):
+        """
+        Marks allowed call as never made, such as when refused by rate limiting.
+        """
+        with self._lock:
+            self._trial_in_progress = False
+
+    def record_success(self):
+        """
+        Records successful call. Closes circuit if call was the trial.
+        """
+        with self._lock:
+            if self._opened_at is not None:
+                if self._trial_in_progress:
+                    logger.auth_info('LDAP circuit for "{0}" closed. Directory is responding again.'.format(self.name))
+                    self._opened_at = None
+                    self._trial_in_progress = False
+                    self._calls.clear()
+                return
+
+            self._record(False)
+
+    def record_failure(self):
+        """
+        Records failed call. Opens circuit if error rate is too high, or reopens if call was the trial.
+        """
+        with self._lock:
+            if self._opened_at is not None:
+                if self._trial_in_progress:
+                    self._opened_at = time.monotonic()
+                    self._trial_in_progress = False
+                return
+
+            self._record(True)
+            call_count = len(self._calls)
+            failure_count = sum(1 for call_time, failed in self._calls if failed)
+            if call_count < self.min_calls or failure_count < self.failure_rate * call_count:
+                return
+
+            self._opened_at = time.monotonic()
+
+        _count(self.name, 'opened')
+        logger.auth_error('LDAP circuit for "{0}" opened. {1} of last {2} calls failed.'.format(
+            self.name,
+            failure_count,
+            call_count,
+        ))
+
+    def _record(self, failed):
+        """
+        Adds call outcome, and drops outcomes older than window. Lock should already be held.
+        """
+        now = time.monotonic()
+        self._calls.append((now, failed))
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+
+def _count(name, count_type):
+    with _stats_lock:
+        _stats['{0}.{1}'.format(name, count_type)] += 1
@@ -0,0 +1,168 @@
+"""
+Registry of user login hooks, for installed CAE project apps.
+
+Apps can run custom logic on user login by providing a "<app>.management.user_hooks" module, with a "LoginHooks" class
+that takes (request, user). Hook modules are found once, on startup (see CaeHomeConfig.ready()), so logins don't pay
+for looking up apps that have no hooks.
+
+By default, hooks run one after another, in the login request's thread. A hook that doesn't depend on the request's
+database transaction, or on other hooks, can set "run_concurrently = True" on its LoginHooks class. Such hooks instead
+run in a shared thread pool, alongside the rest. Login waits up to LOGIN_HOOK_TIMEOUT seconds from when they start.
+
+Time taken by each hook is recorded per process. See get_timings().
+"""
+
+# System Imports.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from django.db import connection
+from importlib import import_module
+
+# User Imports.
+from workspace import logging as init_logging
+
+
+# Import logger.
+logger = init_logging.get_logger(__name__)
+
+
+# Registered hooks, as tuples of (app name, LoginHooks class). None until discover() runs.
+_hooks = None
+_hooks_lock = threading.Lock()
+
+# Thread pool for hooks that run concurrently.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='login_hooks')
+
+# Hook timings for current process, keyed by app name.
+_timings = {}
+_timings_lock = threading.Lock()
+
+
+def discover():
+    """
+    Finds login hooks for all installed CAE project apps, and registers them. Replaces any prior registrations.
+    Hook modules that fail to import raise here, rather than on each login.
+    """
+    global _hooks
+
+    hooks = []
+    for project, project_settings in settings.INSTALLED_CAE_PROJECTS.items():
+        for app, app_name in project_settings['related_apps'].items():
+            module_name = '{0}.management.user_hooks'.format(app_name)
+            try:
+                app_hook = import_module(module_name)
+            except ModuleNotFoundError as err:
+                # Only skip if hook module itself (or its management package) is missing.
+                # Otherwise, hook module exists but has an error of its own.
+                if err.name != module_name and not module_name.startswith('{0}.'.format(err.name)):
+                    raise
+                continue
+
+            hooks.append((app_name, app_hook.LoginHooks))
+
+    with _hooks_lock:
+        _hooks = hooks
+
+
+def get_hooks():
+    """
+    :return: List of registered hooks, as tuples of (app name, LoginHooks class). Discovers hooks on first call, if
+        not already done on startup.
+    """
+    if _hooks is None:
+        discover()
+    return list(_hooks)
+
+
+def run(request, user):
+    """
+    Runs all registered hooks for newly authenticated user.
+    Concurrent hooks that take longer than LOGIN_HOOK_TIMEOUT are left to finish in the background.
+    :param request: Associated web request object.
+    :param user: User model of newly authenticated user.
+    """
+    hooks = get_hooks()
+
+    # Start concurrent hooks first, so they run while the rest do.
+    futures = []
+    for app_name, login_hook in hooks:
+        if getattr(login_hook, 'run_concurrently', False):
+            futures.append((app_name, _executor.submit(_run_concurrent_hook, app_name, login_hook, request, user)))
+
+    for app_name, login_hook in hooks:
+        if not getattr(login_hook, 'run_concurrently', False):
+            _run_hook(app_name, login_hook, request, user)
+
+    # Wait for concurrent hooks, sharing a single deadline.
+    deadline = time.monotonic() + settings.LOGIN_HOOK_TIMEOUT
+    for app_name, future in futures:
+        try:
+            future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            _record(app_name, 'timeouts')
+            logger.auth_warning('{0}: Login hook for "{1}" exceeded {2} seconds. Continuing in background.'.format(
+                user,
+                app_name,
+                settings.LOGIN_HOOK_TIMEOUT,
+            ))
+
+
+def get_timings():
+    """
+    :return: Dictionary of {app name: {"calls": int, "seconds": float, "max_seconds": float, "errors": int,
+        "timeouts": int}}, for current process.
+    """
+    with _timings_lock:
+        return {app_name: dict(timing) for app_name, timing in _timings.items()}
+
+
+def reset_timings():
+    """
+    Resets hook timings for current process.
+    """
+    with _timings_lock:
+        _timings.clear()
+
+
+def _run_hook(app_name, login_hook, request, user):
+    """
+    Runs a single hook, recording time taken.
+    """
+    start = time.perf_counter()
+    try:
+        login_hook(request, user)
+    except Exception:
+        _record(app_name, 'errors')
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        _record(app_name, 'calls', seconds)
+
+    if seconds > settings.LOGIN_HOOK_TIMEOUT:
+        logger.auth_warning('{0}: Login hook for "{1}" took {2:.2f} seconds.'.format(user, app_name, seconds))
+
+
+def _run_concurrent_hook(app_name, login_hook, request, user):
+    """
+    Runs a single hook in a pool thread. Errors are logged, as login may no longer be waiting on the hook.
+    """
+    try:
+        _run_hook(app_name, login_hook, request, user)
+    except Exception as err:
+        logger.auth_error('{0}: Login hook for "{1}" failed. {2}'.format(user, app_name, err), exc_info=True)
+    finally:
+        # Database connections are per thread. Close this thread's, rather than leaving it open.
+        connection.close()
+
+
+def _record(app_name, count_type, seconds=None):
+    with _timings_lock:
+        timing = _timings.setdefault(app_name, {
+            'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'errors': 0, 'timeouts': 0,
+        })
+        timing[count_type] += 1
+        if seconds is not None:
+            timing['seconds'] += seconds
+            timing['max_seconds'] = max(timing['max_seconds'], seconds)
@@ -11,9 +11,9 @@ from django.utils import timezone
 from django.utils.text import slugify
 
 # User Imports.
-from cae_home import models
+from cae_home import models, reference_data
 from workspace import logging as init_logging
-from workspace.ldap_backends.base_auth import AbstractLDAPBackend
+from workspace.ldap_backends.base_auth import AbstractLDAPBackend, escape_filter_value
 
 
 # Import logger.
@@ -28,6 +28,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
     def setup_abstract_class(self):
         # Set ldap connection settings.
         self.get_info = 'NONE'
+        self.ldap_pool_name = 'advising'
         self.ldap_lib.set_host(settings.WMU_LDAP['host'])
         self.ldap_lib.set_master_account(
             settings.ADV_LDAP['login_dn'],
@@ -181,7 +182,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
             logger.auth_info('{0}: Found student wmuProgramCode: {1}'.format(uid, student_code))
 
             search_base = 'ou=Majors,ou=WMUCourses,o=wmich.edu,dc=wmich,dc=edu'
-            search_filter = '(wmuStudentMajor={0})'.format(student_code)
+            search_filter = '(wmuStudentMajor={0})'.format(escape_filter_value(student_code))
             attributes = 'ALL_ATTRIBUTES'
 
             if isinstance(student_code, list):
@@ -198,7 +199,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
             logger.auth_warning('{0}: Failed to get wmuStudentMajor LDAP field. Defaulting to "Unknown" major.'.format(
                 uid,
             ))
-            return models.Major.objects.get(slug='unk')
+            return reference_data.get(models.Major, slug='unk')
 
     def _get_student_major(self, uid, student_code, search_base, search_filter, attributes):
         """
@@ -213,13 +214,11 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
         # First check that a student code was passed.
         if student_code is not None and student_code != '':
             # Attempt to get full major info from LDAP.
-            self.ldap_lib.bind_server(get_info=self.get_info)
-            ldap_major = self.ldap_lib.search(
+            ldap_major = self.ldap_pool.search(
                 search_base=search_base,
                 search_filter=search_filter,
                 attributes=attributes,
             )
-            self.ldap_lib.unbind_server()
 
             if ldap_major is not None:
                 # Got valid response from LDAP.
@@ -227,7 +226,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
 
                 try:
                     # Attempt to get major.
-                    major = models.Major.objects.get(student_code=student_code)
+                    major = reference_data.get(models.Major, student_code=student_code)
                     logger.auth_info('{0}: Found Django Major "{1}" in Django database.'.format(uid, major))
                     return major
                 except models.Major.DoesNotExist:
@@ -257,15 +256,15 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
                         logger.auth_warn(
                             f'{uid}: Failed to create major: {department} {err}'
                         )
-                        return models.Major.objects.get(slug='unk')
+                        return reference_data.get(models.Major, slug='unk')
 
             else:
                 # Could not get valid response from LDAP. Default to unknown.
-                return models.Major.objects.get(slug='unk')
+                return reference_data.get(models.Major, slug='unk')
 
         else:
             # Passed student code was not a real value. Skip fetch attempt and just return unknown major.
-            return models.Major.objects.get(slug='unk')
+            return reference_data.get(models.Major, slug='unk')
 
     def _get_major_department(self, ldap_major):
         """
@@ -280,7 +279,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
 
             try:
                 # Attempt to get Django model.
-                return models.Department.objects.get(slug=slugify(ldap_code))
+                return reference_data.get(models.Department, slug=slugify(ldap_code))
             except models.Department.DoesNotExist:
                 try:
                     # Attempt to create model using code.
@@ -295,7 +294,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
 
         except (KeyError, IndexError):
             logger.error('Failed to parse LDAP major/department of "{0}"'.format(ldap_major))
-            return models.Department.objects.get(slug='na-unknown')
+            return reference_data.get(models.Department, slug='na-unknown')
 
     def _get_major_display_name(self, ldap_major):
         """
@@ -433,19 +432,31 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
 
     def import_major_model(self, major_code):
         """
+        Creates new Major model, using pulled ldap information.
+        :param major_code: Student code of major to import.
+        :return: Instance of Major model, or None if major could not be imported.
+        """
+        major = self.build_major_model(major_code)
+        if major is not None:
+            major.save()
+        return major
 
+    def build_major_model(self, major_code):
+        """
+        Creates new (unsaved) Major model, using pulled ldap information.
+        Allows validating and saving many majors at once. See "cae_home/bulk_import.py".
+        :param major_code: Student code of major to import.
+        :return: Unsaved instance of Major model, or None if major could not be found.
         """
         search_base = 'ou=Majors,ou=WMUCourses,o=wmich.edu,dc=wmich,dc=edu'
-        search_filter = '(wmuStudentMajor={0})'.format(major_code)
+        search_filter = '(wmuStudentMajor={0})'.format(escape_filter_value(major_code))
         attributes = 'ALL_ATTRIBUTES'
 
-        self.ldap_lib.bind_server(get_info=self.get_info)
-        ldap_major = self.ldap_lib.search(
+        ldap_major = self.ldap_pool.search(
             search_base=search_base,
             search_filter=search_filter,
             attributes=attributes,
         )
-        self.ldap_lib.unbind_server()
 
         if ldap_major is None:
             # Failed to find any values.
@@ -455,7 +466,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
         try:
             department = self._get_major_department(ldap_major)
         except (models.Department.DoesNotExist, TypeError):
-            department = models.Department.objects.get(code='NA')
+            department = reference_data.get(models.Department, code='NA')
 
         # Get major's program_code.
         try:
@@ -480,7 +491,7 @@ class AdvisingAuthBackend(AbstractLDAPBackend):
         if major_code.strip() == 'SELJ':
             return
 
-        return models.Major.objects.create(
+        return models.Major(
             department=department,
             student_code=major_code,
             program_code=program_code,
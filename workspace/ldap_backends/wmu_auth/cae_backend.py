@@ -8,10 +8,13 @@ Note that, to work, these need the simple_ldap_lib git submodule imported, and t
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 
 # User Imports.
 from cae_home import models
+from cae_home.user_factory import UserFactory
 from workspace import logging as init_logging
+from workspace.ldap_backends import group_snapshot, ldap_guard
 from workspace.ldap_backends.base_auth import AbstractLDAPBackend
 from workspace.ldap_backends.wmu_auth.wmu_backend import WmuAuthBackend
 
@@ -36,6 +39,7 @@ class CaeAuthBackend(AbstractLDAPBackend):
         self.regex_username_match = self.regex_username_match.format('wmich.edu')
 
         # Set ldap connection settings.
+        self.ldap_pool_name = 'cae'
         self.ldap_lib.set_host(settings.CAE_LDAP['host'])
         self.ldap_lib.set_master_account(
             settings.CAE_LDAP['login_dn'],
@@ -46,7 +50,36 @@ class CaeAuthBackend(AbstractLDAPBackend):
         self.ldap_lib.set_search_base(settings.CAE_LDAP['user_search_base'])
         self.ldap_lib.set_uid_attribute(settings.CAE_LDAP['default_uid'])
 
-    def create_or_update_user_model(self, uid, password=None):
+        # Main campus backend, for syncing user info. Created on first use.
+        self._wmu_backend = None
+
+    @property
+    def wmu_backend(self):
+        """
+        Main campus backend instance, reused across calls.
+        """
+        if self._wmu_backend is None:
+            self._wmu_backend = WmuAuthBackend()
+        return self._wmu_backend
+
+    @property
+    def group_snapshot(self):
+        """
+        Snapshot of CAE Center group members. Shared by all backend instances in process.
+        """
+        return group_snapshot.get_snapshot(
+            self.ldap_pool_name,
+            self.ldap_pool,
+            settings.CAE_LDAP['group_dn'],
+            {
+                'director': settings.CAE_LDAP['director_cn'],
+                'attendant': settings.CAE_LDAP['attendant_cn'],
+                'admin': settings.CAE_LDAP['admin_cn'],
+                'programmer': settings.CAE_LDAP['programmer_cn'],
+            },
+        )
+
+    def create_or_update_user_model(self, uid, password=None, wmu_user_ldap_info=None):
         """
         Attempts to get and update User model with given username.
         In the event that no such model exists, instead create it from scratch using ldap info.
@@ -54,6 +87,8 @@ class CaeAuthBackend(AbstractLDAPBackend):
         Should only be called on known, valid and authenticated users.
         :param uid: Confirmed valid ldap uid.
         :param password: Confirmed valid ldap pass.
+        :param wmu_user_ldap_info: Optional, already fetched info from main campus LDAP.
+            See WmuAuthBackend.get_all_user_info().
         :return: Instance of User model.
         """
         try:
@@ -61,12 +96,12 @@ class CaeAuthBackend(AbstractLDAPBackend):
             user = models.User.objects.get(username=uid)
 
             # If we got this far, then model exists. Update.
-            return self._update_user_model(uid, password)
+            return self._update_user_model(uid, password, wmu_user_ldap_info=wmu_user_ldap_info)
         except models.User.DoesNotExist:
             # User model doesn't exist. Create new model.
-            return self._create_user_model(uid, password)
+            return self._create_user_model(uid, password, wmu_user_ldap_info=wmu_user_ldap_info)
 
-    def _create_user_model(self, uid, password):
+    def _create_user_model(self, uid, password, wmu_user_ldap_info=None):
         """
         Creates new User model, using pulled ldap information.
         Logic here should be "first time model creation" logic.
@@ -75,6 +110,7 @@ class CaeAuthBackend(AbstractLDAPBackend):
         Should only invoke this method through the "_create_or_update_user_model" function.
         :param uid: Confirmed valid ldap uid.
         :param password: Confirmed valid ldap pass.
+        :param wmu_user_ldap_info: Optional, already fetched info from main campus LDAP.
         :return: Instance of User model.
         """
         # Connect to LDAP server and pull user's full info.
@@ -85,35 +121,32 @@ class CaeAuthBackend(AbstractLDAPBackend):
 
             logger.auth_info('{0}: Attempting to create new user model...'.format(uid))
 
-            # Create new user.
-            login_user, created = models.User.objects.get_or_create(username=uid)
+            # Set password based on AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS setting.
+            if not settings.AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS:
+                password = None
 
-            # Double check that user was created. If not, then duplicate user Id's exists.
-            if not created:
+            # Create new user, along with all associated user models, in a single transaction.
+            try:
+                UserFactory().create(
+                    uid,
+                    user={
+                        'email': '{0}@wmich.edu'.format(uid),
+                        'first_name': ldap_user_info['givenName'][0].strip(),
+                        'last_name': ldap_user_info['sn'][0].strip(),
+                    },
+                    password=password,
+                )
+            except (ValidationError, IntegrityError):
                 # Duplicate Id's exist.
                 # Most likely, there's a logic error in code and "_update_user_model" should have been called.
-                login_user = None
                 error_message = '{0}: Attempted to create user but user with id already exists.'.format(uid)
                 logger.auth_error(error_message)
                 raise ValidationError(error_message)
 
-            # Set password based on AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS setting.
-            if settings.AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS and password is not None:
-                login_user.set_password(password)
-                login_user.save()
-
-            # Set general user values.
-            login_user.email = '{0}@wmich.edu'.format(uid)
-            login_user.first_name = ldap_user_info['givenName'][0].strip()
-            login_user.last_name = ldap_user_info['sn'][0].strip()
-
-            # Save model.
-            login_user.save()
-
             logger.auth_info('{0}: Created user new user model. Now setting groups...'.format(uid))
 
             # Model created. Now run update logic to ensure all fields are properly set.
-            login_user = self._update_user_model(uid, password)
+            login_user = self._update_user_model(uid, password, wmu_user_ldap_info=wmu_user_ldap_info)
 
             logger.auth_info('{0}: Imported Main Campus user info. User creation complete.'.format(uid))
 
@@ -134,11 +167,9 @@ class CaeAuthBackend(AbstractLDAPBackend):
                 # No (login) User model associated with id. This is fine.
                 pass
 
-            from workspace.ldap_backends.wmu_auth import wmu_backend
-            wmu_ldap = wmu_backend.WmuAuthBackend()
-            return wmu_ldap.create_or_update_user_model(uid, password)
+            return self.wmu_backend.create_or_update_user_model(uid, password, user_ldap_info=wmu_user_ldap_info)
 
-    def _update_user_model(self, uid, password):
+    def _update_user_model(self, uid, password, wmu_user_ldap_info=None):
         """
         Updates User model, using pulled Ldap information.
         Logic here should be fine to potentially run on every user login instance (including first).
@@ -153,6 +184,7 @@ class CaeAuthBackend(AbstractLDAPBackend):
         (and should) manually update the user group membership.
 
         :param uid: Confirmed valid ldap uid.
+        :param wmu_user_ldap_info: Optional, already fetched info from main campus LDAP.
         :return: Instance of User model.
         """
         # Pull user info.
@@ -165,7 +197,7 @@ class CaeAuthBackend(AbstractLDAPBackend):
         if ldap_user_groups['director']:
             # Check if user is already in group.
             if 'CAE Director' not in user_groups:
-                login_user.groups.add(Group.object.get(name='CAE Director'))
+                login_user.groups.add(Group.objects.get(name='CAE Director'))
                 logger.auth_info('{0}: Added user to CAE Director group.'.format(uid))
             found_in_cae_ldap = True
         if ldap_user_groups['attendant']:
@@ -209,9 +241,17 @@ class CaeAuthBackend(AbstractLDAPBackend):
         logger.auth_info('{0}: Attempting to get Main Campus user info...'.format(uid))
 
         # Check for associated Wmu model info.
-        wmu_ldap = WmuAuthBackend()
-        wmu_ldap.create_or_update_user_model(uid, password)
-        wmu_ldap.create_or_update_wmu_user_model(uid)
+        # Fetch main campus info once, for both calls.
+        try:
+            if wmu_user_ldap_info is None:
+                wmu_user_ldap_info = self.wmu_backend._get_all_user_info_from_bronconet(uid)
+            self.wmu_backend.create_or_update_user_model(uid, password, user_ldap_info=wmu_user_ldap_info)
+            self.wmu_backend.create_or_update_wmu_user_model(uid, user_ldap_info=wmu_user_ldap_info)
+        except ldap_guard.LdapUnavailableError as err:
+            # Main campus LDAP is throttled or down. If user already has main campus info, keep using that for now.
+            if not models.WmuUser.objects.filter(bronco_net=uid).exists():
+                raise
+            logger.auth_warning('{0}: Main Campus LDAP unavailable. Keeping existing user info. {1}'.format(uid, err))
 
         logger.auth_info('{0}: User model has been updated.'.format(uid))
 
@@ -221,55 +261,9 @@ class CaeAuthBackend(AbstractLDAPBackend):
     def get_ldap_user_groups(self, uid):
         """
         Check if user is in any CAE Center groups.
+        Group members are fetched once per snapshot, rather than per user. See "group_snapshot.py".
         Note: Does not verify that passed uid is valid. In such a case, all groups will simply return False.
         :param uid: User id to check.
         :return: Dict of booleans for possible group membership.
         """
-        self.ldap_lib.bind_server()
-
-        user_groups = {
-            'director': False,
-            'attendant': False,
-            'admin': False,
-            'programmer': False,
-        }
-
-        # Check for ldap directors group match.
-        ldap_directors = self.ldap_lib.search(
-            search_base=settings.CAE_LDAP['group_dn'],
-            search_filter='(cn={0})'.format(settings.CAE_LDAP['director_cn']),
-            attributes=['memberUid'],
-        )
-        if ldap_directors is not None and uid in ldap_directors['memberUid']:
-            user_groups['director'] = True
-
-        # Check for ldap attendants group match.
-        ldap_attendants = self.ldap_lib.search(
-            search_base=settings.CAE_LDAP['group_dn'],
-            search_filter='(cn={0})'.format(settings.CAE_LDAP['attendant_cn']),
-            attributes=['memberUid'],
-        )
-        if ldap_attendants is not None and uid in ldap_attendants['memberUid']:
-            user_groups['attendant'] = True
-
-        # Check for ldap admins group match.
-        ldap_admins = self.ldap_lib.search(
-            search_base=settings.CAE_LDAP['group_dn'],
-            search_filter='(cn={0})'.format(settings.CAE_LDAP['admin_cn']),
-            attributes=['memberUid'],
-        )
-        if ldap_admins is not None and uid in ldap_admins['memberUid']:
-            user_groups['admin'] = True
-
-        # Check for ldap programmers group match.
-        ldap_programmers = self.ldap_lib.search(
-            search_base=settings.CAE_LDAP['group_dn'],
-            search_filter='(cn={0})'.format(settings.CAE_LDAP['programmer_cn']),
-            attributes=['memberUid'],
-        )
-        if ldap_programmers is not None and uid in ldap_programmers['memberUid']:
-            user_groups['programmer'] = True
-
-        self.ldap_lib.unbind_server()
-
-        return user_groups
+        return self.group_snapshot.get_user_groups(uid)
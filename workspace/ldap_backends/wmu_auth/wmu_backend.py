@@ -8,14 +8,17 @@ Note that, to work, these need the simple_ldap_lib git submodule imported, and t
 import datetime
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.utils import timezone
 from phonenumber_field.phonenumber import PhoneNumber
 
 # User Imports.
 from cae_home import models
 from cae_home.models.user import compare_user_and_wmuuser_models
+from cae_home.user_factory import UserFactory
 from workspace import logging as init_logging
-from workspace.ldap_backends.base_auth import AbstractLDAPBackend
+from workspace.ldap_backends import ldap_cache, ldap_guard
+from workspace.ldap_backends.base_auth import AbstractLDAPBackend, escape_filter_value
 from workspace.ldap_backends.wmu_auth.adv_backend import AdvisingAuthBackend
 
 
@@ -26,10 +29,89 @@ logger = init_logging.get_logger(__name__)
 CAE_CENTER_MANAGEMENT = ['CAE Director', 'CAE Building Coordinator']
 
 
+class LdapUserStatus:
+    """
+    Main campus LDAP fields used to determine a user's "active" status, parsed once into a compact record.
+    Text fields are stripped (and lowercased, where compared case-insensitively). Expiration fields are dates.
+    Missing or unparsable fields are None.
+    """
+    __slots__ = ('enrolled', 'inet_user_status', 'kerberos_user_status', 'employee_expiration', 'student_expiration')
+
+    # LDAP attributes that record is parsed from.
+    ATTRIBUTES = [
+        'wmuEnrolled',
+        'inetUserStatus',
+        'wmuKerberosUserStatus',
+        'wmuEmployeeExpiration',
+        'wmuStudentExpiration',
+    ]
+
+    def __init__(self, enrolled, inet_user_status, kerberos_user_status, employee_expiration, student_expiration):
+        self.enrolled = enrolled
+        self.inet_user_status = inet_user_status
+        self.kerberos_user_status = kerberos_user_status
+        self.employee_expiration = employee_expiration
+        self.student_expiration = student_expiration
+
+    @classmethod
+    def from_ldap_info(cls, ldap_info):
+        """
+        Parses record from user's LDAP info.
+        :param ldap_info: User's main campus LDAP info, as returned by search.
+        :return: LdapUserStatus instance.
+        """
+        enrolled = cls._get_value(ldap_info, 'wmuEnrolled')
+        inet_user_status = cls._get_value(ldap_info, 'inetUserStatus')
+        return cls(
+            enrolled.lower() if enrolled is not None else None,
+            inet_user_status.lower() if inet_user_status is not None else None,
+            cls._get_value(ldap_info, 'wmuKerberosUserStatus'),
+            cls._get_date(ldap_info, 'wmuEmployeeExpiration'),
+            cls._get_date(ldap_info, 'wmuStudentExpiration'),
+        )
+
+    @staticmethod
+    def _get_value(ldap_info, field_name):
+        """
+        Gets first value of field, as a stripped string.
+        """
+        try:
+            return str(ldap_info[field_name][0]).strip()
+        except (KeyError, IndexError):
+            return None
+
+    @classmethod
+    def _get_date(cls, ldap_info, field_name):
+        """
+        Gets first value of field, as a date. Values are either YYYYMMDD, or a full timestamp.
+        """
+        value = cls._get_value(ldap_info, field_name)
+        if value is None:
+            return None
+
+        try:
+            if len(value) == 8:
+                # Only 8 digits. Likely YYYYMMDD format.
+                return datetime.datetime.strptime(value, '%Y%m%d').date()
+            else:
+                # More than 8 digits. Likely full datetime set.
+                return datetime.datetime.strptime(value, '%Y%m%d%H%M%S%z').date()
+        except ValueError:
+            logger.auth_warning('Failed to parse LDAP {0} value of "{1}".'.format(field_name, value))
+            return None
+
+
 class WmuAuthBackend(AbstractLDAPBackend):
     """
     Custom authentication through the WMU main campus LDAP.
     """
+    # Main campus LDAP attributes read by each user operation. User info searches request only these, rather than the
+    # full entry, to keep transfer size and memory use down when syncing many users at once.
+    IDENTIFIER_ATTRIBUTES = ['uid', 'wmuUID', 'wmuBannerID']
+    NAME_ATTRIBUTES = ['wmuFirstName', 'wmuMiddleName', 'wmuLastName', 'givenName', 'sn', 'displayName', 'gecos', 'cn']
+    CONTACT_ATTRIBUTES = ['mail', 'homePhone']
+    USER_INFO_ATTRIBUTES = IDENTIFIER_ATTRIBUTES + NAME_ATTRIBUTES + CONTACT_ATTRIBUTES + LdapUserStatus.ATTRIBUTES
+
     def setup_abstract_class(self):
         """
         Note: "check_credentials" value is set to False, because otherwise it will ping the LDAP server to verify
@@ -43,6 +125,7 @@ class WmuAuthBackend(AbstractLDAPBackend):
 
         # Set ldap connection settings.
         self.get_info = 'NONE'
+        self.ldap_pool_name = 'wmu'
         self.ldap_lib.set_host(settings.WMU_LDAP['host'])
         self.ldap_lib.set_master_account(
             settings.WMU_LDAP['login_dn'],
@@ -53,9 +136,21 @@ class WmuAuthBackend(AbstractLDAPBackend):
         self.ldap_lib.set_search_base(settings.WMU_LDAP['user_search_base'])
         self.ldap_lib.set_uid_attribute(settings.WMU_LDAP['default_uid'])
 
+        # Advising backend, for updating student majors. Created on first use.
+        self._adv_backend = None
+
+    @property
+    def adv_backend(self):
+        """
+        Advising backend instance, reused across calls.
+        """
+        if self._adv_backend is None:
+            self._adv_backend = AdvisingAuthBackend()
+        return self._adv_backend
+
     # region User Create/Update Functions
 
-    def create_or_update_user_model(self, uid, password=None):
+    def create_or_update_user_model(self, uid, password=None, user_ldap_info=None):
         """
         Attempts to get and update User model with given username.
         In the event that no such model exists, instead create it from scratch using ldap info.
@@ -63,21 +158,28 @@ class WmuAuthBackend(AbstractLDAPBackend):
         Should only be called on known, valid and authenticated users.
         :param uid: Confirmed valid ldap uid.
         :param password: Confirmed valid ldap pass.
+        :param user_ldap_info: Optional, already fetched info from LDAP. See get_all_user_info().
         :return: Instance of User model.
         """
-        # Get user's LDAP info.
-        user_ldap_info = self._get_all_user_info_from_bronconet(uid)
-
         try:
             # Call model to verify existence.
             user = models.User.objects.get(username=uid)
-
-            # If we got this far, then model exists. Update.
-            return self._update_user_model(uid, user_ldap_info)
         except models.User.DoesNotExist:
             # User model doesn't exist. Create new model.
+            if user_ldap_info is None:
+                user_ldap_info = self._get_all_user_info_from_bronconet(uid)
             return self._create_user_model(uid, password, user_ldap_info)
 
+        # If we got this far, then model exists. Update.
+        try:
+            if user_ldap_info is None:
+                user_ldap_info = self._get_all_user_info_from_bronconet(uid)
+            return self._update_user_model(uid, user_ldap_info)
+        except ldap_guard.LdapUnavailableError as err:
+            # Main campus LDAP is throttled or down. Keep using existing user info for now.
+            logger.auth_warning('{0}: Main Campus LDAP unavailable. Keeping existing user info. {1}'.format(uid, err))
+            return user
+
     def _create_user_model(self, uid, password, user_ldap_info):
         """
         Creates new User model, using pulled ldap information.
@@ -92,23 +194,20 @@ class WmuAuthBackend(AbstractLDAPBackend):
         """
         logger.auth_info('{0}: Attempting to create new User model...'.format(uid))
 
-        # Create new user.
-        login_user, created = models.User.objects.get_or_create(username=uid)
+        # Set password based on AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS setting.
+        if not settings.AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS:
+            password = None
 
-        # Double check that user was created. If not, then duplicate user Id's exists.
-        if not created:
+        # Create new user, along with all associated user models, in a single transaction.
+        try:
+            UserFactory().create(uid, user={}, password=password)
+        except (ValidationError, IntegrityError):
             # Duplicate Id's exist.
             # Most likely, there's a logic error in code and "_update_user_model" should have been called.
-            login_user = None
             error_message = '{0}: Attempted to create user but uid already exists.'.format(uid)
             logger.auth_error(error_message)
             raise ValidationError(error_message)
 
-        # Set password based on AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS setting.
-        if settings.AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS and password is not None:
-            login_user.set_password(password)
-            login_user.save()
-
         logger.auth_info('{0}: Set up "User" model. Now creating "WmuUser" model...'.format(uid))
 
         # Model created. Now run update logic to ensure all fields are properly set.
@@ -139,7 +238,7 @@ class WmuAuthBackend(AbstractLDAPBackend):
 
             # Verify and set user ldap "active" status, according to main campus.
             logger.auth_info('{0}: Checking user is_active status against LDAP.'.format(uid))
-            self.verify_user_ldap_status(uid)
+            self.verify_user_ldap_status(uid, ldap_info=user_ldap_info)
 
         # For now, just make sure the associated Wmu User model is created and up to date.
         self.create_or_update_wmu_user_model(uid, user_ldap_info=user_ldap_info)
@@ -241,14 +340,16 @@ class WmuAuthBackend(AbstractLDAPBackend):
         if official_email is None or official_email == '':
             official_email = '{0}@wmich.edu'.format(uid)
 
-        # Create WmuUser model.
-        models.WmuUser.objects.create(
-            bronco_net=uid,
-            winno=winno,
-            first_name=first_name,
-            middle_name=middle_name,
-            last_name=last_name,
-            official_email=official_email,
+        # Create WmuUser model, along with any missing associated user models, in a single transaction.
+        UserFactory().create(
+            uid,
+            wmu_user={
+                'winno': winno,
+                'first_name': first_name,
+                'middle_name': middle_name,
+                'last_name': last_name,
+                'official_email': official_email,
+            },
         )
 
         # Model created. Now run update logic to ensure all fields are properly set.
@@ -281,11 +382,10 @@ class WmuAuthBackend(AbstractLDAPBackend):
 
             # Verify and set user ldap "active" status, according to main campus.
             logger.auth_info('{0}: Checking user is_active status against LDAP.'.format(uid))
-            self.verify_user_ldap_status(uid)
+            self.verify_user_ldap_status(uid, ldap_info=user_ldap_info)
 
         # Update major.
-        adv_ldap = AdvisingAuthBackend()
-        adv_ldap.add_or_update_major(uid)
+        self.adv_backend.add_or_update_major(uid)
 
         logger.auth_info('{0}: WmuUser model has been updated.'.format(uid))
 
@@ -482,19 +582,21 @@ class WmuAuthBackend(AbstractLDAPBackend):
 
     # region User Ldap Status Functions
 
-    def verify_user_ldap_status(self, uid, set_model_active_fields=True):
+    def verify_user_ldap_status(self, uid, set_model_active_fields=True, ldap_info=None):
         """
         Verifies if student/employee is still enrolled/employed, according to main campus LDAP.
         If student is not enrolled/employed, we do a few extra checks to see if we can get useful data anyways.
         :param uid: BroncoNet of student to check.
         :param set_model_active_fields: Bool indicating if user "active" fields should be set based on ldap status.
             Mostly used for testing purposes.
+        :param ldap_info: Optional, already fetched info from LDAP. See get_all_user_info().
         :return: None if no ldap data returned | (True, True) if actively enrolled/employed |
             (False, True) if not enrolled/employed, but within retention period (12 months) |
             (False, False) if not enrolled/employed, and outside of retention period.
         """
-        # Attempt to get full student info from LDAP.
-        ldap_info = self._get_all_user_info_from_bronconet(uid)
+        # Attempt to get student status info from LDAP, if not provided.
+        if ldap_info is None:
+            ldap_info = self._get_user_status_from_bronconet(uid)
 
         # Now parse user ldap info.
         if ldap_info is not None:
@@ -516,7 +618,7 @@ class WmuAuthBackend(AbstractLDAPBackend):
                     # If we got this far, then (login) User model exists. Set fields appropriately.
                     login_user.userintermediary.wmu_is_active = wmu_user_is_active
                     login_user.userintermediary.last_ldap_check = timezone.now()
-                    login_user.save()
+                    login_user.userintermediary.save()
                 except models.User.DoesNotExist:
                     # Does not exist for (login) User. This is fine.
                     pass
@@ -528,7 +630,7 @@ class WmuAuthBackend(AbstractLDAPBackend):
                     # If we got this far, then WmuUser model exists. Set fields appropriately.
                     wmu_user.userintermediary.wmu_is_active = wmu_user_is_active
                     wmu_user.userintermediary.last_ldap_check = timezone.now()
-                    wmu_user.save()
+                    wmu_user.userintermediary.save()
 
                 except models.WmuUser.DoesNotExist:
                     # Does not exist for WmuUser. This is fine.
@@ -554,121 +656,82 @@ class WmuAuthBackend(AbstractLDAPBackend):
 
         So if we read in the string "false" from ldap, that would technically evaluate to True.
         Rather than dealing with that, we assume all fields may be strings, and just check for exact string match.
+        (See LdapUserStatus, which handles this parsing.)
 
         :param uid: BroncoNet of student to check.
-        :param ldap_info: ALL_ATTRIBUTES of user's main campus ldap info.
+        :param ldap_info: User's main campus ldap info (see LdapUserStatus.ATTRIBUTES), or an already parsed
+            LdapUserStatus.
         :return: Tuple of (User is enrolled/active, User is within retention policy)
         """
-        try:
-            # Get wmuEnrolled field.
-            try:
-                # Handle for missing field.
-                field_to_check = str(ldap_info['wmuEnrolled'][0]).strip().lower()
-            except (KeyError, IndexError):
-                field_to_check = None
+        if isinstance(ldap_info, LdapUserStatus):
+            user_status = ldap_info
+        else:
+            user_status = LdapUserStatus.from_ldap_info(ldap_info)
 
-            # Check wmuEnrolled field.
-            if field_to_check == 'true':
-                # User is currently enrolled.
-                logger.auth_info('{0}: is_active LDAP check - Verified wmuEnrolled.'.format(uid))
-                return (True, True)
+        # Check wmuEnrolled field.
+        if user_status.enrolled == 'true':
+            # User is currently enrolled.
+            logger.auth_info('{0}: is_active LDAP check - Verified wmuEnrolled.'.format(uid))
+            return (True, True)
 
-            else:
-                # User is not actively enrolled. We still want to check employee status, etc.
+        # User is not actively enrolled. We still want to check employee status, etc.
 
-                # Get iNetUserStatus field.
-                try:
-                    # Handle for missing field.
-                    field_to_check = str(ldap_info['inetUserStatus'][0]).strip().lower()
-                except (KeyError, IndexError):
-                    field_to_check = None
-
-                # Check iNetUserStatus field.
-                if field_to_check != 'active':
-                    # Not enrolled and not active. Can set user to inactive in Django.
-                    logger.auth_info('{0}: is_active LDAP check - Verified inetUserStatus.'.format(uid))
-                    return (False, False)
-                else:
-                    # User is not enrolled but is "active".
-                    # NOTE: As of June 2021, this seems to stay set to active even for really really old students that
-                    # graduated forever ago. Aka, the "inetUserStatus" LDAP field may be useless now.
-
-                    # The below "expiration" logic should work in theory. However, thanks to main campus LDAP being as
-                    # reliable as ever, it does not seem to update properly.
-                    # For example, some "EmployeeExpiration" values will show a date of years ago, for students that
-                    # are still actively working.
-                    # Meanwhile, for the same above student, the "StudentExpiration" values may show a date of two to
-                    # three years in the future.
-                    # It just seems really really unreliable.
-                    # Thus, experimentally use the below logic first. If this chunk of logic leads to User "active"
-                    # check issues, then remove.
-
-                    # IDK. As of summer 2022, this KerberosUser check doesn't seem to fully work either anymore.
-                    # Some users that should be "inactive" (and even previously were set to such) now come back as
-                    # active. Wtf. How the fuck does main campus LDAP work. It seems so inconsistent.
-                    # Keeping this here for now. Because at least it shouldn't hurt anything. But we still have users
-                    # that should set to inactive that aren't, ugh.
-
-                    kerberos_status = ldap_info['wmuKerberosUserStatus'][0].strip()
-                    if kerberos_status != 'active':
-                        # Kerberos field returns non-active value. User is probably no longer student/working here?
-                        logger.auth_info('{0}: is_active LDAP check - Verified wmuKerberosUserStatus.'.format(uid))
-                        return (False, False)
-
-                    # Get wmuEmployeeExpiration.
-                    try:
-                        expiration_field = str(ldap_info['wmuEmployeeExpiration'][0]).strip()
-
-                        # Check length and handle accordingly.
-                        if len(expiration_field) == 8:
-                            # Only 8 digits. Likely YYYYMMDD format.
-                            employee_expiration = datetime.datetime.strptime(expiration_field, '%Y%m%d').date()
-                        else:
-                            # More than 8 digits. Likely full datetime set.
-                            employee_expiration = datetime.datetime.strptime(expiration_field, '%Y%m%d%H%M%S%z').date()
-
-                        # Check if falls within valid employment period.
-                        if employee_expiration is not None and employee_expiration >= timezone.now().date():
-                            # Not enrolled, but still employed.
-                            logger.auth_info('{0}: is_active LDAP check - Verified wmuEmployeeExpiration.'.format(uid))
-                            return (True, True)
-                    except (KeyError, IndexError):
-                        # Failed to get employee_expiration. Set to None.
-                        employee_expiration = None
-
-                    # Get wmuStudentExpiration.
-                    try:
-                        expiration_field = str(ldap_info['wmuStudentExpiration'][0]).strip()
-
-                        # Check length and handle accordingly.
-                        if len(expiration_field) == 8:
-                            # Only 8 digits. Likely YYYYMMDD format.
-                            student_expiration = datetime.datetime.strptime(expiration_field, '%Y%m%d').date()
-                        else:
-                            # More than 8 digits. Likely full datetime set.
-                            student_expiration = datetime.datetime.strptime(expiration_field, '%Y%m%d%H%M%S%z').date()
-                    except (KeyError, IndexError):
-                        # Failed to get student_expiration. Set to None.
-                        student_expiration = None
-
-                    # Check if both are out of retention policy (12 months).
-                    one_year_ago = (timezone.now() - timezone.timedelta(days=365)).date()
-                    if (student_expiration is not None and student_expiration >= one_year_ago) or \
-                        (employee_expiration is not None and employee_expiration >= one_year_ago):
-
-                        # Not enrolled, but within either student or employee retention period.
-                        logger.auth_info('{0}: is_active LDAP check - Verified wmuStudentExpiration.'.format(uid))
-                        return (False, True)
-
-                    # Not enrolled and not within retention periods.
-                    logger.auth_info('{0}: is_active LDAP check - No verified matches.'.format(uid))
-                    return (False, False)
-
-        except KeyError as err:
-            # One or more relevant fields do not exist. Assuming we can set user to inactive in Django.
-            logger.auth_error('{0}: Failed to find LDAP key for user during enrollment check. {1}'.format(uid, err))
+        # Check iNetUserStatus field.
+        if user_status.inet_user_status != 'active':
+            # Not enrolled and not active. Can set user to inactive in Django.
+            logger.auth_info('{0}: is_active LDAP check - Verified inetUserStatus.'.format(uid))
+            return (False, False)
+
+        # User is not enrolled but is "active".
+        # NOTE: As of June 2021, this seems to stay set to active even for really really old students that
+        # graduated forever ago. Aka, the "inetUserStatus" LDAP field may be useless now.
+
+        # The below "expiration" logic should work in theory. However, thanks to main campus LDAP being as
+        # reliable as ever, it does not seem to update properly.
+        # For example, some "EmployeeExpiration" values will show a date of years ago, for students that
+        # are still actively working.
+        # Meanwhile, for the same above student, the "StudentExpiration" values may show a date of two to
+        # three years in the future.
+        # It just seems really really unreliable.
+        # Thus, experimentally use the below logic first. If this chunk of logic leads to User "active"
+        # check issues, then remove.
+
+        # IDK. As of summer 2022, this KerberosUser check doesn't seem to fully work either anymore.
+        # Some users that should be "inactive" (and even previously were set to such) now come back as
+        # active. Wtf. How the fuck does main campus LDAP work. It seems so inconsistent.
+        # Keeping this here for now. Because at least it shouldn't hurt anything. But we still have users
+        # that should set to inactive that aren't, ugh.
+
+        if user_status.kerberos_user_status is None:
+            # Field does not exist. Assuming we can set user to inactive in Django.
+            logger.auth_error('{0}: Failed to find LDAP wmuKerberosUserStatus during enrollment check.'.format(uid))
+            return (False, False)
+        if user_status.kerberos_user_status != 'active':
+            # Kerberos field returns non-active value. User is probably no longer student/working here?
+            logger.auth_info('{0}: is_active LDAP check - Verified wmuKerberosUserStatus.'.format(uid))
             return (False, False)
 
+        # Check if falls within valid employment period.
+        employee_expiration = user_status.employee_expiration
+        if employee_expiration is not None and employee_expiration >= timezone.now().date():
+            # Not enrolled, but still employed.
+            logger.auth_info('{0}: is_active LDAP check - Verified wmuEmployeeExpiration.'.format(uid))
+            return (True, True)
+
+        # Check if both are out of retention policy (12 months).
+        student_expiration = user_status.student_expiration
+        one_year_ago = (timezone.now() - timezone.timedelta(days=365)).date()
+        if (student_expiration is not None and student_expiration >= one_year_ago) or \
+            (employee_expiration is not None and employee_expiration >= one_year_ago):
+
+            # Not enrolled, but within either student or employee retention period.
+            logger.auth_info('{0}: is_active LDAP check - Verified wmuStudentExpiration.'.format(uid))
+            return (False, True)
+
+        # Not enrolled and not within retention periods.
+        logger.auth_info('{0}: is_active LDAP check - No verified matches.'.format(uid))
+        return (False, False)
+
     # endregion User Ldap Status Functions
 
     # region Ldap Get Attr Functions
@@ -679,20 +742,26 @@ class WmuAuthBackend(AbstractLDAPBackend):
         :param bronco_net: Student BroncoNet to attempt with.
         :return: All of student's LDAP info | None on failure.
         """
-        # Bind to server.
-        self.ldap_lib.bind_server(get_info=self.get_info)
+        def search():
+            with self.ldap_pool.connection() as ldap_connection:
+                return self._search_all_user_info(ldap_connection, bronco_net)
 
-        # Attempt to get full student info from LDAP.
-        ldap_info = self.ldap_lib.search(search_filter='(uid={0})'.format(bronco_net), attributes='ALL_ATTRIBUTES')
+        return ldap_cache.get_or_search(self.ldap_pool_name, 'user_info', bronco_net, search)
 
-        # Check that info was returned.
-        if ldap_info is None:
-            # Nothing returned. Try again, but filter by "wmuUID" field. This should work if the "uid" field fails.
-            ldap_info = self.ldap_lib.search(search_filter='(wmuUID={0})'.format(bronco_net), attributes='ALL_ATTRIBUTES')
+    def _get_user_status_from_bronconet(self, bronco_net):
+        """
+        Attempts to get only student "active" status info from given BroncoNet. See LdapUserStatus.
+        :param bronco_net: Student BroncoNet to attempt with.
+        :return: Student's parsed LdapUserStatus | None on failure.
+        """
+        def search():
+            with self.ldap_pool.connection() as ldap_connection:
+                return self._search_all_user_info(ldap_connection, bronco_net, attributes=LdapUserStatus.ATTRIBUTES)
 
-        # Unbind and return values.
-        self.ldap_lib.unbind_server()
-        return ldap_info
+        ldap_info = ldap_cache.get_or_search(self.ldap_pool_name, 'user_info', ('status', bronco_net), search)
+        if ldap_info is None:
+            return None
+        return LdapUserStatus.from_ldap_info(ldap_info)
 
     def _get_all_user_info_from_winno(self, winno):
         """
@@ -700,14 +769,111 @@ class WmuAuthBackend(AbstractLDAPBackend):
         :param winno: Student Winno to attempt with.
         :return: All of student's LDAP info | None on failure.
         """
-        # Bind to server.
-        self.ldap_lib.bind_server(get_info=self.get_info)
+        def search():
+            with self.ldap_pool.connection() as ldap_connection:
+                return self._search_all_user_info(ldap_connection, winno, by_winno=True)
+
+        return ldap_cache.get_or_search(self.ldap_pool_name, 'user_info', ('winno', winno), search)
+
+    def get_all_user_info(self, values, by_winno=False, chunk_size=100):
+        """
+        Attempts to get all info for many students at once, such as for nightly user syncing.
+        Students are searched in chunks, with a single (paged) search per chunk, rather than one per student.
+        Students not found by "uid" are then searched by "wmuUID", again once per chunk.
+        :param values: List of student BroncoNets (or Winnos, if by_winno is True) to attempt with.
+        :param by_winno: Boolean indicating if values are Winnos.
+        :param chunk_size: Number of students to search for at once.
+        :return: Dict of {value: student's LDAP info}. Students not found in LDAP are excluded.
+        """
+        # Remove duplicates, while preserving order.
+        values = list(dict.fromkeys(str(value).strip() for value in values))
+
+        # Check cache first. Only search for values that aren't cached.
+        cache_keys = {value: ('winno', value) if by_winno else value for value in values}
+        cached_info, _ = ldap_cache.get_many(self.ldap_pool_name, 'user_info', list(cache_keys.values()))
+        user_info = {}
+        missing_values = []
+        for value, cache_key in cache_keys.items():
+            if cache_key in cached_info:
+                user_info[value] = cached_info[cache_key]
+            else:
+                missing_values.append(value)
+
+        for index in range(0, len(missing_values), chunk_size):
+            chunk = missing_values[index:index + chunk_size]
+            with self.ldap_pool.connection() as ldap_connection:
+                if by_winno:
+                    found_info = self._search_many_user_info(ldap_connection, 'wmuBannerID', chunk)
+                else:
+                    found_info = self._search_many_user_info(ldap_connection, 'uid', chunk)
+
+                    # Try again for any not found, but filter by "wmuUID" field. Same as single student searches.
+                    not_found = [value for value in chunk if value.lower() not in found_info]
+                    if not_found:
+                        found_info.update(self._search_many_user_info(ldap_connection, 'wmuUID', not_found))
+
+            for value in chunk:
+                user_info[value] = found_info.get(value.lower(), None)
+                ldap_cache.set_result(self.ldap_pool_name, 'user_info', cache_keys[value], user_info[value])
+
+        # Exclude values not found in LDAP.
+        return {value: user_info[value] for value in values if user_info[value] is not None}
+
+    def _search_many_user_info(self, ldap_connection, attribute, values):
+        """
+        Searches for all info of many students at once, with a single "|" filter on given attribute.
+        :param ldap_connection: Borrowed pool connection to search with.
+        :param attribute: Attribute to match values against, such as "uid".
+        :param values: List of values to search for.
+        :return: Dict of {lowercase value: student's LDAP info}, for each value found.
+        """
+        search_filter = '(|{0})'.format(''.join(
+            '({0}={1})'.format(attribute, escape_filter_value(value)) for value in values
+        ))
+        entries = ldap_connection.search_all(
+            settings.WMU_LDAP['user_search_base'],
+            search_filter,
+            attributes=self.USER_INFO_ATTRIBUTES,
+        )
+
+        # Map entries back to searched values. As with single searches, first matching entry is used.
+        found_info = {}
+        for entry in entries:
+            for entry_value in entry.get(attribute, []):
+                found_info.setdefault(str(entry_value).strip().lower(), entry)
+        return found_info
+
+    def _search_all_user_info(self, ldap_connection, value, by_winno=False, attributes=None):
+        """
+        Searches for all info of a single student. Only requests attributes used by user operations.
+        :param ldap_connection: Borrowed pool connection to search with.
+        :param value: Student BroncoNet (or Winno, if by_winno is True) to attempt with.
+        :param by_winno: Boolean indicating if value is a Winno.
+        :param attributes: Attributes to request. Defaults to USER_INFO_ATTRIBUTES.
+        :return: All of student's LDAP info | None on failure.
+        """
+        if attributes is None:
+            attributes = self.USER_INFO_ATTRIBUTES
+        if by_winno:
+            return ldap_connection.search(
+                search_filter='(wmuBannerID={0})'.format(escape_filter_value(value)),
+                attributes=attributes,
+            )
 
         # Attempt to get full student info from LDAP.
-        ldap_info = self.ldap_lib.search(search_filter='(wmuBannerID={0})'.format(winno), attributes='ALL_ATTRIBUTES')
+        ldap_info = ldap_connection.search(
+            search_filter='(uid={0})'.format(escape_filter_value(value)),
+            attributes=attributes,
+        )
+
+        # Check that info was returned.
+        if ldap_info is None:
+            # Nothing returned. Try again, but filter by "wmuUID" field. This should work if the "uid" field fails.
+            ldap_info = ldap_connection.search(
+                search_filter='(wmuUID={0})'.format(escape_filter_value(value)),
+                attributes=attributes,
+            )
 
-        # Unbind and return values.
-        self.ldap_lib.unbind_server()
         return ldap_info
 
     def _parse_user_ldap_field(self, user_ldap_info, field_name):
@@ -744,23 +910,34 @@ class WmuAuthBackend(AbstractLDAPBackend):
         :param bronco_net: Student BroncoNet to attempt with.
         :return: Student Winno | None on failure.
         """
-        # Bind to server.
-        self.ldap_lib.bind_server(get_info=self.get_info)
-
-        # Get value from server.
-        winno = self.ldap_lib.search(search_filter='(uid={0})'.format(bronco_net), attributes=['wmuBannerID'])
+        def search():
+            with self.ldap_pool.connection() as ldap_connection:
+                # Get value from server.
+                winno = ldap_connection.search(
+                    search_filter='(uid={0})'.format(escape_filter_value(bronco_net)),
+                    attributes=['wmuBannerID'],
+                )
+
+                # Fallback if first attempt fails.
+                if winno is None:
+                    winno = ldap_connection.search(
+                        search_filter='(wmuUID={0})'.format(escape_filter_value(bronco_net)),
+                        attributes=['wmuBannerID'],
+                    )
 
-        # Fallback if first attempt fails.
-        if winno is None:
-            winno = self.ldap_lib.search(search_filter='(wmuUID={0})'.format(bronco_net), attributes=['wmuBannerID'])
+            # Format value.
+            if winno is not None:
+                winno = winno['wmuBannerID'][0]
 
-        # Format value.
-        if winno is not None:
-            winno = winno['wmuBannerID'][0]
+            return winno
 
-        # Unbind and return value.
-        self.ldap_lib.unbind_server()
-        return winno
+        # A user's Winno never changes, so this can be cached for a long time.
+        return ldap_cache.get_or_search(
+            self.ldap_pool_name,
+            'identifier',
+            ('winno_from_bronco_net', bronco_net),
+            search,
+        )
 
     def get_bronconet_from_winno(self, winno):
         """
@@ -768,27 +945,32 @@ class WmuAuthBackend(AbstractLDAPBackend):
         :param winno: Student Winno to attempt with.
         :return: Student BroncoNet | None on failure.
         """
-        # Bind to server.
-        self.ldap_lib.bind_server(get_info=self.get_info)
-
-        # Get value from server.
-        bronco_net = self.ldap_lib.search(search_filter='(wmuBannerId={0})'.format(winno), attributes=['wmuUID'])
-
-        # Format value.
-        if bronco_net is not None:
-            bronco_net = bronco_net['wmuUID'][0]
-
-        # Check if bad bronco_net. Occurs in some older accounts.
-        if bronco_net is not None and len(bronco_net) > 8:
-            bronco_net = self.ldap_lib.search(search_filter='(wmuBannerId={0})'.format(winno), attributes=['uid'])
-
-            # Format value.
-            if bronco_net is not None:
-                bronco_net = bronco_net['uid'][0]
-
-        # Unbind and return value.
-        self.ldap_lib.unbind_server()
-        return bronco_net
+        def search():
+            with self.ldap_pool.connection() as ldap_connection:
+                # Get value from server.
+                bronco_net = ldap_connection.search(
+                    search_filter='(wmuBannerId={0})'.format(escape_filter_value(winno)),
+                    attributes=['wmuUID'],
+                )
+
+                # Format value.
+                if bronco_net is not None:
+                    bronco_net = bronco_net['wmuUID'][0]
+
+                # Check if bad bronco_net. Occurs in some older accounts.
+                if bronco_net is not None and len(bronco_net) > 8:
+                    bronco_net = ldap_connection.search(
+                        search_filter='(wmuBannerId={0})'.format(escape_filter_value(winno)),
+                        attributes=['uid'],
+                    )
+
+                    # Format value.
+                    if bronco_net is not None:
+                        bronco_net = bronco_net['uid'][0]
+
+            return bronco_net
+
+        return ldap_cache.get_or_search(self.ldap_pool_name, 'identifier', ('bronco_net_from_winno', winno), search)
 
     def get_backup_ldap_name(self, uid, user_ldap_info, first_name=False, last_name=False):
         """
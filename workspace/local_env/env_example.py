@@ -64,6 +64,23 @@ DATABASES = {
 # endregion Database Setup
 
 
+# region Cache Setup
+
+# Cache connection information.
+# Defaults to local memory, which is only shared within a single process. Fine for development.
+# Production should use a cache shared by all worker processes, for LDAP search results, LDAP rate limits and reference
+# data changes to apply across workers. Uncomment to use the same Redis server as websocket connections.
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#         'LOCATION': 'redis://127.0.0.1:6379/1',
+#         'KEY_PREFIX': 'cae_workspace',
+#     },
+# }
+
+# endregion Cache Setup
+
+
 # region Site Serve Settings
 
 # Allowed server hosts.
@@ -195,6 +212,10 @@ BACKEND_LDAP_TEST_STUDENT_ID = ''       # BroncoNet for active Ldap student.
 SELENIUM_TESTS_BROWSER = 'chrome'   # Set to 'firefox' to use firefox browser instead.
 SELENIUM_TESTS_HEADLESS = False     # Set to True to run selenium in headless mode (hides browser window).
 
+# Query Budget Settings. Records queries per request and logs views that exceed budget to "sql/queries.log".
+# QUERY_BUDGET_ENABLED = True
+# QUERY_BUDGET_RAISE = True         # Fail requests (and thus tests) that exceed a view's declared query budget.
+
 #enregion Testing Settings
 
 
@@ -8,8 +8,10 @@ Note: Standard log priority is "NOTSET" > "DEBUG" > "INFO" > "WARNING" > "ERROR"
 """
 
 # System Imports.
-import time
+import queue, threading, time
 import logging.config
+from django.core import mail
+from django.utils.log import AdminEmailHandler
 from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
 
 # User Imports.
@@ -291,10 +293,13 @@ def _create_logging_dict(log_directory):
                 'filters': ['include_only_auth'],
             },
             # Error level - To admin email.
+            # Sent in the background as digests, so that repeated errors don't flood inboxes or slow down requests.
             'mail_error': {
                 'level': 'ERROR',
-                'class': 'django.utils.log.AdminEmailHandler',
+                'class': 'workspace.logging.DigestAdminEmailHandler',
                 'formatter': 'verbose',
+                'digest_interval': 60,      # Seconds to collect errors for, before sending digest.
+                'max_emails_per_hour': 20,
             },
         },
         'loggers': {
@@ -360,6 +365,11 @@ def _create_logging_dict(log_directory):
                 'level': 'NOTSET',
                 'propagate': False,
             },
+            'cae_home.query_budget': {
+                'handlers': ['file_debug_sql_queries'],
+                'level': 'NOTSET',
+                'propagate': False,
+            },
             'django.db.backends.schema': {
                 'handlers': ['file_debug_sql_schema'],
                 'level': 'NOTSET',
@@ -484,6 +494,280 @@ def add_logging_level(levelName, levelNum, methodName=None):
     setattr(logging, methodName, logToRoot)
 
 
+# region Logging Handlers
+
+class DigestAdminEmailHandler(AdminEmailHandler):
+    """
+    Admin email handler that sends error emails in the background, as periodic digests.
+
+    Errors are fingerprinted by exception type plus the innermost project frame they were raised through. Within each
+    digest interval, only the first occurrence of a given error is fully formatted. Later occurrences only increment a
+    counter. Emails are then sent from a background thread, so requests never wait on SMTP.
+
+    If the hourly email limit is reached, errors keep collecting and are sent in the next allowed digest.
+
+    On program exit, logging.shutdown() flushes (then closes) every live handler, so remaining errors are still sent.
+    Closing a handler directly discards anything not yet sent.
+    """
+    def __init__(
+        self, *args, digest_interval=60, max_emails_per_hour=20, max_queue_size=1000, background=True, **kwargs,
+    ):
+        """
+        :param digest_interval: Seconds to collect errors for, before sending digest.
+        :param max_emails_per_hour: Maximum number of digest emails to send per hour.
+        :param max_queue_size: Maximum number of queued errors. Further errors are dropped (but still counted).
+        :param background: Boolean indicating if background worker should run. If False, digests are only sent on
+                           flush(). Mostly for UnitTests.
+        """
+        super().__init__(*args, **kwargs)
+        self.digest_interval = digest_interval
+        self.max_emails_per_hour = max_emails_per_hour
+        self.background = background
+
+        # Queue of (fingerprint, subject, message, timestamp) values. Message is None for repeats.
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.dropped_count = 0
+
+        # Fingerprints already formatted in current digest interval.
+        self.interval_fingerprints = set()
+        self.fingerprint_lock = threading.Lock()
+
+        # Background worker values.
+        self.local = threading.local()
+        self.worker = None
+        self.worker_lock = threading.Lock()
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.sent_times = []
+        self.is_closed = False
+
+    def emit(self, record):
+        if self.is_closed:
+            return
+
+        fingerprint = self.get_fingerprint(record)
+
+        # Check if error was already seen in current interval.
+        with self.fingerprint_lock:
+            is_repeat = fingerprint in self.interval_fingerprints
+            self.interval_fingerprints.add(fingerprint)
+
+        if is_repeat:
+            # Only need to count occurrence. Subject is kept short, in case full error was already sent.
+            subject = self.format_subject('{0}: {1}'.format(record.levelname, record.getMessage()))
+            self.enqueue((fingerprint, subject, None, time.strftime('%Y-%m-%d %H:%M:%S')))
+        else:
+            # First occurrence. Format as normal. Parent logic then calls send_mail() to queue.
+            self.local.fingerprint = fingerprint
+            try:
+                super().emit(record)
+            finally:
+                self.local.fingerprint = None
+
+        self.start_worker()
+
+    def send_mail(self, subject, message, *args, **kwargs):
+        """
+        Queues formatted email, to be sent by background worker.
+        """
+        self.enqueue((self.local.fingerprint, subject, message, time.strftime('%Y-%m-%d %H:%M:%S')))
+
+    def enqueue(self, item):
+        """
+        Adds item to queue. If queue is full (such as during an error storm with a stuck SMTP server), item is dropped.
+        """
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped_count += 1
+
+    def get_fingerprint(self, record):
+        """
+        Fingerprints log record by exception type plus the innermost project frame it was raised through.
+        Errors raised within libraries (such as DoesNotExist from Django's query logic) are thus grouped by the project
+        code that called the library, rather than all sharing a single library frame.
+        Falls back to the log call location, for records with no exception.
+        """
+        if record.exc_info and record.exc_info[2] is not None:
+            exc_type, exc_value, exc_traceback = record.exc_info
+
+            # Find innermost project frame. If error never passed through project code, use innermost frame.
+            raising_traceback = None
+            while True:
+                if self.is_project_file(exc_traceback.tb_frame.f_code.co_filename):
+                    raising_traceback = exc_traceback
+                if exc_traceback.tb_next is None:
+                    break
+                exc_traceback = exc_traceback.tb_next
+            if raising_traceback is None:
+                raising_traceback = exc_traceback
+            frame_code = raising_traceback.tb_frame.f_code
+
+            return '{0}.{1} {2}:{3} {4}()'.format(
+                exc_type.__module__,
+                exc_type.__qualname__,
+                frame_code.co_filename,
+                raising_traceback.tb_lineno,
+                frame_code.co_name,
+            )
+
+        return '{0} {1}:{2}'.format(record.name, record.pathname, record.lineno)
+
+    def is_project_file(self, filename):
+        """
+        Determines if file is part of project code, as opposed to Python or an installed library.
+        :param filename: Filename of frame code.
+        :return: Boolean indicating if file is in project.
+        """
+        filename = os.path.abspath(filename)
+        if not filename.startswith(os.path.join(BASE_DIR, '')):
+            return False
+
+        # Virtual environments may be located within project folder.
+        path_parts = filename.split(os.sep)
+        return 'site-packages' not in path_parts and 'dist-packages' not in path_parts
+
+    def start_worker(self):
+        """
+        Starts background worker thread, if not already running.
+        """
+        if not self.background or (self.worker is not None and self.worker.is_alive()):
+            return
+
+        with self.worker_lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run_worker, name='DigestAdminEmailHandler', daemon=True)
+                self.worker.start()
+
+    def run_worker(self):
+        """
+        Background worker loop. Collects queued errors, then sends digest at end of each interval.
+        """
+        while not self.is_closed:
+            interval_end = time.monotonic() + self.digest_interval
+            while True:
+                timeout = interval_end - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    self.add_pending(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self.send_digest()
+
+    def add_pending(self, item):
+        """
+        Adds queued item to pending digest.
+        """
+        fingerprint, subject, message, timestamp = item
+        with self.pending_lock:
+            entry = self.pending.get(fingerprint, None)
+            if entry is None:
+                entry = self.pending[fingerprint] = {
+                    'subject': subject,
+                    'message': message,
+                    'count': 0,
+                    'first_seen': timestamp,
+                }
+            elif entry['message'] is None and message is not None:
+                # Digest was held back by rate limiting, and the error was formatted again in a new interval.
+                entry['subject'] = subject
+                entry['message'] = message
+            entry['count'] += 1
+            entry['last_seen'] = timestamp
+
+    def send_digest(self, force=False):
+        """
+        Sends all pending errors as a single email.
+        :param force: Boolean to send regardless of hourly email limit.
+        """
+        if self.is_closed:
+            return
+
+        # Start a new interval, so that next occurrence of each error is formatted again.
+        with self.fingerprint_lock:
+            self.interval_fingerprints.clear()
+
+        with self.pending_lock:
+            if not self.pending:
+                return
+
+            # Check hourly email limit.
+            now = time.monotonic()
+            self.sent_times = [sent_time for sent_time in self.sent_times if now - sent_time < 3600]
+            if not force and len(self.sent_times) >= self.max_emails_per_hour:
+                return
+
+            entries = list(self.pending.values())
+            occurrence_count = sum(entry['count'] for entry in entries)
+            dropped_count = self.dropped_count
+            self.pending = {}
+            self.dropped_count = 0
+            self.sent_times.append(now)
+
+        # Build digest.
+        if len(entries) == 1:
+            subject = entries[0]['subject']
+            if occurrence_count > 1:
+                subject = '{0} (x{1})'.format(subject, occurrence_count)
+        else:
+            subject = self.format_subject('ERROR Digest: {0} errors ({1} occurrences)'.format(
+                len(entries),
+                occurrence_count,
+            ))
+
+        message_parts = []
+        if dropped_count:
+            message_parts.append('{0} additional errors were dropped due to full queue.'.format(dropped_count))
+        for entry in sorted(entries, key=lambda x: x['count'], reverse=True):
+            message_parts.append('{0}\nOccurrences: {1}    First Seen: {2}    Last Seen: {3}\n\n{4}'.format(
+                entry['subject'],
+                entry['count'],
+                entry['first_seen'],
+                entry['last_seen'],
+                # Repeats of an error whose full details went out in an earlier digest are only counted.
+                entry['message'] if entry['message'] is not None else 'Full details were sent in an earlier digest.',
+            ))
+
+        message = '\n\n{0}\n\n'.format('=' * 80).join(message_parts)
+
+        try:
+            mail.mail_admins(subject, message, fail_silently=True, connection=self.connection())
+        except Exception:
+            # Never raise from background worker. Error has already been logged to file by other handlers.
+            pass
+
+    def flush(self):
+        """
+        Immediately sends any queued errors, regardless of interval or hourly limit.
+        Called by logging.shutdown() on program exit.
+        """
+        while True:
+            try:
+                self.add_pending(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self.send_digest(force=True)
+
+    def close(self):
+        """
+        Closes handler. Any errors not yet sent are discarded, so call flush() first to send them.
+        """
+        self.is_closed = True
+        with self.pending_lock:
+            self.pending = {}
+            self.dropped_count = 0
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        super().close()
+
+# endregion Logging Handlers
+
+
 # region Logging Filters
 
 class _ExcludeInfoPlusFilter(logging.Filter):
@@ -121,6 +121,126 @@ DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 # endregion Environment Values
 
 
+# region Cache Settings
+
+# Project cache. Defaults to local memory, which needs no extra services but is only shared within a single process.
+# LDAP search results, LDAP rate limits and reference data versions are only shared across workers if the cache is.
+# Production installs should opt into a shared cache (such as Redis) in "settings/local_env/env.py".
+CACHES = globals().get('CACHES', {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+})
+
+# UnitTests always get their own local memory cache. Tests clear the cache, so must never touch a shared one.
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cae_workspace_tests',
+        },
+    }
+
+# Number of seconds that a user's "request context" (profile, site theme, group names) is cached for.
+# Values are also invalidated on change, so this mostly limits how long unused entries linger.
+USER_CONTEXT_CACHE_TIMEOUT = 300
+
+# Number of seconds that user and group permissions are cached for.
+# Values are also invalidated on change, so this mostly limits how long unused entries linger.
+PERMISSION_CACHE_TIMEOUT = 300
+
+# Number of seconds between checks for reference data (departments, majors, rooms, etc) changed by other processes.
+# Changes made within the same process apply immediately.
+REFERENCE_DATA_VERSION_CHECK_INTERVAL = 10
+
+# Number of seconds between checks for site context values (CAE Programmer email, default site theme) changed by other
+# processes. Changes made within the same process apply immediately.
+SITE_CONTEXT_VERSION_CHECK_INTERVAL = 10
+
+# endregion Cache Settings
+
+
+# region Query Budget Settings
+
+# Optional per-request query recording. See "cae_home/query_budget.py".
+# Set these in env.py to change them.
+QUERY_BUDGET_ENABLED = globals().get('QUERY_BUDGET_ENABLED', False)
+QUERY_BUDGET_RAISE = globals().get('QUERY_BUDGET_RAISE', False)  # Raise error when view exceeds its declared budget.
+
+# Default per-request budget, for views that don't declare their own.
+QUERY_BUDGET_MAX_QUERIES = globals().get('QUERY_BUDGET_MAX_QUERIES', 50)
+QUERY_BUDGET_MAX_DUPLICATES = globals().get('QUERY_BUDGET_MAX_DUPLICATES', 5)
+QUERY_BUDGET_MAX_DB_TIME = globals().get('QUERY_BUDGET_MAX_DB_TIME', 0.5)   # Seconds.
+
+# endregion Query Budget Settings
+
+
+# region Ldap Settings
+
+# Class used by LDAP backends to connect to directories. Should match the interface of "simple_ldap_lib.SimpleLdap".
+# Set to "workspace.ldap_backends.fake_ldap.FakeSimpleLdap" to use an in-memory directory instead, such as when offline.
+LDAP_LIBRARY = globals().get('LDAP_LIBRARY', 'workspace.ldap_backends.simple_ldap_lib.SimpleLdap')
+
+# Per-process pools of bound LDAP connections, one per directory. See "workspace/ldap_backends/connection_pool.py".
+# Set these in env.py to change them.
+LDAP_CONNECTION_POOL_MAX_SIZE = globals().get('LDAP_CONNECTION_POOL_MAX_SIZE', 4)
+LDAP_CONNECTION_POOL_IDLE_TIMEOUT = globals().get('LDAP_CONNECTION_POOL_IDLE_TIMEOUT', 120)    # Seconds.
+LDAP_CONNECTION_POOL_BORROW_TIMEOUT = globals().get('LDAP_CONNECTION_POOL_BORROW_TIMEOUT', 10)    # Seconds.
+
+# Max entries per page, for LDAP searches that return many entries at once (such as bulk user info searches).
+LDAP_SEARCH_PAGE_SIZE = globals().get('LDAP_SEARCH_PAGE_SIZE', 500)
+
+# Number of seconds that CAE LDAP group members are held for. See "workspace/ldap_backends/group_snapshot.py".
+# Group changes in LDAP take up to this long to apply on login.
+LDAP_GROUP_SNAPSHOT_TTL = globals().get('LDAP_GROUP_SNAPSHOT_TTL', 300)
+
+# Number of days that a user's LDAP info is trusted for on login. Logins with older info sync the user's groups,
+# profile and majors before completing. New and inactive users always sync first.
+# The default of 1 only trusts info synced today, such as by the nightly "update_user_models" run. LDAP group removals
+# take up to this many days to apply on login.
+LDAP_LOGIN_SYNC_MAX_AGE = globals().get('LDAP_LOGIN_SYNC_MAX_AGE', 1)
+
+# Number of seconds login waits on each app login hook that runs concurrently. Slower hooks finish in the background.
+LOGIN_HOOK_TIMEOUT = globals().get('LOGIN_HOOK_TIMEOUT', 2)
+
+# Number of seconds each directory is given, when the PADL utility searches all directories at once.
+# Directories that take longer are reported as unresponsive, and the page shows results from the rest.
+LDAP_UTILITY_TIMEOUT = globals().get('LDAP_UTILITY_TIMEOUT', 5)
+
+# Number of threads each directory gets, when the PADL utility searches all directories at once.
+# Searches that time out keep their thread until the LDAP server responds, so this limits how many hung searches (and
+# pooled connections) a single unresponsive directory can tie up.
+LDAP_UTILITY_THREADS_PER_DIRECTORY = globals().get('LDAP_UTILITY_THREADS_PER_DIRECTORY', 2)
+
+# Number of seconds that LDAP search results are cached for, per class of result. See "ldap_backends/ldap_cache.py".
+# Searches that found nothing are cached for LDAP_CACHE_NOT_FOUND_TIMEOUT instead.
+LDAP_CACHE_TIMEOUTS = globals().get('LDAP_CACHE_TIMEOUTS', {
+    'identifier': 86400,    # BroncoNet/Winno mappings. These don't change.
+    'user_info': 3600,      # Full user records.
+    'attribute': 3600,      # Single user attributes.
+})
+LDAP_CACHE_NOT_FOUND_TIMEOUT = globals().get('LDAP_CACHE_NOT_FOUND_TIMEOUT', 300)
+
+# Max LDAP calls (binds and searches) per second, per directory and traffic class. Shared by all workers through the
+# Django cache. Directories not listed are not limited. See "workspace/ldap_backends/ldap_guard.py".
+# Batch traffic (such as the nightly user sync) has a separate budget, so it can't starve user logins.
+LDAP_RATE_LIMITS = globals().get('LDAP_RATE_LIMITS', {
+    'wmu': {'interactive': 20, 'batch': 5},
+    'advising': {'interactive': 10, 'batch': 5},
+})
+# Max seconds a call waits for budget, per traffic class, before failing.
+LDAP_RATE_LIMIT_MAX_WAIT = globals().get('LDAP_RATE_LIMIT_MAX_WAIT', {'interactive': 2, 'batch': 60})
+
+# Per-process circuit breaker for each directory. Once at least LDAP_CIRCUIT_BREAKER_FAILURE_RATE of the calls in the
+# last LDAP_CIRCUIT_BREAKER_WINDOW seconds fail, calls fail immediately for LDAP_CIRCUIT_BREAKER_RESET_TIMEOUT seconds.
+LDAP_CIRCUIT_BREAKER_FAILURE_RATE = globals().get('LDAP_CIRCUIT_BREAKER_FAILURE_RATE', 0.5)
+LDAP_CIRCUIT_BREAKER_MIN_CALLS = globals().get('LDAP_CIRCUIT_BREAKER_MIN_CALLS', 5)
+LDAP_CIRCUIT_BREAKER_WINDOW = globals().get('LDAP_CIRCUIT_BREAKER_WINDOW', 30)     # Seconds.
+LDAP_CIRCUIT_BREAKER_RESET_TIMEOUT = globals().get('LDAP_CIRCUIT_BREAKER_RESET_TIMEOUT', 30)   # Seconds.
+
+# endregion Ldap Settings
+
+
 # region Third Party Library Settings
 
 # django-phonenumber-field settings
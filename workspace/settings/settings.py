@@ -141,5 +141,9 @@ if DEV_MODE:
     INSTALLED_APPS.append('django_dump_die')
     MIDDLEWARE.append('django_dump_die.middleware.DumpAndDieMiddleware')
 
+# Optionally record queries for all requests. Listed first, so queries from all other middleware are included.
+if QUERY_BUDGET_ENABLED:
+    MIDDLEWARE.insert(0, 'cae_home.middleware.QueryBudgetMiddleware')
+
 # Force additional blank line for debug printing.
 debug_print('')
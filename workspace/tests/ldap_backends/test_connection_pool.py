@@ -0,0 +1,180 @@
+"""
+Tests for LDAP connection pooling.
+"""
+
+# System Imports.
+from django.test import SimpleTestCase, override_settings
+from types import SimpleNamespace
+
+# User Imports.
+from workspace.ldap_backends import ldap_guard
+from workspace.ldap_backends.connection_pool import LdapConnectionPool
+
+
+class FakeLdapLib:
+    """
+    Stand-in for SimpleLdap instance, which counts binds and can fail searches on demand.
+    """
+    def __init__(self):
+        self.bind_count = 0
+        self.unbind_count = 0
+        self.fail_searches = 0
+        self.search_error = ConnectionError('Connection dropped.')
+
+    def bind_server(self, get_info=None):
+        self.bind_count += 1
+
+    def unbind_server(self):
+        self.unbind_count += 1
+
+    def search(self, search_filter=None, attributes=None):
+        if self.fail_searches > 0:
+            self.fail_searches -= 1
+            raise self.search_error
+        return {'uid': [search_filter]}
+
+
+class FakeLdap3Connection:
+    """
+    Stand-in for ldap3 Connection, as held by SimpleLdap instances. Only supports paged searches.
+    """
+    bound = True
+
+    def __init__(self, entries):
+        self.extend = SimpleNamespace(standard=SimpleNamespace(paged_search=self.paged_search))
+        self.entries = entries
+        self.searches = []
+
+    def search(self, *args, **kwargs):
+        raise NotImplementedError()
+
+    def paged_search(self, search_base, search_filter, attributes=None, paged_size=None, generator=True):
+        self.searches.append((search_base, search_filter, attributes, paged_size))
+        yield {'type': 'searchResRef', 'uri': ['ldap://other']}
+        for entry in self.entries:
+            yield {'type': 'searchResEntry', 'dn': entry[0], 'attributes': entry[1]}
+
+
+class LdapConnectionPoolTests(SimpleTestCase):
+    """
+    Tests to ensure LDAP connections are reused, and rebound when necessary.
+    """
+    def setUp(self):
+        self.ldap_libs = []
+        self.pool = LdapConnectionPool('test', self.create_ldap_lib, max_size=2, idle_timeout=60, borrow_timeout=0)
+
+    def create_ldap_lib(self):
+        ldap_lib = FakeLdapLib()
+        self.ldap_libs.append(ldap_lib)
+        return ldap_lib
+
+    def test_connection_reuse(self):
+        """
+        Tests that sequential searches share a single bound connection.
+        """
+        for index in range(5):
+            search_filter = '(uid={0})'.format(index)
+            self.assertEqual(self.pool.search(search_filter=search_filter), {'uid': [search_filter]})
+
+        self.assertEqual(len(self.ldap_libs), 1)
+        self.assertEqual(self.ldap_libs[0].bind_count, 1)
+        self.assertEqual(self.ldap_libs[0].unbind_count, 0)
+
+    def test_max_size(self):
+        """
+        Tests that pool holds no more than max size connections, and refuses further borrows when exhausted.
+        """
+        with self.pool.connection() as connection_1, self.pool.connection() as connection_2:
+            connection_1.search()
+            connection_2.search()
+
+            with self.assertRaises(ldap_guard.LdapPoolExhaustedError):
+                with self.pool.connection():
+                    pass
+
+            # No extra connection was opened.
+            self.assertEqual(len(self.ldap_libs), 2)
+
+        self.assertEqual(len(self.pool._idle_connections), 2)
+
+        with self.subTest('Connection returned'):
+            with self.pool.connection() as connection_1, self.pool.connection() as connection_2:
+                connection_1.search()
+                connection_2.search()
+            self.assertEqual(len(self.ldap_libs), 2)
+
+    def test_rebind_on_failure(self):
+        """
+        Tests that a failed search rebinds connection and retries.
+        """
+        self.pool.search()
+        ldap_lib = self.ldap_libs[0]
+        ldap_lib.fail_searches = 1
+
+        self.assertIsNotNone(self.pool.search())
+        self.assertEqual(ldap_lib.bind_count, 2)
+        self.assertEqual(ldap_lib.unbind_count, 1)
+
+        with self.subTest('Repeated failure'):
+            ldap_lib.fail_searches = 2
+            with self.assertRaises(ConnectionError):
+                self.pool.search()
+
+            # Failed connection is not returned to pool.
+            self.assertEqual(len(self.pool._idle_connections), 0)
+
+        with self.subTest('Non-connection failure'):
+            # Errors unrelated to the connection itself (such as an invalid filter) are raised without a rebind.
+            self.pool.search()
+            ldap_lib = self.ldap_libs[-1]
+            ldap_lib.fail_searches = 1
+            ldap_lib.search_error = ValueError('Invalid filter.')
+            with self.assertRaises(ValueError):
+                self.pool.search()
+
+            self.assertEqual(ldap_lib.bind_count, 1)
+            self.assertEqual(ldap_lib.unbind_count, 0)
+            self.assertEqual(len(self.pool._idle_connections), 1)
+
+    def test_idle_timeout(self):
+        """
+        Tests that connections idle for longer than the timeout are unbound and replaced.
+        """
+        self.pool.search()
+        self.pool._idle_connections[0].last_used -= 120
+
+        self.pool.search()
+        self.assertEqual(len(self.ldap_libs), 2)
+        self.assertEqual(self.ldap_libs[0].unbind_count, 1)
+        self.assertEqual(self.ldap_libs[1].bind_count, 1)
+
+    @override_settings(LDAP_SEARCH_PAGE_SIZE=50)
+    def test_search_all(self):
+        """
+        Tests that multiple entry searches run as paged searches on library's underlying connection.
+        """
+        ldap3_connection = FakeLdap3Connection([
+            ('uid=a,ou=people', {'uid': ['a'], 'mail': 'a@wmich.edu'}),
+            ('uid=b,ou=people', {'uid': ['b'], 'mail': 'b@wmich.edu'}),
+        ])
+
+        with self.pool.connection() as connection:
+            connection.ldap_lib._connection = ldap3_connection
+            entries = connection.search_all('ou=people', '(|(uid=a)(uid=b))', attributes=['uid', 'mail'])
+
+        # Single values are returned as lists, same as single entry searches.
+        self.assertEqual(entries, [
+            {'uid': ['a'], 'mail': ['a@wmich.edu']},
+            {'uid': ['b'], 'mail': ['b@wmich.edu']},
+        ])
+        self.assertEqual(ldap3_connection.searches, [('ou=people', '(|(uid=a)(uid=b))', ['uid', 'mail'], 50)])
+
+        with self.subTest('No bound ldap3 connection'):
+            with self.pool.connection() as connection:
+                ldap3_connection.bound = False
+                with self.assertRaises(TypeError):
+                    connection.search_all('ou=people', '(uid=a)')
+
+                del connection.ldap_lib._connection
+                with self.assertRaises(TypeError):
+                    connection.search_all('ou=people', '(uid=a)')
@@ -0,0 +1,201 @@
+"""
+Tests for in-memory fake LDAP library.
+"""
+
+# System Imports.
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+# User Imports.
+from workspace.ldap_backends import connection_pool, fake_ldap
+
+
+@override_settings(**fake_ldap.SETTINGS)
+class FakeLdapTests(SimpleTestCase):
+    """
+    Tests to ensure fake directory returns the same shape of data as actual LDAP.
+    """
+    def setUp(self):
+        self.directory = fake_ldap.FakeDirectory.generate(user_count=10)
+        fake_ldap.set_directory(self.directory)
+
+        self.ldap_lib = fake_ldap.FakeSimpleLdap()
+        self.ldap_lib.set_host('wmu.fake')
+        self.ldap_lib.set_search_base('ou=people,dc=wmu,dc=fake')
+        self.ldap_lib.bind_server()
+
+        self.user = self.directory.search('ou=people,dc=wmu,dc=fake', '(wmuBannerID=700000003)')
+
+    def tearDown(self):
+        fake_ldap.set_directory(None)
+
+    def test_search(self):
+        """
+        Tests searching for entries.
+        """
+        uid = self.user['uid'][0]
+
+        with self.subTest('Search with all attributes'):
+            ldap_info = self.ldap_lib.search(search_filter='(uid={0})'.format(uid), attributes='ALL_ATTRIBUTES')
+            self.assertEqual(ldap_info['wmuBannerID'], ['700000003'])
+            self.assertIn(ldap_info['wmuEnrolled'][0], ['TRUE', 'FALSE'])
+
+        with self.subTest('Search with specific attributes'):
+            # Attribute names are case-insensitive, same as actual LDAP.
+            ldap_info = self.ldap_lib.search(search_filter='(wmuBannerId=700000003)', attributes=['wmuUID'])
+            self.assertEqual(ldap_info, {'wmuUID': [uid]})
+
+        with self.subTest('Search with compound filter'):
+            ldap_info = self.ldap_lib.search(
+                search_filter='(&(uid={0})(!(wmuBannerID=1)))'.format(uid.upper()),
+                attributes=['uid'],
+            )
+            self.assertEqual(ldap_info, {'uid': [uid]})
+
+        with self.subTest('Search for majors'):
+            ldap_major = self.ldap_lib.search(
+                search_base=fake_ldap.MAJOR_SEARCH_BASE,
+                search_filter='(wmuStudentMajor={0})'.format(self.user['wmuStudentMajor'][0]),
+                attributes='ALL_ATTRIBUTES',
+            )
+            self.assertIn('wmuProgramCode', ldap_major)
+
+        with self.subTest('Search outside of search base'):
+            self.assertIsNone(self.ldap_lib.search(search_base='ou=other', search_filter='(uid={0})'.format(uid)))
+
+        with self.subTest('Search for invalid value'):
+            self.assertIsNone(self.ldap_lib.search(search_filter='(uid=invalid_user)'))
+
+        with self.subTest('Search for all matching entries'):
+            uids = [user_uid for user_uid, winno in self.directory.users[:3]]
+            ldap_entries = self.ldap_lib.search_all(
+                search_filter='(|{0}(uid=invalid_user))'.format(''.join('(uid={0})'.format(uid) for uid in uids)),
+                attributes=['uid'],
+                page_size=2,
+            )
+            self.assertEqual(ldap_entries, [{'uid': [user_uid]} for user_uid in uids])
+
+    def test_authenticate(self):
+        """
+        Tests checking user credentials.
+        """
+        uid = self.user['uid'][0]
+
+        self.assertTrue(self.ldap_lib.authenticate_with_unknown_uid(uid, fake_ldap.DEFAULT_PASSWORD)[0])
+        self.assertFalse(self.ldap_lib.authenticate_with_unknown_uid(uid, 'invalid_password')[0])
+        self.assertFalse(self.ldap_lib.authenticate_with_unknown_uid('invalid_user', fake_ldap.DEFAULT_PASSWORD)[0])
+
+    def test_call_accounting(self):
+        """
+        Tests that calls are counted per host and operation.
+        """
+        self.ldap_lib.search(search_filter='(uid=invalid_user)')
+        self.ldap_lib.search(search_filter='(uid=invalid_user)')
+        self.ldap_lib.unbind_server()
+
+        self.assertEqual(self.directory.get_calls('wmu.fake'), {'bind': 1, 'search': 2, 'unbind': 1})
+        self.assertEqual(self.directory.get_calls('cae.fake'), {})
+
+        with self.subTest('Search while unbound'):
+            with self.assertRaises(fake_ldap.FakeLdapError):
+                self.ldap_lib.search(search_filter='(uid=invalid_user)')
+
+    def test_failure_injection(self):
+        """
+        Tests that operations fail at configured rate.
+        """
+        self.directory.failure_rate = {'search': 1}
+
+        with self.assertRaises(fake_ldap.FakeLdapError):
+            self.ldap_lib.search(search_filter='(uid=invalid_user)')
+
+        # Other operations are unaffected.
+        self.ldap_lib.unbind_server()
+        self.ldap_lib.bind_server()
+
+    def test_backend(self):
+        """
+        Tests that backends can search the fake directory, through the LDAP_LIBRARY setting.
+        """
+        from workspace.ldap_backends.wmu_auth import wmu_backend
+
+        # Make sure no pooled connections or cached results remain from prior tests.
+        connection_pool.close_all()
+        cache.clear()
+
+        wmu_ldap = wmu_backend.WmuAuthBackend()
+        self.assertEqual(wmu_ldap.get_bronconet_from_winno('700000003'), self.user['uid'][0])
+        self.assertEqual(wmu_ldap.get_winno_from_bronconet(self.user['uid'][0]), '700000003')
+        self.assertEqual(self.directory.get_calls('wmu.fake')['search'], 2)
+
+        with self.subTest('User info only includes requested attributes'):
+            ldap_info = wmu_ldap._get_all_user_info_from_bronconet(self.user['uid'][0])
+            self.assertEqual(set(ldap_info.keys()), set(wmu_ldap.USER_INFO_ATTRIBUTES) & set(self.user.keys()))
+            self.assertNotIn('wmuStudentMajor', ldap_info)
+
+        with self.subTest('User status is parsed once'):
+            user_status = wmu_backend.LdapUserStatus.from_ldap_info(ldap_info)
+            self.assertEqual(user_status.enrolled, self.user['wmuEnrolled'][0].lower())
+            self.assertEqual(user_status.student_expiration.strftime('%Y%m%d'), self.user['wmuStudentExpiration'][0])
+            self.assertEqual(
+                wmu_ldap._verify_user_ldap_status(self.user['uid'][0], user_status),
+                wmu_ldap._verify_user_ldap_status(self.user['uid'][0], ldap_info),
+            )
+
+        connection_pool.close_all()
+
+    def test_backend_bulk_search(self):
+        """
+        Tests that backend bulk searches make one search per chunk of users, rather than one per user.
+        """
+        from workspace.ldap_backends.wmu_auth import wmu_backend
+
+        # Make sure no pooled connections or cached results remain from prior tests.
+        connection_pool.close_all()
+        cache.clear()
+        self.addCleanup(connection_pool.close_all)
+
+        # Add user that can only be found by "wmuUID".
+        self.directory.add(
+            'uid=wmu_only_alias,ou=people,dc=wmu,dc=fake',
+            {'uid': ['wmu_only_alias'], 'wmuUID': ['wmu_only_user'], 'wmuBannerID': ['700099999']},
+        )
+        uids = [uid for uid, winno in self.directory.users] + ['wmu_only_user', 'invalid_user']
+        wmu_ldap = wmu_backend.WmuAuthBackend()
+
+        with self.subTest('Search by BroncoNet'):
+            self.directory.reset_calls()
+            ldap_results = wmu_ldap.get_all_user_info(uids, chunk_size=4)
+
+            # One search per chunk of 4, plus one "wmuUID" search for the chunk with users not found by "uid".
+            self.assertEqual(self.directory.get_calls('wmu.fake')['search'], 4)
+            self.assertEqual(sorted(ldap_results.keys()), sorted(uids[:-1]))
+            self.assertEqual(ldap_results['wmu_only_user']['uid'], ['wmu_only_alias'])
+
+        with self.subTest('Results are cached'):
+            self.directory.reset_calls()
+            wmu_ldap.get_all_user_info(uids, chunk_size=4)
+            self.assertEqual(self.directory.get_calls('wmu.fake')['search'], 0)
+
+        with self.subTest('Results match single user searches'):
+            cache.clear()
+            for uid in uids[:-1]:
+                self.assertEqual(ldap_results[uid], wmu_ldap._get_all_user_info_from_bronconet(uid))
+
+        with self.subTest('Search by Winno'):
+            cache.clear()
+            self.directory.reset_calls()
+            winnos = [winno for uid, winno in self.directory.users]
+            ldap_results = wmu_ldap.get_all_user_info(winnos, by_winno=True)
+
+            self.assertEqual(self.directory.get_calls('wmu.fake')['search'], 1)
+            self.assertEqual(sorted(ldap_results.keys()), sorted(winnos))
+
+        with self.subTest('Results are paged'), override_settings(LDAP_SEARCH_PAGE_SIZE=3):
+            cache.clear()
+            self.directory.reset_calls()
+            ldap_results = wmu_ldap.get_all_user_info(uids)
+
+            # 10 users found by "uid" over 4 pages, then one "wmuUID" search.
+            self.assertEqual(self.directory.get_calls('wmu.fake')['search'], 5)
+            self.assertEqual(len(ldap_results), len(uids) - 1)
@@ -0,0 +1,82 @@
+"""
+Tests for LDAP group membership snapshots.
+"""
+
+# System Imports.
+from django.test import SimpleTestCase
+
+# User Imports.
+from workspace.ldap_backends.connection_pool import LdapConnectionPool
+from workspace.ldap_backends.group_snapshot import LdapGroupSnapshot
+
+
+class FakeLdapLib:
+    """
+    Stand-in for SimpleLdap instance, which returns group members and counts searches.
+    """
+    groups = {
+        'directors': ['director_user'],
+        'admins': ['admin_user', 'director_user'],
+    }
+
+    def __init__(self):
+        self.search_count = 0
+
+    def bind_server(self, get_info=None):
+        pass
+
+    def unbind_server(self):
+        pass
+
+    def search(self, search_base=None, search_filter=None, attributes=None):
+        self.search_count += 1
+        group_cn = search_filter[len('(cn='):-1]
+        if group_cn not in self.groups:
+            return None
+        return {'memberUid': self.groups[group_cn]}
+
+
+class LdapGroupSnapshotTests(SimpleTestCase):
+    """
+    Tests to ensure group members are fetched once per snapshot.
+    """
+    def setUp(self):
+        self.ldap_lib = FakeLdapLib()
+        ldap_pool = LdapConnectionPool('test', lambda: self.ldap_lib, max_size=1, idle_timeout=60, borrow_timeout=0)
+        self.snapshot = LdapGroupSnapshot(
+            ldap_pool,
+            'ou=groups',
+            {'director': 'directors', 'admin': 'admins', 'programmer': 'programmers'},
+            ttl=60,
+        )
+
+    def test_get_user_groups(self):
+        """
+        Tests checking group membership for many users.
+        """
+        self.assertEqual(
+            self.snapshot.get_user_groups('director_user'),
+            {'director': True, 'admin': True, 'programmer': False},
+        )
+        self.assertEqual(
+            self.snapshot.get_user_groups('admin_user'),
+            {'director': False, 'admin': True, 'programmer': False},
+        )
+        for index in range(10):
+            self.assertEqual(
+                self.snapshot.get_user_groups('user_{0}'.format(index)),
+                {'director': False, 'admin': False, 'programmer': False},
+            )
+
+        # Only one search per group.
+        self.assertEqual(self.ldap_lib.search_count, 3)
+
+    def test_expiration(self):
+        """
+        Tests that snapshot is refreshed once expired.
+        """
+        self.snapshot.get_user_groups('admin_user')
+        self.snapshot.invalidate()
+        self.snapshot.get_user_groups('admin_user')
+
+        self.assertEqual(self.ldap_lib.search_count, 6)
@@ -0,0 +1,81 @@
+"""
+Tests for LDAP result caching.
+"""
+
+# System Imports.
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+# User Imports.
+from workspace.ldap_backends import ldap_cache
+
+
+class LdapCacheTests(SimpleTestCase):
+    """
+    Tests to ensure LDAP results are cached in both tiers.
+    """
+    def setUp(self):
+        cache.clear()
+        ldap_cache.reset_stats()
+        self.search_count = 0
+
+    def search(self, result=None):
+        """
+        Returns function which counts searches, and returns given result.
+        """
+        def search():
+            self.search_count += 1
+            return result
+        return search
+
+    def test_unit_of_work(self):
+        """
+        Tests that results are memoized within a unit of work.
+        """
+        with ldap_cache.unit_of_work():
+            for index in range(3):
+                result = ldap_cache.get_or_search('test', 'user_info', 'test_user', self.search({'uid': ['test_user']}))
+                self.assertEqual(result, {'uid': ['test_user']})
+
+            # Memo is still used if shared cache is cleared.
+            cache.clear()
+            ldap_cache.get_or_search('test', 'user_info', 'test_user', self.search())
+
+        self.assertEqual(self.search_count, 1)
+        self.assertEqual(ldap_cache.get_stats(), {'user_info': {'memo_hits': 3, 'cache_hits': 0, 'misses': 1}})
+
+    def test_shared_cache(self):
+        """
+        Tests that results are shared through Django cache, outside of a unit of work.
+        """
+        ldap_cache.get_or_search('test', 'identifier', ('winno_from_bronco_net', 'test_user'), self.search('123'))
+        result = ldap_cache.get_or_search('test', 'identifier', ('winno_from_bronco_net', 'test_user'), self.search())
+
+        self.assertEqual(result, '123')
+        self.assertEqual(self.search_count, 1)
+        self.assertEqual(ldap_cache.get_stats(), {'identifier': {'memo_hits': 0, 'cache_hits': 1, 'misses': 1}})
+
+        with self.subTest('Invalidation'):
+            ldap_cache.invalidate('test', 'identifier', ('winno_from_bronco_net', 'test_user'))
+            ldap_cache.get_or_search('test', 'identifier', ('winno_from_bronco_net', 'test_user'), self.search('123'))
+            self.assertEqual(self.search_count, 2)
+
+    def test_not_found(self):
+        """
+        Tests that searches which found nothing are also cached.
+        """
+        for index in range(3):
+            self.assertIsNone(ldap_cache.get_or_search('test', 'user_info', 'invalid_user', self.search()))
+
+        self.assertEqual(self.search_count, 1)
+
+    def test_get_many(self):
+        """
+        Tests getting many cached results at once.
+        """
+        ldap_cache.set_result('test', 'user_info', 'user_1', {'uid': ['user_1']})
+        ldap_cache.set_result('test', 'user_info', 'user_2', None)
+
+        results, missing_keys = ldap_cache.get_many('test', 'user_info', ['user_1', 'user_2', 'user_3'])
+        self.assertEqual(results, {'user_1': {'uid': ['user_1']}, 'user_2': None})
+        self.assertEqual(missing_keys, ['user_3'])
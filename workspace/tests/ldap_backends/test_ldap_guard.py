@@ -0,0 +1,104 @@
+"""
+Tests for LDAP rate limiting and circuit breaking.
+"""
+
+# System Imports.
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+# User Imports.
+from workspace.ldap_backends import ldap_guard
+
+
+@override_settings(
+    LDAP_RATE_LIMITS={'test': {'interactive': 2, 'batch': 1}},
+    LDAP_RATE_LIMIT_MAX_WAIT={'interactive': 0, 'batch': 0},
+)
+class LdapGuardTests(SimpleTestCase):
+    """
+    Tests to ensure LDAP calls are refused when over budget, or when the directory is failing.
+    """
+    def setUp(self):
+        cache.clear()
+        ldap_guard.reset_breakers()
+        ldap_guard.reset_stats()
+
+    def call(self, name='test', error=None):
+        """
+        Makes a single guarded call, which raises given error.
+        """
+        with ldap_guard.guard(name):
+            if error is not None:
+                raise error
+
+    def test_rate_limit(self):
+        """
+        Tests that calls over budget are refused, with separate budgets per traffic class.
+        """
+        # Ensure all calls fall in the same one second window.
+        with patch.object(ldap_guard.time, 'time', return_value=1000.5):
+            self.call()
+            self.call()
+            with self.assertRaises(ldap_guard.LdapRateLimitError):
+                self.call()
+
+            with ldap_guard.batch_traffic():
+                self.call()
+                with self.assertRaises(ldap_guard.LdapRateLimitError):
+                    self.call()
+
+            # Directories without limits are unaffected.
+            for index in range(5):
+                self.call('unlimited')
+
+        self.assertEqual(ldap_guard.get_stats()['test']['throttled'], 2)
+        self.assertNotIn('unlimited', ldap_guard.get_stats())
+
+    def test_circuit_breaker(self):
+        """
+        Tests that calls fail fast once too many calls have failed.
+        """
+        breaker = ldap_guard.CircuitBreaker('breaker', failure_rate=0.5, min_calls=4, window=60, reset_timeout=60)
+        ldap_guard._breakers['breaker'] = breaker
+
+        # Failures below minimum call count don't open circuit.
+        self.call('breaker')
+        for index in range(2):
+            with self.assertRaises(ValueError):
+                self.call('breaker', ValueError('Server down.'))
+        self.assertFalse(breaker.is_open)
+
+        # Failure rate is now over threshold.
+        with self.assertRaises(ValueError):
+            self.call('breaker', ValueError('Server down.'))
+        self.assertTrue(breaker.is_open)
+
+        # Calls are refused, without being made.
+        with self.assertRaises(ldap_guard.LdapCircuitOpenError):
+            self.call('breaker', AssertionError('Call should not be made.'))
+        self.assertEqual(ldap_guard.get_stats()['breaker'], {
+            'delayed': 0, 'throttled': 0, 'short_circuited': 1, 'opened': 1,
+        })
+
+        with self.subTest('Trial call'):
+            # Once reset timeout passes, a successful trial call closes circuit.
+            breaker.reset_timeout = 0
+            self.call('breaker')
+            self.assertFalse(breaker.is_open)
+
+    def test_refused_calls_not_counted_as_failures(self):
+        """
+        Tests that throttled calls don't count towards opening circuit.
+        """
+        breaker = ldap_guard.get_breaker('test')
+        breaker.min_calls = 1
+
+        with patch.object(ldap_guard.time, 'time', return_value=1000.5):
+            self.call()
+            self.call()
+            for index in range(3):
+                with self.assertRaises(ldap_guard.LdapRateLimitError):
+                    self.call()
+
+        self.assertFalse(breaker.is_open)
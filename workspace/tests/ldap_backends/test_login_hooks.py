@@ -0,0 +1,87 @@
+"""
+Tests for user login hook registry.
+"""
+
+# System Imports.
+import sys, threading, types
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+# User Imports.
+from workspace.ldap_backends import login_hooks
+
+
+HOOK_MODULE = 'login_hook_test_app.management.user_hooks'
+
+
+class LoginHookTests(SimpleTestCase):
+    """
+    Tests to ensure login hooks are found once, and run with timing.
+    """
+    def setUp(self):
+        self.calls = []
+
+        # Hook module for a fake app. Only hook modules are looked up, so app needs nothing else.
+        test_case = self
+
+        class LoginHooks:
+            def __init__(self, request, user):
+                test_case.calls.append((threading.current_thread().name, user))
+
+        hook_module = types.ModuleType(HOOK_MODULE)
+        hook_module.LoginHooks = LoginHooks
+        self.hook_module = hook_module
+
+        patcher = patch.dict(sys.modules, {HOOK_MODULE: hook_module})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        settings_override = override_settings(INSTALLED_CAE_PROJECTS={
+            'Test_Project': {
+                'related_apps': {
+                    'login_hook_test_app': 'login_hook_test_app',
+                    'app_without_hooks': 'login_hook_missing_app',
+                },
+            },
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        login_hooks.discover()
+        login_hooks.reset_timings()
+        self.addCleanup(login_hooks.discover)
+
+    def test_discover(self):
+        """
+        Tests that only apps with hook modules are registered.
+        """
+        self.assertEqual(login_hooks.get_hooks(), [('login_hook_test_app', self.hook_module.LoginHooks)])
+
+    def test_run(self):
+        """
+        Tests that hooks run in login thread, and are timed.
+        """
+        login_hooks.run(None, 'test_user')
+
+        self.assertEqual(self.calls, [(threading.current_thread().name, 'test_user')])
+        self.assertEqual(login_hooks.get_timings()['login_hook_test_app']['calls'], 1)
+
+    @override_settings(LOGIN_HOOK_TIMEOUT=0.01)
+    def test_run_concurrently(self):
+        """
+        Tests that concurrent hooks run in pool, and login stops waiting once timeout passes.
+        """
+        self.hook_module.LoginHooks.run_concurrently = True
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        with patch.object(login_hooks, '_run_hook', side_effect=lambda *args: release.wait(5)):
+            login_hooks.run(None, 'test_user')
+
+        self.assertEqual(login_hooks.get_timings()['login_hook_test_app']['timeouts'], 1)
+        release.set()
+
+        with self.subTest('Hook completes'), override_settings(LOGIN_HOOK_TIMEOUT=5):
+            login_hooks.run(None, 'test_user')
+            self.assertEqual(len(self.calls), 1)
+            self.assertTrue(self.calls[0][0].startswith('login_hooks'))
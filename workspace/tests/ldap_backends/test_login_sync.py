@@ -0,0 +1,85 @@
+"""
+Tests for LDAP login fast path, and syncing of out of date users on login.
+"""
+
+# System Imports.
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+# User Imports.
+from cae_home import models
+from cae_home.tests.utils import IntegrationTestCase
+from workspace.ldap_backends import connection_pool, fake_ldap, ldap_guard
+from workspace.ldap_backends.wmu_auth.cae_backend import CaeAuthBackend
+
+
+@override_settings(**fake_ldap.SETTINGS, AUTH_BACKEND_USE_DJANGO_USER_PASSWORDS=False, LDAP_RATE_LIMITS={})
+class LoginSyncTests(IntegrationTestCase):
+    """
+    Tests to ensure logins by known users only wait on the credential bind.
+    """
+    def setUp(self):
+        self.directory = fake_ldap.FakeDirectory.generate(user_count=5)
+        fake_ldap.set_directory(self.directory)
+
+        # Make sure no pooled connections or cached results remain from prior tests.
+        connection_pool.close_all()
+        cache.clear()
+        ldap_guard.reset_breakers()
+
+        self.uid = self.directory.users[0][0]
+        self.cae_auth = CaeAuthBackend()
+
+    def tearDown(self):
+        fake_ldap.set_directory(None)
+        connection_pool.close_all()
+
+    def login(self):
+        """
+        Logs in as test user, and counts directory calls made.
+        """
+        self.directory.reset_calls()
+        user = self.cae_auth.authenticate(None, username=self.uid, password=fake_ldap.DEFAULT_PASSWORD)
+        return user, self.directory.get_calls()
+
+    def test_login_sync(self):
+        """
+        Tests that only new or out of date users sync on login.
+        """
+        with self.subTest('New user'):
+            # Synced before login completes.
+            with self.captureOnCommitCallbacks(execute=True):
+                user, calls = self.login()
+            self.assertEqual(user.username, self.uid)
+            self.assertGreater(calls['search'], 0)
+
+        with self.subTest('Recently synced user'):
+            with self.captureOnCommitCallbacks(execute=True):
+                user, calls = self.login()
+            self.assertEqual(user.username, self.uid)
+            self.assertEqual(calls, {'authenticate': 1})
+
+        with self.subTest('Out of date user'):
+            # Info may predate LDAP group removals. Synced before login completes.
+            models.UserIntermediary.objects.filter(bronco_net=self.uid).update(
+                last_ldap_check=timezone.localdate() - timezone.timedelta(days=2),
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                user, calls = self.login()
+            self.assertEqual(user.username, self.uid)
+            self.assertGreater(calls['search'], 0)
+            user_intermediary = models.UserIntermediary.objects.get(bronco_net=self.uid)
+            self.assertEqual(user_intermediary.last_ldap_check, timezone.localdate())
+
+    def test_filter_escaping(self):
+        """
+        Tests that searched values are escaped in LDAP filters, so they only ever match that exact user.
+        """
+        for search_value in ('*', '{0}*'.format(self.uid[:-1]), '{0})(uid=*'.format(self.uid)):
+            with self.subTest(search_value):
+                self.assertIsNone(self.cae_auth.get_ldap_user_info(search_value, attributes=['uid']))
+                self.assertIsNone(self.cae_auth.get_ldap_user_attribute(search_value, 'uid'))
+
+        with self.subTest('Exact value'):
+            self.assertEqual(self.cae_auth.get_ldap_user_attribute(self.uid, 'uid'), self.uid)
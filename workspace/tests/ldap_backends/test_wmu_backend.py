@@ -262,7 +262,8 @@ class WmuAuthBackendTests(IntegrationTestCase):
 
             # Test values.
             self.assertIsNotNone(ldap_results)
-            self.assertEqual(len(ldap_results), 29)
+            # Only attributes used by user operations are requested.
+            self.assertLessEqual(set(ldap_results.keys()), set(WmuAuthBackend.USER_INFO_ATTRIBUTES))
             self.assertEqual(ldap_results['uid'][0], self.test_ceas_prog_account)
             self.assertEqual(ldap_results['sn'][0], 'Programmers')
             self.assertEqual(ldap_results['givenName'][0], 'CAE')
@@ -284,6 +285,24 @@ class WmuAuthBackendTests(IntegrationTestCase):
             self.assertEqual(ldap_results['uid'][0], self.test_student_account)
             self.assertEqual(ldap_results['mail'][0][-10:], '@wmich.edu')
 
+    @unittest.skipUnless(run_ldap_tests(), 'Missing criteria for LDAP. Skipping Ldap tests.')
+    @unittest.skipUnless(prog_or_student_test_account_is_populated(), 'No Ldap User specified. Skipping Ldap tests.')
+    def test_get_all_user_info(self):
+        # Get test accounts.
+        bronco_nets = []
+        if prog_test_account_is_populated():
+            bronco_nets.append(self.test_ceas_prog_account)
+        if student_test_account_is_populated():
+            bronco_nets.append(self.test_student_account)
+
+        # Get ldap results, including a value which should not exist.
+        ldap_results = self.wmu_backend.get_all_user_info(bronco_nets + ['invalid_bronco_net'], chunk_size=1)
+
+        # Test values.
+        self.assertEqual(sorted(ldap_results.keys()), sorted(bronco_nets))
+        for bronco_net in bronco_nets:
+            self.assertEqual(ldap_results[bronco_net], self.wmu_backend._get_all_user_info_from_bronconet(bronco_net))
+
     @unittest.skipUnless(run_ldap_tests(), 'Missing criteria for LDAP. Skipping Ldap tests.')
     @unittest.skipUnless(prog_or_student_test_account_is_populated(), 'No Ldap User specified. Skipping Ldap tests.')
     def test___get_all_user_info_from_winno(self):
@@ -0,0 +1,138 @@
+"""
+Tests for project logging.
+"""
+
+# System Imports.
+import json, logging, sys
+from django.core import mail
+from django.test import TestCase, override_settings
+
+# User Imports.
+from workspace.logging import DigestAdminEmailHandler
+
+
+@override_settings(ADMINS=[('Test Admin', 'test_admin@wmich.edu')])
+class DigestAdminEmailHandlerTests(TestCase):
+    """
+    Tests to ensure admin error emails are deduplicated and sent as digests.
+    """
+    def setUp(self):
+        # Disable background worker, so that tests control when digests send.
+        self.handler = DigestAdminEmailHandler(max_emails_per_hour=2, background=False)
+        self.logger = logging.getLogger('workspace.tests.test_logging')
+
+    def tearDown(self):
+        # Close handler, so that unsent test errors are discarded rather than emailed on program exit.
+        self.handler.close()
+
+    def get_record(self, exception_class):
+        """
+        Returns error log record for an exception raised from a consistent frame.
+        """
+        try:
+            raise exception_class('Test error.')
+        except exception_class:
+            return self.logger.makeRecord(
+                self.logger.name, logging.ERROR, __file__, 0, 'Test error.', None, sys.exc_info(),
+            )
+
+    def test_fingerprint(self):
+        """
+        Tests that errors are fingerprinted by exception type and raising frame.
+        """
+        self.assertEqual(
+            self.handler.get_fingerprint(self.get_record(ValueError)),
+            self.handler.get_fingerprint(self.get_record(ValueError)),
+        )
+        self.assertNotEqual(
+            self.handler.get_fingerprint(self.get_record(ValueError)),
+            self.handler.get_fingerprint(self.get_record(KeyError)),
+        )
+
+        with self.subTest('Errors raised within library code'):
+            # Same library frame raises both errors. Fingerprint should use calling project frame instead.
+            try:
+                json.loads('{')
+            except ValueError:
+                first_exc_info = sys.exc_info()
+            try:
+                json.loads('{')
+            except ValueError:
+                second_exc_info = sys.exc_info()
+
+            first_fingerprint = self.handler.get_fingerprint(self.logger.makeRecord(
+                self.logger.name, logging.ERROR, __file__, 0, 'Test error.', None, first_exc_info,
+            ))
+            second_fingerprint = self.handler.get_fingerprint(self.logger.makeRecord(
+                self.logger.name, logging.ERROR, __file__, 0, 'Test error.', None, second_exc_info,
+            ))
+            self.assertIn(__file__, first_fingerprint)
+            self.assertNotEqual(first_fingerprint, second_fingerprint)
+
+    def test_digest(self):
+        """
+        Tests that repeated errors are sent as a single email, with occurrence counts.
+        """
+        with self.subTest('Single error type'):
+            for index in range(5):
+                self.handler.emit(self.get_record(ValueError))
+
+            # Nothing should be sent until digest is due.
+            self.assertEqual(len(mail.outbox), 0)
+
+            self.handler.flush()
+            self.assertEqual(len(mail.outbox), 1)
+            self.assertIn('(x5)', mail.outbox[0].subject)
+            self.assertIn('Occurrences: 5', mail.outbox[0].body)
+
+        with self.subTest('Multiple error types'):
+            for index in range(3):
+                self.handler.emit(self.get_record(ValueError))
+            self.handler.emit(self.get_record(KeyError))
+
+            self.handler.flush()
+            self.assertEqual(len(mail.outbox), 2)
+            self.assertIn('2 errors (4 occurrences)', mail.outbox[1].subject)
+            self.assertIn('Occurrences: 3', mail.outbox[1].body)
+            self.assertIn('Occurrences: 1', mail.outbox[1].body)
+
+        with self.subTest('Repeats after first occurrence was sent'):
+            self.handler.emit(self.get_record(ValueError))
+            self.handler.add_pending(self.handler.queue.get_nowait())
+
+            # Repeat is queued before digest sends, but only collected afterwards.
+            self.handler.emit(self.get_record(ValueError))
+            self.handler.send_digest(force=True)
+            self.assertEqual(len(mail.outbox), 3)
+
+            # Repeat should still be reported, with count.
+            self.handler.flush()
+            self.assertEqual(len(mail.outbox), 4)
+            self.assertIn('Occurrences: 1', mail.outbox[3].body)
+            self.assertIn('Full details were sent in an earlier digest.', mail.outbox[3].body)
+
+    def test_rate_limit(self):
+        """
+        Tests that errors are held back once hourly email limit is reached.
+        """
+        for index in range(3):
+            self.handler.emit(self.get_record(ValueError))
+            while not self.handler.queue.empty():
+                self.handler.add_pending(self.handler.queue.get_nowait())
+            self.handler.send_digest()
+
+        # Limit is two emails. Third should still be pending.
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(self.handler.pending[self.handler.get_fingerprint(self.get_record(ValueError))]['count'], 1)
+
+    def test_close(self):
+        """
+        Tests that closed handlers discard unsent errors.
+        """
+        self.handler.emit(self.get_record(ValueError))
+        self.handler.close()
+
+        # Neither flushing nor further errors should send email.
+        self.handler.emit(self.get_record(ValueError))
+        self.handler.flush()
+        self.assertEqual(len(mail.outbox), 0)